@@ -0,0 +1,81 @@
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator
+
+METHODS = ["GET", "GET", "GET", "GET", "POST", "PUT", "DELETE"]
+SUCCESS_STATUS = [200, 200, 200, 201, 204, 301, 304]
+ERROR_STATUS = [400, 401, 403, 404, 404, 404, 500, 502, 503]
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 14_6 like Mac OS X)",
+    "Googlebot/2.1 (+http://www.google.com/bot.html)",
+    "curl/7.68.0",
+    "-",
+]
+REFERRERS = ["-", "-", "https://example.com/", "https://google.com/"]
+
+START_TIME = datetime(2024, 11, 26, 0, 0, 0, tzinfo=timezone.utc)
+
+
+def generate_lines(
+    lines: int,
+    ip_cardinality: int = 1000,
+    path_cardinality: int = 200,
+    error_ratio: float = 0.1,
+    seed: int = 42,
+    start: datetime = START_TIME,
+) -> Iterator[str]:
+    """
+    Genera líneas de log nginx sintéticas y deterministas.
+
+    Args:
+        lines: Número de líneas a generar
+        ip_cardinality: Número de IPs distintas
+        path_cardinality: Número de rutas distintas
+        error_ratio: Proporción de respuestas 4xx/5xx
+        seed: Semilla; la misma semilla genera siempre el mismo log
+        start: Timestamp de la primera línea
+    """
+    rng = random.Random(seed)
+    ips = [
+        f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}"
+        for i in range(ip_cardinality)
+    ]
+    paths = [
+        f"/api/resource/{i}" if i % 3 else f"/page/{i}.html"
+        for i in range(path_cardinality)
+    ]
+    timestamp = start
+
+    for _ in range(lines):
+        timestamp += timedelta(milliseconds=rng.randrange(0, 200))
+        if rng.random() < error_ratio:
+            status = rng.choice(ERROR_STATUS)
+        else:
+            status = rng.choice(SUCCESS_STATUS)
+        yield (
+            f"{rng.choice(ips)} - - [{timestamp.strftime('%d/%b/%Y:%H:%M:%S %z')}] "
+            f'"{rng.choice(METHODS)} {rng.choice(paths)} HTTP/1.1" '
+            f"{status} {rng.randrange(0, 50000)} "
+            f'"{rng.choice(REFERRERS)}" "{rng.choice(USER_AGENTS)}"'
+        )
+
+
+def generate_nginx_log(
+    path: Path,
+    lines: int,
+    ip_cardinality: int = 1000,
+    path_cardinality: int = 200,
+    error_ratio: float = 0.1,
+    seed: int = 42,
+) -> Path:
+    """Escribe un log nginx sintético en `path` y retorna la ruta."""
+    with open(path, "w", encoding="utf-8") as f:
+        for line in generate_lines(
+            lines, ip_cardinality, path_cardinality, error_ratio, seed
+        ):
+            f.write(line)
+            f.write("\n")
+    return Path(path)
@@ -0,0 +1,337 @@
+"""
+Benchmarks reproducibles de parseo, análisis, formateo y exportación.
+
+Uso:
+    python -m benchmarks.run run --lines 200000 --output results.json
+    python -m benchmarks.run compare base.json results.json --threshold 0.10
+"""
+
+import importlib
+import io
+import json
+import multiprocessing
+import platform
+import queue as queue_module
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import click
+
+from benchmarks.log_generator import generate_nginx_log
+from src.analyzers.log_analyzer import LogAnalyzer
+from src.parsers.nginx_parser import NginxParser
+
+# Segundos que se espera a un caso antes de darlo por colgado
+CASE_TIMEOUT = 600.0
+
+# Un caso recibe la ruta del log y retorna (operación a medir, nº de elementos)
+Case = Callable[[Path], Tuple[Callable[[], object], int]]
+
+ANALYZER_CALLS: Dict[str, Tuple] = {
+    "total_requests": (),
+    "total_errors": (),
+    "total_success": (),
+    "get_status_counts": (),
+    "most_common_status": (),
+    "top_ips": (10,),
+    "top_paths": (10,),
+    "get_method_counts": (),
+    "most_common_method": (),
+    "error_rate": (),
+    "get_errors": (),
+    "client_error_count": (),
+    "server_error_count": (),
+    "requests_by_hour": (),
+    "busiest_hour": (),
+    "requests_by_date": (),
+    "total_bytes_transferred": (),
+    "average_response_size": (),
+    "largest_response": (),
+    "unique_ips_count": (),
+    "get_unique_ips": (),
+    "filter_by_status": (404,),
+    "filter_by_ip": ("10.0.0.1",),
+    "filter_by_method": ("GET",),
+    "filter_by_path": ("/page/0.html",),
+    "get_summary": (),
+}
+
+# Formateador -> (clase, método -> función que obtiene la entrada del analyzer).
+# Las clases se importan dentro de cada caso: un formateador roto solo
+# invalida sus propios casos.
+FORMATTER_CALLS: Dict[str, Tuple[str, Dict[str, Callable]]] = {
+    "json": (
+        "src.formatters.json_formatter.JSONFormatter",
+        {
+            "format_summary": lambda a: a.get_summary(),
+            "format_top_ips": lambda a: a.top_ips(None),
+            "format_top_paths": lambda a: a.top_paths(None),
+            "format_status_counts": lambda a: a.get_status_counts(),
+        },
+    ),
+    "csv": (
+        "src.formatters.csv_formatter.CSVFormatter",
+        {
+            "format_top_ips": lambda a: a.top_ips(None),
+            "format_top_paths": lambda a: a.top_paths(None),
+            "format_status_counts": lambda a: a.get_status_counts(),
+        },
+    ),
+    "markdown": (
+        "src.formatters.markdown_formatter.MarkdownFormatter",
+        {
+            "format_summary": lambda a: a.get_summary(),
+            "format_top_ips": lambda a: a.top_ips(None),
+            "format_top_paths": lambda a: a.top_paths(None),
+            "format_status_counts": lambda a: a.get_status_counts(),
+            "format_full_report": lambda a: a,
+        },
+    ),
+}
+
+
+def _load_analyzer(log: Path) -> LogAnalyzer:
+    return LogAnalyzer(list(NginxParser().parse_file(log)))
+
+
+def _parse_case(log: Path):
+    with open(log, "rb") as f:
+        lines = sum(1 for _ in f)
+    return (lambda: sum(1 for _ in NginxParser().parse_file(log))), lines
+
+
+def _analyzer_case(method: str) -> Case:
+    def setup(log: Path):
+        analyzer = _load_analyzer(log)
+        func = getattr(analyzer, method)
+        args = ANALYZER_CALLS[method]
+        return (lambda: func(*args)), analyzer.total_requests()
+
+    return setup
+
+
+def _formatter_case(class_path: str, method: str, make_input: Callable) -> Case:
+    def setup(log: Path):
+        module_name, class_name = class_path.rsplit(".", 1)
+        formatter_cls = getattr(importlib.import_module(module_name), class_name)
+        data = make_input(_load_analyzer(log))
+        func = getattr(formatter_cls(), method)
+        items = len(data) if hasattr(data, "__len__") else 1
+        return (lambda: func(data)), items
+
+    return setup
+
+
+def _export_case(method: str) -> Case:
+    def setup(log: Path):
+        from src.formatters.entry_exporter import EntryExporter
+
+        entries = list(NginxParser().parse_file(log))
+        func = getattr(EntryExporter(), method)
+        return (lambda: func(entries, io.StringIO())), len(entries)
+
+    return setup
+
+
+def build_cases() -> Dict[str, Case]:
+    """Retorna todos los casos de benchmark por nombre."""
+    cases: Dict[str, Case] = {"parse.nginx": _parse_case}
+    for method in ANALYZER_CALLS:
+        cases[f"analyze.{method}"] = _analyzer_case(method)
+    for name, (class_path, methods) in FORMATTER_CALLS.items():
+        for method, make_input in methods.items():
+            cases[f"format.{name}.{method}"] = _formatter_case(
+                class_path, method, make_input
+            )
+    cases["export.jsonl"] = _export_case("write_jsonl")
+    cases["export.csv"] = _export_case("write_csv")
+    return cases
+
+
+def _max_rss_kb() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _run_case(name: str, log: str, repeat: int, queue) -> None:
+    """Ejecuta un caso en un proceso aislado y envía el resultado por la cola."""
+    try:
+        operation, items = build_cases()[name](Path(log))
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            operation()
+            best = min(best, time.perf_counter() - start)
+        queue.put(
+            {
+                "name": name,
+                "items": items,
+                "seconds": best,
+                "items_per_sec": items / best if best else 0.0,
+                "peak_rss_kb": _max_rss_kb(),
+            }
+        )
+    except Exception as e:
+        queue.put({"name": name, "error": repr(e)})
+
+
+def _wait_result(name: str, process, queue, timeout: float = CASE_TIMEOUT) -> Dict:
+    """
+    Retorna el resultado que el proceso de un caso envía por la cola.
+
+    Si el proceso muere sin enviarlo (OOM, segfault) o tarda más de
+    timeout segundos, retorna un resultado con error en lugar de esperar
+    para siempre.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return queue.get(timeout=min(1.0, max(deadline - time.monotonic(), 0.01)))
+        except queue_module.Empty:
+            pass
+        if not process.is_alive():
+            try:
+                # Pudo enviar el resultado justo antes de terminar
+                return queue.get(timeout=0.1)
+            except queue_module.Empty:
+                return {
+                    "name": name,
+                    "error": f"el proceso terminó con código {process.exitcode}",
+                }
+        if time.monotonic() >= deadline:
+            process.terminate()
+            return {"name": name, "error": f"sin resultado tras {timeout:.0f} s"}
+
+
+def run_benchmarks(log: Path, names: List[str], repeat: int = 3) -> List[Dict]:
+    """
+    Ejecuta los casos indicados, cada uno en un proceso nuevo.
+
+    Un proceso por caso hace que el pico de RSS de uno no contamine al resto:
+    peak_rss_kb es el pico del proceso del caso, preparación incluida (p. ej.
+    parsear el log para los casos de análisis).
+    """
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    for name in names:
+        queue = ctx.Queue()
+        process = ctx.Process(target=_run_case, args=(name, str(log), repeat, queue))
+        process.start()
+        results.append(_wait_result(name, process, queue))
+        process.join()
+    return results
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare_results(base: Dict, new: Dict, threshold: float) -> List[Tuple[str, float]]:
+    """Retorna (caso, ratio nuevo/base) de los casos más lentos que el umbral."""
+    base_by_name = {r["name"]: r for r in base["results"] if "error" not in r}
+    regressions = []
+    for result in new["results"]:
+        old = base_by_name.get(result["name"])
+        if old is None or "error" in result or not old["items_per_sec"]:
+            continue
+        ratio = result["items_per_sec"] / old["items_per_sec"]
+        if ratio < 1 - threshold:
+            regressions.append((result["name"], ratio))
+    return regressions
+
+
+@click.group()
+def main() -> None:
+    """Benchmarks de parseo, análisis y formateo."""
+
+
+@main.command()
+@click.option(
+    "--lines", default=100_000, show_default=True, help="Líneas del log sintético."
+)
+@click.option("--ips", default=1000, show_default=True, help="IPs distintas.")
+@click.option("--paths", default=200, show_default=True, help="Rutas distintas.")
+@click.option(
+    "--error-ratio", default=0.1, show_default=True, help="Proporción de errores."
+)
+@click.option("--seed", default=42, show_default=True, help="Semilla del generador.")
+@click.option(
+    "--repeat", default=3, show_default=True, help="Repeticiones (se toma la mejor)."
+)
+@click.option(
+    "--filter", "pattern", default="", help="Solo casos que contienen este texto."
+)
+@click.option(
+    "--output", type=click.Path(dir_okay=False), help="Archivo JSON de resultados."
+)
+def run(lines, ips, paths, error_ratio, seed, repeat, pattern, output) -> None:
+    """Genera un log sintético y ejecuta los benchmarks."""
+    names = [name for name in build_cases() if pattern in name]
+    with tempfile.TemporaryDirectory() as tmp:
+        log = generate_nginx_log(
+            Path(tmp) / "bench.log", lines, ips, paths, error_ratio, seed
+        )
+        results = run_benchmarks(log, names, repeat)
+
+    for r in results:
+        if "error" in r:
+            click.echo(f"{r['name']:<40} ERROR {r['error']}")
+        else:
+            click.echo(
+                f"{r['name']:<40} {r['items_per_sec']:>14,.0f}/s "
+                f"{r['peak_rss_kb'] / 1024:>8.1f} MiB"
+            )
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "date": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "params": {
+                "lines": lines,
+                "ips": ips,
+                "paths": paths,
+                "error_ratio": error_ratio,
+                "seed": seed,
+                "repeat": repeat,
+            },
+        },
+        "results": results,
+    }
+    if output:
+        Path(output).write_text(json.dumps(report, indent=2))
+
+
+@main.command()
+@click.argument("base", type=click.Path(exists=True, dir_okay=False))
+@click.argument("new", type=click.Path(exists=True, dir_okay=False))
+@click.option("--threshold", default=0.10, show_default=True, help="Pérdida tolerada.")
+def compare(base, new, threshold) -> None:
+    """Compara dos resultados y falla si algún caso empeora más del umbral."""
+    regressions = compare_results(
+        json.loads(Path(base).read_text()), json.loads(Path(new).read_text()), threshold
+    )
+    for name, ratio in regressions:
+        click.echo(f"{name:<40} {ratio:.2f}x")
+    if regressions:
+        sys.exit(1)
+    click.echo("Sin regresiones.")
+
+
+if __name__ == "__main__":
+    main()
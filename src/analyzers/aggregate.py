@@ -0,0 +1,159 @@
+from collections import Counter
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+from .. import profiling
+from ..models.log_entry import LogEntry
+from .path_normalizer import PathNormalizer
+
+if TYPE_CHECKING:
+    from .user_agents import UserAgentBreakdown, UserAgentClassifier
+
+
+@profiling.instrument("aggregate", exclude=("update",))
+class LogAggregate:
+    """
+    Métricas de un log acumuladas en una sola pasada.
+
+    A diferencia de LogAnalyzer no guarda las entradas: cada una actualiza
+    unos contadores y se descarta, así que sirve para logs que no caben en
+    memoria y para generar todos los informes sin recorrer los logs otra vez.
+    Los totales de error y éxito se derivan de las cuentas por status, con
+    la misma definición que LogEntry. Con un PathNormalizer los paths se
+    cuentan por plantilla (/api/users/{id}), lo que además acota su
+    cardinalidad. Los user agents se cuentan en bruto y se clasifican al
+    pedir el desglose, una vez por UA distinto.
+    """
+
+    def __init__(self, normalizer: Optional[PathNormalizer] = None) -> None:
+        self.normalizer = normalizer
+        self.total_requests = 0
+        self.total_bytes = 0
+        self.status_counts: Counter = Counter()
+        self.method_counts: Counter = Counter()
+        self.ip_counts: Counter = Counter()
+        self.path_counts: Counter = Counter()
+        self.hour_counts: Counter = Counter()
+        self.user_agent_counts: Counter = Counter()
+        self.first_seen: Optional[datetime] = None
+        self.last_seen: Optional[datetime] = None
+
+    def update(self, entry: LogEntry) -> None:
+        """Añade una entrada."""
+        self.consume((entry,))
+
+    def consume(self, entries: Iterable[LogEntry]) -> int:
+        """Añade todas las entradas de entries. Retorna cuántas se añadieron."""
+        status_counts = self.status_counts
+        method_counts = self.method_counts
+        ip_counts = self.ip_counts
+        path_counts = self.path_counts
+        hour_counts = self.hour_counts
+        user_agent_counts = self.user_agent_counts
+        normalize = self.normalizer.normalize if self.normalizer else None
+        first, last = self.first_seen, self.last_seen
+        count = 0
+        total_bytes = 0
+        for e in entries:
+            count += 1
+            total_bytes += e.response_size
+            status_counts[e.status_code] += 1
+            method_counts[e.method] += 1
+            ip_counts[e.ip] += 1
+            path_counts[e.path if normalize is None else normalize(e.path)] += 1
+            user_agent_counts[e.user_agent] += 1
+            ts = e.timestamp
+            hour_counts[ts.hour] += 1
+            if first is None or ts < first:
+                first = ts
+            if last is None or ts > last:
+                last = ts
+        self.total_requests += count
+        self.total_bytes += total_bytes
+        self.first_seen, self.last_seen = first, last
+        return count
+
+    def merge(self, other: "LogAggregate") -> None:
+        """Suma a este agregado las cuentas de other (p. ej. de otro worker)."""
+        self.total_requests += other.total_requests
+        self.total_bytes += other.total_bytes
+        self.status_counts.update(other.status_counts)
+        self.method_counts.update(other.method_counts)
+        self.ip_counts.update(other.ip_counts)
+        self.path_counts.update(other.path_counts)
+        self.hour_counts.update(other.hour_counts)
+        self.user_agent_counts.update(other.user_agent_counts)
+        for ts in (other.first_seen, other.last_seen):
+            if ts is None:
+                continue
+            if self.first_seen is None or ts < self.first_seen:
+                self.first_seen = ts
+            if self.last_seen is None or ts > self.last_seen:
+                self.last_seen = ts
+
+    def _count_status(self, low: int, high: int) -> int:
+        return sum(c for s, c in self.status_counts.items() if low <= s <= high)
+
+    @property
+    def total_success(self) -> int:
+        """Retorna el total de éxitos (2xx)"""
+        return self._count_status(200, 299)
+
+    @property
+    def total_errors(self) -> int:
+        """Retorna el total de errores (todo lo que no es 2xx, como LogEntry.is_error)"""
+        return self.total_requests - self.total_success
+
+    @property
+    def client_errors(self) -> int:
+        """Retorna el número de errores de cliente (4xx)"""
+        return self._count_status(400, 499)
+
+    @property
+    def server_errors(self) -> int:
+        """Retorna el número de errores de servidor (5xx)"""
+        return self._count_status(500, 599)
+
+    @property
+    def error_rate(self) -> float:
+        """Retorna el ratio de errores"""
+        if not self.total_requests:
+            return 0.0
+        return self.total_errors / self.total_requests
+
+    @property
+    def unique_ips(self) -> int:
+        """Retorna el número de IPs únicas"""
+        return len(self.ip_counts)
+
+    def top_ips(self, n: Optional[int] = 10) -> List[Tuple[str, int]]:
+        """Retorna top N IPs más activas."""
+        return self.ip_counts.most_common(n)
+
+    def top_paths(self, n: Optional[int] = 10) -> List[Tuple[str, int]]:
+        """Retorna top N paths más visitados."""
+        return self.path_counts.most_common(n)
+
+    def requests_by_hour(self) -> Dict[int, int]:
+        """Retorna las requests por hora del día, ordenadas por hora."""
+        return dict(sorted(self.hour_counts.items()))
+
+    def user_agents(
+        self, classifier: Optional["UserAgentClassifier"] = None
+    ) -> "UserAgentBreakdown":
+        """Retorna las requests por navegador, sistema, dispositivo y bot."""
+        if classifier is None:
+            from .user_agents import UserAgentClassifier
+
+            classifier = UserAgentClassifier()
+        return classifier.breakdown(self.user_agent_counts.items())
+
+    def get_summary(self) -> Dict[str, int | float]:
+        """Retorna el resumen, con las mismas claves que LogAnalyzer.get_summary"""
+        return {
+            "total_requests": self.total_requests,
+            "total_errors": self.total_errors,
+            "error_rate": self.error_rate,
+            "unique_ips": self.unique_ips,
+            "total_bytes": self.total_bytes,
+        }
@@ -0,0 +1,53 @@
+from typing import FrozenSet, Iterable, Iterator, Optional
+
+from ..models.log_entry import LogEntry
+from .ip_ranges import CidrTable
+from .path_normalizer import PathNormalizer
+
+
+def parse_status_spec(spec: str) -> FrozenSet[int]:
+    """
+    Retorna el conjunto de códigos de estado descrito por spec.
+
+    Acepta códigos exactos ("404"), clases ("5xx") y listas separadas por
+    comas ("4xx,500"). Lanza ValueError si algún elemento no es válido.
+    """
+    codes = set()
+    for part in spec.split(","):
+        part = part.strip().lower()
+        if len(part) == 3 and part[0] in "12345" and part[1:] == "xx":
+            base = int(part[0]) * 100
+            codes.update(range(base, base + 100))
+        elif part.isdigit() and 100 <= int(part) <= 599:
+            codes.add(int(part))
+        else:
+            raise ValueError(f"Status inválido: {part!r}")
+    return frozenset(codes)
+
+
+def filter_status(
+    entries: Iterable[LogEntry], statuses: FrozenSet[int]
+) -> Iterator[LogEntry]:
+    """Retorna las entradas cuyo status_code está en statuses, de forma perezosa."""
+    return (e for e in entries if e.status_code in statuses)
+
+
+def filter_path_template(
+    entries: Iterable[LogEntry],
+    template: str,
+    normalizer: Optional[PathNormalizer] = None,
+) -> Iterator[LogEntry]:
+    """
+    Retorna las entradas cuyo path normalizado es template (p. ej.
+    "/api/users/{id}"), de forma perezosa.
+    """
+    normalize = (normalizer or PathNormalizer()).normalize
+    return (e for e in entries if normalize(e.path) == template)
+
+
+def filter_networks(
+    entries: Iterable[LogEntry], table: CidrTable
+) -> Iterator[LogEntry]:
+    """Retorna las entradas cuya IP está en algún prefijo de table, de forma perezosa."""
+    lookup = table.lookup
+    return (e for e in entries if lookup(e.ip) is not None)
@@ -0,0 +1,433 @@
+import csv
+import hashlib
+import ipaddress
+import mmap
+import os
+import stat
+import struct
+import tempfile
+from abc import ABC, abstractmethod
+from bisect import bisect_right
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import maxminddb
+except ImportError:
+    maxminddb = None
+
+from .ip_ranges import flatten_ranges, ip_to_int
+
+# IPs distintas cuyo resultado se recuerda
+CACHE_SIZE = 65_536
+
+# Cabecera de una tabla compilada: magic, número de rangos y de registros, y
+# tamaño y st_mtime_ns del CSV de origen (para saber si la tabla está al día)
+MAGIC = b"LPGEO\x00\x02\x00"
+HEADER = struct.Struct("<8sQQQq")
+
+# Cada clave es la IP en 16 bytes big-endian (las IPv4 como ::ffff:a.b.c.d),
+# así que comparar bytes equivale a comparar las IPs como enteros
+KEY_SIZE = 16
+_V4_BASE = 0xFFFF << 32
+
+# Nombres de columna aceptados en los CSV de rangos
+NETWORK_COLUMNS = ("network", "cidr")
+START_COLUMNS = ("start_ip", "range_start", "start")
+END_COLUMNS = ("end_ip", "range_end", "end")
+COUNTRY_COLUMNS = ("country", "country_code", "country_iso_code")
+ASN_COLUMNS = ("asn", "autonomous_system_number", "as_number")
+ORG_COLUMNS = ("org", "as_org", "autonomous_system_organization", "as_name")
+
+GeoGroup = Dict[str, int]
+
+
+@dataclass(frozen=True)
+class GeoInfo:
+    """País y sistema autónomo de una IP; cada campo puede faltar."""
+
+    country: Optional[str] = None
+    asn: Optional[int] = None
+    org: Optional[str] = None
+
+    @property
+    def asn_label(self) -> Optional[str]:
+        """Retorna "AS13335 Cloudflare", o None si no hay ASN."""
+        if self.asn is None:
+            return None
+        return f"AS{self.asn} {self.org}" if self.org else f"AS{self.asn}"
+
+
+def _key(ip: str) -> Optional[bytes]:
+    parsed = ip_to_int(ip)
+    if parsed is None:
+        return None
+    version, value = parsed
+    if version == 4:
+        value |= _V4_BASE
+    return value.to_bytes(KEY_SIZE, "big")
+
+
+def _column(fieldnames: List[str], names: Tuple[str, ...]) -> Optional[str]:
+    lowered = {name.strip().lower(): name for name in fieldnames}
+    for name in names:
+        if name in lowered:
+            return lowered[name]
+    return None
+
+
+def _read_ranges(path: str) -> Tuple[List[Tuple[int, int, int]], List[GeoInfo]]:
+    """
+    Lee un CSV de rangos con cabecera: una columna network (CIDR) o
+    start_ip/end_ip, y country, asn y org (todas opcionales). Retorna los
+    rangos (inicio, fin, índice de registro) y los registros sin repetir.
+
+    Raises:
+        ValueError: Si faltan las columnas de rango o una fila no es válida
+    """
+    records: Dict[GeoInfo, int] = {}
+    ranges: List[Tuple[int, int, int]] = []
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        fields = reader.fieldnames or []
+        network_col = _column(fields, NETWORK_COLUMNS)
+        start_col = _column(fields, START_COLUMNS)
+        end_col = _column(fields, END_COLUMNS)
+        if network_col is None and (start_col is None or end_col is None):
+            raise ValueError(f"{path}: se espera una columna network o start_ip/end_ip")
+        country_col = _column(fields, COUNTRY_COLUMNS)
+        asn_col = _column(fields, ASN_COLUMNS)
+        org_col = _column(fields, ORG_COLUMNS)
+
+        for row in reader:
+            try:
+                if network_col is not None:
+                    net = ipaddress.ip_network(row[network_col].strip(), strict=False)
+                    first, last = net.network_address, net.broadcast_address
+                else:
+                    first = ipaddress.ip_address(row[start_col].strip())
+                    last = ipaddress.ip_address(row[end_col].strip())
+                start = int.from_bytes(_key(str(first)), "big")
+                end = int.from_bytes(_key(str(last)), "big")
+                asn = (row.get(asn_col) or "").strip().upper().removeprefix("AS")
+                info = GeoInfo(
+                    (row.get(country_col) or "").strip().upper() or None,
+                    int(asn) if asn else None,
+                    (row.get(org_col) or "").strip() or None,
+                )
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"{path}:{reader.line_num}: {e}")
+            if end < start:
+                raise ValueError(f"{path}:{reader.line_num}: rango invertido")
+            index = records.setdefault(info, len(records))
+            ranges.append((start, end, index))
+    return ranges, list(records)
+
+
+def compile_ranges(csv_path: str, out_path: str) -> int:
+    """
+    Compila un CSV de rangos (ver _read_ranges) en una tabla binaria para
+    GeoIpTable. Retorna el número de intervalos escritos.
+
+    Los rangos anidados se resuelven por el más específico. El archivo
+    tiene la cabecera (con el tamaño y el mtime del CSV), los inicios y los finales de los intervalos como
+    claves de 16 bytes, el índice de registro de cada uno (uint32) y los
+    registros como líneas "país<TAB>asn<TAB>org".
+    """
+    # El stat va antes de leer: si el CSV cambia mientras tanto, la tabla
+    # queda marcada como desfasada y se recompila la próxima vez
+    source = os.stat(csv_path)
+    ranges, records = _read_ranges(csv_path)
+    flat = flatten_ranges(ranges)
+    # Temporal con nombre impredecible (O_EXCL, modo 0600) y rename atómico:
+    # nadie puede adelantarse creando el temporal o un enlace con su nombre
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f"{os.path.basename(out_path)}.",
+        suffix=".tmp",
+        dir=os.path.dirname(os.path.abspath(out_path)),
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(
+                HEADER.pack(
+                    MAGIC, len(flat), len(records), source.st_size, source.st_mtime_ns
+                )
+            )
+            f.write(b"".join(start.to_bytes(KEY_SIZE, "big") for start, _, _ in flat))
+            f.write(b"".join(end.to_bytes(KEY_SIZE, "big") for _, end, _ in flat))
+            f.write(struct.pack(f"<{len(flat)}I", *(index for _, _, index in flat)))
+            for info in records:
+                org = " ".join((info.org or "").split())
+                asn = "" if info.asn is None else str(info.asn)
+                fields = (info.country or "", asn, org)
+                f.write(("\t".join(fields) + "\n").encode("utf-8"))
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return len(flat)
+
+
+class _Keys:
+    """Vista de las claves de 16 bytes de un mmap como secuencia para bisect."""
+
+    __slots__ = ("buf", "offset", "size")
+
+    def __init__(self, buf: mmap.mmap, offset: int, size: int) -> None:
+        self.buf = buf
+        self.offset = offset
+        self.size = size
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, i: int) -> bytes:
+        start = self.offset + i * KEY_SIZE
+        return self.buf[start : start + KEY_SIZE]
+
+
+class GeoDatabase(ABC):
+    """
+    Base de las fuentes de datos geográficos: búsqueda por IP con caché LRU
+    y agrupación de cuentas por país o ASN.
+
+    Las IPs se repiten mucho, así que se agrupan primero las cuentas por IP
+    (p. ej. LogAggregate.ip_counts) y solo se busca cada IP distinta una vez.
+    Las subclases implementan _lookup.
+    """
+
+    def __init__(self, cache_size: int = CACHE_SIZE) -> None:
+        self.cache_size = cache_size
+        self._cached = lru_cache(maxsize=cache_size)(self._lookup)
+
+    @abstractmethod
+    def _lookup(self, ip: str) -> Optional[GeoInfo]:
+        pass
+
+    def lookup(self, ip: str) -> Optional[GeoInfo]:
+        """Retorna los datos de ip, o None si no está en la base."""
+        return self._cached(ip)
+
+    def cache_info(self):
+        """Retorna aciertos, fallos y tamaño de la caché (como functools.lru_cache)."""
+        return self._cached.cache_info()
+
+    def _group(self, ip_counts: Iterable[Tuple[str, int]], field: str) -> GeoGroup:
+        grouped: GeoGroup = {}
+        lookup = self._cached
+        for ip, n in ip_counts:
+            info = lookup(ip)
+            label = getattr(info, field) if info is not None else None
+            if label is not None:
+                grouped[label] = grouped.get(label, 0) + n
+        return grouped
+
+    def by_country(self, ip_counts: Iterable[Tuple[str, int]]) -> GeoGroup:
+        """Suma cuentas (ip, n) por código de país; las IPs sin país no cuentan."""
+        return self._group(ip_counts, "country")
+
+    def by_asn(self, ip_counts: Iterable[Tuple[str, int]]) -> GeoGroup:
+        """Suma cuentas (ip, n) por ASN ("AS13335 Cloudflare")."""
+        return self._group(ip_counts, "asn_label")
+
+    def close(self) -> None:
+        """Libera los recursos de la base."""
+
+    def __enter__(self) -> "GeoDatabase":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class GeoIpTable(GeoDatabase):
+    """
+    Tabla de rangos compilada con compile_ranges, leída con mmap.
+
+    No se carga en memoria: buscar una IP es una bisección sobre las claves
+    del archivo mapeado (O(log n) páginas, que el sistema operativo cachea)
+    más la búsqueda del registro, que sí se lee entero al abrir porque son
+    pocos. Es picklable: los workers reabren el archivo.
+    """
+
+    def __init__(self, path: str, cache_size: int = CACHE_SIZE) -> None:
+        super().__init__(cache_size)
+        self.path = path
+        self._open()
+
+    def _open(self) -> None:
+        with open(self.path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size:
+            self._map.close()
+            raise ValueError(f"{self.path}: no es una tabla compilada por logparse")
+        magic, size, _, source_size, source_mtime_ns = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError(f"{self.path}: no es una tabla compilada por logparse")
+        self.size = size
+        self.source = (source_size, source_mtime_ns)
+        self._starts = _Keys(self._map, HEADER.size, size)
+        self._ends = _Keys(self._map, HEADER.size + size * KEY_SIZE, size)
+        self._index_offset = HEADER.size + 2 * size * KEY_SIZE
+        records_offset = self._index_offset + 4 * size
+        self._records: List[GeoInfo] = []
+        for line in self._map[records_offset:].decode("utf-8").splitlines():
+            country, asn, org = line.split("\t")
+            self._records.append(
+                GeoInfo(country or None, int(asn) if asn else None, org or None)
+            )
+
+    def __getstate__(self) -> Dict:
+        # Ni el mmap ni la caché viajan a los workers
+        return {"path": self.path, "cache_size": self.cache_size}
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__init__(state["path"], state["cache_size"])
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _lookup(self, ip: str) -> Optional[GeoInfo]:
+        key = _key(ip)
+        if key is None:
+            return None
+        i = bisect_right(self._starts, key) - 1
+        if i < 0 or key > self._ends[i]:
+            return None
+        offset = self._index_offset + 4 * i
+        (index,) = struct.unpack_from("<I", self._map, offset)
+        return self._records[index]
+
+    def close(self) -> None:
+        """Cierra el mmap."""
+        self._map.close()
+
+
+class MmdbDatabase(GeoDatabase):
+    """
+    Base MaxMind (.mmdb: GeoLite2-Country, GeoLite2-ASN, GeoIP2...) leída
+    con el paquete maxminddb, que también usa mmap.
+    """
+
+    def __init__(self, path: str, cache_size: int = CACHE_SIZE) -> None:
+        if maxminddb is None:
+            raise ImportError("MmdbDatabase necesita maxminddb: pip install maxminddb")
+        super().__init__(cache_size)
+        self.path = path
+        self._reader = maxminddb.open_database(path)
+
+    def __getstate__(self) -> Dict:
+        return {"path": self.path, "cache_size": self.cache_size}
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__init__(state["path"], state["cache_size"])
+
+    def _lookup(self, ip: str) -> Optional[GeoInfo]:
+        try:
+            record = self._reader.get(ip)
+        except ValueError:
+            return None
+        if not record:
+            return None
+        country = record.get("country") or record.get("registered_country") or {}
+        return GeoInfo(
+            country.get("iso_code"),
+            record.get("autonomous_system_number"),
+            record.get("autonomous_system_organization"),
+        )
+
+    def close(self) -> None:
+        """Cierra el lector."""
+        self._reader.close()
+
+
+def _is_compiled(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def cache_dir() -> str:
+    """
+    Retorna el directorio (privado, del usuario) donde se guardan las tablas
+    compiladas de los CSV: $XDG_CACHE_HOME/logparse o ~/.cache/logparse.
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "logparse")
+
+
+def compiled_path(csv_path: str) -> str:
+    """Retorna dónde se guarda en cache_dir() la tabla compilada de csv_path."""
+    key = hashlib.sha256(os.path.abspath(csv_path).encode()).hexdigest()[:16]
+    return os.path.join(cache_dir(), f"{os.path.basename(csv_path)}.{key}.lpgeo")
+
+
+def _is_trusted(path: str) -> bool:
+    """
+    Retorna True si path es un archivo regular (no un enlace) del usuario
+    actual que nadie más puede escribir: solo entonces se mapea una tabla
+    compilada que no se ha indicado explícitamente.
+    """
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    if not stat.S_ISREG(st.st_mode) or st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        return False
+    getuid = getattr(os, "getuid", None)
+    return getuid is None or st.st_uid == getuid()
+
+
+def _private_cache_dir() -> str:
+    """Crea si hace falta cache_dir() con modo 0700 y comprueba que es propio."""
+    path = cache_dir()
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    st = os.lstat(path)
+    getuid = getattr(os, "getuid", None)
+    if (
+        not stat.S_ISDIR(st.st_mode)
+        or st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+        or (getuid is not None and st.st_uid != getuid())
+    ):
+        raise PermissionError(f"Directorio de caché inseguro: {path}")
+    return path
+
+
+def open_database(path: str) -> GeoDatabase:
+    """
+    Abre una base geográfica local según su tipo: .mmdb de MaxMind, tabla
+    ya compilada o CSV de rangos. El CSV se compila la primera vez en
+    cache_dir() (nunca junto al CSV) y la tabla se reutiliza mientras el
+    CSV conserve el tamaño y el st_mtime_ns guardados en ella y la tabla
+    sea del usuario y solo él pueda escribirla.
+
+    Raises:
+        ValueError: Si el CSV no es válido
+        ImportError: Si es un .mmdb y falta maxminddb
+    """
+    if path.lower().endswith(".mmdb"):
+        return MmdbDatabase(path)
+    if _is_compiled(path):
+        return GeoIpTable(path)
+
+    compiled = compiled_path(path)
+    st = os.stat(path)
+    if _is_trusted(compiled):
+        try:
+            table = GeoIpTable(compiled)
+        except ValueError:
+            # De otra versión de logparse: se recompila
+            pass
+        else:
+            if table.source == (st.st_size, st.st_mtime_ns):
+                return table
+            table.close()
+    _private_cache_dir()
+    compile_ranges(path, compiled)
+    return GeoIpTable(compiled)
@@ -0,0 +1,365 @@
+import heapq
+import os
+import pickle
+import re
+import shutil
+import tempfile
+from operator import attrgetter, itemgetter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .. import profiling
+from ..models.log_entry import LogEntry
+from .timeseries import _bin_value, _size_bin
+
+
+def _hour(e: LogEntry) -> int:
+    return e.timestamp.hour
+
+
+def _date(e: LogEntry) -> str:
+    return e.timestamp.date().isoformat()
+
+
+def _status_class(e: LogEntry) -> str:
+    return f"{e.status_code // 100}xx"
+
+
+# Dimensiones por las que se puede agrupar
+DIMENSIONS: Dict[str, Callable[[LogEntry], object]] = {
+    "ip": attrgetter("ip"),
+    "method": attrgetter("method"),
+    "path": attrgetter("path"),
+    "status": attrgetter("status_code"),
+    "status_class": _status_class,
+    "hour": _hour,
+    "date": _date,
+    "user_agent": attrgetter("user_agent"),
+    "referrer": attrgetter("referrer"),
+}
+
+# Métricas simples; además "pNN_size" da el percentil NN del tamaño
+METRICS = (
+    "count",
+    "bytes_sum",
+    "bytes_avg",
+    "bytes_min",
+    "bytes_max",
+    "errors",
+    "error_rate",
+)
+QUANTILE_METRIC = re.compile(r"p(\d{1,2}(?:\.\d+)?)_size")
+
+# Grupos en memoria a partir de los que se vuelca a disco
+MAX_GROUPS = 500_000
+
+# Particiones por hash de los volcados: al final se combina cada una por
+# separado, así que en memoria solo hay los grupos de una partición
+SPILL_PARTITIONS = 16
+
+# Niveles de reparto de una partición con más de max_groups grupos; en el
+# último se combina aunque se pase del límite
+MAX_SPLIT_DEPTH = 6
+
+# Posiciones del estado de un grupo: [count, bytes, errors, min, max, hist]
+_COUNT, _BYTES, _ERRORS, _MIN, _MAX, _HIST = range(6)
+
+GroupKey = Tuple
+GroupState = list
+
+
+def parse_metrics(metrics: Sequence[str]) -> List[str]:
+    """
+    Valida los nombres de métricas y los retorna.
+
+    Raises:
+        ValueError: Si alguna métrica no existe
+    """
+    for metric in metrics:
+        if metric not in METRICS and not QUANTILE_METRIC.fullmatch(metric):
+            raise ValueError(
+                f"Métrica desconocida: {metric} (válidas: {', '.join(METRICS)},"
+                " pNN_size)"
+            )
+    return list(metrics)
+
+
+def _merge_state(state: GroupState, other: GroupState) -> None:
+    state[_COUNT] += other[_COUNT]
+    state[_BYTES] += other[_BYTES]
+    state[_ERRORS] += other[_ERRORS]
+    state[_MIN] = min(state[_MIN], other[_MIN])
+    state[_MAX] = max(state[_MAX], other[_MAX])
+    if other[_HIST] is not None:
+        hist = state[_HIST]
+        for index, n in other[_HIST].items():
+            hist[index] = hist.get(index, 0) + n
+
+
+def _quantile(hist: Dict[int, int], count: int, q: float) -> float:
+    rank = q * (count - 1)
+    seen = 0
+    for index in sorted(hist):
+        seen += hist[index]
+        if seen > rank:
+            return _bin_value(index)
+    return 0.0
+
+
+@profiling.instrument("group_by")
+class GroupByAggregator:
+    """
+    Agregación por varias dimensiones en una sola pasada.
+
+    Cada grupo es una entrada de un dict indexado por la tupla de valores de
+    las dimensiones (agregación por hash); su estado son unos contadores y,
+    si se piden percentiles, un histograma logarítmico disperso de tamaños
+    como el de TimeSeriesAggregator (error relativo < 25 %).
+
+    Para acotar la memoria, cuando hay más de max_groups grupos se vuelcan
+    todos a disco, repartidos en SPILL_PARTITIONS archivos por hash de la
+    clave, y se sigue con el dict vacío. Al pedir los resultados se combina
+    cada partición por separado: una clave siempre cae en la misma, así que
+    basta con tener en memoria los grupos de una partición a la vez. Si una
+    partición tiene por sí sola más de max_groups grupos, se reparte de
+    nuevo en SPILL_PARTITIONS archivos con otro hash, recursivamente.
+    """
+
+    def __init__(
+        self,
+        keys: Sequence[str],
+        metrics: Sequence[str] = ("count",),
+        max_groups: int = MAX_GROUPS,
+        spill_dir: Optional[str] = None,
+    ) -> None:
+        if not keys:
+            raise ValueError("Hay que agrupar por al menos una dimensión")
+        unknown = [key for key in keys if key not in DIMENSIONS]
+        if unknown:
+            raise ValueError(
+                f"Dimensión desconocida: {', '.join(unknown)}"
+                f" (válidas: {', '.join(DIMENSIONS)})"
+            )
+        self.keys = list(keys)
+        self.metrics = parse_metrics(metrics)
+        self.max_groups = max_groups
+        self.spill_dir = spill_dir
+        self.quantiles = {
+            metric: float(m.group(1)) / 100
+            for metric in self.metrics
+            if (m := QUANTILE_METRIC.fullmatch(metric))
+        }
+        self.groups: Dict[GroupKey, GroupState] = {}
+        self.spills = 0
+        self._spill_path: Optional[str] = None
+        self._split: set = set()
+
+    def _key_function(self) -> Callable[[LogEntry], GroupKey]:
+        extractors = [DIMENSIONS[key] for key in self.keys]
+        if len(extractors) == 1:
+            extract = extractors[0]
+            return lambda e: (extract(e),)
+        return lambda e: tuple([extract(e) for extract in extractors])
+
+    def consume(self, entries: Iterable[LogEntry]) -> int:
+        """Añade las entradas. Retorna cuántas se añadieron."""
+        key_of = self._key_function()
+        groups = self.groups
+        max_groups = self.max_groups
+        with_hist = bool(self.quantiles)
+        count = 0
+        for e in entries:
+            key = key_of(e)
+            size = e.response_size
+            state = groups.get(key)
+            if state is None:
+                if len(groups) >= max_groups:
+                    self._spill()
+                state = groups[key] = [0, 0, 0, size, size, {} if with_hist else None]
+            state[_COUNT] += 1
+            state[_BYTES] += size
+            if not 200 <= e.status_code < 300:
+                state[_ERRORS] += 1
+            if size < state[_MIN]:
+                state[_MIN] = size
+            elif size > state[_MAX]:
+                state[_MAX] = size
+            if with_hist:
+                hist = state[_HIST]
+                index = _size_bin(size)
+                hist[index] = hist.get(index, 0) + 1
+            count += 1
+        return count
+
+    def _partition_file(self, partition: int) -> str:
+        return os.path.join(self._spill_path, f"part-{partition:02d}.pickle")
+
+    @staticmethod
+    def _subpartition_file(path: str, partition: int) -> str:
+        return f"{path[: -len('.pickle')]}-{partition:02d}.pickle"
+
+    @staticmethod
+    def _append(path: str, chunk: Dict[GroupKey, GroupState]) -> None:
+        with open(path, "ab") as f:
+            pickle.dump(chunk, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _chunks(path: str) -> Iterator[Dict[GroupKey, GroupState]]:
+        with open(path, "rb") as f:
+            while True:
+                try:
+                    yield pickle.load(f)
+                except EOFError:
+                    return
+
+    def _spill(self) -> None:
+        """Vuelca los grupos en memoria a las particiones en disco y los libera."""
+        if self._spill_path is None:
+            self._spill_path = tempfile.mkdtemp(
+                prefix="logparse-groupby-", dir=self.spill_dir
+            )
+        elif self._split:
+            # Los repartos de una lectura anterior ya no están completos
+            top = {self._partition_file(i) for i in range(SPILL_PARTITIONS)}
+            for name in os.listdir(self._spill_path):
+                path = os.path.join(self._spill_path, name)
+                if path not in top:
+                    os.remove(path)
+            self._split.clear()
+        partitions: List[Dict[GroupKey, GroupState]] = [
+            {} for _ in range(SPILL_PARTITIONS)
+        ]
+        for key, state in self.groups.items():
+            partitions[hash(key) % SPILL_PARTITIONS][key] = state
+        for partition, chunk in enumerate(partitions):
+            if chunk:
+                self._append(self._partition_file(partition), chunk)
+        self.groups.clear()
+        self.spills += 1
+
+    def _load(self, path: str, limit: Optional[int]) -> Optional[Dict]:
+        """
+        Retorna los grupos del archivo combinados, o None si pasan de limit
+        (sin terminar de leerlo).
+        """
+        merged: Dict[GroupKey, GroupState] = {}
+        for chunk in self._chunks(path):
+            for key, state in chunk.items():
+                mine = merged.get(key)
+                if mine is None:
+                    merged[key] = state
+                else:
+                    _merge_state(mine, state)
+            if limit is not None and len(merged) > limit:
+                return None
+        return merged
+
+    def _split_partition(self, path: str, depth: int) -> None:
+        """Reparte los grupos de path en SPILL_PARTITIONS archivos con otro hash."""
+        for chunk in self._chunks(path):
+            parts: List[Dict[GroupKey, GroupState]] = [
+                {} for _ in range(SPILL_PARTITIONS)
+            ]
+            for key, state in chunk.items():
+                parts[hash((depth, key)) % SPILL_PARTITIONS][key] = state
+            for partition, part in enumerate(parts):
+                if part:
+                    self._append(self._subpartition_file(path, partition), part)
+        self._split.add(path)
+
+    def _partition_items(
+        self, path: str, depth: int
+    ) -> Iterator[Tuple[GroupKey, GroupState]]:
+        if not os.path.exists(path):
+            return
+        if path not in self._split:
+            limit = self.max_groups if depth < MAX_SPLIT_DEPTH else None
+            merged = self._load(path, limit)
+            if merged is not None:
+                yield from merged.items()
+                return
+            self._split_partition(path, depth)
+        for partition in range(SPILL_PARTITIONS):
+            yield from self._partition_items(
+                self._subpartition_file(path, partition), depth + 1
+            )
+
+    def _items(self) -> Iterator[Tuple[GroupKey, GroupState]]:
+        if self._spill_path is None:
+            yield from self.groups.items()
+            return
+        if self.groups:
+            self._spill()
+        for partition in range(SPILL_PARTITIONS):
+            yield from self._partition_items(self._partition_file(partition), 1)
+
+    def _row(self, key: GroupKey, state: GroupState) -> Dict:
+        row: Dict = dict(zip(self.keys, key))
+        count = state[_COUNT]
+        for metric in self.metrics:
+            if metric == "count":
+                row[metric] = count
+            elif metric == "bytes_sum":
+                row[metric] = state[_BYTES]
+            elif metric == "bytes_avg":
+                row[metric] = state[_BYTES] / count
+            elif metric == "bytes_min":
+                row[metric] = state[_MIN]
+            elif metric == "bytes_max":
+                row[metric] = state[_MAX]
+            elif metric == "errors":
+                row[metric] = state[_ERRORS]
+            elif metric == "error_rate":
+                row[metric] = state[_ERRORS] / count
+            else:
+                row[metric] = _quantile(state[_HIST], count, self.quantiles[metric])
+        return row
+
+    def rows(self) -> Iterator[Dict]:
+        """
+        Genera una fila por grupo: las dimensiones y las métricas pedidas.
+
+        Sin volcados el orden es el de aparición; con volcados, por
+        partición. Después de llamarlo con volcados, los grupos quedan
+        solo en disco hasta close().
+        """
+        for key, state in self._items():
+            yield self._row(key, state)
+
+    def results(
+        self, order_by: Optional[str] = None, n: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Retorna las filas ordenadas de mayor a menor por la métrica order_by
+        o, sin ella, por las dimensiones. Con n, solo las n primeras: las
+        filas pasan por un heap de n elementos sin cargarse todas a la vez.
+        """
+        if order_by is not None and order_by not in self.metrics:
+            raise ValueError(f"order_by debe ser una de las métricas: {order_by}")
+        if order_by is not None:
+            key = itemgetter(order_by)
+            if n is not None:
+                return heapq.nlargest(n, self.rows(), key=key)
+            return sorted(self.rows(), key=key, reverse=True)
+        keys = self.keys
+
+        def key(row: Dict) -> Tuple:
+            return tuple(
+                (row[k] is None, row[k] if row[k] is not None else 0) for k in keys
+            )
+
+        if n is not None:
+            return heapq.nsmallest(n, self.rows(), key=key)
+        return sorted(self.rows(), key=key)
+
+    def close(self) -> None:
+        """Borra los volcados a disco, si los hay."""
+        if self._spill_path is not None:
+            shutil.rmtree(self._spill_path, ignore_errors=True)
+            self._spill_path = None
+            self._split.clear()
+
+    def __enter__(self) -> "GroupByAggregator":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,169 @@
+import ipaddress
+import socket
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple, TypeVar, Union
+
+# IPs distintas cuya búsqueda se cachea antes de vaciar la caché
+LOOKUP_CACHE_SIZE = 65_536
+
+# Prefijo de las IPv4 mapeadas en IPv6 (::ffff:a.b.c.d)
+_V4_MAPPED = 0xFFFF
+
+T = TypeVar("T")
+
+Network = Union[str, ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+def ip_to_int(ip: str) -> Optional[Tuple[int, int]]:
+    """
+    Retorna (versión, entero) de una IP en texto, o None si no es válida.
+
+    Las IPv4 mapeadas en IPv6 (::ffff:1.2.3.4) se tratan como IPv4.
+    """
+    try:
+        if ":" in ip:
+            value = int.from_bytes(socket.inet_pton(socket.AF_INET6, ip), "big")
+            if value >> 32 == _V4_MAPPED:
+                return 4, value & 0xFFFFFFFF
+            return 6, value
+        return 4, int.from_bytes(socket.inet_pton(socket.AF_INET, ip), "big")
+    except (OSError, ValueError):
+        return None
+
+
+def flatten_ranges(intervals: List[Tuple[int, int, T]]) -> List[Tuple[int, int, T]]:
+    """
+    Convierte rangos (start, end, etiqueta) anidados o disjuntos, como los
+    de los prefijos CIDR, en intervalos disjuntos ordenados, cada uno con
+    la etiqueta del rango más específico.
+    """
+    intervals.sort(key=lambda t: (t[0], -t[1]))
+    out: List[Tuple[int, int, T]] = []
+    stack: List[Tuple[int, int, T]] = []
+    cursor = 0
+
+    def emit(start: int, end: int, label: T) -> None:
+        if start > end:
+            return
+        if out and out[-1][2] == label and out[-1][1] + 1 == start:
+            out[-1] = (out[-1][0], end, label)
+        else:
+            out.append((start, end, label))
+
+    for start, end, label in intervals:
+        while stack and stack[-1][1] < start:
+            _, top_end, top_label = stack.pop()
+            emit(cursor, top_end, top_label)
+            cursor = top_end + 1
+        if stack:
+            emit(cursor, start - 1, stack[-1][2])
+        stack.append((start, end, label))
+        cursor = start
+    while stack:
+        _, top_end, top_label = stack.pop()
+        emit(cursor, top_end, top_label)
+        cursor = top_end + 1
+    return out
+
+
+def read_networks(path: str) -> List[Tuple[str, Optional[str]]]:
+    """
+    Lee un archivo con un prefijo por línea, opcionalmente seguido de una
+    etiqueta ("10.0.0.0/16,oficina"). Ignora líneas vacías y comentarios (#).
+    Retorna pares (prefijo, etiqueta o None).
+
+    Raises:
+        ValueError: Si algún prefijo no es válido
+    """
+    networks = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            network, _, label = line.partition(",")
+            network = network.strip()
+            try:
+                ipaddress.ip_network(network, strict=False)
+            except ValueError as e:
+                raise ValueError(f"{path}:{number}: {e}")
+            networks.append((network, label.strip() or None))
+    return networks
+
+
+class CidrTable:
+    """
+    Tabla de prefijos CIDR (IPv4 e IPv6) con búsqueda O(log n).
+
+    Los prefijos se compilan en intervalos disjuntos de enteros ordenados
+    (uno por versión de IP), donde los prefijos anidados se resuelven por
+    el más específico; buscar una IP es una bisección sobre los inicios.
+    Las IPs se repiten mucho en los logs, así que además se cachea el
+    resultado por IP en texto.
+    """
+
+    def __init__(
+        self, networks: Iterable[Union[Network, Tuple[Network, str]]] = ()
+    ) -> None:
+        intervals: Dict[int, List[Tuple[int, int, str]]] = {4: [], 6: []}
+        for item in networks:
+            network, label = item if isinstance(item, tuple) else (item, None)
+            net = ipaddress.ip_network(network, strict=False)
+            start = int(net.network_address)
+            end = int(net.broadcast_address)
+            intervals[net.version].append((start, end, label or str(net)))
+        self.size = len(intervals[4]) + len(intervals[6])
+        self._starts: Dict[int, List[int]] = {}
+        self._ends: Dict[int, List[int]] = {}
+        self._labels: Dict[int, List[str]] = {}
+        for version, items in intervals.items():
+            flat = flatten_ranges(items)
+            self._starts[version] = [start for start, _, _ in flat]
+            self._ends[version] = [end for _, end, _ in flat]
+            self._labels[version] = [label for _, _, label in flat]
+        self._cache: Dict[str, Optional[str]] = {}
+
+    @classmethod
+    def from_file(cls, path: str) -> "CidrTable":
+        """Carga una tabla de un archivo de prefijos (ver read_networks)."""
+        return cls(read_networks(path))
+
+    def __getstate__(self) -> Dict:
+        # La caché no viaja a los workers
+        state = self.__dict__.copy()
+        state["_cache"] = {}
+        return state
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, ip: str) -> bool:
+        return self.lookup(ip) is not None
+
+    def lookup(self, ip: str) -> Optional[str]:
+        """Retorna la etiqueta del prefijo más específico que contiene ip, o None."""
+        cache = self._cache
+        if ip in cache:
+            return cache[ip]
+        label = None
+        parsed = ip_to_int(ip)
+        if parsed is not None:
+            version, value = parsed
+            starts = self._starts[version]
+            i = bisect_right(starts, value) - 1
+            if i >= 0 and value <= self._ends[version][i]:
+                label = self._labels[version][i]
+        if len(cache) >= LOOKUP_CACHE_SIZE:
+            cache.clear()
+        cache[ip] = label
+        return label
+
+    def group(self, ip_counts: Iterable[Tuple[str, int]]) -> Dict[str, int]:
+        """Suma cuentas (ip, n) por prefijo; las IPs fuera de la tabla no cuentan."""
+        grouped: Dict[str, int] = {}
+        lookup = self.lookup
+        for ip, n in ip_counts:
+            label = lookup(ip)
+            if label is not None:
+                grouped[label] = grouped.get(label, 0) + n
+        return grouped
@@ -0,0 +1,127 @@
+from bisect import bisect_left
+import heapq
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..models.log_entry import LogEntry
+
+# Límites superiores (bytes) del histograma de tamaño de respuesta
+DEFAULT_SIZE_BUCKETS: Tuple[int, ...] = (
+    100,
+    1_000,
+    10_000,
+    100_000,
+    1_000_000,
+    10_000_000,
+    100_000_000,
+)
+
+OTHER_LABEL = "other"
+
+
+class TopKCounter:
+    """
+    Contador aproximado de los K elementos más frecuentes en memoria acotada.
+
+    Guarda como máximo `capacity` claves; al superarla descarta las menos
+    frecuentes y conserva la mitad superior. Los elementos realmente
+    frecuentes sobreviven a las podas, así que su cuenta es exacta o casi.
+    """
+
+    def __init__(self, k: int, capacity: Optional[int] = None) -> None:
+        self.k = k
+        self.capacity = max(capacity or k * 10, 2)
+        self.counts: Dict[str, int] = {}
+
+    def add(self, key: str, n: int = 1) -> None:
+        """Suma n a la cuenta de key."""
+        counts = self.counts
+        counts[key] = counts.get(key, 0) + n
+        if len(counts) > self.capacity:
+            keep = heapq.nlargest(
+                self.capacity // 2, counts.items(), key=lambda kv: kv[1]
+            )
+            self.counts = dict(keep)
+
+    def most_common(self, n: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Retorna los n (por defecto k) elementos más frecuentes."""
+        return heapq.nlargest(n or self.k, self.counts.items(), key=lambda kv: kv[1])
+
+
+class BoundedLabelCounter:
+    """
+    Contador por etiqueta con cardinalidad acotada y cuentas monótonas.
+
+    Las primeras `max_labels` etiquetas distintas obtienen serie propia; el
+    resto se acumula en "other". Una etiqueta admitida no se retira nunca,
+    así que cada serie solo crece (requisito de los counters Prometheus).
+    """
+
+    def __init__(self, max_labels: int) -> None:
+        self.max_labels = max_labels
+        self.counts: Dict[str, int] = {}
+
+    def add(self, label: str, n: int = 1) -> None:
+        """Suma n a la serie de label (u "other" si no hay hueco)."""
+        counts = self.counts
+        if label not in counts and len(counts) >= self.max_labels:
+            label = OTHER_LABEL
+        counts[label] = counts.get(label, 0) + n
+
+    def items(self) -> List[Tuple[str, int]]:
+        """Retorna (etiqueta, cuenta) ordenado por etiqueta."""
+        return sorted(self.counts.items())
+
+
+class LiveMetrics:
+    """
+    Métricas incrementales tipo LogAnalyzer para el modo servidor.
+
+    Cada entrada se procesa en O(1) y el estado ocupa O(series), así que
+    generar /metrics no depende del número de líneas procesadas.
+    """
+
+    def __init__(
+        self,
+        top_k: int = 20,
+        max_labels: int = 50,
+        size_buckets: Sequence[int] = DEFAULT_SIZE_BUCKETS,
+    ) -> None:
+        self.requests_total = 0
+        self.errors_total = 0
+        self.bytes_total = 0
+        self.by_status = BoundedLabelCounter(max_labels)
+        self.by_method = BoundedLabelCounter(max_labels)
+        self.size_buckets = tuple(sorted(size_buckets))
+        self.size_bucket_counts = [0] * (len(self.size_buckets) + 1)
+        self.top_paths = TopKCounter(top_k)
+        self.top_ips = TopKCounter(top_k)
+
+    def update(self, entry: LogEntry) -> None:
+        """Incorpora una entrada a las métricas."""
+        self.requests_total += 1
+        if entry.is_error:
+            self.errors_total += 1
+        size = entry.response_size
+        self.bytes_total += size
+        self.by_status.add(str(entry.status_code))
+        self.by_method.add(entry.method)
+        self.top_paths.add(entry.path)
+        self.top_ips.add(entry.ip)
+        # El último hueco de size_bucket_counts corresponde a +Inf
+        self.size_bucket_counts[bisect_left(self.size_buckets, size)] += 1
+
+    def update_many(self, entries: Iterable[LogEntry]) -> None:
+        """Incorpora varias entradas."""
+        update = self.update
+        for entry in entries:
+            update(entry)
+
+    def size_histogram(self) -> List[Tuple[str, int]]:
+        """Retorna el histograma acumulado (le, cuenta) al estilo Prometheus."""
+        result = []
+        cumulative = 0
+        for bound, count in zip(self.size_buckets, self.size_bucket_counts):
+            cumulative += count
+            result.append((str(bound), cumulative))
+        result.append(("+Inf", cumulative + self.size_bucket_counts[-1]))
+        return result
@@ -1,9 +1,31 @@
 from collections import Counter
 from datetime import date
-from typing import Dict, List, Optional, Tuple, Set
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Set,
+)
+from .. import profiling
+from .aggregate import LogAggregate
+from .filters import filter_networks
+from .ip_ranges import CidrTable
+from .path_normalizer import PathNormalizer
 from ..models.log_entry import LogEntry
 
+if TYPE_CHECKING:
+    # Se importan al usarse: cargarlos al arrancar encarece todos los comandos
+    from .geoip import GeoDatabase
+    from .spike_detector import Spike, SpikeDetector
+    from .timeseries import TimeSeriesAggregator
+    from .user_agents import UserAgentBreakdown, UserAgentClassifier
 
+
+@profiling.instrument("aggregate")
 class LogAnalyzer:
     """Analiza logs y calcula metricas"""
 
@@ -11,6 +33,44 @@ class LogAnalyzer:
         """Inicializa con lista de LogEntry"""
         self.logs = logs
 
+    async def feed(self, entries: AsyncIterable[LogEntry]) -> int:
+        """
+        Añade al analyzer las entradas de un iterable asíncrono.
+
+        Pensado para consumir BaseParser.aparse_file desde un servicio
+        asyncio. Retorna el número de entradas añadidas.
+        """
+        count = 0
+        append = self.logs.append
+        async for entry in entries:
+            append(entry)
+            count += 1
+        return count
+
+    def aggregate(self) -> LogAggregate:
+        """Retorna todas las métricas calculadas en una sola pasada sobre los logs"""
+        aggregate = LogAggregate()
+        aggregate.consume(self.logs)
+        return aggregate
+
+    def time_series(self, resolution: int = 3600) -> "TimeSeriesAggregator":
+        """Retorna la serie temporal de los logs con buckets de resolution segundos"""
+        from .timeseries import TimeSeriesAggregator
+
+        series = TimeSeriesAggregator(resolution)
+        series.consume(self.logs)
+        return series
+
+    def detect_spikes(
+        self, resolution: int = 60, detector: Optional["SpikeDetector"] = None
+    ) -> List["Spike"]:
+        """Retorna los picos de requests y tasa de error de la serie temporal"""
+        if detector is None:
+            from .spike_detector import SpikeDetector
+
+            detector = SpikeDetector()
+        return list(detector.detect(self.time_series(resolution).buckets()))
+
     def total_requests(self) -> int:
         """Retorna el total de requests"""
         return len(self.logs)
@@ -40,9 +100,66 @@ class LogAnalyzer:
         counter = Counter(e.ip for e in self.logs)
         return counter.most_common(n)
 
-    def top_paths(self, n: int = 10) -> List[Tuple[str, int]]:
-        """Retorna top N paths más activas."""
-        counter = Counter(e.path for e in self.logs)
+    def top_countries(self, geo: "GeoDatabase", n: int = 10) -> List[Tuple[str, int]]:
+        """Retorna top N países (código ISO) según geo; las IPs sin país no cuentan."""
+        counter = Counter(geo.by_country(Counter(e.ip for e in self.logs).items()))
+        return counter.most_common(n)
+
+    def top_asns(self, geo: "GeoDatabase", n: int = 10) -> List[Tuple[str, int]]:
+        """Retorna top N sistemas autónomos ("AS13335 Cloudflare") según geo."""
+        counter = Counter(geo.by_asn(Counter(e.ip for e in self.logs).items()))
+        return counter.most_common(n)
+
+    def group_by(
+        self,
+        keys: Sequence[str],
+        metrics: Sequence[str] = ("count",),
+        order_by: Optional[str] = None,
+        n: Optional[int] = None,
+        max_groups: Optional[int] = None,
+    ) -> List[Dict]:
+        """
+        Retorna las métricas (count, bytes_sum, error_rate, p95_size...) por
+        cada combinación de las dimensiones keys (status, method, hour...),
+        calculadas en una sola pasada. Ver GroupByAggregator (max_groups
+        por defecto: MAX_GROUPS).
+        """
+        from .group_by import MAX_GROUPS, GroupByAggregator
+
+        if max_groups is None:
+            max_groups = MAX_GROUPS
+        with GroupByAggregator(keys, metrics, max_groups) as aggregator:
+            aggregator.consume(self.logs)
+            return aggregator.results(order_by, n)
+
+    def user_agents(
+        self, classifier: Optional["UserAgentClassifier"] = None
+    ) -> "UserAgentBreakdown":
+        """Retorna las requests por navegador, sistema, dispositivo y bot en una pasada"""
+        if classifier is None:
+            from .user_agents import UserAgentClassifier
+
+            classifier = UserAgentClassifier()
+        return classifier.breakdown(Counter(e.user_agent for e in self.logs).items())
+
+    def top_browsers(
+        self, n: int = 10, classifier: Optional["UserAgentClassifier"] = None
+    ) -> List[Tuple[str, int]]:
+        """Retorna top N navegadores (sin contar los bots)."""
+        return self.user_agents(classifier).top_browsers(n)
+
+    def bot_share(self, classifier: Optional["UserAgentClassifier"] = None) -> float:
+        """Retorna el ratio de requests hechas por bots"""
+        return self.user_agents(classifier).bot_share
+
+    def top_paths(
+        self, n: int = 10, normalizer: Optional[PathNormalizer] = None
+    ) -> List[Tuple[str, int]]:
+        """Retorna top N paths más activas (por plantilla si hay normalizer)."""
+        if normalizer is None:
+            counter = Counter(e.path for e in self.logs)
+        else:
+            counter = Counter(map(normalizer.normalize, (e.path for e in self.logs)))
         return counter.most_common(n)
 
     def get_method_counts(self) -> Dict[str, int]:
@@ -120,9 +237,15 @@ class LogAnalyzer:
         return [e for e in self.logs if e.status_code == status]
 
     def filter_by_ip(self, ip: str) -> Optional[List[LogEntry]]:
-        """Retorna la lista de requests filtrada por ip"""
+        """Retorna la lista de requests filtrada por ip o por prefijo CIDR ("10.0.0.0/16")"""
+        if "/" in ip:
+            return list(filter_networks(self.logs, CidrTable([ip])))
         return [e for e in self.logs if e.ip == ip]
 
+    def requests_by_network(self, table: CidrTable) -> Dict[str, int]:
+        """Retorna las requests por prefijo (o etiqueta) de table"""
+        return table.group(Counter(e.ip for e in self.logs).items())
+
     def filter_by_method(self, method: str) -> Optional[List[LogEntry]]:
         """Retorna la lista de requests filtrada por method"""
         return [e for e in self.logs if e.method == method]
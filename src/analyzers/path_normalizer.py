@@ -0,0 +1,107 @@
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Pattern, Sequence, Tuple
+
+# Marcador de los segmentos variables
+ID_PLACEHOLDER = "{id}"
+
+# Paths distintos que se recuerdan ya normalizados
+CACHE_SIZE = 65_536
+
+# Segmentos que se colapsan en {id}: números, UUIDs y hashes/ids hexadecimales
+# (al menos 8 caracteres con algún dígito, para no colapsar palabras como "deadbeef")
+ID_SEGMENT = re.compile(
+    r"\d+"
+    r"|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+    r"|(?=[a-fA-F]*\d)[0-9a-fA-F]{8,}"
+)
+
+
+def parse_rule(spec: str) -> Tuple[str, str]:
+    """
+    Convierte "PATRÓN=PLANTILLA" en (patrón, plantilla).
+
+    Se separa por el último "=", así que el patrón puede contenerlo (p. ej.
+    "(?=" o "a=b") y la plantilla no.
+
+    Raises:
+        ValueError: Si falta el "=" o el patrón no es una regex válida
+    """
+    pattern, sep, template = spec.rpartition("=")
+    if not sep or not pattern:
+        raise ValueError(f"Regla inválida (se espera PATRÓN=PLANTILLA): {spec}")
+    try:
+        re.compile(pattern)
+    except re.error as e:
+        raise ValueError(f"Regla inválida: {e}")
+    return pattern, template
+
+
+class PathNormalizer:
+    """
+    Convierte paths en plantillas: /api/users/123?x=1 -> /api/users/{id}.
+
+    Quita la query string, colapsa en {id} los segmentos que son números,
+    UUIDs o ids hexadecimales y aplica después las reglas del usuario
+    (regex sobre el path entero -> plantilla literal, la primera que
+    coincide).
+    Los resultados se memorizan en una caché LRU por path original, así que
+    un path repetido cuesta una búsqueda en un dict.
+    """
+
+    def __init__(
+        self,
+        rules: Sequence[Tuple[str, str]] = (),
+        strip_query: bool = True,
+        collapse_ids: bool = True,
+        cache_size: int = CACHE_SIZE,
+    ) -> None:
+        self.rules: List[Tuple[Pattern, str]] = [
+            (re.compile(pattern), template) for pattern, template in rules
+        ]
+        self.strip_query = strip_query
+        self.collapse_ids = collapse_ids
+        self.cache_size = cache_size
+        self._cached = lru_cache(maxsize=cache_size)(self._normalize)
+
+    def __getstate__(self) -> Dict:
+        # La caché no viaja a los workers
+        state = self.__dict__.copy()
+        del state["_cached"]
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._cached = lru_cache(maxsize=self.cache_size)(self._normalize)
+
+    def _normalize(self, path: str) -> str:
+        if self.strip_query:
+            path = path.split("?", 1)[0].split("#", 1)[0]
+        if self.collapse_ids:
+            fullmatch = ID_SEGMENT.fullmatch
+            path = "/".join(
+                ID_PLACEHOLDER if segment and fullmatch(segment) else segment
+                for segment in path.split("/")
+            )
+        for pattern, template in self.rules:
+            if pattern.search(path):
+                # La plantilla es literal: sin escapes ni referencias a grupos
+                return pattern.sub(lambda _: template, path, count=1)
+        return path
+
+    def normalize(self, path: str) -> str:
+        """Retorna la plantilla de path."""
+        return self._cached(path)
+
+    def cache_info(self):
+        """Retorna aciertos, fallos y tamaño de la caché (como functools.lru_cache)."""
+        return self._cached.cache_info()
+
+    def group(self, paths: Iterable[Tuple[str, int]]) -> Dict[str, int]:
+        """Suma cuentas (path, n) por plantilla."""
+        grouped: Dict[str, int] = {}
+        normalize = self._cached
+        for path, n in paths:
+            template = normalize(path)
+            grouped[template] = grouped.get(template, 0) + n
+        return grouped
@@ -0,0 +1,202 @@
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable, Deque, Dict, FrozenSet, Iterable
+from typing import Iterator, Optional, Sequence, Tuple
+
+from ..models.log_entry import LogEntry
+from ..parsers.base_parser import BaseParser, read_blocks
+from ..parsers.parse_stats import ParseStats
+from .aggregate import LogAggregate
+from .ip_ranges import CidrTable
+from .path_normalizer import PathNormalizer
+from .threat_detector import BlockScan, ThreatDetector, ThreatScanner
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+# Bloques en vuelo por worker en el modo paralelo
+BLOCKS_PER_WORKER = 2
+
+
+@dataclass(frozen=True)
+class EntryFilter:
+    """
+    Filtros del pipeline de análisis, aplicados de forma perezosa.
+
+    El rango de fechas es semiabierto [start, end). Si los límites no tienen
+    zona horaria y las entradas sí, se interpretan en la zona de las
+    entradas. path_template deja solo las requests cuya plantilla (según
+    normalizer, o uno estándar) es esa, p. ej. "/api/users/{id}", y
+    networks deja solo las IPs de esos prefijos CIDR. Es picklable para
+    poder enviarse a los workers.
+    """
+
+    errors_only: bool = False
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    statuses: Optional[FrozenSet[int]] = None
+    path_template: Optional[str] = None
+    normalizer: Optional[PathNormalizer] = None
+    networks: Optional[CidrTable] = None
+
+    @property
+    def active(self) -> bool:
+        """Retorna True si algún filtro está activo."""
+        return bool(
+            self.errors_only
+            or self.start is not None
+            or self.end is not None
+            or self.statuses is not None
+            or self.path_template is not None
+            or self.networks is not None
+        )
+
+    def _bounds(self, ts: datetime) -> Tuple[Optional[datetime], Optional[datetime]]:
+        tz = ts.tzinfo
+        start, end = self.start, self.end
+        if start is not None and (start.tzinfo is None) != (tz is None):
+            start = start.replace(tzinfo=tz)
+        if end is not None and (end.tzinfo is None) != (tz is None):
+            end = end.replace(tzinfo=tz)
+        return start, end
+
+    def apply(self, entries: Iterable[LogEntry]) -> Iterator[LogEntry]:
+        """Retorna las entradas que pasan todos los filtros."""
+        if not self.active:
+            yield from entries
+            return
+        errors_only, statuses = self.errors_only, self.statuses
+        template = self.path_template
+        lookup = self.networks.lookup if self.networks is not None else None
+        if template is not None:
+            normalize = (self.normalizer or PathNormalizer()).normalize
+        check_time = self.start is not None or self.end is not None
+        bounds: Dict = {}
+        for e in entries:
+            if errors_only and not e.is_error:
+                continue
+            if statuses is not None and e.status_code not in statuses:
+                continue
+            if template is not None and normalize(e.path) != template:
+                continue
+            if lookup is not None and lookup(e.ip) is None:
+                continue
+            if check_time:
+                ts = e.timestamp
+                tz = ts.tzinfo
+                if tz not in bounds:
+                    bounds[tz] = self._bounds(ts)
+                start, end = bounds[tz]
+                if start is not None and ts < start:
+                    continue
+                if end is not None and ts >= end:
+                    continue
+            yield e
+
+
+def aggregate_block(
+    parser: BaseParser,
+    block: bytes,
+    entry_filter: EntryFilter,
+    sample_size: int = 0,
+    scanner: Optional[ThreatScanner] = None,
+    normalizer: Optional[PathNormalizer] = None,
+) -> Tuple[LogAggregate, ParseStats, Optional[BlockScan]]:
+    """
+    Parsea, filtra y agrega (y opcionalmente escanea) un bloque con estado propio.
+
+    Pensado para ejecutarse en un worker: solo viajan de vuelta los
+    contadores y hallazgos, no las entradas.
+    """
+    stats = ParseStats(sample_size=sample_size)
+    aggregate = LogAggregate(normalizer)
+    entries = entry_filter.apply(parser.parse_block(block, stats))
+    if scanner is not None:
+        entries = list(entries)
+    aggregate.consume(entries)
+    scan = scanner.scan(entries) if scanner is not None else None
+    return aggregate, stats, scan
+
+
+def run_pipeline(
+    jobs: Sequence[Tuple[str, BaseParser]],
+    entry_filter: EntryFilter = EntryFilter(),
+    workers: int = 1,
+    stats: Optional[ParseStats] = None,
+    progress: Optional[Callable[[int], None]] = None,
+    detector: Optional[ThreatDetector] = None,
+    normalizer: Optional[PathNormalizer] = None,
+) -> LogAggregate:
+    """
+    Ejecuta parseo -> filtros -> agregación sobre varios archivos.
+
+    Los archivos se leen por bloques y cada bloque se descarta tras
+    agregarse, así que nunca se materializa la lista de entradas. Con
+    workers > 1 los bloques se parsean y agregan en un ProcessPoolExecutor
+    (como mucho BLOCKS_PER_WORKER por worker en vuelo) y los agregados
+    parciales se combinan en este proceso. Si hay detector, los workers
+    escanean sus bloques y el estado de picos se actualiza aquí, en orden.
+
+    Args:
+        jobs: Pares (archivo, parser) a procesar, en orden
+        entry_filter: Filtros a aplicar antes de agregar
+        workers: Procesos de parseo (1 = en este proceso)
+        stats: ParseStats donde acumular las estadísticas (opcional)
+        progress: Se llama con los bytes de cada bloque leído (opcional)
+        detector: ThreatDetector que observa las entradas filtradas (opcional)
+        normalizer: Agrupa los paths por plantilla (opcional)
+    """
+    stats = stats if stats is not None else ParseStats()
+    aggregate = LogAggregate(normalizer)
+    start = time.perf_counter()
+
+    scanner = detector.scanner if detector is not None else None
+    if workers <= 1:
+        for file, parser in jobs:
+            for block in read_blocks(file, parser.BLOCK_SIZE):
+                entries = entry_filter.apply(parser.parse_block(block, stats))
+                if detector is None:
+                    aggregate.consume(entries)
+                else:
+                    entries = list(entries)
+                    aggregate.consume(entries)
+                    detector.observe(entries)
+                if progress is not None:
+                    progress(len(block))
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        pending: Deque[Tuple["Future", int]] = deque()
+
+        def collect() -> None:
+            future, size = pending.popleft()
+            partial, block_stats, scan = future.result()
+            aggregate.merge(partial)
+            stats.merge(block_stats)
+            if scan is not None:
+                detector.absorb(scan)
+            if progress is not None:
+                progress(size)
+
+        with ProcessPoolExecutor(workers) as executor:
+            for file, parser in jobs:
+                for block in read_blocks(file, parser.BLOCK_SIZE):
+                    future = executor.submit(
+                        aggregate_block,
+                        parser,
+                        block,
+                        entry_filter,
+                        stats.sample_size,
+                        scanner,
+                        normalizer,
+                    )
+                    pending.append((future, len(block)))
+                    if len(pending) >= workers * BLOCKS_PER_WORKER:
+                        collect()
+            while pending:
+                collect()
+
+    stats.elapsed += time.perf_counter() - start
+    return aggregate
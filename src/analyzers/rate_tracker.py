@@ -0,0 +1,241 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from .. import profiling
+from ..models.log_entry import LogEntry
+
+# Buckets por ventana: la ventana deslizante avanza en saltos de window/buckets
+DEFAULT_BUCKETS = 6
+
+# Claves seguidas a la vez; al superarlo se descarta la menos reciente
+DEFAULT_MAX_KEYS = 1_000_000
+
+# Timestamps distintos cuyo bucket se cachea en observe
+BUCKET_CACHE_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class RateRule:
+    """
+    Qué requests cuentan para el tracker.
+
+    path se compara con el path sin query string: exacto, o como prefijo si
+    termina en "/". Los campos a None no filtran.
+    """
+
+    path: Optional[str] = None
+    statuses: Optional[FrozenSet[int]] = None
+    methods: Optional[FrozenSet[str]] = None
+
+    def matches(self, entry: LogEntry) -> bool:
+        """Retorna True si la entrada cuenta para esta regla."""
+        if self.statuses is not None and entry.status_code not in self.statuses:
+            return False
+        if self.methods is not None and entry.method not in self.methods:
+            return False
+        if self.path is not None:
+            path = entry.path.split("?", 1)[0]
+            if self.path.endswith("/"):
+                return path.startswith(self.path)
+            return path == self.path
+        return True
+
+
+@dataclass(frozen=True)
+class RateAlert:
+    """Una clave (p. ej. una IP) que alcanza el umbral en la ventana."""
+
+    key: str
+    timestamp: datetime
+    count: int
+
+
+class _KeyWindow:
+    """Ring buffer de cuentas por bucket de una clave."""
+
+    __slots__ = ("counts", "bucket", "total")
+
+    def __init__(self, size: int, bucket: int) -> None:
+        self.counts = [0] * size
+        self.bucket = bucket
+        self.total = 0
+
+    def advance(self, bucket: int) -> None:
+        """Mueve la ventana hasta bucket, vaciando los buckets que salen."""
+        size = len(self.counts)
+        if bucket - self.bucket >= size:
+            self.counts = [0] * size
+            self.total = 0
+        else:
+            counts = self.counts
+            for b in range(self.bucket + 1, bucket + 1):
+                self.total -= counts[b % size]
+                counts[b % size] = 0
+        self.bucket = bucket
+
+
+@profiling.instrument(
+    "rate", exclude=("bucket_of", "bucket_start", "add", "add_bucket", "count")
+)
+class RateTracker:
+    """
+    Cuenta eventos por clave en una ventana deslizante, en memoria acotada.
+
+    Cada clave tiene un ring buffer de `buckets` cuentas que cubren `window`
+    segundos; la ventana avanza por buckets. El reloj es el de los propios
+    logs (el timestamp más reciente visto), así que el mismo tracker sirve
+    para un análisis por lotes y para seguir un log en vivo. Las entradas
+    que llegan desordenadas cuentan si siguen dentro de la ventana.
+
+    La memoria está acotada de dos formas: las claves viven en un
+    OrderedDict por orden de actividad, de modo que las inactivas durante
+    una ventana entera se descartan desde el principio en O(1) cada una, y
+    nunca hay más de max_keys claves (se descarta la menos reciente). Las
+    claves que alcanzan el umbral se guardan aparte, así que offenders()
+    cuesta O(infractores) y no O(claves).
+    """
+
+    def __init__(
+        self,
+        window: float = 60,
+        threshold: int = 10,
+        buckets: int = DEFAULT_BUCKETS,
+        max_keys: int = DEFAULT_MAX_KEYS,
+    ) -> None:
+        if window <= 0 or buckets < 1:
+            raise ValueError("window debe ser > 0 y buckets >= 1")
+        self.window = window
+        self.threshold = threshold
+        self.buckets = buckets
+        self.bucket_width = window / buckets
+        self.max_keys = max_keys
+        self.keys: "OrderedDict[str, _KeyWindow]" = OrderedDict()
+        self.offending: Dict[str, _KeyWindow] = {}
+        self.watermark: Optional[int] = None
+        self.evicted = 0
+        self._buckets_by_ts: Dict[datetime, int] = {}
+
+    def bucket_of(self, ts: datetime) -> int:
+        """Retorna el índice de bucket de un timestamp."""
+        return int(ts.timestamp() // self.bucket_width)
+
+    def bucket_start(self, bucket: int) -> datetime:
+        """Retorna el inicio (UTC) de un bucket."""
+        return datetime.fromtimestamp(bucket * self.bucket_width, timezone.utc)
+
+    def add(self, key: str, ts: datetime, n: int = 1) -> Optional[RateAlert]:
+        """
+        Suma n eventos de key en ts.
+
+        Retorna un RateAlert si con ellos key alcanza el umbral (una vez
+        hasta que vuelva a bajar de él), o None.
+        """
+        count = self.add_bucket(key, self.bucket_of(ts), n)
+        return None if count is None else RateAlert(key, ts, count)
+
+    def add_bucket(self, key: str, bucket: int, n: int = 1) -> Optional[int]:
+        """
+        Como add, pero con el índice de bucket ya calculado (p. ej. en un
+        worker). Retorna la cuenta de la ventana si key alcanza el umbral.
+        """
+        return self._add(key, bucket, n)
+
+    def _add(self, key: str, bucket: int, n: int = 1) -> Optional[int]:
+        watermark = self.watermark
+        if watermark is None or bucket > watermark:
+            self.watermark = watermark = bucket
+            self._evict_idle()
+        elif bucket <= watermark - self.buckets:
+            return None
+
+        keys = self.keys
+        state = keys.get(key)
+        if state is None:
+            state = keys[key] = _KeyWindow(self.buckets, bucket)
+            if len(keys) > self.max_keys:
+                old, _ = keys.popitem(last=False)
+                self.offending.pop(old, None)
+                self.evicted += 1
+        else:
+            keys.move_to_end(key)
+            if bucket > state.bucket:
+                state.advance(bucket)
+                if state.total < self.threshold:
+                    self.offending.pop(key, None)
+            elif bucket <= state.bucket - self.buckets:
+                return None
+
+        state.counts[bucket % self.buckets] += n
+        state.total += n
+        if state.total >= self.threshold and key not in self.offending:
+            self.offending[key] = state
+            return state.total
+        return None
+
+    def _evict_idle(self) -> None:
+        # Las claves sin eventos en toda la ventana ya cuentan 0
+        cutoff = self.watermark - self.buckets
+        keys = self.keys
+        while keys:
+            key, state = next(iter(keys.items()))
+            if state.bucket > cutoff:
+                break
+            del keys[key]
+            self.offending.pop(key, None)
+            self.evicted += 1
+
+    def count(self, key: str) -> int:
+        """Retorna los eventos de key en la ventana actual."""
+        state = self.keys.get(key)
+        if state is None:
+            return 0
+        if state.bucket < self.watermark:
+            state.advance(self.watermark)
+        return state.total
+
+    def offenders(self) -> List[Tuple[str, int]]:
+        """
+        Retorna las claves que están en el umbral o por encima en la ventana
+        actual, de más a menos eventos. Solo recorre los infractores.
+        """
+        result = []
+        for key, state in list(self.offending.items()):
+            if state.bucket < self.watermark:
+                state.advance(self.watermark)
+            if state.total < self.threshold:
+                del self.offending[key]
+            else:
+                result.append((key, state.total))
+        result.sort(key=lambda kv: (-kv[1], kv[0]))
+        return result
+
+    def observe(
+        self,
+        entries: Iterable[LogEntry],
+        rule: Optional[RateRule] = None,
+        key: Callable[[LogEntry], str] = lambda e: e.ip,
+    ) -> List[RateAlert]:
+        """
+        Cuenta las entradas que cumplen rule (por defecto, todas), agrupadas
+        por key (por defecto, la IP). Retorna las alertas nuevas.
+        """
+        matches = rule.matches if rule is not None else None
+        cache = self._buckets_by_ts
+        add = self._add
+        alerts = []
+        for e in entries:
+            if matches is not None and not matches(e):
+                continue
+            ts = e.timestamp
+            bucket = cache.get(ts)
+            if bucket is None:
+                if len(cache) >= BUCKET_CACHE_SIZE:
+                    cache.clear()
+                bucket = cache[ts] = self.bucket_of(ts)
+            k = key(e)
+            count = add(k, bucket)
+            if count is not None:
+                alerts.append(RateAlert(k, ts, count))
+        return alerts
@@ -0,0 +1,244 @@
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .. import profiling
+from ..models.log_entry import LogEntry
+
+# Inactividad (segundos) que cierra una sesión, como en Google Analytics
+DEFAULT_GAP = 30 * 60
+
+# Segundos que se espera a entradas desordenadas antes de cerrar una sesión
+DEFAULT_LATENESS = 60
+
+# Extensiones que no cuentan como página vista
+STATIC_EXTENSIONS = frozenset(
+    {
+        ".css",
+        ".js",
+        ".map",
+        ".png",
+        ".jpg",
+        ".jpeg",
+        ".gif",
+        ".svg",
+        ".ico",
+        ".webp",
+        ".woff",
+        ".woff2",
+        ".ttf",
+    }
+)
+
+# Límites superiores (inclusive) de los rangos del informe y sus etiquetas
+DURATION_BUCKETS: Tuple[int, ...] = (0, 60, 300, 900, 1800, 3600)
+DURATION_LABELS: Tuple[str, ...] = (
+    "0s",
+    "< 1m",
+    "1-5m",
+    "5-15m",
+    "15-30m",
+    "30-60m",
+    "> 1h",
+)
+PAGE_BUCKETS: Tuple[int, ...] = (1, 3, 10)
+PAGE_LABELS: Tuple[str, ...] = ("0-1", "2-3", "4-10", "> 10")
+
+# Timestamps distintos cuya conversión a segundos se cachea
+TIMESTAMP_CACHE_SIZE = 4096
+
+
+def is_page(path: str) -> bool:
+    """Retorna True si path es una página vista (no un recurso estático)."""
+    path = path.split("?", 1)[0]
+    dot = path.rfind(".")
+    if dot == -1 or dot < path.rfind("/"):
+        return True
+    return path[dot:].lower() not in STATIC_EXTENSIONS
+
+
+@dataclass
+class Session:
+    """Una visita: requests del mismo IP y user agent sin pausas largas."""
+
+    ip: str
+    user_agent: Optional[str]
+    start: datetime
+    end: datetime
+    requests: int = 0
+    pages: int = 0
+    bytes: int = 0
+
+    @property
+    def duration(self) -> float:
+        """Retorna la duración en segundos (0 para una sola request)."""
+        return (self.end - self.start).total_seconds()
+
+
+class _OpenSession:
+    """Sesión abierta: los datos de Session y la última actividad en segundos."""
+
+    __slots__ = ("session", "last")
+
+    def __init__(self, session: Session, last: float) -> None:
+        self.session = session
+        self.last = last
+
+
+@profiling.instrument("sessions")
+class Sessionizer:
+    """
+    Agrupa un flujo de LogEntry en sesiones (IP + user agent) en streaming.
+
+    Solo guarda las sesiones abiertas, en un OrderedDict por orden de
+    actividad. La marca de agua es el timestamp más reciente visto; cuando
+    avanza, las sesiones sin actividad desde hace más de gap + lateness se
+    cierran desde el principio del OrderedDict, sin recorrer las demás. La
+    entrada no se ordena: basta con que llegue aproximadamente en orden
+    (los desórdenes de hasta lateness segundos se toleran). Si se leen
+    varios archivos, deben pasarse en orden temporal.
+    """
+
+    def __init__(self, gap: float = DEFAULT_GAP, lateness: float = DEFAULT_LATENESS):
+        self.gap = gap
+        self.lateness = lateness
+        self.open: "OrderedDict[Tuple[str, Optional[str]], _OpenSession]" = (
+            OrderedDict()
+        )
+        self.watermark: Optional[float] = None
+        self._seconds: Dict[datetime, float] = {}
+
+    def feed(self, entries: Iterable[LogEntry]) -> Iterator[Session]:
+        """Añade las entradas y genera las sesiones que se van cerrando."""
+        open_sessions = self.open
+        seconds = self._seconds
+        limit = self.gap + self.lateness
+        for e in entries:
+            ts = e.timestamp
+            now = seconds.get(ts)
+            if now is None:
+                if len(seconds) >= TIMESTAMP_CACHE_SIZE:
+                    seconds.clear()
+                now = seconds[ts] = ts.timestamp()
+
+            if self.watermark is None or now > self.watermark:
+                self.watermark = now
+                yield from self._close_idle(now - limit)
+
+            key = (e.ip, e.user_agent)
+            current = open_sessions.get(key)
+            if current is not None and now - current.last > self.gap:
+                # Pausa larga sin que la marca de agua la haya cerrado aún
+                del open_sessions[key]
+                yield current.session
+                current = None
+            if current is None:
+                current = open_sessions[key] = _OpenSession(
+                    Session(e.ip, e.user_agent, ts, ts), now
+                )
+            else:
+                open_sessions.move_to_end(key)
+            session = current.session
+            if now > current.last:
+                current.last = now
+                session.end = ts
+            elif ts < session.start:
+                session.start = ts
+            session.requests += 1
+            session.bytes += e.response_size
+            if is_page(e.path):
+                session.pages += 1
+
+    def _close_idle(self, cutoff: float) -> Iterator[Session]:
+        open_sessions = self.open
+        while open_sessions:
+            key, current = next(iter(open_sessions.items()))
+            if current.last >= cutoff:
+                break
+            del open_sessions[key]
+            yield current.session
+
+    def flush(self) -> Iterator[Session]:
+        """Cierra y genera todas las sesiones abiertas (al final de la entrada)."""
+        while self.open:
+            yield self.open.popitem(last=False)[1].session
+
+    def sessions(self, entries: Iterable[LogEntry]) -> Iterator[Session]:
+        """Genera todas las sesiones de entries, incluidas las que quedan abiertas."""
+        yield from self.feed(entries)
+        yield from self.flush()
+
+
+@profiling.instrument("sessions")
+class SessionSummary:
+    """
+    Métricas de un conjunto de sesiones en memoria constante.
+
+    Guarda totales y cuentas por rango de duración y de páginas, no las
+    sesiones, así que sirve para consumir la salida de Sessionizer sobre
+    logs de cualquier tamaño.
+    """
+
+    def __init__(self) -> None:
+        self.sessions = 0
+        self.requests = 0
+        self.pages = 0
+        self.bounces = 0
+        self.total_duration = 0.0
+        self.max_duration = 0.0
+        self.duration_counts: List[int] = [0] * (len(DURATION_BUCKETS) + 1)
+        self.page_counts: List[int] = [0] * (len(PAGE_BUCKETS) + 1)
+
+    def consume(self, sessions: Iterable[Session]) -> int:
+        """Añade las sesiones. Retorna cuántas se añadieron."""
+        count = 0
+        for s in sessions:
+            count += 1
+            duration = s.duration
+            self.requests += s.requests
+            self.pages += s.pages
+            self.total_duration += duration
+            if duration > self.max_duration:
+                self.max_duration = duration
+            if s.pages <= 1:
+                self.bounces += 1
+            self.duration_counts[bisect_left(DURATION_BUCKETS, duration)] += 1
+            self.page_counts[bisect_left(PAGE_BUCKETS, s.pages)] += 1
+        self.sessions += count
+        return count
+
+    @property
+    def avg_duration(self) -> float:
+        """Retorna la duración media en segundos"""
+        return self.total_duration / self.sessions if self.sessions else 0.0
+
+    @property
+    def avg_pages(self) -> float:
+        """Retorna las páginas vistas por sesión"""
+        return self.pages / self.sessions if self.sessions else 0.0
+
+    @property
+    def bounce_rate(self) -> float:
+        """Retorna el ratio de sesiones con una página o ninguna"""
+        return self.bounces / self.sessions if self.sessions else 0.0
+
+    def duration_histogram(self) -> Dict[str, int]:
+        """Retorna las sesiones por rango de duración."""
+        return dict(zip(DURATION_LABELS, self.duration_counts))
+
+    def pages_histogram(self) -> Dict[str, int]:
+        """Retorna las sesiones por rango de páginas vistas."""
+        return dict(zip(PAGE_LABELS, self.page_counts))
+
+    def get_summary(self) -> Dict[str, int | float]:
+        """Retorna el resumen de las sesiones."""
+        return {
+            "sessions": self.sessions,
+            "requests": self.requests,
+            "avg_duration": self.avg_duration,
+            "max_duration": self.max_duration,
+            "avg_pages": self.avg_pages,
+            "bounce_rate": self.bounce_rate,
+        }
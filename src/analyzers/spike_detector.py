@@ -0,0 +1,126 @@
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional
+
+from .. import profiling
+from .timeseries import TimeBucket
+
+METRIC_REQUESTS = "requests"
+METRIC_ERROR_RATE = "error_rate"
+
+# Desviación mínima de la tasa de error, para que una serie casi constante
+# no dispare alertas por variaciones de décimas
+MIN_RATE_STD = 0.01
+
+
+class Ewma:
+    """
+    Media y varianza con decaimiento exponencial, actualizadas en O(1).
+
+    alpha es el peso de cada observación nueva (0.1 ~ las últimas 20).
+    """
+
+    __slots__ = ("alpha", "mean", "var", "count")
+
+    def __init__(self, alpha: float) -> None:
+        self.alpha = alpha
+        self.mean = 0.0
+        self.var = 0.0
+        self.count = 0
+
+    def update(self, value: float) -> None:
+        """Incorpora una observación."""
+        if self.count == 0:
+            self.mean = value
+        else:
+            diff = value - self.mean
+            incr = self.alpha * diff
+            self.mean += incr
+            self.var = (1 - self.alpha) * (self.var + diff * incr)
+        self.count += 1
+
+
+@dataclass(frozen=True)
+class Spike:
+    """Un bucket cuyo valor se aleja de la línea base más de threshold desviaciones."""
+
+    metric: str
+    start: datetime
+    value: float
+    baseline: float
+    zscore: float
+
+
+@profiling.instrument("spikes", exclude=("observe",))
+class SpikeDetector:
+    """
+    Detecta picos de tráfico y de tasa de error sobre los buckets de una
+    serie temporal, a medida que se cierran.
+
+    Cada métrica tiene una línea base EWMA (media y varianza); un bucket es
+    un pico si su z-score frente a la base anterior supera threshold. Cada
+    bucket actualiza la base en O(1), sin recorrer el histórico, así que
+    sirve igual para una serie completa (detect) que para los buckets que
+    va cerrando TimeSeriesAggregator.drain() al seguir un log. Las primeras
+    warmup observaciones solo entrenan la base. Para el tráfico la
+    desviación nunca baja de la de Poisson (raíz de la media); la tasa de
+    error solo se evalúa en buckets con al menos min_requests requests.
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.1,
+        threshold: float = 3.0,
+        warmup: int = 10,
+        min_requests: int = 20,
+    ) -> None:
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha debe estar en (0, 1]")
+        self.threshold = threshold
+        self.warmup = warmup
+        self.min_requests = min_requests
+        self.requests = Ewma(alpha)
+        self.error_rate = Ewma(alpha)
+
+    def _check(
+        self, metric: str, baseline: Ewma, value: float, floor: float, start: datetime
+    ) -> Optional[Spike]:
+        spike = None
+        if baseline.count >= self.warmup:
+            std = max(math.sqrt(baseline.var), floor)
+            zscore = (value - baseline.mean) / std
+            if zscore >= self.threshold:
+                spike = Spike(metric, start, value, baseline.mean, zscore)
+        baseline.update(value)
+        return spike
+
+    def observe(self, bucket: TimeBucket) -> List[Spike]:
+        """Evalúa un bucket cerrado y lo añade a la base. Retorna sus picos."""
+        spikes = []
+        requests = self.requests
+        spike = self._check(
+            METRIC_REQUESTS,
+            requests,
+            bucket.requests,
+            max(1.0, math.sqrt(max(requests.mean, 0.0))),
+            bucket.start,
+        )
+        if spike is not None:
+            spikes.append(spike)
+        if bucket.requests >= self.min_requests:
+            spike = self._check(
+                METRIC_ERROR_RATE,
+                self.error_rate,
+                bucket.errors / bucket.requests,
+                MIN_RATE_STD,
+                bucket.start,
+            )
+            if spike is not None:
+                spikes.append(spike)
+        return spikes
+
+    def detect(self, buckets: Iterable[TimeBucket]) -> Iterator[Spike]:
+        """Genera los picos de una secuencia de buckets en orden."""
+        for bucket in buckets:
+            yield from self.observe(bucket)
@@ -0,0 +1,262 @@
+import re
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import unquote_plus
+
+from .. import profiling
+from ..models.log_entry import LogEntry
+from .live_metrics import TopKCounter
+from .rate_tracker import DEFAULT_BUCKETS, RateTracker
+
+TARGET_PATH = "path"
+TARGET_USER_AGENT = "user_agent"
+
+KIND_SIGNATURE = "signature"
+KIND_RATE = "rate"
+
+# Resultados de match que se cachean por string antes de vaciar la caché
+MATCH_CACHE_SIZE = 65_536
+
+
+@dataclass(frozen=True)
+class Signature:
+    """Patrón de ataque: nombre, categoría, regex y campo de LogEntry al que aplica."""
+
+    name: str
+    category: str
+    pattern: str
+    target: str = TARGET_PATH
+
+
+SIGNATURES: Tuple[Signature, ...] = (
+    # SQL injection
+    Signature(
+        "sqli_union_select", "sqli", r"union(?:\s|\+|/\*.*?\*/)+(?:all\s+)?select"
+    ),
+    Signature("sqli_tautology", "sqli", r"'\s*or\s+'?\w+'?\s*=\s*'?\w+"),
+    Signature("sqli_or_1_1", "sqli", r"\bor\s+1\s*=\s*1\b"),
+    Signature("sqli_sleep", "sqli", r"\b(?:sleep|benchmark|pg_sleep)\s*\("),
+    Signature("sqli_schema", "sqli", r"information_schema|sys\.tables"),
+    Signature("sqli_stacked", "sqli", r";\s*(?:drop|delete|insert|update)\s"),
+    # Path traversal / inclusión de archivos
+    Signature("traversal_dotdot", "path_traversal", r"\.\.[/\\]"),
+    Signature("traversal_etc_passwd", "path_traversal", r"/etc/(?:passwd|shadow)"),
+    Signature("traversal_win_ini", "path_traversal", r"win\.ini|boot\.ini"),
+    Signature("traversal_proc", "path_traversal", r"/proc/self/"),
+    # XSS
+    Signature("xss_script", "xss", r"<\s*script"),
+    Signature("xss_handler", "xss", r"\bon(?:error|load)\s*="),
+    Signature("xss_js_uri", "xss", r"javascript:"),
+    # Inyección de comandos
+    Signature("cmd_subshell", "command_injection", r"\$\(|`[^`]*`"),
+    Signature(
+        "cmd_chain", "command_injection", r"[;|]\s*(?:cat|wget|curl|sh|bash|nc)\b"
+    ),
+    # Archivos sensibles
+    Signature("sensitive_env", "sensitive_file", r"/\.env\b"),
+    Signature("sensitive_git", "sensitive_file", r"/\.git(?:/|$)"),
+    Signature("sensitive_cloud", "sensitive_file", r"/\.(?:aws|ssh)/"),
+    Signature(
+        "sensitive_admin", "sensitive_file", r"wp-login\.php|phpmyadmin|/wp-admin"
+    ),
+    # Scanners conocidos (user agent)
+    Signature(
+        "scanner_ua",
+        "scanner",
+        r"sqlmap|nikto|nmap|masscan|zgrab|nuclei|dirbuster|gobuster|wpscan"
+        r"|acunetix|nessus|openvas|w3af|hydra|\bscanner\b",
+        TARGET_USER_AGENT,
+    ),
+)
+
+
+@dataclass(frozen=True)
+class Finding:
+    """Un hallazgo del detector: firma que coincide o pico de tráfico de una IP."""
+
+    kind: str
+    name: str
+    category: str
+    ip: str
+    timestamp: datetime
+    detail: str
+
+
+class SignatureMatcher:
+    """
+    Busca muchas firmas con una única regex combinada por campo.
+
+    Cada firma es un grupo con nombre de una alternancia, de modo que cada
+    string se recorre una sola vez sea cual sea el número de firmas; el grupo
+    que coincide (lastgroup) identifica la firma. Se reporta una firma por
+    campo: la coincidencia más a la izquierda y, a igual posición, la primera
+    de la lista. Los paths se decodifican (%2e%2e%2f -> ../) antes
+    de buscar y el resultado se cachea por string, porque los logs repiten
+    mucho los mismos paths y user agents.
+    """
+
+    def __init__(self, signatures: Sequence[Signature] = SIGNATURES) -> None:
+        self.signatures = {f"s{i}": sig for i, sig in enumerate(signatures)}
+        self.regexes = {}
+        for target in (TARGET_PATH, TARGET_USER_AGENT):
+            alternatives = [
+                f"(?P<{group}>{sig.pattern})"
+                for group, sig in self.signatures.items()
+                if sig.target == target
+            ]
+            if alternatives:
+                self.regexes[target] = re.compile("|".join(alternatives), re.IGNORECASE)
+        self._cache: Dict[Tuple[str, str], Optional[Signature]] = {}
+
+    def __getstate__(self) -> Dict:
+        # La caché no viaja a los workers
+        state = self.__dict__.copy()
+        state["_cache"] = {}
+        return state
+
+    def match(self, target: str, value: Optional[str]) -> Optional[Signature]:
+        """Retorna la primera firma de target que coincide con value, o None."""
+        if not value:
+            return None
+        key = (target, value)
+        cache = self._cache
+        if key in cache:
+            return cache[key]
+        regex = self.regexes.get(target)
+        signature = None
+        if regex is not None:
+            text = unquote_plus(value) if "%" in value or "+" in value else value
+            m = regex.search(text)
+            if m is not None:
+                signature = self.signatures[m.lastgroup]
+        if len(cache) >= MATCH_CACHE_SIZE:
+            cache.clear()
+        cache[key] = signature
+        return signature
+
+
+@dataclass
+class BlockScan:
+    """Resultado de escanear un bloque: hallazgos de firmas y cuentas por bucket e IP."""
+
+    findings: List[Finding]
+    rate_counts: Dict[int, Counter]
+
+
+class ThreatScanner:
+    """
+    Parte sin estado del detector: firmas y conteo por bucket de un bloque.
+
+    Es picklable, así que puede ejecutarse en los workers del pipeline; el
+    estado entre bloques (picos por IP) vive en ThreatDetector.
+    """
+
+    def __init__(
+        self, matcher: Optional[SignatureMatcher] = None, bucket_width: float = 10
+    ) -> None:
+        self.matcher = matcher or SignatureMatcher()
+        self.bucket_width = bucket_width
+
+    def scan(self, entries: Iterable[LogEntry]) -> BlockScan:
+        """Retorna los hallazgos de firmas y las requests por bucket e IP."""
+        match = self.matcher.match
+        width = self.bucket_width
+        findings: List[Finding] = []
+        rate_counts: Dict[int, Counter] = {}
+        windows: Dict[datetime, int] = {}
+        for e in entries:
+            ts = e.timestamp
+            index = windows.get(ts)
+            if index is None:
+                index = windows[ts] = int(ts.timestamp() // width)
+            counts = rate_counts.get(index)
+            if counts is None:
+                counts = rate_counts[index] = Counter()
+            counts[e.ip] += 1
+
+            for target, value in (
+                (TARGET_PATH, e.path),
+                (TARGET_USER_AGENT, e.user_agent),
+            ):
+                sig = match(target, value)
+                if sig is not None:
+                    findings.append(
+                        Finding(KIND_SIGNATURE, sig.name, sig.category, e.ip, ts, value)
+                    )
+        return BlockScan(findings, rate_counts)
+
+
+@profiling.instrument("detect")
+class ThreatDetector:
+    """
+    Detector en streaming de patrones de ataque y picos de tráfico por IP.
+
+    Se alimenta bloque a bloque durante la pasada de parseo (observe, o
+    absorb con el BlockScan de un worker). Los picos se cuentan con un
+    RateTracker: requests por IP en una ventana deslizante de rate_window
+    segundos, con un hallazgo cada vez que una IP alcanza rate_threshold. La
+    memoria está acotada: el tracker sigue como máximo max_tracked_ips IPs,
+    se guardan como máximo max_findings hallazgos (el resto solo se cuenta)
+    y un top-K aproximado de las IPs con más hallazgos.
+    """
+
+    def __init__(
+        self,
+        signatures: Sequence[Signature] = SIGNATURES,
+        rate_window: int = 60,
+        rate_threshold: int = 600,
+        max_tracked_ips: int = 100_000,
+        max_findings: int = 1_000,
+        top_offenders: int = 20,
+    ) -> None:
+        self.rates = RateTracker(
+            rate_window, rate_threshold, DEFAULT_BUCKETS, max_tracked_ips
+        )
+        self.scanner = ThreatScanner(
+            SignatureMatcher(signatures), self.rates.bucket_width
+        )
+        self.rate_window = rate_window
+        self.rate_threshold = rate_threshold
+        self.max_findings = max_findings
+        self.findings: List[Finding] = []
+        self.category_counts: Counter = Counter()
+        self.offenders = TopKCounter(top_offenders)
+
+    def observe(self, entries: Iterable[LogEntry]) -> List[Finding]:
+        """Procesa un lote de entradas. Retorna los hallazgos nuevos."""
+        return self.absorb(self.scanner.scan(entries))
+
+    def absorb(self, scan: BlockScan) -> List[Finding]:
+        """Incorpora el escaneo de un bloque (en orden). Retorna los hallazgos nuevos."""
+        new = list(scan.findings)
+        rates = self.rates
+        for bucket in sorted(scan.rate_counts):
+            for ip, n in scan.rate_counts[bucket].items():
+                if rates.add_bucket(ip, bucket, n) is not None:
+                    new.append(
+                        Finding(
+                            KIND_RATE,
+                            "rate_spike",
+                            "rate",
+                            ip,
+                            rates.bucket_start(bucket),
+                            f">= {self.rate_threshold} requests en {self.rate_window}s",
+                        )
+                    )
+        for finding in new:
+            self.category_counts[finding.category] += 1
+            self.offenders.add(finding.ip)
+        room = self.max_findings - len(self.findings)
+        if room > 0:
+            self.findings.extend(new[:room])
+        return new
+
+    def summary(self, top_n: int = 10) -> Dict:
+        """Retorna el total de hallazgos por categoría y las IPs con más hallazgos."""
+        return {
+            "total_findings": sum(self.category_counts.values()),
+            "by_category": dict(self.category_counts.most_common()),
+            "top_offenders": self.offenders.most_common(top_n),
+        }
@@ -0,0 +1,286 @@
+from array import array
+from dataclasses import dataclass
+from datetime import datetime, tzinfo
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .. import profiling
+from ..models.log_entry import LogEntry
+
+# Resoluciones con nombre, en segundos
+RESOLUTIONS = {"1s": 1, "10s": 10, "1m": 60, "5m": 300, "1h": 3600, "1d": 86400}
+
+# Histograma logarítmico de tamaños: 2 bins por potencia de 2 (error relativo
+# < 25 %) hasta 2**40 bytes; el bin 0 es el tamaño 0
+SIZE_BITS = 40
+SIZE_BINS = 2 * SIZE_BITS + 1
+
+# Cuantiles del informe
+QUANTILES: Tuple[float, ...] = (0.5, 0.95, 0.99)
+
+# Timestamps distintos cuyo bucket se cachea
+BUCKET_CACHE_SIZE = 4096
+
+# Buckets que puede abarcar una serie (~24 días a 1 s): un timestamp erróneo
+# no debe hacer que los arrays densos reserven millones de posiciones
+MAX_BUCKETS = 1 << 21
+
+
+def parse_resolution(spec: str) -> int:
+    """
+    Convierte "10s", "1m", "1h"... (o un número de segundos) en segundos.
+
+    Raises:
+        ValueError: Si la resolución no es válida
+    """
+    spec = spec.strip().lower()
+    if spec in RESOLUTIONS:
+        return RESOLUTIONS[spec]
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    number, unit = (spec[:-1], spec[-1]) if spec[-1:] in units else (spec, "s")
+    if not number.isdigit() or int(number) == 0:
+        raise ValueError(f"Resolución inválida: {spec}")
+    return int(number) * units[unit]
+
+
+def _size_bin(size: int) -> int:
+    if size <= 0:
+        return 0
+    bits = size.bit_length()
+    if bits > SIZE_BITS:
+        return SIZE_BINS - 1
+    half = (size >> (bits - 2)) & 1 if bits >= 2 else 0
+    return 2 * (bits - 1) + half + 1
+
+
+def _bin_value(index: int) -> float:
+    """Retorna el valor representativo (punto medio) de un bin."""
+    if index == 0:
+        return 0.0
+    bits, half = divmod(index - 1, 2)
+    if bits == 0:
+        return 1.0
+    width = 1 << (bits - 1)
+    low = (1 << bits) + half * width
+    return low + (width - 1) / 2
+
+
+def _quantile(hist: array, count: int, q: float) -> float:
+    rank = q * (count - 1)
+    seen = 0
+    for index, n in enumerate(hist):
+        seen += n
+        if seen > rank:
+            return _bin_value(index)
+    return _bin_value(len(hist) - 1)
+
+
+@dataclass(frozen=True)
+class TimeBucket:
+    """Métricas de un intervalo de la serie temporal."""
+
+    start: datetime
+    requests: int
+    errors: int
+    bytes: int
+    size_quantiles: Dict[float, float]
+
+
+@profiling.instrument("timeseries")
+class TimeSeriesAggregator:
+    """
+    Serie temporal de requests, errores, bytes y cuantiles de tamaño.
+
+    Los buckets de `resolution` segundos se guardan en arrays densos
+    indexados por su distancia al primer bucket, no en dicts por datetime:
+    añadir una entrada es una suma en una posición, y los huecos sin
+    tráfico cuestan un cero. Cada bucket tiene además un histograma
+    logarítmico de tamaños (creado al usarse) del que salen los cuantiles.
+
+    Para entrada en streaming se toleran desórdenes de hasta `lateness`
+    segundos respecto al timestamp más reciente; lo más antiguo se descarta
+    y se cuenta en `late`. drain() emite y libera los buckets que ya no
+    pueden cambiar, así que la memoria queda acotada a la ventana de
+    lateness. Sin lateness (por defecto) se acepta cualquier orden.
+
+    La serie abarca como mucho `max_buckets` buckets: una entrada que la
+    alargaría más (p. ej. un timestamp erróneo años fuera del log) se
+    descarta y se cuenta en `out_of_range`.
+    """
+
+    def __init__(
+        self,
+        resolution: int = 60,
+        lateness: Optional[float] = None,
+        quantiles: Tuple[float, ...] = QUANTILES,
+        max_buckets: int = MAX_BUCKETS,
+    ) -> None:
+        if resolution < 1:
+            raise ValueError("resolution debe ser >= 1 segundo")
+        self.resolution = resolution
+        self.max_buckets = max_buckets
+        self.lateness = lateness
+        self.quantiles = quantiles
+        self.origin: Optional[int] = None
+        self.requests = array("q")
+        self.errors = array("q")
+        self.bytes = array("q")
+        self.histograms: List[Optional[array]] = []
+        self.watermark: Optional[int] = None
+        self.late = 0
+        self.out_of_range = 0
+        self.tz: Optional[tzinfo] = None
+        self._buckets: Dict[datetime, int] = {}
+
+    def _fits(self, bucket: int) -> bool:
+        """Retorna True si incluir bucket no lleva la serie más allá de max_buckets."""
+        if self.origin is None:
+            return True
+        low = min(self.origin, bucket)
+        high = max(self.origin + len(self.requests) - 1, bucket)
+        return high - low < self.max_buckets
+
+    def _ensure(self, bucket: int) -> int:
+        """Amplía los arrays para incluir bucket. Retorna su posición."""
+        if self.origin is None:
+            self.origin = bucket
+        offset = bucket - self.origin
+        if offset < 0:
+            pad = -offset
+            for column in (self.requests, self.errors, self.bytes):
+                column[:0] = array("q", bytes(8 * pad))
+            self.histograms[:0] = [None] * pad
+            self.origin = bucket
+            offset = 0
+        missing = offset + 1 - len(self.requests)
+        if missing > 0:
+            zeros = bytes(8 * missing)
+            for column in (self.requests, self.errors, self.bytes):
+                column.frombytes(zeros)
+            self.histograms.extend([None] * missing)
+        return offset
+
+    def consume(self, entries: Iterable[LogEntry]) -> int:
+        """Añade las entradas. Retorna cuántas se añadieron (sin las tardías)."""
+        resolution = self.resolution
+        cache = self._buckets
+        requests, errors, sizes = self.requests, self.errors, self.bytes
+        histograms = self.histograms
+        late_limit = None
+        if self.lateness is not None:
+            late_limit = int(self.lateness // resolution)
+        count = 0
+        for e in entries:
+            ts = e.timestamp
+            bucket = cache.get(ts)
+            if bucket is None:
+                if len(cache) >= BUCKET_CACHE_SIZE:
+                    cache.clear()
+                bucket = cache[ts] = int(ts.timestamp() // resolution)
+                if self.tz is None:
+                    self.tz = ts.tzinfo
+
+            offset = bucket - self.origin if self.origin is not None else -1
+            if (offset < 0 or offset >= len(requests)) and not self._fits(bucket):
+                self.out_of_range += 1
+                continue
+
+            if self.watermark is None or bucket > self.watermark:
+                self.watermark = bucket
+            elif late_limit is not None and bucket < self.watermark - late_limit:
+                self.late += 1
+                continue
+
+            if offset < 0 or offset >= len(requests):
+                offset = self._ensure(bucket)
+                requests, errors, sizes = self.requests, self.errors, self.bytes
+            size = e.response_size
+            requests[offset] += 1
+            sizes[offset] += size
+            if not 200 <= e.status_code < 300:
+                errors[offset] += 1
+            hist = histograms[offset]
+            if hist is None:
+                hist = histograms[offset] = array("q", bytes(8 * SIZE_BINS))
+            hist[_size_bin(size)] += 1
+            count += 1
+        return count
+
+    def merge(self, other: "TimeSeriesAggregator") -> None:
+        """
+        Suma a esta serie la de other (misma resolución).
+
+        Raises:
+            ValueError: Si las resoluciones difieren o juntas abarcan más
+                de max_buckets
+        """
+        if other.resolution != self.resolution:
+            raise ValueError("Las series deben tener la misma resolución")
+        if other.origin is None:
+            return
+        end = other.origin + len(other.requests) - 1
+        if self.origin is not None:
+            end = max(end, self.origin + len(self.requests) - 1)
+        if end - min(other.origin, self.origin or other.origin) >= self.max_buckets:
+            raise ValueError(f"Las series juntas superan {self.max_buckets} buckets")
+        self.tz = self.tz or other.tz
+        self._ensure(other.origin)
+        self._ensure(other.origin + len(other.requests) - 1)
+        base = other.origin - self.origin
+        for i in range(len(other.requests)):
+            self.requests[base + i] += other.requests[i]
+            self.errors[base + i] += other.errors[i]
+            self.bytes[base + i] += other.bytes[i]
+            hist = other.histograms[i]
+            if hist is None:
+                continue
+            mine = self.histograms[base + i]
+            if mine is None:
+                self.histograms[base + i] = array("q", hist)
+            else:
+                for j, n in enumerate(hist):
+                    mine[j] += n
+        if other.watermark is not None and (
+            self.watermark is None or other.watermark > self.watermark
+        ):
+            self.watermark = other.watermark
+        self.late += other.late
+        self.out_of_range += other.out_of_range
+
+    def _bucket(self, offset: int) -> TimeBucket:
+        count = self.requests[offset]
+        hist = self.histograms[offset]
+        quantiles = {
+            q: (_quantile(hist, count, q) if count else 0.0) for q in self.quantiles
+        }
+        start = datetime.fromtimestamp(
+            (self.origin + offset) * self.resolution, self.tz
+        )
+        return TimeBucket(
+            start, count, self.errors[offset], self.bytes[offset], quantiles
+        )
+
+    def buckets(self, include_empty: bool = True) -> Iterator[TimeBucket]:
+        """Genera los buckets en orden, incluidos los vacíos entre medias."""
+        for offset in range(len(self.requests)):
+            if include_empty or self.requests[offset]:
+                yield self._bucket(offset)
+
+    def drain(self) -> List[TimeBucket]:
+        """
+        Retorna y libera los buckets cerrados: los anteriores a la marca de
+        agua menos lateness (sin lateness, todos menos el último).
+        """
+        if self.origin is None:
+            return []
+        late_limit = (
+            0 if self.lateness is None else int(self.lateness // self.resolution)
+        )
+        closed = max(
+            0, min(len(self.requests), self.watermark - late_limit - self.origin)
+        )
+        drained = [self._bucket(offset) for offset in range(closed)]
+        for column in (self.requests, self.errors, self.bytes):
+            del column[:closed]
+        del self.histograms[:closed]
+        self.origin += closed
+        return drained
@@ -0,0 +1,235 @@
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Pattern, Sequence, Tuple
+
+# User agents distintos que se recuerdan ya clasificados
+CACHE_SIZE = 16_384
+
+DEVICE_BOT = "bot"
+DEVICE_MOBILE = "mobile"
+DEVICE_TABLET = "tablet"
+DEVICE_DESKTOP = "desktop"
+DEVICE_OTHER = "other"
+
+UNKNOWN = "Desconocido"
+OTHER = "Otro"
+
+# (nombre, regex) de bots conocidos; se combinan en una única regex. Los
+# genéricos van al final: a igual posición gana el primero de la lista
+BOTS: Tuple[Tuple[str, str], ...] = (
+    (
+        "Googlebot",
+        r"googlebot|google-inspectiontool|adsbot-google|mediapartners-google",
+    ),
+    ("Bingbot", r"bingbot|bingpreview|msnbot"),
+    ("YandexBot", r"yandex(?:bot|images|metrika)"),
+    ("Baiduspider", r"baiduspider"),
+    ("DuckDuckBot", r"duckduckbot"),
+    ("Applebot", r"applebot"),
+    ("Facebook", r"facebookexternalhit|facebookcatalog|meta-externalagent"),
+    ("Twitterbot", r"twitterbot"),
+    ("Slackbot", r"slackbot|slack-imgproxy"),
+    ("AhrefsBot", r"ahrefsbot"),
+    ("SemrushBot", r"semrushbot"),
+    ("GPTBot", r"gptbot|chatgpt-user|oai-searchbot"),
+    ("ClaudeBot", r"claudebot|claude-web|anthropic-ai"),
+    (
+        "Monitor",
+        r"uptimerobot|pingdom|statuscake|kube-probe|elb-healthchecker|prometheus/",
+    ),
+    ("Webhook", r"github-hookshot|bitbucket-webhooks"),
+    ("Scanner", r"sqlmap|nikto|nmap|masscan|zgrab|nuclei|wpscan|gobuster|\bscanner\b"),
+    ("Headless", r"headlesschrome|phantomjs|puppeteer|playwright"),
+    ("curl", r"\bcurl/"),
+    ("Wget", r"\bwget/"),
+    ("Python", r"python-requests|python-urllib|aiohttp|httpx|scrapy"),
+    ("Go", r"go-http-client"),
+    ("Node", r"axios/|node-fetch|undici"),
+    ("Java", r"^java/|apache-httpclient|okhttp"),
+    (OTHER, r"bot\b|bot/|crawler|spider|crawl|scraper|slurp|archiver|fetcher"),
+)
+
+# Navegadores y sistemas en orden de prioridad: muchos UAs se hacen pasar
+# por otros (Edge dice "Chrome" y "Safari", Chrome dice "Safari"...)
+BROWSERS: Tuple[Tuple[str, str], ...] = (
+    ("Edge", r"Edg(?:e|A|iOS)?/"),
+    ("Opera", r"OPR/|Opera"),
+    ("Samsung Internet", r"SamsungBrowser/"),
+    ("Yandex Browser", r"YaBrowser/"),
+    ("Firefox", r"Firefox/|FxiOS/"),
+    ("Chrome", r"Chrome/|CriOS/"),
+    ("Safari", r"Version/[\d.]+.*Safari/"),
+    ("Internet Explorer", r"MSIE |Trident/"),
+)
+OPERATING_SYSTEMS: Tuple[Tuple[str, str], ...] = (
+    ("iOS", r"iPhone|iPad|iPod"),
+    ("Android", r"Android"),
+    ("ChromeOS", r"CrOS"),
+    ("Windows", r"Windows"),
+    ("macOS", r"Mac OS X|Macintosh"),
+    ("Linux", r"Linux|X11"),
+)
+DESKTOP_OS = frozenset({"ChromeOS", "Windows", "macOS", "Linux"})
+
+_TABLET = re.compile(r"iPad|Tablet")
+_MOBILE = re.compile(r"Mobi|iPhone|iPod|Android")
+
+
+def _compile(rules: Sequence[Tuple[str, str]]) -> List[Tuple[str, Pattern]]:
+    return [(name, re.compile(pattern)) for name, pattern in rules]
+
+
+_BROWSER_PATTERNS = _compile(BROWSERS)
+_OS_PATTERNS = _compile(OPERATING_SYSTEMS)
+
+
+def _first(patterns: List[Tuple[str, Pattern]], ua: str) -> str:
+    for name, pattern in patterns:
+        if pattern.search(ua):
+            return name
+    return OTHER
+
+
+@dataclass(frozen=True)
+class UserAgent:
+    """Clasificación de un user agent: navegador, sistema, dispositivo y bot."""
+
+    browser: str
+    os: str
+    device: str
+    bot: Optional[str] = None
+
+    @property
+    def is_bot(self) -> bool:
+        """Retorna True si el user agent es de un bot o cliente automático."""
+        return self.bot is not None
+
+
+UNKNOWN_AGENT = UserAgent(UNKNOWN, UNKNOWN, DEVICE_OTHER)
+
+
+@dataclass
+class UserAgentBreakdown:
+    """Requests por navegador, sistema, dispositivo y bot."""
+
+    total: int = 0
+    browsers: Counter = field(default_factory=Counter)
+    operating_systems: Counter = field(default_factory=Counter)
+    devices: Counter = field(default_factory=Counter)
+    bots: Counter = field(default_factory=Counter)
+
+    @property
+    def bot_requests(self) -> int:
+        """Retorna las requests de bots"""
+        return sum(self.bots.values())
+
+    @property
+    def bot_share(self) -> float:
+        """Retorna el ratio de requests de bots"""
+        return self.bot_requests / self.total if self.total else 0.0
+
+    def top_browsers(self, n: Optional[int] = 10) -> List[Tuple[str, int]]:
+        """Retorna top N navegadores (sin contar los bots)."""
+        return self.browsers.most_common(n)
+
+    def top_bots(self, n: Optional[int] = 10) -> List[Tuple[str, int]]:
+        """Retorna top N bots."""
+        return self.bots.most_common(n)
+
+    def get_summary(self) -> Dict:
+        """Retorna el desglose como dict serializable."""
+        return {
+            "total_requests": self.total,
+            "bot_requests": self.bot_requests,
+            "bot_share": self.bot_share,
+            "devices": dict(self.devices.most_common()),
+            "browsers": dict(self.browsers.most_common()),
+            "operating_systems": dict(self.operating_systems.most_common()),
+            "bots": dict(self.bots.most_common()),
+        }
+
+
+class UserAgentClassifier:
+    """
+    Clasifica user agents en navegador, sistema operativo, dispositivo
+    (bot, mobile, tablet, desktop) y nombre de bot.
+
+    Los bots se detectan con una única regex combinada (un grupo con nombre
+    por bot, como SignatureMatcher), que recorre el UA una sola vez; el
+    navegador y el sistema, con listas cortas de regex por prioridad. Como
+    un log tiene pocos user agents distintos, el resultado se memoriza en
+    una caché LRU acotada por UA en bruto y clasificar una request repetida
+    cuesta una búsqueda en un dict.
+    """
+
+    def __init__(
+        self, bots: Sequence[Tuple[str, str]] = BOTS, cache_size: int = CACHE_SIZE
+    ) -> None:
+        self.bot_names = {f"b{i}": name for i, (name, _) in enumerate(bots)}
+        self.bot_regex = re.compile(
+            "|".join(f"(?P<b{i}>{pattern})" for i, (_, pattern) in enumerate(bots)),
+            re.IGNORECASE,
+        )
+        self.cache_size = cache_size
+        self._cached = lru_cache(maxsize=cache_size)(self._classify)
+
+    def __getstate__(self) -> Dict:
+        # La caché no viaja a los workers
+        state = self.__dict__.copy()
+        del state["_cached"]
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._cached = lru_cache(maxsize=self.cache_size)(self._classify)
+
+    def _classify(self, ua: Optional[str]) -> UserAgent:
+        if not ua or ua == "-":
+            return UNKNOWN_AGENT
+        os = _first(_OS_PATTERNS, ua)
+        m = self.bot_regex.search(ua)
+        if m is not None:
+            return UserAgent(OTHER, os, DEVICE_BOT, self.bot_names[m.lastgroup])
+        if _TABLET.search(ua) or (os == "Android" and "Mobile" not in ua):
+            device = DEVICE_TABLET
+        elif _MOBILE.search(ua):
+            device = DEVICE_MOBILE
+        elif os in DESKTOP_OS:
+            device = DEVICE_DESKTOP
+        else:
+            device = DEVICE_OTHER
+        return UserAgent(_first(_BROWSER_PATTERNS, ua), os, device)
+
+    def classify(self, ua: Optional[str]) -> UserAgent:
+        """Retorna la clasificación de ua (UNKNOWN_AGENT si falta)."""
+        return self._cached(ua)
+
+    def is_bot(self, ua: Optional[str]) -> bool:
+        """Retorna True si ua es de un bot."""
+        return self._cached(ua).bot is not None
+
+    def cache_info(self):
+        """Retorna aciertos, fallos y tamaño de la caché (como functools.lru_cache)."""
+        return self._cached.cache_info()
+
+    def breakdown(
+        self, ua_counts: Iterable[Tuple[Optional[str], int]]
+    ) -> UserAgentBreakdown:
+        """
+        Retorna el desglose de cuentas (ua, n), p. ej. de
+        LogAggregate.user_agent_counts: cada UA distinto se clasifica una vez.
+        """
+        result = UserAgentBreakdown()
+        classify = self._cached
+        for ua, n in ua_counts:
+            agent = classify(ua)
+            result.total += n
+            result.devices[agent.device] += n
+            result.operating_systems[agent.os] += n
+            if agent.bot is not None:
+                result.bots[agent.bot] += n
+            else:
+                result.browsers[agent.browser] += n
+        return result
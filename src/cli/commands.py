@@ -0,0 +1,1220 @@
+"""
+CLI de logparse.
+
+Arrancar debe ser barato: `logparse --help` o un análisis de un archivo
+pequeño no deberían pagar la importación de rich, asyncio, pyarrow ni de
+formatters que no se usan. Por eso este módulo solo importa click a nivel
+de módulo; parsers, formatters y demás se importan dentro de cada comando.
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Iterable, List, Tuple
+
+import click
+
+if TYPE_CHECKING:
+    from ..analyzers.timeseries import TimeSeriesAggregator
+    from ..parsers.base_parser import BaseParser
+    from ..parsers.parse_stats import ParseStats
+
+# Formato -> "módulo.Clase" dentro de src.parsers
+PARSERS = {"nginx": "nginx_parser.NginxParser", "json": "json_parser.JsonLinesParser"}
+
+
+def load_class(package: str, dotted: str):
+    """Importa y retorna la clase "módulo.Clase" del subpaquete package de src."""
+    module_name, class_name = dotted.rsplit(".", 1)
+    # Equivale a `from ..package.module import Clase`; con __import__ (y no
+    # importlib) el import aparece en `python -X importtime`
+    module = __import__(
+        f"{package}.{module_name}", globals(), fromlist=[class_name], level=2
+    )
+    return getattr(module, class_name)
+
+
+@click.group()
+@click.option(
+    "--profile",
+    "show_profile",
+    is_flag=True,
+    help="Muestra el tiempo por etapa del pipeline.",
+)
+@click.option(
+    "--profile-output",
+    type=click.Path(dir_okay=False),
+    help="Guarda un perfil cProfile (pstats) en este archivo.",
+)
+@click.option(
+    "--profile-collapsed",
+    type=click.Path(dir_okay=False),
+    help="Guarda las etapas en formato collapsed stacks (flamegraph).",
+)
+@click.pass_context
+def cli(ctx, show_profile, profile_output, profile_collapsed) -> None:
+    """Analizador de logs nginx y apache."""
+    if show_profile or profile_output or profile_collapsed:
+        from .. import profiling
+
+        profiler = ctx.with_resource(
+            profiling.profile(profile_output, profile_collapsed)
+        )
+        if show_profile:
+            ctx.call_on_close(lambda: click.echo(profiler.format_report(), err=True))
+
+
+DATE_FORMATS = ["%Y-%m-%d", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S"]
+
+REPORT_FORMATTERS = {
+    "table": "table_formatter.TableFormatter",
+    "json": "json_formatter.JSONFormatter",
+    "csv": "csv_formatter.CSVFormatter",
+    "markdown": "markdown_formatter.MarkdownFormatter",
+}
+
+
+@cli.command()
+@click.argument(
+    "files", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False)
+)
+@click.option("--top-ips", default=10, show_default=True, help="IPs en el top de IPs.")
+@click.option(
+    "--top-paths", default=10, show_default=True, help="Paths en el top de paths."
+)
+@click.option(
+    "--errors-only", is_flag=True, help="Analiza solo las requests con error."
+)
+@click.option(
+    "--status",
+    "status_spec",
+    help='Analiza solo estos códigos: "404", "5xx" o listas como "4xx,500".',
+)
+@click.option(
+    "--start",
+    type=click.DateTime(DATE_FORMATS),
+    help="Incluye requests desde esta fecha (inclusive).",
+)
+@click.option(
+    "--end",
+    type=click.DateTime(DATE_FORMATS),
+    help="Incluye requests hasta esta fecha; una fecha sin hora incluye el día entero.",
+)
+@click.option(
+    "--ip",
+    "ip_specs",
+    multiple=True,
+    metavar="CIDR",
+    help='Analiza solo estas IPs o prefijos ("10.1.0.0/16", "2001:db8::/32"); se puede repetir.',
+)
+@click.option(
+    "--ip-file",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Archivo con un prefijo CIDR por línea (p. ej. rangos de un proveedor cloud).",
+)
+@click.option(
+    "--group-paths",
+    is_flag=True,
+    help="Agrupa los paths por plantilla: /api/users/123 -> /api/users/{id}.",
+)
+@click.option(
+    "--path-rule",
+    "path_rules",
+    multiple=True,
+    metavar="PATRÓN=PLANTILLA",
+    help="Regla extra de agrupación (regex sobre el path); se puede repetir.",
+)
+@click.option(
+    "--path",
+    "path_template",
+    help='Analiza solo las requests con esta plantilla, p. ej. "/api/users/{id}".',
+)
+@click.option(
+    "--output",
+    "output_format",
+    type=click.Choice(list(REPORT_FORMATTERS)),
+    default="table",
+    show_default=True,
+    help="Formato del informe.",
+)
+@click.option(
+    "--output-file",
+    type=click.Path(dir_okay=False),
+    help="Archivo del informe (.gz, .bz2 y .xz se comprimen); por defecto stdout.",
+)
+@click.option(
+    "--workers",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Procesos de parseo en paralelo.",
+)
+@click.option(
+    "--progress/--no-progress",
+    default=None,
+    help="Barra de progreso por bytes leídos (por defecto, si stderr es una terminal).",
+)
+def analyze(
+    files,
+    top_ips,
+    top_paths,
+    errors_only,
+    status_spec,
+    start,
+    end,
+    ip_specs,
+    ip_file,
+    group_paths,
+    path_rules,
+    path_template,
+    output_format,
+    output_file,
+    workers,
+    progress,
+) -> None:
+    """Analiza los logs y genera un informe, sin cargar las entradas en memoria."""
+    from ..analyzers.filters import parse_status_spec
+    from ..analyzers.ip_ranges import CidrTable, read_networks
+    from ..analyzers.path_normalizer import PathNormalizer, parse_rule
+    from ..analyzers.pipeline import EntryFilter, run_pipeline
+    from ..formatters.output import open_output
+    from ..parsers.parse_stats import ParseStats
+
+    statuses = None
+    if status_spec:
+        try:
+            statuses = parse_status_spec(status_spec)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="--status")
+    if end is not None and end.time() == datetime.min.time():
+        end += timedelta(days=1)
+    try:
+        rules = [parse_rule(rule) for rule in path_rules]
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--path-rule")
+    normalizer = None
+    if group_paths or rules or path_template:
+        normalizer = PathNormalizer(rules)
+    networks = None
+    if ip_specs or ip_file:
+        try:
+            specs = [spec.strip() for spec in ip_specs]
+            if ip_file:
+                specs.extend(read_networks(ip_file))
+            networks = CidrTable(specs)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="--ip/--ip-file")
+    entry_filter = EntryFilter(
+        errors_only, start, end, statuses, path_template, normalizer, networks
+    )
+    if not (group_paths or rules):
+        normalizer = None
+
+    jobs = resolve_jobs(files)
+
+    parse_stats = ParseStats()
+    if progress is None:
+        progress = sys.stderr.isatty()
+    if progress:
+        total_bytes = sum(os.path.getsize(file) for file, _ in jobs)
+        aggregate = run_with_progress(
+            total_bytes,
+            run_pipeline,
+            jobs,
+            entry_filter,
+            workers,
+            parse_stats,
+            normalizer=normalizer,
+        )
+    else:
+        aggregate = run_pipeline(
+            jobs, entry_filter, workers, parse_stats, normalizer=normalizer
+        )
+
+    formatter = load_class("formatters", REPORT_FORMATTERS[output_format])()
+    if output_file:
+        with open_output(output_file) as fp:
+            formatter.write_report(aggregate, fp, top_ips, top_paths)
+    else:
+        formatter.write_report(aggregate, sys.stdout, top_ips, top_paths)
+        if output_format == "json":
+            sys.stdout.write("\n")
+
+    click.echo(
+        f"{aggregate.total_requests} requests analizadas de"
+        f" {parse_stats.lines_parsed} entradas ({parse_stats.lines_rejected}"
+        f" líneas rechazadas, {parse_stats.lines_per_second:,.0f} líneas/s)",
+        err=True,
+    )
+
+
+@cli.command()
+@click.argument(
+    "files", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False)
+)
+@click.option(
+    "--sample", default=5, show_default=True, help="Líneas rechazadas a mostrar."
+)
+def stats(files, sample) -> None:
+    """Muestra estadísticas de parseo: líneas leídas, parseadas y descartadas."""
+    from ..parsers.parse_stats import ParseStats
+
+    parse_stats = ParseStats(sample_size=sample)
+    for file, parser in resolve_jobs(files):
+        for _ in parser.parse_file(file, parse_stats):
+            pass
+
+    click.echo(format_parse_stats(parse_stats))
+
+
+@cli.command()
+@click.argument("files", nargs=-1, required=True, type=click.Path(dir_okay=False))
+@click.option(
+    "--host", default="127.0.0.1", show_default=True, help="Dirección de escucha."
+)
+@click.option(
+    "--port", default=9877, show_default=True, help="Puerto HTTP de /metrics."
+)
+@click.option(
+    "--format",
+    "log_format",
+    type=click.Choice(["auto", *PARSERS]),
+    default="auto",
+    show_default=True,
+    help="Formato de los logs.",
+)
+@click.option("--top-k", default=20, show_default=True, help="Rutas e IPs en el top-K.")
+@click.option(
+    "--max-labels",
+    default=50,
+    show_default=True,
+    help="Máximo de series por etiqueta (status, method).",
+)
+@click.option(
+    "--poll-interval", default=1.0, show_default=True, help="Segundos entre lecturas."
+)
+@click.option(
+    "--from-start", is_flag=True, help="Procesa también el contenido ya existente."
+)
+def serve(
+    files, host, port, log_format, top_k, max_labels, poll_interval, from_start
+) -> None:
+    """Sigue los logs y expone métricas Prometheus en /metrics."""
+    from .metrics_server import MetricsServer
+
+    server = MetricsServer(
+        files,
+        [resolve_parser(file, log_format) for file in files],
+        host=host,
+        port=port,
+        top_k=top_k,
+        max_labels=max_labels,
+        poll_interval=poll_interval,
+        from_start=from_start,
+    )
+    bound_host, bound_port = server.address[:2]
+    click.echo(
+        f"Sirviendo métricas en http://{bound_host}:{bound_port}/metrics", err=True
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+
+@cli.command()
+@click.argument(
+    "files", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False)
+)
+@click.option(
+    "--status",
+    "status_spec",
+    help='Códigos a exportar: "404", "5xx" o listas como "4xx,500".',
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["jsonl", "csv", "parquet", "arrow"]),
+    default="jsonl",
+    show_default=True,
+    help="Formato de salida (parquet y arrow necesitan pyarrow y --output-file).",
+)
+@click.option(
+    "--output-file",
+    type=click.Path(dir_okay=False),
+    help="Archivo de salida (.gz, .bz2 y .xz se comprimen); por defecto stdout.",
+)
+def export(files, status_spec, output_format, output_file) -> None:
+    """Exporta las entradas que cumplen los filtros, una fila por request."""
+    from ..analyzers.filters import filter_status, parse_status_spec
+    from ..formatters.entry_exporter import EntryExporter
+    from ..formatters.output import open_output
+    from ..parsers.parse_stats import ParseStats
+
+    statuses = None
+    if status_spec:
+        try:
+            statuses = parse_status_spec(status_spec)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="--status")
+
+    parse_stats = ParseStats()
+
+    def entries():
+        for file, parser in resolve_jobs(files):
+            yield from parser.parse_file(file, parse_stats)
+
+    rows = entries()
+    if statuses is not None:
+        rows = filter_status(rows, statuses)
+
+    if output_format in ("parquet", "arrow"):
+        if not output_file:
+            raise click.UsageError(f"--format {output_format} necesita --output-file")
+        from ..formatters.parquet_formatter import ParquetFormatter
+
+        try:
+            columnar = ParquetFormatter()
+        except ImportError as e:
+            raise click.ClickException(str(e))
+        if output_format == "parquet":
+            written = columnar.write_parquet(rows, output_file)
+        else:
+            written = columnar.write_arrow(rows, output_file)
+    else:
+        exporter = EntryExporter()
+        write = exporter.write_csv if output_format == "csv" else exporter.write_jsonl
+        if output_file:
+            with open_output(output_file) as fp:
+                written = write(rows, fp)
+        else:
+            written = write(rows, sys.stdout)
+
+    click.echo(
+        f"Filas exportadas: {written} de {parse_stats.lines_parsed} entradas", err=True
+    )
+
+
+@cli.command()
+@click.argument(
+    "files", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False)
+)
+@click.option(
+    "--rate-window",
+    default=60,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Ventana (segundos) para contar requests por IP.",
+)
+@click.option(
+    "--rate-threshold",
+    default=600,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Requests de una IP en una ventana a partir de las que hay pico.",
+)
+@click.option(
+    "--max-findings",
+    default=20,
+    show_default=True,
+    help="Hallazgos a mostrar (el resto solo se cuenta).",
+)
+@click.option(
+    "--output",
+    "output_format",
+    type=click.Choice(["text", "json"]),
+    default="text",
+    show_default=True,
+    help="Formato del informe.",
+)
+@click.option(
+    "--workers",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Procesos de parseo en paralelo.",
+)
+def detect(
+    files, rate_window, rate_threshold, max_findings, output_format, workers
+) -> None:
+    """Detecta patrones de ataque (SQLi, traversal, scanners...) y picos por IP."""
+    from ..analyzers.pipeline import EntryFilter, run_pipeline
+    from ..analyzers.threat_detector import ThreatDetector
+    from ..parsers.parse_stats import ParseStats
+
+    jobs = resolve_jobs(files)
+
+    detector = ThreatDetector(
+        rate_window=rate_window,
+        rate_threshold=rate_threshold,
+        max_findings=max_findings,
+    )
+    parse_stats = ParseStats()
+    aggregate = run_pipeline(
+        jobs, EntryFilter(), workers, parse_stats, detector=detector
+    )
+
+    if output_format == "json":
+        import json
+
+        report = detector.summary()
+        report["findings"] = [
+            {**vars(f), "timestamp": f.timestamp.isoformat()} for f in detector.findings
+        ]
+        click.echo(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        click.echo(format_findings(detector))
+    click.echo(
+        f"{aggregate.total_requests} requests revisadas de {len(jobs)} archivos",
+        err=True,
+    )
+
+
+@cli.command()
+@click.argument("files", nargs=-1, required=True, type=click.Path(dir_okay=False))
+@click.option(
+    "--path",
+    "path",
+    default="/api/login",
+    show_default=True,
+    help='Path a vigilar (sin query string); si termina en "/", como prefijo.',
+)
+@click.option(
+    "--status",
+    "status_spec",
+    default="401,403",
+    show_default=True,
+    help='Códigos que cuentan: "401,403", "4xx"...',
+)
+@click.option(
+    "--window",
+    default=60,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Ventana deslizante en segundos.",
+)
+@click.option(
+    "--threshold",
+    default=10,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Requests de una IP en la ventana a partir de las que se alerta.",
+)
+@click.option(
+    "--max-keys",
+    default=1_000_000,
+    show_default=True,
+    help="Máximo de IPs seguidas a la vez.",
+)
+@click.option(
+    "--format",
+    "log_format",
+    type=click.Choice(["auto", *PARSERS]),
+    default="auto",
+    show_default=True,
+    help="Formato de los logs.",
+)
+@click.option(
+    "--follow/--no-follow",
+    default=True,
+    show_default=True,
+    help="Sigue los logs como tail -F, o los lee una vez y termina.",
+)
+@click.option(
+    "--poll-interval", default=1.0, show_default=True, help="Segundos entre lecturas."
+)
+@click.option(
+    "--from-start", is_flag=True, help="Al seguir, procesa también lo ya existente."
+)
+def watch(
+    files,
+    path,
+    status_spec,
+    window,
+    threshold,
+    max_keys,
+    log_format,
+    follow,
+    poll_interval,
+    from_start,
+) -> None:
+    """Alerta de las IPs que superan un ritmo de requests (p. ej. fuerza bruta)."""
+    from ..analyzers.filters import parse_status_spec
+    from ..analyzers.rate_tracker import RateRule, RateTracker
+    from ..parsers.base_parser import read_blocks
+    from ..parsers.parse_stats import ParseStats
+
+    try:
+        statuses = parse_status_spec(status_spec) if status_spec else None
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--status")
+    rule = RateRule(path or None, statuses)
+    tracker = RateTracker(window, threshold, max_keys=max_keys)
+    parse_stats = ParseStats()
+
+    def consume(parser, block) -> None:
+        alerts = tracker.observe(parser.parse_block(block, parse_stats), rule)
+        for alert in alerts:
+            click.echo(
+                f"ALERTA {alert.key}: {alert.count} requests en {window}s"
+                f" ({alert.timestamp})"
+            )
+
+    jobs = [(file, resolve_parser(file, log_format)) for file in files]
+    if follow:
+        follow_files(jobs, consume, poll_interval, from_start)
+        return
+    for file, parser in jobs:
+        for block in read_blocks(file, parser.BLOCK_SIZE):
+            consume(parser, block)
+    offenders = tracker.offenders()
+    click.echo(f"IPs por encima del umbral al final: {len(offenders)}")
+    for ip, count in offenders:
+        click.echo(f"  {ip}: {count}")
+
+
+@cli.command()
+@click.argument(
+    "files", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False)
+)
+@click.option(
+    "--gap",
+    default=30,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Minutos de inactividad que cierran una sesión.",
+)
+@click.option(
+    "--output",
+    "output_format",
+    type=click.Choice(["text", "json"]),
+    default="text",
+    show_default=True,
+    help="Formato del informe.",
+)
+def sessions(files, gap, output_format) -> None:
+    """
+    Agrupa las requests en sesiones (IP + user agent) y resume duración y
+    páginas por sesión. Los archivos se leen en el orden dado, como un único
+    flujo (p. ej. access.log.1 access.log).
+    """
+    from ..analyzers.sessionizer import Sessionizer, SessionSummary
+    from ..parsers.parse_stats import ParseStats
+
+    parse_stats = ParseStats()
+
+    def entries():
+        for file, parser in resolve_jobs(files):
+            yield from parser.parse_file(file, parse_stats)
+
+    summary = SessionSummary()
+    summary.consume(Sessionizer(gap=gap * 60).sessions(entries()))
+
+    if output_format == "json":
+        import json
+
+        report = {
+            **summary.get_summary(),
+            "by_duration": summary.duration_histogram(),
+            "by_pages": summary.pages_histogram(),
+        }
+        click.echo(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        click.echo(format_sessions(summary))
+
+
+@cli.command()
+@click.argument(
+    "files", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False)
+)
+@click.option(
+    "--resolution",
+    default="1m",
+    show_default=True,
+    help='Ancho de cada intervalo: "1s", "10s", "1m", "1h"...',
+)
+@click.option(
+    "--output",
+    "output_format",
+    type=click.Choice(["table", "csv", "json"]),
+    default="table",
+    show_default=True,
+    help="Formato de la serie.",
+)
+@click.option("--skip-empty", is_flag=True, help="Omite los intervalos sin requests.")
+def timeline(files, resolution, output_format, skip_empty) -> None:
+    """Serie temporal de requests, errores, bytes y cuantiles de tamaño."""
+    from ..analyzers.timeseries import TimeSeriesAggregator, parse_resolution
+
+    try:
+        seconds = parse_resolution(resolution)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--resolution")
+
+    series = TimeSeriesAggregator(seconds)
+    for file, parser in resolve_jobs(files):
+        series.consume(parser.parse_file(file))
+    warn_out_of_range(series)
+
+    header = ["start", "requests", "errors", "bytes"] + [
+        f"p{q * 100:g}" for q in series.quantiles
+    ]
+    rows = (
+        [b.start.isoformat(), b.requests, b.errors, b.bytes]
+        + [round(v) for v in b.size_quantiles.values()]
+        for b in series.buckets(include_empty=not skip_empty)
+    )
+    if output_format == "json":
+        import json
+
+        click.echo(json.dumps([dict(zip(header, row)) for row in rows], indent=2))
+    elif output_format == "csv":
+        import csv
+
+        writer = csv.writer(sys.stdout)
+        writer.writerow(header)
+        writer.writerows(rows)
+    else:
+        from ..formatters.table_formatter import TableFormatter
+
+        columns = [
+            (name, "left" if i == 0 else "right") for i, name in enumerate(header)
+        ]
+        TableFormatter().write_rows(
+            f"Requests cada {resolution}", columns, rows, sys.stdout
+        )
+
+
+@cli.command()
+@click.argument("files", nargs=-1, required=True, type=click.Path(dir_okay=False))
+@click.option(
+    "--resolution",
+    default="1m",
+    show_default=True,
+    help='Ancho de cada intervalo: "10s", "1m", "5m"...',
+)
+@click.option(
+    "--threshold",
+    default=3.0,
+    show_default=True,
+    type=click.FloatRange(min=0, min_open=True),
+    help="Z-score a partir del que un intervalo es un pico.",
+)
+@click.option(
+    "--alpha",
+    default=0.1,
+    show_default=True,
+    type=click.FloatRange(0, 1, min_open=True),
+    help="Peso de cada intervalo en la línea base EWMA.",
+)
+@click.option(
+    "--warmup",
+    default=10,
+    show_default=True,
+    help="Intervalos que solo entrenan la línea base.",
+)
+@click.option(
+    "--min-requests",
+    default=20,
+    show_default=True,
+    help="Requests mínimas de un intervalo para evaluar su tasa de error.",
+)
+@click.option(
+    "--format",
+    "log_format",
+    type=click.Choice(["auto", *PARSERS]),
+    default="auto",
+    show_default=True,
+    help="Formato de los logs.",
+)
+@click.option(
+    "--follow", is_flag=True, help="Sigue los logs y avisa al cerrarse cada intervalo."
+)
+@click.option(
+    "--lateness",
+    default=60,
+    show_default=True,
+    help="Al seguir, segundos que se esperan entradas desordenadas.",
+)
+@click.option(
+    "--poll-interval", default=1.0, show_default=True, help="Segundos entre lecturas."
+)
+@click.option(
+    "--from-start", is_flag=True, help="Al seguir, procesa también lo ya existente."
+)
+def spikes(
+    files,
+    resolution,
+    threshold,
+    alpha,
+    warmup,
+    min_requests,
+    log_format,
+    follow,
+    lateness,
+    poll_interval,
+    from_start,
+) -> None:
+    """Detecta picos de tráfico y de tasa de error (EWMA + z-score)."""
+    from ..analyzers.spike_detector import SpikeDetector
+    from ..analyzers.timeseries import TimeSeriesAggregator, parse_resolution
+    from ..parsers.base_parser import read_blocks
+
+    try:
+        seconds = parse_resolution(resolution)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--resolution")
+    detector = SpikeDetector(alpha, threshold, warmup, min_requests)
+    series = TimeSeriesAggregator(seconds, lateness if follow else None)
+
+    def report(buckets) -> None:
+        for spike in detector.detect(buckets):
+            click.echo(format_spike(spike))
+
+    jobs = [(file, resolve_parser(file, log_format)) for file in files]
+    if follow:
+
+        def consume(parser, block) -> None:
+            series.consume(parser.parse_block(block))
+            report(series.drain())
+
+        follow_files(jobs, consume, poll_interval, from_start)
+        return
+    for file, parser in jobs:
+        for block in read_blocks(file, parser.BLOCK_SIZE):
+            series.consume(parser.parse_block(block))
+    warn_out_of_range(series)
+    report(series.buckets())
+
+
+@cli.command()
+@click.argument(
+    "files", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False)
+)
+@click.option(
+    "--db",
+    "db_path",
+    required=True,
+    type=click.Path(exists=True, dir_okay=False),
+    help="Base local: .mmdb de MaxMind o CSV de rangos (network o start_ip/end_ip,"
+    " country, asn, org), que se compila la primera vez en ~/.cache/logparse.",
+)
+@click.option("--top", default=10, show_default=True, help="Países y ASNs a mostrar.")
+@click.option(
+    "--output",
+    "output_format",
+    type=click.Choice(["text", "json"]),
+    default="text",
+    show_default=True,
+    help="Formato del informe.",
+)
+@click.option(
+    "--workers",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Procesos de parseo en paralelo.",
+)
+def geo(files, db_path, top, output_format, workers) -> None:
+    """
+    Top países y sistemas autónomos (ASN) de los clientes, con una base
+    local y sin red. Cada IP distinta se busca una sola vez.
+    """
+    from collections import Counter
+
+    from ..analyzers.geoip import open_database
+    from ..analyzers.pipeline import EntryFilter, run_pipeline
+    from ..parsers.parse_stats import ParseStats
+
+    try:
+        database = open_database(db_path)
+    except (ValueError, ImportError) as e:
+        raise click.BadParameter(str(e), param_hint="--db")
+
+    with database:
+        aggregate = run_pipeline(
+            resolve_jobs(files), EntryFilter(), workers, ParseStats()
+        )
+        ip_counts = aggregate.ip_counts.items()
+        countries = Counter(database.by_country(ip_counts)).most_common(top)
+        asns = Counter(database.by_asn(ip_counts)).most_common(top)
+
+    if output_format == "json":
+        import json
+
+        report = {
+            "top_countries": [{"country": c, "count": n} for c, n in countries],
+            "top_asns": [{"asn": a, "count": n} for a, n in asns],
+        }
+        click.echo(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        click.echo(format_geo(countries, asns))
+    click.echo(
+        f"{aggregate.unique_ips} IPs distintas de {aggregate.total_requests} requests",
+        err=True,
+    )
+
+
+@cli.command()
+@click.argument(
+    "files", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False)
+)
+@click.option(
+    "--top",
+    default=10,
+    show_default=True,
+    help="Navegadores, sistemas y bots a mostrar.",
+)
+@click.option(
+    "--output",
+    "output_format",
+    type=click.Choice(["text", "json"]),
+    default="text",
+    show_default=True,
+    help="Formato del informe.",
+)
+@click.option(
+    "--workers",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Procesos de parseo en paralelo.",
+)
+def agents(files, top, output_format, workers) -> None:
+    """
+    Desglose de las requests por dispositivo (bot, mobile, tablet, desktop),
+    navegador, sistema operativo y bot. Cada user agent distinto se
+    clasifica una sola vez.
+    """
+    from ..analyzers.pipeline import EntryFilter, run_pipeline
+    from ..parsers.parse_stats import ParseStats
+
+    jobs = resolve_jobs(files)
+
+    aggregate = run_pipeline(jobs, EntryFilter(), workers, ParseStats())
+    breakdown = aggregate.user_agents()
+
+    if output_format == "json":
+        import json
+
+        click.echo(json.dumps(breakdown.get_summary(), indent=2, ensure_ascii=False))
+    else:
+        click.echo(format_user_agents(breakdown, top))
+    click.echo(
+        f"{len(aggregate.user_agent_counts)} user agents distintos de"
+        f" {aggregate.total_requests} requests",
+        err=True,
+    )
+
+
+@cli.command()
+@click.argument(
+    "files", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False)
+)
+@click.option(
+    "--by",
+    "keys",
+    required=True,
+    help="Dimensiones separadas por comas: ip, method, path, status, status_class,"
+    " hour, date, user_agent, referrer.",
+)
+@click.option(
+    "--metrics",
+    default="count",
+    show_default=True,
+    help="Métricas separadas por comas: count, bytes_sum, bytes_avg, bytes_min,"
+    " bytes_max, errors, error_rate, pNN_size (p. ej. p95_size).",
+)
+@click.option(
+    "--status",
+    "status_spec",
+    help='Solo estos status: "404", "4xx", "5xx,429"...',
+)
+@click.option("--order-by", help="Métrica por la que ordenar de mayor a menor.")
+@click.option("--top", type=click.IntRange(min=1), help="Filas a mostrar.")
+@click.option(
+    "--max-groups",
+    default=500_000,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Grupos en memoria antes de volcar agregados parciales a disco.",
+)
+@click.option(
+    "--output",
+    "output_format",
+    type=click.Choice(["text", "json", "csv"]),
+    default="text",
+    show_default=True,
+    help="Formato del informe.",
+)
+def group(
+    files, keys, metrics, status_spec, order_by, top, max_groups, output_format
+) -> None:
+    """
+    Agrega las requests por varias dimensiones a la vez, en una sola pasada:
+    p. ej. --by status,method,hour --metrics count,bytes_sum,p95_size.
+    """
+    from ..analyzers.filters import parse_status_spec
+    from ..analyzers.group_by import GroupByAggregator
+    from ..analyzers.pipeline import EntryFilter
+    from ..parsers.parse_stats import ParseStats
+
+    statuses = None
+    if status_spec:
+        try:
+            statuses = parse_status_spec(status_spec)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="--status")
+    key_list = [key.strip() for key in keys.split(",") if key.strip()]
+    metric_list = [metric.strip() for metric in metrics.split(",") if metric.strip()]
+    try:
+        aggregator = GroupByAggregator(key_list, metric_list, max_groups)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--by/--metrics")
+    if order_by is not None and order_by not in aggregator.metrics:
+        raise click.BadParameter(
+            "debe ser una de las métricas de --metrics", param_hint="--order-by"
+        )
+
+    entry_filter = EntryFilter(statuses=statuses)
+    parse_stats = ParseStats()
+    with aggregator:
+        for file, parser in resolve_jobs(files):
+            aggregator.consume(entry_filter.apply(parser.parse_file(file, parse_stats)))
+        rows = aggregator.results(order_by, top)
+        spills = aggregator.spills
+
+    columns = aggregator.keys + aggregator.metrics
+    if output_format == "json":
+        import json
+
+        click.echo(json.dumps(rows, indent=2, ensure_ascii=False))
+    elif output_format == "csv":
+        import csv
+
+        writer = csv.DictWriter(sys.stdout, fieldnames=columns, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+    else:
+        click.echo(format_groups(rows, columns))
+    click.echo(
+        f"{len(rows)} filas de {parse_stats.lines_parsed} entradas"
+        f" ({spills} volcados a disco)",
+        err=True,
+    )
+
+
+def follow_files(
+    jobs, on_block, poll_interval: float = 1.0, from_start: bool = False
+) -> None:
+    """
+    Sigue cada archivo de jobs (pares archivo, parser) en su propio hilo,
+    como tail -F, y llama a on_block(parser, bloque) con cada bloque nuevo,
+    de uno en uno. Vuelve con Ctrl+C.
+    """
+    import threading
+
+    from ..parsers.tail import follow_blocks
+
+    stop = threading.Event()
+    lock = threading.Lock()
+
+    def follow(file, parser) -> None:
+        for block in follow_blocks(file, poll_interval, from_start, stop):
+            with lock:
+                on_block(parser, block)
+
+    threads = [threading.Thread(target=follow, args=job, daemon=True) for job in jobs]
+    for thread in threads:
+        thread.start()
+    click.echo(f"Vigilando {len(jobs)} archivos (Ctrl+C para salir)", err=True)
+    try:
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(poll_interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+
+
+def run_with_progress(total_bytes: int, run_pipeline, *args, **kwargs):
+    """Ejecuta run_pipeline(*args, **kwargs) con una barra de progreso Rich en stderr."""
+    from rich.console import Console
+    from rich.progress import (
+        BarColumn,
+        DownloadColumn,
+        Progress,
+        TimeRemainingColumn,
+        TransferSpeedColumn,
+    )
+
+    with Progress(
+        "[progress.description]{task.description}",
+        BarColumn(),
+        DownloadColumn(),
+        TransferSpeedColumn(),
+        TimeRemainingColumn(),
+        console=Console(stderr=True),
+        transient=True,
+    ) as bar:
+        task = bar.add_task("Analizando", total=total_bytes)
+        return run_pipeline(*args, progress=lambda n: bar.advance(task, n), **kwargs)
+
+
+def warn_out_of_range(series: "TimeSeriesAggregator") -> None:
+    """Avisa por stderr de las requests descartadas por quedar fuera de la serie."""
+    if series.out_of_range:
+        click.echo(
+            f"{series.out_of_range:,} requests descartadas: su timestamp alargaría"
+            f" la serie más de {series.max_buckets:,} intervalos",
+            err=True,
+        )
+
+
+def resolve_jobs(files: Iterable[str]) -> List[Tuple[str, "BaseParser"]]:
+    """
+    Retorna (archivo, parser) de cada archivo con el formato detectado.
+
+    Los archivos con formato no reconocido se avisan por stderr y se omiten.
+    """
+    from ..parsers.format_detector import detect_parser
+
+    jobs = []
+    for file in files:
+        parser = detect_parser(file)
+        if parser is None:
+            click.echo(f"Formato no reconocido: {file}", err=True)
+            continue
+        jobs.append((file, parser))
+    return jobs
+
+
+def resolve_parser(file, log_format: str = "auto") -> "BaseParser":
+    """
+    Retorna el parser para el archivo: el indicado, o el detectado con
+    NginxParser como valor por defecto si el archivo aún no tiene líneas.
+    """
+    from ..parsers.format_detector import detect_parser
+    from ..parsers.nginx_parser import NginxParser
+
+    if log_format != "auto":
+        return load_class("parsers", PARSERS[log_format])()
+    try:
+        return detect_parser(file) or NginxParser()
+    except FileNotFoundError:
+        return NginxParser()
+
+
+def format_parse_stats(parse_stats: "ParseStats") -> str:
+    """Retorna el resumen de ParseStats en texto legible."""
+    lines = [
+        f"Líneas leídas:     {parse_stats.lines_read}",
+        f"Líneas parseadas:  {parse_stats.lines_parsed}",
+        f"Líneas rechazadas: {parse_stats.lines_rejected}"
+        f" ({parse_stats.rejection_rate:.2%})",
+    ]
+    for reason, count in sorted(parse_stats.skipped.items()):
+        lines.append(f"  {reason}: {count}")
+    lines.append(f"Bytes leídos:      {parse_stats.bytes_read}")
+    lines.append(f"Velocidad:         {parse_stats.lines_per_second:,.0f} líneas/s")
+    if parse_stats.rejected_sample:
+        lines.append("Muestra de líneas rechazadas:")
+        for reason, line in parse_stats.rejected_sample:
+            lines.append(f"  [{reason}] {line}")
+    return "\n".join(lines)
+
+
+def format_sessions(summary) -> str:
+    """Retorna el resumen de un SessionSummary en texto legible."""
+    lines = [
+        f"Sesiones:            {summary.sessions}",
+        f"Requests:            {summary.requests}",
+        f"Duración media:      {summary.avg_duration:,.0f} s",
+        f"Duración máxima:     {summary.max_duration:,.0f} s",
+        f"Páginas por sesión:  {summary.avg_pages:.2f}",
+        f"Tasa de rebote:      {summary.bounce_rate:.2%}",
+        "Sesiones por duración:",
+    ]
+    for label, count in summary.duration_histogram().items():
+        lines.append(f"  {label}: {count}")
+    lines.append("Sesiones por páginas vistas:")
+    for label, count in summary.pages_histogram().items():
+        lines.append(f"  {label}: {count}")
+    return "\n".join(lines)
+
+
+def format_geo(countries, asns) -> str:
+    """Retorna los tops de países y ASNs en texto legible."""
+    lines = ["Top países:"]
+    lines.extend(f"  {country}: {count}" for country, count in countries)
+    lines.append("Top ASNs:")
+    lines.extend(f"  {asn}: {count}" for asn, count in asns)
+    return "\n".join(lines)
+
+
+def format_user_agents(breakdown, top: int = 10) -> str:
+    """Retorna el desglose de un UserAgentBreakdown en texto legible."""
+    lines = [
+        f"Requests:         {breakdown.total}",
+        f"Requests de bots: {breakdown.bot_requests} ({breakdown.bot_share:.2%})",
+        "Por dispositivo:",
+    ]
+    lines.extend(f"  {d}: {n}" for d, n in breakdown.devices.most_common())
+    sections = (
+        ("Top navegadores:", breakdown.top_browsers(top)),
+        ("Top sistemas:", breakdown.operating_systems.most_common(top)),
+        ("Top bots:", breakdown.top_bots(top)),
+    )
+    for title, rows in sections:
+        lines.append(title)
+        lines.extend(f"  {name}: {n}" for name, n in rows)
+    return "\n".join(lines)
+
+
+def format_groups(rows, columns) -> str:
+    """Retorna las filas de un group-by como una tabla de texto alineada."""
+
+    def cell(value) -> str:
+        if isinstance(value, float):
+            return f"{value:,.2f}"
+        return "-" if value is None else str(value)
+
+    table = [list(columns)] + [[cell(row[c]) for c in columns] for row in rows]
+    widths = [max(len(line[i]) for line in table) for i in range(len(columns))]
+    return "\n".join(
+        "  ".join(value.ljust(width) for value, width in zip(line, widths)).rstrip()
+        for line in table
+    )
+
+
+def format_spike(spike) -> str:
+    """Retorna un pico en una línea legible."""
+    if spike.metric == "error_rate":
+        values = f"{spike.value:.2%} (base {spike.baseline:.2%})"
+    else:
+        values = f"{spike.value:,.0f} (base {spike.baseline:,.1f})"
+    return f"PICO {spike.metric} {spike.start}: {values}, z={spike.zscore:.1f}"
+
+
+def format_findings(detector) -> str:
+    """Retorna el resumen de un ThreatDetector en texto legible."""
+    summary = detector.summary()
+    lines = [f"Hallazgos: {summary['total_findings']}"]
+    for category, count in summary["by_category"].items():
+        lines.append(f"  {category}: {count}")
+    if summary["top_offenders"]:
+        lines.append("IPs con más hallazgos:")
+        for ip, count in summary["top_offenders"]:
+            lines.append(f"  {ip}: {count}")
+    if detector.findings:
+        lines.append("Muestra de hallazgos:")
+        for f in detector.findings:
+            lines.append(f"  [{f.name}] {f.ip} {f.timestamp} {f.detail}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    cli()
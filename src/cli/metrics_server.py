@@ -0,0 +1,100 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Sequence
+
+from ..analyzers.live_metrics import LiveMetrics
+from ..formatters.prometheus_formatter import CONTENT_TYPE, PrometheusFormatter
+from ..parsers.base_parser import BaseParser
+from ..parsers.parse_stats import ParseStats
+from ..parsers.tail import follow_blocks
+
+
+class MetricsServer:
+    """
+    Sigue uno o varios logs y publica sus métricas en /metrics.
+
+    Cada archivo se sigue en su propio hilo; las métricas se actualizan por
+    bloque bajo un lock, y /metrics solo recorre las series existentes.
+    """
+
+    def __init__(
+        self,
+        files: Sequence[str],
+        parsers: Sequence[BaseParser],
+        host: str = "127.0.0.1",
+        port: int = 9877,
+        top_k: int = 20,
+        max_labels: int = 50,
+        poll_interval: float = 1.0,
+        from_start: bool = False,
+    ) -> None:
+        self.files = list(files)
+        self.parsers = list(parsers)
+        self.metrics = LiveMetrics(top_k=top_k, max_labels=max_labels)
+        self.stats = ParseStats()
+        self.formatter = PrometheusFormatter()
+        self.poll_interval = poll_interval
+        self.from_start = from_start
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.threads: List[threading.Thread] = []
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+
+    @property
+    def address(self):
+        """Retorna (host, puerto) en el que escucha el servidor."""
+        return self.httpd.server_address
+
+    def render(self) -> str:
+        """Retorna el texto de /metrics."""
+        with self.lock:
+            return self.formatter.format_metrics(self.metrics, self.stats)
+
+    def _follow(self, file: str, parser: BaseParser) -> None:
+        for block in follow_blocks(
+            file, self.poll_interval, self.from_start, self.stop_event
+        ):
+            with self.lock:
+                self.metrics.update_many(parser.parse_block(block, self.stats))
+
+    def _make_handler(self):
+        server = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = server.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args) -> None:
+                pass
+
+        return MetricsHandler
+
+    def start(self) -> None:
+        """Arranca los hilos de seguimiento (no bloquea)."""
+        for file, parser in zip(self.files, self.parsers):
+            thread = threading.Thread(
+                target=self._follow, args=(file, parser), daemon=True
+            )
+            thread.start()
+            self.threads.append(thread)
+
+    def serve_forever(self) -> None:
+        """Arranca el seguimiento y atiende peticiones hasta shutdown()."""
+        self.start()
+        self.httpd.serve_forever()
+
+    def shutdown(self, timeout: Optional[float] = 5.0) -> None:
+        """Detiene el servidor HTTP y los hilos de seguimiento."""
+        self.stop_event.set()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        for thread in self.threads:
+            thread.join(timeout)
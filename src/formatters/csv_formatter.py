@@ -1,7 +1,12 @@
-from typing import Dict, List, Tuple
+from typing import Dict, IO, Iterable, List, Optional, Tuple
 from io import StringIO
 import csv
 
+from .. import profiling
+from ..analyzers.aggregate import LogAggregate
+
+
+@profiling.instrument("format")
 class CSVFormatter:
 
     # def format_summary(self, summary: str, indent: Optional[int] = None) -> str:
@@ -10,28 +15,62 @@ class CSVFormatter:
     #     writer = csv.writer(out)
     #     writer.writerow(["IP", "Count"])
     #     writer.writerows()
-        # return json.dumps(summary, indent=indent)
+    # return json.dumps(summary, indent=indent)
 
     def format_top_ips(self, top_ips: List[Tuple[str, int]]) -> str:
         """Retorna un CSV con las IP - count top"""
         out = StringIO()
-        writer = csv.writer(out)
-        writer.writerow(["IP", "Count"])
-        writer.writerows(top_ips)
+        self.write_top_ips(top_ips, out)
         return out.getvalue()
 
     def format_top_paths(self, top_paths: List[Tuple[str, int]]) -> str:
         """Retorna un CSV con los path - count top"""
         out = StringIO()
-        writer = csv.writer(out)
-        writer.writerow(["Paths", "Count"])
-        writer.writerows(top_paths)
+        self.write_top_paths(top_paths, out)
         return out.getvalue()
 
     def format_status_counts(self, status_counts: Dict[int, int]) -> str:
         """Retorna un CSV con los status - count top"""
         out = StringIO()
-        writer = csv.writer(out)
-        writer.writerow(["Status", "Count"])
-        writer.writerows(list(status_counts.items()))
+        self.write_status_counts(status_counts, out)
         return out.getvalue()
+
+    def write_rows(self, header: List[str], rows: Iterable[Tuple], fp: IO[str]) -> None:
+        """Escribe en fp un CSV con cabecera, fila a fila (rows puede ser un generador)"""
+        writer = csv.writer(fp)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+    def write_top_ips(self, top_ips: Iterable[Tuple[str, int]], fp: IO[str]) -> None:
+        """Escribe en fp el CSV de IP - count"""
+        self.write_rows(["IP", "Count"], top_ips, fp)
+
+    def write_top_paths(
+        self, top_paths: Iterable[Tuple[str, int]], fp: IO[str]
+    ) -> None:
+        """Escribe en fp el CSV de path - count"""
+        self.write_rows(["Paths", "Count"], top_paths, fp)
+
+    def write_status_counts(self, status_counts: Dict[int, int], fp: IO[str]) -> None:
+        """Escribe en fp el CSV de status - count"""
+        self.write_rows(["Status", "Count"], status_counts.items(), fp)
+
+    def write_report(
+        self,
+        aggregate: LogAggregate,
+        fp: IO[str],
+        top_ips: Optional[int] = 10,
+        top_paths: Optional[int] = 10,
+    ) -> None:
+        """
+        Escribe en fp el informe completo de un LogAggregate: resumen, top IPs,
+        top paths y status, cada tabla con su cabecera y separadas por una
+        línea vacía.
+        """
+        self.write_rows(["Metric", "Value"], aggregate.get_summary().items(), fp)
+        fp.write("\r\n")
+        self.write_top_ips(aggregate.top_ips(top_ips), fp)
+        fp.write("\r\n")
+        self.write_top_paths(aggregate.top_paths(top_paths), fp)
+        fp.write("\r\n")
+        self.write_status_counts(dict(sorted(aggregate.status_counts.items())), fp)
@@ -0,0 +1,150 @@
+import json
+from typing import Dict, IO, Iterable, List, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from .. import profiling
+from ..models.log_entry import LogEntry
+
+FIELDS = (
+    "ip",
+    "timestamp",
+    "method",
+    "path",
+    "status_code",
+    "response_size",
+    "user_agent",
+    "referrer",
+)
+
+# Filas que se acumulan antes de cada escritura
+BATCH_SIZE = 10_000
+
+# Entradas máximas de las cachés de timestamps y campos CSV antes de vaciarlas
+CACHE_SIZE = 100_000
+
+_CSV_SPECIAL = (",", '"', "\r", "\n")
+
+
+def _csv_field(value: Optional[str]) -> str:
+    """Retorna value como campo CSV, con comillas solo si hacen falta."""
+    if value is None:
+        return ""
+    if any(c in value for c in _CSV_SPECIAL):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+if orjson is not None:
+
+    def _encode(obj: Dict) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+
+else:
+
+    def _encode(obj: Dict) -> str:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+@profiling.instrument("format")
+class EntryExporter:
+    """
+    Exporta LogEntry fila a fila a JSON Lines o CSV.
+
+    Las filas se escriben en lotes de batch_size. Los logs traen muchas
+    líneas por segundo, así que el timestamp ISO se formatea una vez por
+    segundo distinto; en CSV también se cachea el campo ya escapado de
+    paths, user agents y referrers, que se repiten mucho.
+    """
+
+    def __init__(self, batch_size: int = BATCH_SIZE) -> None:
+        self.batch_size = batch_size
+        self._iso_cache: Dict = {}
+        self._field_cache: Dict[Optional[str], str] = {}
+
+    def _iso(self, ts) -> str:
+        """Formatea ts en ISO 8601 y lo guarda en la caché por segundo."""
+        cache = self._iso_cache
+        if len(cache) >= CACHE_SIZE:
+            cache.clear()
+        iso = cache[ts] = ts.isoformat()
+        return iso
+
+    def _field(self, value: Optional[str]) -> str:
+        """Escapa value como campo CSV y lo guarda en la caché."""
+        cache = self._field_cache
+        if len(cache) >= CACHE_SIZE:
+            cache.clear()
+        text = cache[value] = _csv_field(value)
+        return text
+
+    def write_jsonl(self, entries: Iterable[LogEntry], fp: IO[str]) -> int:
+        """Escribe una entrada JSON por línea en fp. Retorna las filas escritas."""
+        iso_cache = self._iso_cache
+        encode = _encode
+        batch: List[str] = []
+        rows = 0
+        for e in entries:
+            ts = e.timestamp
+            iso = iso_cache.get(ts) or self._iso(ts)
+            batch.append(
+                encode(
+                    {
+                        "ip": e.ip,
+                        "timestamp": iso,
+                        "method": e.method,
+                        "path": e.path,
+                        "status_code": e.status_code,
+                        "response_size": e.response_size,
+                        "user_agent": e.user_agent,
+                        "referrer": e.referrer,
+                    }
+                )
+            )
+            if len(batch) >= self.batch_size:
+                fp.write("\n".join(batch) + "\n")
+                rows += len(batch)
+                batch.clear()
+        if batch:
+            fp.write("\n".join(batch) + "\n")
+            rows += len(batch)
+        return rows
+
+    def write_csv(
+        self, entries: Iterable[LogEntry], fp: IO[str], header: bool = True
+    ) -> int:
+        """
+        Escribe las entradas en CSV (mismo resultado que csv.writer con los
+        valores por defecto). Retorna las filas escritas, sin la cabecera.
+        """
+        iso_cache = self._iso_cache
+        cache = self._field_cache
+        field = self._field
+        batch: List[str] = []
+        rows = 0
+        if header:
+            fp.write(",".join(FIELDS) + "\r\n")
+
+        for e in entries:
+            ts = e.timestamp
+            iso = iso_cache.get(ts) or self._iso(ts)
+            ip = cache.get(e.ip) or field(e.ip)
+            method = cache.get(e.method) or field(e.method)
+            path = cache.get(e.path) or field(e.path)
+            user_agent = cache.get(e.user_agent) or field(e.user_agent)
+            referrer = cache.get(e.referrer) or field(e.referrer)
+            batch.append(
+                f"{ip},{iso},{method},{path},{e.status_code},"
+                f"{e.response_size},{user_agent},{referrer}\r\n"
+            )
+            if len(batch) >= self.batch_size:
+                fp.write("".join(batch))
+                rows += len(batch)
+                batch.clear()
+        if batch:
+            fp.write("".join(batch))
+            rows += len(batch)
+        return rows
@@ -1,6 +1,49 @@
 import json
-from typing import Dict, List, Optional, Tuple
+from io import StringIO
+from typing import Dict, IO, Iterable, List, Optional, Tuple
 
+from .. import profiling
+from ..analyzers.aggregate import LogAggregate
+
+# Elementos que se acumulan antes de cada escritura en write_*
+CHUNK_SIZE = 1000
+
+
+def _write_array(fp: IO[str], items: Iterable[dict], indent: Optional[int]) -> None:
+    """
+    Escribe una lista JSON elemento a elemento, en bloques de CHUNK_SIZE.
+
+    El resultado es idéntico a json.dumps(list(items), indent=indent) sin
+    construir nunca la lista ni el string completos.
+    """
+    if indent is None:
+        open_, sep, close = "[", ", ", "]"
+        nested = None
+    else:
+        pad = " " * indent
+        open_, sep, close = "[\n" + pad, ",\n" + pad, "\n]"
+        nested = "\n" + pad
+
+    chunk: List[str] = []
+    first = True
+    for item in items:
+        text = json.dumps(item, indent=indent)
+        if nested is not None:
+            text = text.replace("\n", nested)
+        chunk.append(open_ + text if first else sep + text)
+        first = False
+        if len(chunk) >= CHUNK_SIZE:
+            fp.write("".join(chunk))
+            chunk.clear()
+
+    if first:
+        fp.write("[]")
+        return
+    chunk.append(close)
+    fp.write("".join(chunk))
+
+
+@profiling.instrument("format")
 class JSONFormatter:
 
     def format_summary(self, summary: str, indent: Optional[int] = None) -> str:
@@ -9,15 +52,75 @@ class JSONFormatter:
 
     def format_top_ips(self, top_ips: List[Tuple[str, int]]) -> str:
         """Retorna un string JSON con las IP - count top"""
-        data = [{"ip": ip, "count": count} for ip, count in top_ips]
-        return json.dumps(data, indent=2)
+        out = StringIO()
+        self.write_top_ips(top_ips, out)
+        return out.getvalue()
 
     def format_top_paths(self, top_paths: List[Tuple[str, int]]) -> str:
         """Retorna un string JSON con los path - count top"""
-        data = [{"path": path, "count": count} for path, count in top_paths]
-        return json.dumps(data, indent=2)
+        out = StringIO()
+        self.write_top_paths(top_paths, out)
+        return out.getvalue()
 
     def format_status_counts(self, status_counts: Dict[int, int]) -> str:
         """Retorna un string JSON con los status - count top"""
         data = {str(status): count for status, count in status_counts.items()}
         return json.dumps(data, indent=2)
+
+    def write_summary(
+        self, summary: Dict, fp: IO[str], indent: Optional[int] = None
+    ) -> None:
+        """Escribe el resumen JSON en fp"""
+        json.dump(summary, fp, indent=indent)
+
+    def write_top_ips(
+        self, top_ips: Iterable[Tuple[str, int]], fp: IO[str], indent: int = 2
+    ) -> None:
+        """Escribe en fp la lista JSON de IP - count sin construirla en memoria"""
+        _write_array(fp, ({"ip": ip, "count": count} for ip, count in top_ips), indent)
+
+    def write_top_paths(
+        self, top_paths: Iterable[Tuple[str, int]], fp: IO[str], indent: int = 2
+    ) -> None:
+        """Escribe en fp la lista JSON de path - count sin construirla en memoria"""
+        _write_array(
+            fp, ({"path": path, "count": count} for path, count in top_paths), indent
+        )
+
+    def write_status_counts(
+        self, status_counts: Dict[int, int], fp: IO[str], indent: int = 2
+    ) -> None:
+        """Escribe en fp el JSON de status - count"""
+        data = {str(status): count for status, count in status_counts.items()}
+        json.dump(data, fp, indent=indent)
+
+    def write_report(
+        self,
+        aggregate: LogAggregate,
+        fp: IO[str],
+        top_ips: Optional[int] = 10,
+        top_paths: Optional[int] = 10,
+        indent: Optional[int] = 2,
+    ) -> None:
+        """Escribe en fp el informe completo de un LogAggregate como un objeto JSON"""
+        report: Dict = {"summary": aggregate.get_summary()}
+        if aggregate.first_seen is not None:
+            report["period"] = {
+                "start": aggregate.first_seen.isoformat(),
+                "end": aggregate.last_seen.isoformat(),
+            }
+        report["top_ips"] = [
+            {"ip": ip, "count": count} for ip, count in aggregate.top_ips(top_ips)
+        ]
+        report["top_paths"] = [
+            {"path": path, "count": count}
+            for path, count in aggregate.top_paths(top_paths)
+        ]
+        report["status_counts"] = {
+            str(status): count
+            for status, count in sorted(aggregate.status_counts.items())
+        }
+        report["requests_by_hour"] = {
+            str(hour): count for hour, count in aggregate.requests_by_hour().items()
+        }
+        json.dump(report, fp, indent=indent)
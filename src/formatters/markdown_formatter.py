@@ -1,34 +1,179 @@
-from typing import Dict, List, Tuple
 from io import StringIO
-import csv
+from typing import Dict, IO, Iterable, List, Optional, Sequence, Tuple, Union
 
+from .. import profiling
+from ..analyzers.aggregate import LogAggregate
+from ..analyzers.log_analyzer import LogAnalyzer
+from .summary import summary_rows
+
+# Ancho (en caracteres) de la barra más larga del histograma por hora
+HISTOGRAM_WIDTH = 40
+
+# Filas de los tops en el informe completo
+REPORT_TOP_N = 10
+
+
+def _cell(value) -> str:
+    """Retorna value como celda Markdown (los | se escapan)."""
+    return str(value).replace("|", "\\|").replace("\n", " ")
+
+
+@profiling.instrument("format")
 class MarkdownFormatter:
 
-    def format_summary(self, summary: str, indent: Optional[int] = None) -> str:
-        """Retorna un resumen en markdown valido"""
-        return json.dumps(summary, indent=indent)
+    def format_summary(self, summary: Dict, indent: Optional[int] = None) -> str:
+        """
+        Retorna un resumen en markdown valido.
+
+        indent se acepta por compatibilidad con JSONFormatter y se ignora.
+        """
+        out = StringIO()
+        self.write_summary(summary, out)
+        return out.getvalue()
 
     def format_top_ips(self, top_ips: List[Tuple[str, int]]) -> str:
-        """Retorna un CSV con las IP - count top"""
+        """Retorna una tabla Markdown con las IP - count top"""
         out = StringIO()
-        writer = csv.writer(out)
-        writer.writerow(["IP", "Count"])
-        writer.writerows(top_ips)
+        self.write_top_ips(top_ips, out)
         return out.getvalue()
 
     def format_top_paths(self, top_paths: List[Tuple[str, int]]) -> str:
-        """Retorna un CSV con los path - count top"""
+        """Retorna una tabla Markdown con los path - count top"""
         out = StringIO()
-        writer = csv.writer(out)
-        writer.writerow(["Paths", "Count"])
-        writer.writerows(top_paths)
+        self.write_top_paths(top_paths, out)
         return out.getvalue()
 
     def format_status_counts(self, status_counts: Dict[int, int]) -> str:
-        """Retorna un CSV con los status - count top"""
+        """Retorna una tabla Markdown con los status - count"""
+        out = StringIO()
+        self.write_status_counts(status_counts, out)
+        return out.getvalue()
+
+    def format_hourly(self, by_hour: Dict[int, int]) -> str:
+        """Retorna el histograma de requests por hora como tabla Markdown"""
         out = StringIO()
-        writer = csv.writer(out)
-        writer.writerow(["Status", "Count"])
-        writer.writerows(list(status_counts.items()))
+        self.write_hourly(by_hour, out)
         return out.getvalue()
 
+    def format_full_report(
+        self,
+        source: Union[LogAnalyzer, LogAggregate],
+        top_ips: int = REPORT_TOP_N,
+        top_paths: int = REPORT_TOP_N,
+    ) -> str:
+        """Retorna el informe completo en Markdown de un analyzer o agregado"""
+        out = StringIO()
+        self.write_report(source, out, top_ips, top_paths)
+        return out.getvalue()
+
+    def write_table(
+        self,
+        header: Sequence[str],
+        rows: Iterable[Sequence],
+        fp: IO[str],
+        align: Optional[Sequence[str]] = None,
+    ) -> None:
+        """
+        Escribe una tabla Markdown fila a fila.
+
+        Si rows es una secuencia ya en memoria (lista, tupla), las columnas se
+        alinean al ancho de la celda más larga, de modo que el texto queda
+        legible también sin renderizar; si es un iterador, se escribe sin
+        esperar al resto y el ancho es el de la cabecera. align indica
+        "left" o "right" por columna (por defecto, todas a la izquierda).
+        """
+        align = align or ["left"] * len(header)
+        widths = [max(len(h), 3) for h in header]
+        if isinstance(rows, Sequence):
+            for row in rows:
+                for i, value in enumerate(row):
+                    widths[i] = max(widths[i], len(_cell(value)))
+
+        def line(values: Iterable[str]) -> str:
+            padded = [
+                v.rjust(w) if a == "right" else v.ljust(w)
+                for v, w, a in zip(values, widths, align)
+            ]
+            return "| " + " | ".join(padded) + " |\n"
+
+        separator = [
+            "-" * (w - 1) + ":" if a == "right" else "-" * w
+            for w, a in zip(widths, align)
+        ]
+        fp.write(line(header))
+        fp.write(line(separator))
+        for row in rows:
+            fp.write(line(map(_cell, row)))
+
+    def write_summary(self, summary: Dict, fp: IO[str]) -> None:
+        """Escribe en fp la sección de resumen"""
+        fp.write("## Resumen\n\n")
+        self.write_table(
+            ["Métrica", "Valor"],
+            summary_rows(summary),
+            fp,
+            ["left", "right"],
+        )
+
+    def write_top_ips(self, top_ips: Iterable[Tuple[str, int]], fp: IO[str]) -> None:
+        """Escribe en fp la sección de IPs más activas"""
+        fp.write("## Top IPs\n\n")
+        self.write_table(["IP", "Requests"], top_ips, fp, ["left", "right"])
+
+    def write_top_paths(
+        self, top_paths: Iterable[Tuple[str, int]], fp: IO[str]
+    ) -> None:
+        """Escribe en fp la sección de paths más visitados"""
+        fp.write("## Top paths\n\n")
+        self.write_table(["Path", "Requests"], top_paths, fp, ["left", "right"])
+
+    def write_status_counts(self, status_counts: Dict[int, int], fp: IO[str]) -> None:
+        """Escribe en fp la sección de códigos de estado"""
+        fp.write("## Códigos de estado\n\n")
+        self.write_table(
+            ["Status", "Requests"], sorted(status_counts.items()), fp, ["left", "right"]
+        )
+
+    def write_hourly(self, by_hour: Dict[int, int], fp: IO[str]) -> None:
+        """Escribe en fp el histograma de requests por hora"""
+        fp.write("## Requests por hora\n\n")
+        peak = max(by_hour.values(), default=0)
+        rows = [
+            (
+                f"{hour:02d}:00",
+                count,
+                "█" * max(1, round(count * HISTOGRAM_WIDTH / peak)) if count else "",
+            )
+            for hour, count in sorted(by_hour.items())
+        ]
+        self.write_table(["Hora", "Requests", ""], rows, fp, ["left", "right", "left"])
+
+    def write_report(
+        self,
+        source: Union[LogAnalyzer, LogAggregate],
+        fp: IO[str],
+        top_ips: int = REPORT_TOP_N,
+        top_paths: int = REPORT_TOP_N,
+    ) -> None:
+        """
+        Escribe en fp el informe completo: resumen, top IPs y paths, códigos
+        de estado e histograma por hora.
+
+        Un LogAnalyzer se agrega una sola vez; todas las secciones salen del
+        mismo LogAggregate sin volver a recorrer los logs.
+        """
+        aggregate = source.aggregate() if isinstance(source, LogAnalyzer) else source
+        fp.write("# Informe de logs\n\n")
+        if aggregate.first_seen is not None:
+            fp.write(f"Periodo: {aggregate.first_seen} – {aggregate.last_seen}\n\n")
+        sections = [
+            (self.write_summary, aggregate.get_summary()),
+            (self.write_top_ips, aggregate.top_ips(top_ips)),
+            (self.write_top_paths, aggregate.top_paths(top_paths)),
+            (self.write_status_counts, aggregate.status_counts),
+            (self.write_hourly, aggregate.requests_by_hour()),
+        ]
+        for i, (write, data) in enumerate(sections):
+            if i:
+                fp.write("\n")
+            write(data, fp)
@@ -0,0 +1,24 @@
+import importlib
+import os
+from typing import IO
+
+# Sufijo -> módulo de compresión (se importa solo si se usa)
+COMPRESSORS = {".gz": "gzip", ".bz2": "bz2", ".xz": "lzma"}
+
+# Tamaño del buffer de escritura para archivos sin comprimir
+BUFFER_SIZE = 1 << 20
+
+
+def open_output(path, encoding: str = "utf-8") -> IO[str]:
+    """
+    Abre un archivo de salida en modo texto, comprimido según su extensión.
+
+    `informe.json.gz`, `.bz2` y `.xz` se comprimen al vuelo; cualquier otra
+    extensión se escribe tal cual con un buffer grande. Se usa newline=""
+    para que el módulo csv controle los saltos de línea.
+    """
+    module = COMPRESSORS.get(os.path.splitext(path)[1].lower())
+    if module is not None:
+        opener = importlib.import_module(module).open
+        return opener(path, "wt", encoding=encoding, newline="")
+    return open(path, "w", encoding=encoding, newline="", buffering=BUFFER_SIZE)
@@ -0,0 +1,172 @@
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pc = pq = None
+
+from .. import profiling
+from ..models.log_entry import LogEntry
+from .entry_exporter import FIELDS
+
+# Filas por row group (Parquet) o record batch (Arrow IPC)
+ROW_GROUP_SIZE = 128 * 1024
+
+# Columnas de alta repetición que se guardan como diccionario
+DICTIONARY_COLUMNS = ("ip", "method", "path", "user_agent", "referrer")
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("ParquetFormatter necesita pyarrow: pip install pyarrow")
+
+
+def entry_schema() -> "pa.Schema":
+    """Retorna el esquema Arrow de una LogEntry."""
+    _require_pyarrow()
+    text = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema(
+        [
+            pa.field("ip", text, nullable=False),
+            pa.field("timestamp", pa.timestamp("us", tz="UTC"), nullable=False),
+            pa.field("method", text, nullable=False),
+            pa.field("path", text, nullable=False),
+            pa.field("status_code", pa.int16(), nullable=False),
+            pa.field("response_size", pa.int64(), nullable=False),
+            pa.field("user_agent", text),
+            pa.field("referrer", text),
+        ]
+    )
+
+
+class SharedDictionary:
+    """
+    Diccionario de una columna común a todos los batches de un archivo.
+
+    Solo crece: los valores nuevos se añaden al final, así que el
+    diccionario de cada batch extiende al del anterior y Arrow IPC lo
+    escribe como delta en lugar de como reemplazo (que el formato de
+    archivo no admite). El array del diccionario se conserva entre batches
+    y solo se le concatenan los valores nuevos de cada uno, ya en Arrow.
+    """
+
+    def __init__(self) -> None:
+        self.positions: Dict[str, int] = {}
+        self.dictionary: "pa.Array" = pa.array([], type=pa.string())
+
+    def encode(self, values) -> "pa.DictionaryArray":
+        """Retorna values codificados con índices a este diccionario."""
+        encoded = pa.array(values, type=pa.string()).dictionary_encode()
+        positions = self.positions
+        mapping = []
+        new = []
+        for i, value in enumerate(encoded.dictionary.to_pylist()):
+            position = positions.get(value)
+            if position is None:
+                position = positions[value] = len(positions)
+                new.append(i)
+            mapping.append(position)
+        if new:
+            added = encoded.dictionary.take(pa.array(new, type=pa.int32()))
+            self.dictionary = pa.concat_arrays([self.dictionary, added])
+        indices = pc.take(pa.array(mapping, type=pa.int32()), encoded.indices)
+        return pa.DictionaryArray.from_arrays(indices, self.dictionary)
+
+
+@profiling.instrument("format")
+class ParquetFormatter:
+    """
+    Escribe LogEntry en formato columnar (Parquet o Arrow IPC).
+
+    Las entradas se consumen en bloques de row_group_size filas, cada bloque
+    se convierte en un record batch y se escribe como un row group, así que
+    la memoria no depende del tamaño del log. IP, método, path, user agent y
+    referrer se guardan como diccionario: en Parquet, uno por row group; en
+    Arrow IPC, uno por columna para todo el archivo (SharedDictionary).
+    """
+
+    def __init__(
+        self, row_group_size: int = ROW_GROUP_SIZE, compression: str = "zstd"
+    ) -> None:
+        _require_pyarrow()
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.schema = entry_schema()
+
+    def record_batches(
+        self, entries: Iterable[LogEntry], shared_dictionaries: bool = False
+    ) -> Iterator["pa.RecordBatch"]:
+        """
+        Retorna los record batches de entries, de row_group_size filas cada uno.
+
+        Con shared_dictionaries, las columnas de diccionario de todos los
+        batches comparten un SharedDictionary por columna.
+        """
+        dictionaries = (
+            {name: SharedDictionary() for name in DICTIONARY_COLUMNS}
+            if shared_dictionaries
+            else None
+        )
+        it = iter(entries)
+        while True:
+            rows = [
+                (
+                    e.ip,
+                    e.timestamp,
+                    e.method,
+                    e.path,
+                    e.status_code,
+                    e.response_size,
+                    e.user_agent,
+                    e.referrer,
+                )
+                for e in islice(it, self.row_group_size)
+            ]
+            if not rows:
+                return
+            yield self._to_batch(rows, dictionaries)
+
+    def _to_batch(
+        self,
+        rows: List[tuple],
+        dictionaries: Optional[Dict[str, SharedDictionary]] = None,
+    ) -> "pa.RecordBatch":
+        columns = dict(zip(FIELDS, zip(*rows)))
+        arrays = []
+        for field in self.schema:
+            values = columns[field.name]
+            if field.name not in DICTIONARY_COLUMNS:
+                arrays.append(pa.array(values, type=field.type))
+            elif dictionaries is not None:
+                arrays.append(dictionaries[field.name].encode(values))
+            else:
+                arrays.append(pa.array(values, type=pa.string()).dictionary_encode())
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+    def write_parquet(self, entries: Iterable[LogEntry], path) -> int:
+        """Escribe las entradas en un archivo Parquet. Retorna las filas escritas."""
+        rows = 0
+        with pq.ParquetWriter(
+            str(path),
+            self.schema,
+            compression=self.compression,
+            use_dictionary=list(DICTIONARY_COLUMNS),
+        ) as writer:
+            for batch in self.record_batches(entries):
+                writer.write_table(pa.Table.from_batches([batch]))
+                rows += batch.num_rows
+        return rows
+
+    def write_arrow(self, entries: Iterable[LogEntry], path) -> int:
+        """Escribe las entradas en un archivo Arrow IPC (Feather v2). Retorna las filas escritas."""
+        rows = 0
+        options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+        with pa.OSFile(str(path), "wb") as sink:
+            with pa.ipc.new_file(sink, self.schema, options=options) as writer:
+                for batch in self.record_batches(entries, shared_dictionaries=True):
+                    writer.write_batch(batch)
+                    rows += batch.num_rows
+        return rows
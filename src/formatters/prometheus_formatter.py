@@ -0,0 +1,82 @@
+from typing import List, Optional
+
+from .. import profiling
+from ..analyzers.live_metrics import LiveMetrics
+from ..parsers.parse_stats import ParseStats
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    """Escapa un valor de etiqueta según el formato de exposición de Prometheus."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+@profiling.instrument("format")
+class PrometheusFormatter:
+
+    def __init__(self, prefix: str = "logparse") -> None:
+        self.prefix = prefix
+
+    def format_metrics(
+        self, metrics: LiveMetrics, stats: Optional[ParseStats] = None
+    ) -> str:
+        """Retorna las métricas en formato de exposición de texto de Prometheus"""
+        p = self.prefix
+        out: List[str] = []
+
+        def header(name: str, kind: str, help_text: str) -> None:
+            out.append(f"# HELP {p}_{name} {help_text}")
+            out.append(f"# TYPE {p}_{name} {kind}")
+
+        header("requests_total", "counter", "Requests procesadas por código de estado.")
+        for status, count in metrics.by_status.items():
+            out.append(f'{p}_requests_total{{status="{_escape(status)}"}} {count}')
+
+        header(
+            "requests_by_method_total",
+            "counter",
+            "Requests procesadas por método HTTP.",
+        )
+        for method, count in metrics.by_method.items():
+            out.append(
+                f'{p}_requests_by_method_total{{method="{_escape(method)}"}} {count}'
+            )
+
+        header("errors_total", "counter", "Requests con error (ver LogEntry.is_error).")
+        out.append(f"{p}_errors_total {metrics.errors_total}")
+
+        header("response_bytes_total", "counter", "Bytes de respuesta transferidos.")
+        out.append(f"{p}_response_bytes_total {metrics.bytes_total}")
+
+        header("response_size_bytes", "histogram", "Tamaño de respuesta en bytes.")
+        for le, count in metrics.size_histogram():
+            out.append(f'{p}_response_size_bytes_bucket{{le="{le}"}} {count}')
+        out.append(f"{p}_response_size_bytes_sum {metrics.bytes_total}")
+        out.append(f"{p}_response_size_bytes_count {metrics.requests_total}")
+
+        header(
+            "top_path_requests",
+            "gauge",
+            "Requests de las rutas más visitadas (top-K aproximado).",
+        )
+        for path, count in metrics.top_paths.most_common():
+            out.append(f'{p}_top_path_requests{{path="{_escape(path)}"}} {count}')
+
+        header(
+            "top_ip_requests",
+            "gauge",
+            "Requests de las IPs más activas (top-K aproximado).",
+        )
+        for ip, count in metrics.top_ips.most_common():
+            out.append(f'{p}_top_ip_requests{{ip="{_escape(ip)}"}} {count}')
+
+        if stats is not None:
+            header("lines_read_total", "counter", "Líneas leídas de los logs.")
+            out.append(f"{p}_lines_read_total {stats.lines_read}")
+            header(
+                "lines_rejected_total", "counter", "Líneas que no se pudieron parsear."
+            )
+            out.append(f"{p}_lines_rejected_total {stats.lines_rejected}")
+
+        return "\n".join(out) + "\n"
@@ -0,0 +1,29 @@
+from typing import Dict, List, Tuple
+
+# Etiqueta de cada métrica del resumen en las salidas para personas
+SUMMARY_LABELS = {
+    "total_requests": "Total requests",
+    "total_errors": "Total errores",
+    "error_rate": "Tasa de error",
+    "unique_ips": "IPs únicas",
+    "total_bytes": "Bytes transferidos",
+}
+
+
+def format_value(key: str, value) -> str:
+    """Retorna value formateado para mostrar (porcentaje, miles...)."""
+    if key == "error_rate":
+        return f"{value:.2%}"
+    if isinstance(value, float):
+        return f"{value:,.2f}"
+    if isinstance(value, int):
+        return f"{value:,}"
+    return str(value)
+
+
+def summary_rows(summary: Dict) -> List[Tuple[str, str]]:
+    """Retorna el resumen como filas (etiqueta, valor formateado)."""
+    return [
+        (SUMMARY_LABELS.get(key, key), format_value(key, value))
+        for key, value in summary.items()
+    ]
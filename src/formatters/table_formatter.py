@@ -0,0 +1,228 @@
+from itertools import islice
+from typing import IO, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from rich import box
+from rich.cells import cell_len, set_cell_size
+from rich.console import Console
+from rich.table import Table
+from rich.text import Text
+
+from .. import profiling
+from ..analyzers.aggregate import LogAggregate
+from ..models.log_entry import LogEntry
+from .summary import summary_rows
+
+# Filas por página (y por bloque al escribir en streaming)
+PAGE_SIZE = 50
+
+# Ancho máximo de una columna; el resto se recorta con "…"
+MAX_COLUMN_WIDTH = 80
+
+# (cabecera, alineación) de cada columna
+Columns = Sequence[Tuple[str, str]]
+
+IP_COLUMNS: Columns = (("IP", "left"), ("Requests", "right"))
+PATH_COLUMNS: Columns = (("Path", "left"), ("Requests", "right"))
+STATUS_COLUMNS: Columns = (("Status", "left"), ("Requests", "right"))
+ENTRY_COLUMNS: Columns = (
+    ("IP", "left"),
+    ("Fecha", "left"),
+    ("Método", "left"),
+    ("Path", "left"),
+    ("Status", "right"),
+    ("Bytes", "right"),
+)
+
+
+def _fit(text: str, width: int, justify: str) -> str:
+    """Ajusta text a width celdas; si es más largo, lo recorta con "…"."""
+    size = cell_len(text)
+    if size > width:
+        return set_cell_size(text, width - 1) + "…"
+    pad = " " * (width - size)
+    return pad + text if justify == "right" else text + pad
+
+
+def _entry_row(entry: LogEntry) -> Tuple:
+    return (
+        entry.ip,
+        entry.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+        entry.method,
+        entry.path,
+        entry.status_code,
+        entry.response_size,
+    )
+
+
+@profiling.instrument("format")
+class TableFormatter:
+    """
+    Tablas Rich para la terminal.
+
+    Rich mide todas las filas antes de dibujar una tabla, así que nunca se le
+    pasa el resultado entero: format_* construye solo la página pedida
+    (islice sobre la fuente de filas, que puede ser un generador) y write_*
+    escribe las filas por bloques de page_size con anchos de columna fijos,
+    de modo que la salida empieza enseguida aunque haya miles de filas.
+    """
+
+    def __init__(self, page_size: int = PAGE_SIZE, width: Optional[int] = None):
+        self.page_size = page_size
+        self.width = width
+
+    def page_count(self, total: int) -> int:
+        """Retorna el número de páginas necesarias para total filas."""
+        return max(1, -(-total // self.page_size))
+
+    def page_table(
+        self,
+        title: str,
+        columns: Columns,
+        rows: Iterable[Sequence],
+        page: int = 1,
+        total: Optional[int] = None,
+    ) -> Table:
+        """
+        Retorna una Table con la página `page` (desde 1) de rows.
+
+        Solo se consumen las filas hasta el final de esa página. Si se conoce
+        el total (o rows tiene len), el pie indica "Página X de N".
+        """
+        if page < 1:
+            raise ValueError("page debe ser >= 1")
+        if total is None and hasattr(rows, "__len__"):
+            total = len(rows)
+        start = (page - 1) * self.page_size
+        window = islice(rows, start, start + self.page_size)
+
+        table = Table(title=title, box=box.SIMPLE_HEAD)
+        for header, justify in columns:
+            table.add_column(
+                header, justify=justify, no_wrap=True, max_width=MAX_COLUMN_WIDTH
+            )
+        for row in window:
+            table.add_row(*(Text(str(value)) for value in row))
+        if total is not None:
+            table.caption = f"Página {page} de {self.page_count(total)} ({total} filas)"
+        return table
+
+    def format_summary(self, summary: Dict) -> Table:
+        """Retorna una tabla métrica - valor con el resumen"""
+        return self.page_table(
+            "Resumen", (("Métrica", "left"), ("Valor", "right")), summary_rows(summary)
+        )
+
+    def format_top_ips(
+        self, top_ips: Iterable[Tuple[str, int]], page: int = 1
+    ) -> Table:
+        """Retorna una tabla con la página pedida de IP - count"""
+        return self.page_table("Top IPs", IP_COLUMNS, top_ips, page)
+
+    def format_top_paths(
+        self, top_paths: Iterable[Tuple[str, int]], page: int = 1
+    ) -> Table:
+        """Retorna una tabla con la página pedida de path - count"""
+        return self.page_table("Top paths", PATH_COLUMNS, top_paths, page)
+
+    def format_status_counts(self, status_counts: Dict[int, int]) -> Table:
+        """Retorna una tabla con los status - count"""
+        return self.page_table(
+            "Códigos de estado", STATUS_COLUMNS, sorted(status_counts.items())
+        )
+
+    def format_entries(
+        self, entries: Iterable[LogEntry], page: int = 1, total: Optional[int] = None
+    ) -> Table:
+        """Retorna una tabla con la página pedida de requests"""
+        if total is None and hasattr(entries, "__len__"):
+            total = len(entries)
+        return self.page_table(
+            "Requests", ENTRY_COLUMNS, map(_entry_row, entries), page, total
+        )
+
+    def write_rows(
+        self, title: str, columns: Columns, rows: Iterable[Sequence], fp: IO[str]
+    ) -> int:
+        """
+        Imprime todas las filas en fp, en bloques de page_size.
+
+        Los anchos de columna se fijan con todas las filas si rows es una
+        secuencia y, si no, con el primer bloque (hasta MAX_COLUMN_WIDTH y
+        el ancho de la consola); una celda más ancha se recorta con "…".
+        Rich dibuja el título y la cabecera; las filas se escriben como
+        texto con esos anchos, igual que las dibujaría Rich, sin maquetar
+        la tabla entera. Retorna las filas escritas.
+        """
+        console = Console(file=fp, width=self.width, highlight=False)
+        it = iter(rows)
+        chunk = [tuple(map(str, row)) for row in islice(it, self.page_size)]
+        measured = (
+            (tuple(map(str, row)) for row in rows)
+            if isinstance(rows, Sequence)
+            else chunk
+        )
+        widths = self._column_widths(columns, measured, console.width)
+        justify = [j for _, j in columns]
+
+        header = Table(title=title, box=box.SIMPLE_HEAD, show_edge=False)
+        for (name, j), width in zip(columns, widths):
+            header.add_column(name, justify=j, no_wrap=True, width=width)
+        console.print(header)
+
+        written = 0
+        while chunk:
+            fp.write(
+                "".join(
+                    " " + "   ".join(map(_fit, row, widths, justify)) + " \n"
+                    for row in chunk
+                )
+            )
+            written += len(chunk)
+            chunk = [tuple(map(str, row)) for row in islice(it, self.page_size)]
+        return written
+
+    @staticmethod
+    def _column_widths(
+        columns: Columns, rows: Iterable[Tuple[str, ...]], console_width: int
+    ) -> List[int]:
+        widths = [cell_len(h) for h, _ in columns]
+        for row in rows:
+            widths = [max(w, cell_len(value)) for w, value in zip(widths, row)]
+        widths = [min(MAX_COLUMN_WIDTH, w) for w in widths]
+        # Padding (1 a cada lado) y separador entre columnas, como SIMPLE_HEAD
+        available = console_width - 3 * (len(columns) - 1) - 2
+        shrinkable = [i for i, (_, j) in enumerate(columns) if j == "left"]
+        while sum(widths) > available and shrinkable:
+            widest = max(shrinkable, key=widths.__getitem__)
+            if widths[widest] <= cell_len(columns[widest][0]):
+                break
+            widths[widest] -= 1
+        return widths
+
+    def write_top_ips(self, top_ips: Iterable[Tuple[str, int]], fp: IO[str]) -> int:
+        """Imprime en fp la tabla completa de IP - count, bloque a bloque"""
+        return self.write_rows("Top IPs", IP_COLUMNS, top_ips, fp)
+
+    def write_top_paths(self, top_paths: Iterable[Tuple[str, int]], fp: IO[str]) -> int:
+        """Imprime en fp la tabla completa de path - count, bloque a bloque"""
+        return self.write_rows("Top paths", PATH_COLUMNS, top_paths, fp)
+
+    def write_entries(self, entries: Iterable[LogEntry], fp: IO[str]) -> int:
+        """Imprime en fp todas las requests, bloque a bloque"""
+        return self.write_rows("Requests", ENTRY_COLUMNS, map(_entry_row, entries), fp)
+
+    def write_report(
+        self,
+        aggregate: LogAggregate,
+        fp: IO[str],
+        top_ips: Optional[int] = 10,
+        top_paths: Optional[int] = 10,
+    ) -> None:
+        """Imprime en fp el informe completo de un LogAggregate"""
+        console = Console(file=fp, width=self.width, highlight=False)
+        console.print(self.format_summary(aggregate.get_summary()))
+        self.write_top_ips(aggregate.top_ips(top_ips), fp)
+        console.print()
+        self.write_top_paths(aggregate.top_paths(top_paths), fp)
+        console.print()
+        console.print(self.format_status_counts(aggregate.status_counts))
@@ -1,26 +1,292 @@
 from abc import ABC, abstractmethod
-from typing import Iterator, Optional
+from collections import deque
+import time
+from typing import TYPE_CHECKING, AsyncIterator, Deque, Iterator, List, Optional, Tuple
 
 from src.models.log_entry import LogEntry
+from .. import profiling
+from .parse_stats import (
+    SKIP_COMMENT,
+    SKIP_EMPTY,
+    SKIP_INVALID,
+    SKIP_NO_MATCH,
+    ParseStats,
+)
+
+if TYPE_CHECKING:
+    import asyncio
+    from concurrent.futures import Executor
+
+# Tamaño aproximado (bytes) de cada bloque que parse_file entrega a parse_block
+DEFAULT_BLOCK_SIZE = 1 << 20
+
+
+def read_blocks(file, block_size: int = DEFAULT_BLOCK_SIZE) -> Iterator[bytes]:
+    """
+    Lee un archivo en bloques de bytes que terminan en fin de línea.
+
+    Cada bloque tiene aproximadamente block_size bytes; la línea incompleta
+    del final de una lectura se pasa al bloque siguiente.
+    """
+    with open(file, "rb") as f:
+        pending = b""
+        while True:
+            chunk = f.read(block_size)
+            if not chunk:
+                break
+            cut = chunk.rfind(b"\n")
+            if cut == -1:
+                pending += chunk
+                continue
+            yield pending + chunk[: cut + 1]
+            pending = chunk[cut + 1 :]
+        if pending:
+            yield pending
+
+
+def decode_lines(
+    block: bytes, stats: Optional[ParseStats] = None
+) -> Tuple[List[str], int]:
+    """
+    Decodifica un bloque UTF-8 en líneas.
+
+    Retorna las líneas y cuántas se descartaron: si el bloque no es UTF-8
+    válido se decodifica línea a línea y las que fallan se registran en
+    stats como SKIP_INVALID en lugar de reemplazar los bytes erróneos.
+    """
+    try:
+        lines = block.decode("utf-8").split("\n")
+        invalid = 0
+    except UnicodeDecodeError:
+        lines = []
+        invalid = 0
+        for raw in block.split(b"\n"):
+            try:
+                lines.append(raw.decode("utf-8"))
+            except UnicodeDecodeError:
+                invalid += 1
+                if stats is not None:
+                    stats.skip(SKIP_INVALID, raw.decode("utf-8", errors="replace"))
+    if lines and lines[-1] == "":
+        lines.pop()
+    return lines, invalid
+
+
+def parse_block_with_stats(
+    parser: "BaseParser", block: bytes, sample_size: int = 0
+) -> Tuple[List[LogEntry], ParseStats]:
+    """
+    Parsea un bloque con unas estadísticas propias.
+
+    Pensado para ejecutarse en un worker: las estadísticas se devuelven
+    para que el proceso principal las combine con ParseStats.merge.
+    """
+    stats = ParseStats(sample_size=sample_size)
+    start = time.perf_counter()
+    entries = parser.parse_block(block, stats)
+    stats.elapsed = time.perf_counter() - start
+    return entries, stats
 
 
 class BaseParser(ABC):
 
+    BLOCK_SIZE = DEFAULT_BLOCK_SIZE
+
     @abstractmethod
     def parse_line(self, line) -> Optional[LogEntry]:
         pass
 
-    def parse_file(self, file) -> Iterator[LogEntry]:
-        with open(file, "r", encoding="utf-8") as f:
-            for line in f:
-                # if not line or line.startswith("#"):
-                line = line.strip()
-                if not line or line.startswith("#"):
-                    continue
-                try:
-                    tmp = self.parse_line(line)
-                    if tmp is None:
-                        continue
-                    yield tmp
-                except ValueError:
-                    pass
+    def parse_line_strict(self, line) -> Optional[LogEntry]:
+        """
+        Como parse_line, pero lanza ValueError si la línea tiene el formato
+        del parser con valores inválidos (None si no tiene el formato).
+
+        parse_lines lo usa para distinguir SKIP_NO_MATCH de SKIP_INVALID;
+        por defecto llama a parse_line.
+        """
+        return self.parse_line(line)
+
+    def parse_lines(
+        self, lines: List[str], stats: Optional[ParseStats] = None
+    ) -> List[LogEntry]:
+        """
+        Parsea un lote de líneas.
+
+        Salta líneas vacías, comentarios y líneas que no se pueden parsear,
+        registrando el motivo en stats si se indica. Las subclases pueden
+        sobrescribirlo para procesar el lote completo sin pasar por
+        parse_line en cada línea.
+        """
+        entries = []
+        append = entries.append
+        parse_line = self.parse_line_strict
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                if stats is not None:
+                    stats.skip(SKIP_COMMENT if line else SKIP_EMPTY, line)
+                continue
+            try:
+                entry = parse_line(line)
+            except ValueError:
+                if stats is not None:
+                    stats.skip(SKIP_INVALID, line)
+                continue
+            if entry is not None:
+                append(entry)
+            elif stats is not None:
+                stats.skip(SKIP_NO_MATCH, line)
+        return entries
+
+    def parse_block(
+        self, block: bytes, stats: Optional[ParseStats] = None
+    ) -> List[LogEntry]:
+        """
+        Parsea un bloque de bytes con líneas completas (UTF-8).
+
+        Las líneas que no son UTF-8 válido se descartan como SKIP_INVALID.
+        """
+        profiler = profiling.active()
+        if profiler is not None:
+            start = time.perf_counter()
+        lines, invalid = decode_lines(block, stats)
+        if profiler is not None:
+            profiler.add("parse.decode", time.perf_counter() - start)
+            entries = self.parse_lines_profiled(lines, stats, profiler)
+        else:
+            entries = self.parse_lines(lines, stats)
+        if stats is not None:
+            stats.lines_read += len(lines) + invalid
+            stats.lines_parsed += len(entries)
+            stats.bytes_read += len(block)
+        return entries
+
+    def parse_lines_profiled(
+        self,
+        lines: List[str],
+        stats: Optional[ParseStats],
+        profiler: "profiling.Profiler",
+    ) -> List[LogEntry]:
+        """
+        parse_lines con medición de tiempos, usado cuando hay un profile() activo.
+
+        Por defecto mide el lote completo como "parse.lines"; las subclases
+        pueden sobrescribirlo para separar etapas (regex, timestamps...).
+        """
+        start = time.perf_counter()
+        entries = self.parse_lines(lines, stats)
+        profiler.add("parse.lines", time.perf_counter() - start, len(lines))
+        return entries
+
+    def parse_file(
+        self, file, stats: Optional[ParseStats] = None
+    ) -> Iterator[LogEntry]:
+        """
+        Parsea un archivo completo de forma perezosa, bloque a bloque.
+
+        Args:
+            file: Ruta del archivo de log
+            stats: ParseStats donde acumular las estadísticas (opcional)
+        """
+        profiler = profiling.active()
+        if stats is None and profiler is None:
+            for block in read_blocks(file, self.BLOCK_SIZE):
+                yield from self.parse_block(block)
+            return
+
+        clock = time.perf_counter
+        blocks = read_blocks(file, self.BLOCK_SIZE)
+        while True:
+            start = clock()
+            block = next(blocks, None)
+            if profiler is not None:
+                profiler.add("parse.io", clock() - start)
+            if block is None:
+                if stats is not None:
+                    stats.elapsed += clock() - start
+                break
+            entries = self.parse_block(block, stats)
+            if stats is not None:
+                stats.elapsed += clock() - start
+            yield from entries
+
+    async def aparse_blocks(
+        self,
+        file,
+        executor: Optional["Executor"] = None,
+        prefetch: int = 2,
+        stats: Optional[ParseStats] = None,
+    ) -> AsyncIterator[List[LogEntry]]:
+        """
+        Parsea un archivo de forma asíncrona, retornando un lote por bloque.
+
+        La lectura se hace en el executor por defecto del loop (hilos) y el
+        parseo en `executor`, que puede ser un ProcessPoolExecutor para el
+        trabajo pesado de CPU (el parser debe ser picklable). Como máximo hay
+        `prefetch` bloques leídos o en parseo sin consumir: si el consumidor
+        no avanza, tampoco se lee más del archivo.
+
+        Args:
+            file: Ruta del archivo de log
+            executor: Executor donde parsear los bloques (None = hilos del loop)
+            prefetch: Bloques que se parsean por adelantado
+            stats: ParseStats donde acumular las estadísticas (opcional)
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        blocks = read_blocks(file, self.BLOCK_SIZE)
+        sample_size = stats.sample_size if stats is not None else 0
+        pending: Deque["asyncio.Future"] = deque()
+        exhausted = False
+        clock = time.perf_counter
+        try:
+            while True:
+                start = clock()
+                while not exhausted and len(pending) < max(prefetch, 1):
+                    block = await loop.run_in_executor(None, next, blocks, None)
+                    if block is None:
+                        exhausted = True
+                    else:
+                        pending.append(
+                            loop.run_in_executor(
+                                executor,
+                                parse_block_with_stats,
+                                self,
+                                block,
+                                sample_size,
+                            )
+                        )
+                if not pending:
+                    if stats is not None:
+                        stats.elapsed += clock() - start
+                    break
+                entries, block_stats = await pending.popleft()
+                if stats is not None:
+                    stats.merge(block_stats)
+                    stats.elapsed += clock() - start
+                yield entries
+        finally:
+            for future in pending:
+                future.cancel()
+            try:
+                blocks.close()
+            except ValueError:
+                # Cancelado durante una lectura: el hilo aún usa el generador
+                pass
+
+    async def aparse_file(
+        self,
+        file,
+        executor: Optional["Executor"] = None,
+        prefetch: int = 2,
+        stats: Optional[ParseStats] = None,
+    ) -> AsyncIterator[LogEntry]:
+        """
+        Versión asíncrona de parse_file: genera LogEntry sin bloquear el loop.
+
+        Ver aparse_blocks para el significado de los argumentos.
+        """
+        async for entries in self.aparse_blocks(file, executor, prefetch, stats):
+            for entry in entries:
+                yield entry
@@ -0,0 +1,98 @@
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Type
+
+from ..models.log_entry import LogEntry
+from .base_parser import BaseParser
+from .json_parser import JsonLinesParser
+from .nginx_parser import NginxParser
+from .parse_stats import ParseStats
+
+# Parsers candidatos, en orden de preferencia en caso de empate
+REGISTERED_PARSERS: List[Type[BaseParser]] = [NginxParser, JsonLinesParser]
+
+DEFAULT_SAMPLE_SIZE = 50
+
+
+def register_parser(parser_cls: Type[BaseParser]) -> Type[BaseParser]:
+    """
+    Registra un parser para que participe en la detección de formato.
+
+    Puede usarse como decorador sobre subclases de BaseParser.
+    """
+    if parser_cls not in REGISTERED_PARSERS:
+        REGISTERED_PARSERS.append(parser_cls)
+    return parser_cls
+
+
+def _sample_lines(file, sample_size: int) -> List[str]:
+    """Retorna las primeras líneas no vacías ni comentadas del archivo."""
+    with open(file, "r", encoding="utf-8", errors="replace") as f:
+        stripped = (line.strip() for line in f)
+        useful = (line for line in stripped if line and not line.startswith("#"))
+        return list(islice(useful, sample_size))
+
+
+def _score(parser: BaseParser, lines: List[str]) -> int:
+    """Retorna cuántas líneas de la muestra reconoce el parser."""
+    matched = 0
+    for line in lines:
+        try:
+            if parser.parse_line(line) is not None:
+                matched += 1
+        except ValueError:
+            pass
+    return matched
+
+
+def detect_parser(
+    file,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    candidates: Optional[Iterable[Type[BaseParser]]] = None,
+) -> Optional[BaseParser]:
+    """
+    Detecta el formato de un archivo probando sus primeras líneas.
+
+    Args:
+        file: Ruta del archivo de log
+        sample_size: Número de líneas útiles a probar
+        candidates: Clases de parser a probar (por defecto las registradas;
+            una lista vacía no prueba ninguna)
+
+    Returns:
+        Instancia del parser que reconoce más líneas de la muestra,
+        None si ninguno reconoce ninguna
+    """
+    lines = _sample_lines(file, sample_size)
+    if not lines:
+        return None
+
+    best: Optional[BaseParser] = None
+    best_score = 0
+    if candidates is None:
+        candidates = REGISTERED_PARSERS
+    for parser_cls in candidates:
+        parser = parser_cls()
+        score = _score(parser, lines)
+        if score > best_score:
+            best, best_score = parser, score
+            if score == len(lines):
+                break
+    return best
+
+
+def parse_files(
+    files: Iterable,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    stats: Optional[ParseStats] = None,
+) -> Iterator[LogEntry]:
+    """
+    Parsea varios archivos eligiendo el parser de cada uno por separado.
+
+    Los archivos cuyo formato no se reconoce se saltan sin leerse completos.
+    Si se indica stats, acumula en él las estadísticas de todos los archivos.
+    """
+    for file in files:
+        parser = detect_parser(file, sample_size)
+        if parser is None:
+            continue
+        yield from parser.parse_file(file, stats)
@@ -0,0 +1,195 @@
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from ..models.log_entry import LogEntry
+from .base_parser import BaseParser
+from .parse_stats import (
+    SKIP_COMMENT,
+    SKIP_EMPTY,
+    SKIP_INVALID,
+    SKIP_NO_MATCH,
+    ParseStats,
+)
+
+# Decoder JSON más rápido disponible: orjson > msgspec > json (stdlib)
+try:
+    import orjson
+
+    _loads = orjson.loads
+    _DecodeError: type = orjson.JSONDecodeError
+except ImportError:  # pragma: no cover - depende del entorno
+    try:
+        import msgspec
+
+        _loads = msgspec.json.decode
+        _DecodeError = msgspec.DecodeError
+    except ImportError:
+        import json
+
+        _loads = json.loads
+        _DecodeError = json.JSONDecodeError
+
+
+NGINX_TIME_LOCAL_FORMAT = "%d/%b/%Y:%H:%M:%S %z"
+
+
+@lru_cache(maxsize=4096)
+def _parse_timestamp(value: str) -> datetime:
+    """Parsea un timestamp ISO 8601 o $time_local (cacheado por valor)."""
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return datetime.strptime(value, NGINX_TIME_LOCAL_FORMAT)
+
+
+def _optional(value: Any) -> Optional[str]:
+    """Convierte "-" y cadenas vacías en None."""
+    if value is None or value == "-" or value == "":
+        return None
+    return str(value)
+
+
+class JsonLinesParser(BaseParser):
+    """
+    Parser para logs nginx con log_format escape=json (un objeto JSON por línea).
+
+    Las claves del JSON se mapean a campos de LogEntry mediante `fields`.
+    Si faltan las claves de método y ruta se usa la clave `request`
+    ("GET /path HTTP/1.1").
+
+    Ejemplo:
+    {"remote_addr": "192.168.1.1", "time_iso8601": "2024-11-26T12:00:00+00:00",
+     "request_method": "GET", "request_uri": "/index.html", "status": "200",
+     "body_bytes_sent": "1234", "http_referer": "-", "http_user_agent": "Mozilla/5.0"}
+    """
+
+    DEFAULT_FIELDS: Dict[str, str] = {
+        "ip": "remote_addr",
+        "timestamp": "time_iso8601",
+        "method": "request_method",
+        "path": "request_uri",
+        "status_code": "status",
+        "response_size": "body_bytes_sent",
+        "user_agent": "http_user_agent",
+        "referrer": "http_referer",
+    }
+
+    REQUEST_FIELD = "request"
+
+    def __init__(self, fields: Optional[Dict[str, str]] = None) -> None:
+        """
+        Args:
+            fields: Mapeo campo de LogEntry -> clave JSON; sobrescribe los
+                valores de DEFAULT_FIELDS
+        """
+        self.fields = {**self.DEFAULT_FIELDS, **(fields or {})}
+
+    def parse_line(self, line) -> Optional[LogEntry]:
+        """
+        Parsea una línea JSON.
+
+        Returns:
+            LogEntry si la línea es un objeto JSON con los campos requeridos,
+            None en caso contrario
+        """
+        try:
+            obj = _loads(line)
+        except (_DecodeError, ValueError):
+            return None
+        return self.build_entry(obj)
+
+    def parse_line_strict(self, line) -> Optional[LogEntry]:
+        """
+        Parsea una línea JSON.
+
+        Returns:
+            LogEntry, o None si la línea no es JSON
+
+        Raises:
+            ValueError: Si es JSON pero le faltan campos o son inválidos
+        """
+        try:
+            obj = _loads(line)
+        except (_DecodeError, ValueError):
+            return None
+        entry = self.build_entry(obj)
+        if entry is None:
+            raise ValueError("Objeto JSON sin los campos requeridos")
+        return entry
+
+    def build_entry(self, obj: Any) -> Optional[LogEntry]:
+        """Construye un LogEntry a partir de un objeto JSON ya decodificado."""
+        if not isinstance(obj, dict):
+            return None
+
+        fields = self.fields
+        try:
+            method = obj.get(fields["method"])
+            path = obj.get(fields["path"])
+            if method is None or path is None:
+                method, path = obj[self.REQUEST_FIELD].split(" ")[:2]
+
+            raw_ts = obj[fields["timestamp"]]
+            if isinstance(raw_ts, (int, float)):
+                timestamp = datetime.fromtimestamp(raw_ts, tz=timezone.utc)
+            else:
+                timestamp = _parse_timestamp(raw_ts)
+
+            return LogEntry(
+                ip=obj[fields["ip"]],
+                timestamp=timestamp,
+                method=method,
+                path=path,
+                status_code=int(obj[fields["status_code"]]),
+                response_size=int(obj[fields["response_size"]]),
+                user_agent=_optional(obj.get(fields["user_agent"])),
+                referrer=_optional(obj.get(fields["referrer"])),
+            )
+        except (KeyError, ValueError, TypeError, AttributeError):
+            return None
+
+    def decode_batch(self, lines: List[str]) -> List[Any]:
+        """
+        Decodifica un lote de líneas con una sola llamada al decoder.
+
+        Las líneas se unen en un array JSON; si el lote contiene alguna línea
+        inválida se vuelve a decodificar línea a línea (None para las malas).
+        """
+        if all(line.startswith("{") and line.endswith("}") for line in lines):
+            try:
+                objs = _loads("[" + ",".join(lines) + "]")
+                if len(objs) == len(lines) and all(type(o) is dict for o in objs):
+                    return objs
+            except (_DecodeError, ValueError):
+                pass
+
+        result = []
+        for line in lines:
+            try:
+                result.append(_loads(line))
+            except (_DecodeError, ValueError):
+                result.append(None)
+        return result
+
+    def parse_lines(
+        self, lines: List[str], stats: Optional[ParseStats] = None
+    ) -> List[LogEntry]:
+        """Parsea un lote de líneas decodificándolo con decode_batch."""
+        useful = []
+        for line in lines:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                useful.append(line)
+            elif stats is not None:
+                stats.skip(SKIP_COMMENT if line else SKIP_EMPTY, line)
+
+        build = self.build_entry
+        entries = []
+        for line, obj in zip(useful, self.decode_batch(useful)):
+            entry = build(obj)
+            if entry is not None:
+                entries.append(entry)
+            elif stats is not None:
+                stats.skip(SKIP_NO_MATCH if obj is None else SKIP_INVALID, line)
+        return entries
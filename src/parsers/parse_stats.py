@@ -0,0 +1,129 @@
+import random
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+# Razones por las que se descarta una línea
+SKIP_EMPTY = "empty"
+SKIP_COMMENT = "comment"
+SKIP_NO_MATCH = "no_match"
+SKIP_INVALID = "invalid"
+
+
+@dataclass
+class ParseStats:
+    """
+    Estadísticas de un parseo: líneas leídas, parseadas y descartadas.
+
+    Attributes:
+        sample_size: Máximo de líneas rechazadas a conservar (0 = ninguna)
+        lines_read: Líneas leídas del archivo
+        lines_parsed: Líneas convertidas en LogEntry
+        bytes_read: Bytes consumidos del archivo
+        elapsed: Segundos (tiempo real) dedicados a leer y parsear
+        worker_time: Segundos de parseo de las partes combinadas con merge;
+            con varios workers en paralelo supera a elapsed
+        skipped: Líneas descartadas por razón
+        rejected_sample: Muestra aleatoria uniforme (reservoir) de
+            (razón, línea) entre las líneas rechazadas
+    """
+
+    sample_size: int = 0
+    lines_read: int = 0
+    lines_parsed: int = 0
+    bytes_read: int = 0
+    elapsed: float = 0.0
+    worker_time: float = 0.0
+    skipped: Counter = field(default_factory=Counter)
+    rejected_sample: List[Tuple[str, str]] = field(default_factory=list)
+    _rejected_seen: int = field(default=0, repr=False)
+    _rng: random.Random = field(default_factory=random.Random, repr=False)
+
+    def skip(self, reason: str, line: str) -> None:
+        """Registra una línea descartada (vacías y comentarios no se muestrean)."""
+        self.skipped[reason] += 1
+        if not self.sample_size or reason in (SKIP_EMPTY, SKIP_COMMENT):
+            return
+
+        self._rejected_seen += 1
+        if len(self.rejected_sample) < self.sample_size:
+            self.rejected_sample.append((reason, line))
+        else:
+            slot = self._rng.randrange(self._rejected_seen)
+            if slot < self.sample_size:
+                self.rejected_sample[slot] = (reason, line)
+
+    @property
+    def lines_skipped(self) -> int:
+        """Retorna el total de líneas descartadas."""
+        return sum(self.skipped.values())
+
+    @property
+    def lines_rejected(self) -> int:
+        """Retorna las líneas con contenido que no se pudieron parsear."""
+        return self.skipped[SKIP_NO_MATCH] + self.skipped[SKIP_INVALID]
+
+    @property
+    def rejection_rate(self) -> float:
+        """Retorna el ratio de líneas rechazadas sobre las líneas con contenido."""
+        candidates = self.lines_parsed + self.lines_rejected
+        if not candidates:
+            return 0.0
+        return self.lines_rejected / candidates
+
+    @property
+    def lines_per_second(self) -> float:
+        """Retorna la velocidad de parseo en líneas por segundo."""
+        if not self.elapsed:
+            return 0.0
+        return self.lines_read / self.elapsed
+
+    def merge(self, other: "ParseStats") -> None:
+        """
+        Acumula en esta instancia las estadísticas de otra (p.ej. de un worker).
+
+        El elapsed de la otra se suma a worker_time y no a elapsed: las partes
+        pueden haberse parseado en paralelo, así que el tiempo real lo mide
+        quien las combina (run_pipeline, aparse_file) y lines_per_second no
+        queda subestimado.
+
+        La muestra de rechazadas se combina ponderando cada lado por las
+        líneas rechazadas que vio: cada plaza se saca de uno u otro con
+        probabilidad proporcional a las que le quedan (hipergeométrica), así
+        que la muestra sigue siendo uniforme sobre todas las rechazadas.
+        """
+        self.lines_read += other.lines_read
+        self.lines_parsed += other.lines_parsed
+        self.bytes_read += other.bytes_read
+        self.worker_time += other.worker_time + other.elapsed
+        self.skipped.update(other.skipped)
+
+        if self.sample_size and other.rejected_sample:
+            mine = self._rng.sample(self.rejected_sample, len(self.rejected_sample))
+            theirs = self._rng.sample(other.rejected_sample, len(other.rejected_sample))
+            left, right = self._rejected_seen, other._rejected_seen
+            combined: List[Tuple[str, str]] = []
+            while len(combined) < self.sample_size and (mine or theirs):
+                if not theirs or (mine and self._rng.randrange(left + right) < left):
+                    combined.append(mine.pop())
+                    left -= 1
+                else:
+                    combined.append(theirs.pop())
+                    right -= 1
+            self.rejected_sample = combined
+        self._rejected_seen += other._rejected_seen
+
+    def to_dict(self) -> Dict[str, object]:
+        """Retorna las estadísticas como diccionario serializable."""
+        return {
+            "lines_read": self.lines_read,
+            "lines_parsed": self.lines_parsed,
+            "lines_skipped": self.lines_skipped,
+            "skipped": dict(self.skipped),
+            "rejection_rate": self.rejection_rate,
+            "bytes_read": self.bytes_read,
+            "elapsed": self.elapsed,
+            "worker_time": self.worker_time,
+            "lines_per_second": self.lines_per_second,
+            "rejected_sample": [list(item) for item in self.rejected_sample],
+        }
@@ -0,0 +1,88 @@
+import os
+import threading
+from typing import Iterator, Optional
+
+from ..models.log_entry import LogEntry
+from .base_parser import DEFAULT_BLOCK_SIZE, BaseParser
+from .parse_stats import ParseStats
+
+
+def follow_blocks(
+    file,
+    poll_interval: float = 1.0,
+    from_start: bool = False,
+    stop: Optional[threading.Event] = None,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> Iterator[bytes]:
+    """
+    Sigue un archivo como `tail -F`, generando bloques de líneas completas.
+
+    Detecta rotación (cambio de inodo) y truncado, y reabre el archivo.
+    Termina cuando se activa `stop`; sin `stop` sigue indefinidamente.
+
+    Args:
+        file: Ruta del archivo a seguir
+        poll_interval: Segundos de espera cuando no hay datos nuevos
+        from_start: Si es False, empieza por el final del archivo (si ya
+            existe; uno que se crea después se lee entero)
+        stop: Evento que detiene el seguimiento
+        block_size: Máximo de bytes leídos por iteración
+    """
+    stop = stop or threading.Event()
+    f = None
+    pending = b""
+    try:
+        while not stop.is_set():
+            if f is None:
+                try:
+                    f = open(file, "rb")
+                except FileNotFoundError:
+                    # Un archivo que aparece después se lee desde el principio
+                    from_start = True
+                    stop.wait(poll_interval)
+                    continue
+                if not from_start:
+                    f.seek(0, os.SEEK_END)
+                # Tras una rotación el archivo nuevo se lee desde el principio
+                from_start = True
+                pending = b""
+
+            chunk = f.read(block_size)
+            if chunk:
+                cut = chunk.rfind(b"\n")
+                if cut == -1:
+                    pending += chunk
+                else:
+                    yield pending + chunk[: cut + 1]
+                    pending = chunk[cut + 1 :]
+                continue
+
+            try:
+                st = os.stat(file)
+            except FileNotFoundError:
+                st = None
+            if st is None or st.st_ino != os.fstat(f.fileno()).st_ino:
+                f.close()
+                f = None
+                continue
+            if st.st_size < f.tell():
+                f.seek(0)
+                pending = b""
+                continue
+            stop.wait(poll_interval)
+    finally:
+        if f is not None:
+            f.close()
+
+
+def follow_entries(
+    parser: BaseParser,
+    file,
+    poll_interval: float = 1.0,
+    from_start: bool = False,
+    stop: Optional[threading.Event] = None,
+    stats: Optional[ParseStats] = None,
+) -> Iterator[LogEntry]:
+    """Sigue un archivo y genera los LogEntry de las líneas nuevas."""
+    for block in follow_blocks(file, poll_interval, from_start, stop):
+        yield from parser.parse_block(block, stats)
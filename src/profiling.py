@@ -0,0 +1,211 @@
+"""
+Instrumentación opcional por etapas del pipeline (lectura, regex, timestamps,
+validación, agregación y formateo).
+
+Mientras no hay un `profile()` activo las comprobaciones cuestan una
+consulta a una variable global por bloque o por llamada a método, nunca
+por línea de log.
+"""
+
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class Profiler:
+    """
+    Acumula tiempo y número de llamadas por etapa.
+
+    Las etapas se anidan con `stage()`; el tiempo propio (sin hijos) de cada
+    pila de etapas se guarda para exportarlo como collapsed stacks.
+    """
+
+    def __init__(self) -> None:
+        self.cumulative: Dict[str, List[float]] = {}
+        self.self_times: Dict[Tuple[str, ...], float] = {}
+        self._stack: List[str] = []
+        self._child_time: List[float] = []
+
+    def _record(
+        self, path: Tuple[str, ...], elapsed: float, self_time: float, calls: int
+    ) -> None:
+        totals = self.cumulative.setdefault(path[-1], [0.0, 0])
+        totals[0] += elapsed
+        totals[1] += calls
+        self.self_times[path] = self.self_times.get(path, 0.0) + self_time
+        if self._child_time:
+            self._child_time[-1] += elapsed
+
+    @contextmanager
+    def stage(self, name: str, calls: int = 1) -> Iterator[None]:
+        """Mide el bloque como etapa `name`, anidada en la etapa actual."""
+        self._stack.append(name)
+        self._child_time.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            path = tuple(self._stack)
+            self._stack.pop()
+            child = self._child_time.pop()
+            self._record(path, elapsed, elapsed - child, calls)
+
+    def add(self, name: str, seconds: float, calls: int = 1) -> None:
+        """
+        Registra una etapa ya medida (p.ej. la parte de regex de un bloque).
+
+        Se registra como etapa raíz, pero su tiempo se descuenta de la etapa
+        abierta: parsear desde un generador dentro de "aggregate" no infla
+        el tiempo propio de la agregación.
+        """
+        self._record((name,), seconds, seconds, calls)
+
+    def report(self) -> List[Tuple[str, float, int]]:
+        """Retorna (etapa, segundos acumulados, llamadas) ordenado por tiempo."""
+        rows = [(name, t[0], int(t[1])) for name, t in self.cumulative.items()]
+        return sorted(rows, key=lambda row: row[1], reverse=True)
+
+    def format_report(self) -> str:
+        """Retorna el informe de etapas como tabla de texto."""
+        rows = self.report()
+        width = max([len("Etapa")] + [len(name) for name, _, _ in rows])
+        lines = [f"{'Etapa':<{width}}  {'Segundos':>10}  {'Llamadas':>10}"]
+        for name, seconds, calls in rows:
+            lines.append(f"{name:<{width}}  {seconds:>10.4f}  {calls:>10}")
+        return "\n".join(lines)
+
+    def collapsed_stacks(self) -> str:
+        """
+        Retorna el tiempo propio en formato collapsed stacks (flamegraph.pl,
+        speedscope): "etapa;subetapa microsegundos" por línea.
+        """
+        lines = []
+        for path, seconds in sorted(self.self_times.items()):
+            frames = ";".join(part.replace(".", ";") for part in path)
+            lines.append(f"{frames} {max(int(seconds * 1_000_000), 0)}")
+        return "\n".join(lines) + "\n"
+
+
+_active: Optional[Profiler] = None
+
+
+def active() -> Optional[Profiler]:
+    """Retorna el Profiler activo, o None si no se está perfilando."""
+    return _active
+
+
+@contextmanager
+def profile(
+    cprofile_path: Optional[str] = None, collapsed_path: Optional[str] = None
+) -> Iterator[Profiler]:
+    """
+    Activa la instrumentación por etapas dentro del bloque.
+
+    Args:
+        cprofile_path: Si se indica, ejecuta también cProfile y guarda las
+            estadísticas (pstats) en esta ruta
+        collapsed_path: Si se indica, guarda las etapas en formato collapsed
+            stacks al terminar
+    """
+    global _active
+    profiler = Profiler()
+    previous = _active
+    _active = profiler
+    cprof = None
+    if cprofile_path:
+        import cProfile
+
+        cprof = cProfile.Profile()
+    if cprof is not None:
+        cprof.enable()
+    try:
+        yield profiler
+    finally:
+        if cprof is not None:
+            cprof.disable()
+            cprof.dump_stats(cprofile_path)
+        _active = previous
+        if collapsed_path:
+            with open(collapsed_path, "w", encoding="utf-8") as f:
+                f.write(profiler.collapsed_stacks())
+
+
+@contextmanager
+def stage(name: str, calls: int = 1) -> Iterator[None]:
+    """Mide el bloque como etapa si hay un Profiler activo; si no, no hace nada."""
+    profiler = _active
+    if profiler is None:
+        yield
+        return
+    with profiler.stage(name, calls):
+        yield
+
+
+def _timed_generator(profiler: Profiler, name: str, gen: Iterator) -> Iterator:
+    """Mide como etapa cada avance de gen, sin el tiempo del consumidor."""
+    calls = 1
+    try:
+        while True:
+            with profiler.stage(name, calls):
+                try:
+                    item = next(gen)
+                except StopIteration:
+                    return
+            calls = 0
+            yield item
+    finally:
+        gen.close()
+
+
+def instrument(prefix: str, exclude: Iterable[str] = ()):
+    """
+    Decorador de clase: mide cada método público como etapa "prefix.método".
+
+    En los generadores se mide la iteración (cada avance, no la creación)
+    y cuenta una llamada por generador. Los métodos asíncronos y los de
+    exclude se dejan sin instrumentar: ahí van los que se llaman por cada
+    entrada, que no deben pagar ni la consulta al Profiler activo.
+    """
+    skip = frozenset(exclude)
+
+    def wrap(method):
+        name = f"{prefix}.{method.__name__}"
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            profiler = _active
+            if profiler is None:
+                return method(*args, **kwargs)
+            with profiler.stage(name):
+                return method(*args, **kwargs)
+
+        return wrapper
+
+    def wrap_generator(method):
+        name = f"{prefix}.{method.__name__}"
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            profiler = _active
+            if profiler is None:
+                return method(*args, **kwargs)
+            return _timed_generator(profiler, name, method(*args, **kwargs))
+
+        return wrapper
+
+    def decorate(cls):
+        for attr, value in list(vars(cls).items()):
+            if attr.startswith("_") or attr in skip or not inspect.isfunction(value):
+                continue
+            if inspect.iscoroutinefunction(value) or inspect.isasyncgenfunction(value):
+                continue
+            if inspect.isgeneratorfunction(value):
+                setattr(cls, attr, wrap_generator(value))
+            else:
+                setattr(cls, attr, wrap(value))
+        return cls
+
+    return decorate
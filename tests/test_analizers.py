@@ -1,7 +1,11 @@
 import pytest
 from datetime import datetime
 from collections import Counter
+from src.analyzers.filters import filter_status, parse_status_spec
 from src.analyzers.log_analyzer import LogAnalyzer
+from src.analyzers.pipeline import EntryFilter, run_pipeline
+from src.parsers.nginx_parser import NginxParser
+from src.parsers.parse_stats import ParseStats
 from src.models.log_entry import LogEntry
 
 
@@ -565,4 +569,147 @@ class TestEdgeCases:
         assert analyzer.total_success() == 0
 
 
+# ============================================================================
+# FASE 14: Tests de Filtros por Status
+# ============================================================================
+
+class TestStatusFilters:
+    """Tests para parse_status_spec y filter_status."""
+
+    def test_status_class(self):
+        """Test 46: "5xx" incluye todos los códigos 500-599."""
+        codes = parse_status_spec("5xx")
+
+        assert len(codes) == 100
+        assert 500 in codes and 599 in codes
+        assert 404 not in codes
+
+    def test_status_list(self):
+        """Test 47: Acepta listas que mezclan clases y códigos exactos."""
+        codes = parse_status_spec("4xx, 500")
+
+        assert 404 in codes
+        assert 500 in codes
+        assert 501 not in codes
+
+    @pytest.mark.parametrize("spec", ["9xx", "abc", "600", "5x", ""])
+    def test_invalid_status_spec(self, spec):
+        """Test 48: Un status inválido lanza ValueError."""
+        with pytest.raises(ValueError):
+            parse_status_spec(spec)
+
+    def test_filter_status(self):
+        """Test 49: filter_status conserva solo los códigos pedidos."""
+        entries = [
+            LogEntry("192.168.1.1", datetime.now(), "GET", "/", status, 100)
+            for status in (200, 404, 500, 503)
+        ]
+
+        result = list(filter_status(entries, parse_status_spec("5xx")))
+
+        assert [e.status_code for e in result] == [500, 503]
+
+
+# ============================================================================
+# FASE 15: Tests de LogAggregate (agregación en una pasada)
+# ============================================================================
+
+class TestLogAggregate:
+    """Tests para LogAggregate y LogAnalyzer.aggregate."""
+
+    def test_matches_analyzer(self, sample_entries):
+        """Test 50: Las métricas agregadas coinciden con las de LogAnalyzer."""
+        analyzer = LogAnalyzer(sample_entries)
+
+        aggregate = analyzer.aggregate()
+
+        assert aggregate.get_summary() == analyzer.get_summary()
+        assert dict(aggregate.status_counts) == analyzer.get_status_counts()
+        assert aggregate.top_ips(3) == analyzer.top_ips(3)
+        assert aggregate.requests_by_hour() == dict(sorted(analyzer.requests_by_hour().items()))
+        assert aggregate.client_errors == analyzer.client_error_count()
+        assert aggregate.server_errors == analyzer.server_error_count()
+
+    def test_merge(self, sample_entries):
+        """Test 51: Unir dos agregados parciales equivale a agregar todo junto."""
+        half = len(sample_entries) // 2
+        left = LogAnalyzer(sample_entries[:half]).aggregate()
+        right = LogAnalyzer(sample_entries[half:]).aggregate()
+
+        left.merge(right)
+
+        full = LogAnalyzer(sample_entries).aggregate()
+        assert left.get_summary() == full.get_summary()
+        assert left.path_counts == full.path_counts
+        assert (left.first_seen, left.last_seen) == (full.first_seen, full.last_seen)
+
+    def test_empty_aggregate(self):
+        """Test 52: Un agregado vacío tiene todo a cero."""
+        aggregate = LogAnalyzer([]).aggregate()
+
+        assert aggregate.total_requests == 0
+        assert aggregate.error_rate == 0.0
+        assert aggregate.first_seen is None
+
+
+# ============================================================================
+# FASE 16: Tests del Pipeline de Análisis en Streaming
+# ============================================================================
+
+class TestPipeline:
+    """Tests para EntryFilter y run_pipeline."""
+
+    def test_filter_errors_only(self, sample_entries):
+        """Test 53: errors_only deja pasar solo las entradas con error."""
+        result = list(EntryFilter(errors_only=True).apply(sample_entries))
+
+        assert result
+        assert all(e.is_error for e in result)
+
+    def test_filter_date_range(self, sample_entries):
+        """Test 54: El rango de fechas es semiabierto [start, end)."""
+        start = datetime(2024, 11, 26, 9, 0, 0)
+        end = datetime(2024, 11, 26, 10, 0, 0)
+
+        result = list(EntryFilter(start=start, end=end).apply(sample_entries))
+
+        assert result
+        assert all(start <= e.timestamp < end for e in result)
+
+    def test_filter_naive_bounds_on_aware_entries(self):
+        """Test 55: Límites sin zona horaria se comparan en la zona de las entradas."""
+        entries = list(NginxParser().parse_file("fixtures/nginx_sample.log"))
+
+        result = list(EntryFilter(start=datetime(2024, 11, 26, 12, 0, 0)).apply(entries))
+
+        assert result
+        assert all(e.timestamp.hour >= 12 for e in result)
+
+    def test_pipeline_matches_analyzer(self):
+        """Test 56: run_pipeline da las mismas métricas que LogAnalyzer."""
+        parser = NginxParser()
+        stats = ParseStats()
+
+        aggregate = run_pipeline([("fixtures/nginx_sample.log", parser)], stats=stats)
+
+        analyzer = LogAnalyzer(list(parser.parse_file("fixtures/nginx_sample.log")))
+        assert aggregate.get_summary() == analyzer.get_summary()
+        assert stats.lines_parsed == analyzer.total_requests()
+
+    def test_pipeline_workers(self, tmp_path):
+        """Test 57: Con varios workers el resultado es el mismo."""
+        log = tmp_path / "access.log"
+        log.write_text(open("fixtures/nginx_sample.log").read() * 20)
+        parser = NginxParser()
+        parser.BLOCK_SIZE = 4096
+        progress = []
+
+        serial = run_pipeline([(str(log), parser)], EntryFilter(errors_only=True))
+        parallel = run_pipeline(
+            [(str(log), parser)], EntryFilter(errors_only=True), workers=2,
+            progress=progress.append,
+        )
 
+        assert parallel.get_summary() == serial.get_summary()
+        assert parallel.ip_counts == serial.ip_counts
+        assert sum(progress) == log.stat().st_size
@@ -1,9 +1,13 @@
+import asyncio
 import pytest
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Optional
 from abc import ABC
-from src.parsers.base_parser import BaseParser
+from src.parsers.base_parser import BaseParser, read_blocks
 from src.models.log_entry import LogEntry
+from src.parsers.parse_stats import SKIP_INVALID, ParseStats
+from src.analyzers.log_analyzer import LogAnalyzer
 from datetime import datetime
 
 # ============================================================================
@@ -396,6 +400,165 @@ class TestPerformance:
         assert isinstance(first, LogEntry)
 
 
+# ============================================================================
+# FASE 9: Tests de la API por Lotes (parse_lines / parse_block)
+# ============================================================================
+
+
+class TestBatchAPI:
+    """Tests para parse_lines, parse_block y la lectura por bloques."""
+
+    def test_parse_lines_returns_entries(self):
+        """Test 26: parse_lines parsea un lote y salta líneas inválidas."""
+        parser = DummyParser()
+        lines = Path("fixtures/test_base_mixed.log").read_text().splitlines()
+
+        entries = parser.parse_lines(lines)
+
+        assert [e.ip for e in entries] == ["192.168.1.1", "192.168.1.2", "192.168.1.3"]
+
+    def test_parse_lines_skips_value_errors(self):
+        """Test 27: parse_lines ignora las líneas que lanzan ValueError."""
+
+        class RaisingParser(DummyParser):
+            def parse_line(self, line):
+                if "BREAK" in line:
+                    raise ValueError("Línea problemática")
+                return super().parse_line(line)
+
+        lines = ["BREAK", "192.168.1.1|2024-11-26T12:00:00+00:00|GET|/|200|10"]
+
+        assert len(RaisingParser().parse_lines(lines)) == 1
+
+    def test_parse_block_decodes_bytes(self):
+        """Test 28: parse_block acepta bytes con varias líneas."""
+        parser = DummyParser()
+        block = Path("fixtures/test_base_simple.log").read_bytes()
+
+        assert len(parser.parse_block(block)) == 3
+
+    def test_parse_block_rejects_invalid_utf8(self):
+        """Test 29: Las líneas con UTF-8 inválido se cuentan como inválidas."""
+        parser = DummyParser()
+        block = b"\xff\xfe basura\n192.168.1.1|2024-11-26T12:00:00+00:00|GET|/|200|10\n"
+        stats = ParseStats(sample_size=5)
+
+        assert len(parser.parse_block(block, stats)) == 1
+        assert stats.lines_read == 2
+        assert stats.skipped == {SKIP_INVALID: 1}
+        assert stats.rejected_sample == [(SKIP_INVALID, "\ufffd\ufffd basura")]
+
+    def test_read_blocks_splits_on_line_boundaries(self, tmp_path):
+        """Test 30: read_blocks nunca corta una línea entre dos bloques."""
+        log = tmp_path / "big.log"
+        lines = [f"linea-{i:05d}" for i in range(2000)]
+        log.write_text("\n".join(lines))
+
+        blocks = list(read_blocks(log, block_size=100))
+
+        assert len(blocks) > 1
+        assert all(b.endswith(b"\n") for b in blocks[:-1])
+        assert b"".join(blocks).decode().split("\n") == lines
+
+    def test_parse_file_with_small_blocks(self):
+        """Test 31: parse_file da el mismo resultado con bloques pequeños."""
+        parser = DummyParser()
+        parser.BLOCK_SIZE = 16
+
+        entries = list(parser.parse_file(Path("fixtures/test_base_mixed.log")))
+
+        assert len(entries) == 3
+
+
+# ============================================================================
+# FASE 10: Tests de la API Asíncrona
+# ============================================================================
+
+
+class TestAsyncAPI:
+    """Tests para aparse_file y aparse_blocks."""
+
+    def test_aparse_file_yields_same_entries(self):
+        """Test 32: aparse_file genera las mismas entradas que parse_file."""
+        parser = DummyParser()
+        test_file = Path("fixtures/test_base_mixed.log")
+
+        async def collect():
+            return [entry async for entry in parser.aparse_file(test_file)]
+
+        assert asyncio.run(collect()) == list(parser.parse_file(test_file))
+
+    def test_aparse_file_with_process_pool(self):
+        """Test 33: aparse_file puede parsear en un pool de procesos."""
+        parser = DummyParser()
+        parser.BLOCK_SIZE = 64
+        test_file = Path("fixtures/test_base_mixed.log")
+
+        async def collect():
+            with ProcessPoolExecutor(max_workers=2) as pool:
+                return [e async for e in parser.aparse_file(test_file, executor=pool)]
+
+        assert [e.ip for e in asyncio.run(collect())] == [
+            "192.168.1.1",
+            "192.168.1.2",
+            "192.168.1.3",
+        ]
+
+    def test_aparse_file_collects_stats(self):
+        """Test 34: aparse_file acumula estadísticas de todos los bloques."""
+        parser = DummyParser()
+        parser.BLOCK_SIZE = 16
+        stats = ParseStats(sample_size=5)
+
+        async def collect():
+            return [
+                e
+                async for e in parser.aparse_file(
+                    Path("fixtures/test_base_mixed.log"), stats=stats
+                )
+            ]
+
+        entries = asyncio.run(collect())
+
+        assert stats.lines_read == 6
+        assert stats.lines_parsed == len(entries) == 3
+        assert len(stats.rejected_sample) == 2
+
+    def test_aparse_blocks_applies_backpressure(self, tmp_path):
+        """Test 35: Sin consumir, no se leen más de `prefetch` bloques."""
+        log = tmp_path / "big.log"
+        line = "192.168.1.1|2024-11-26T12:00:00+00:00|GET|/|200|10\n"
+        log.write_text(line * 1000)
+        parser = DummyParser()
+        parser.BLOCK_SIZE = len(line) * 10
+        stats = ParseStats()
+
+        async def first_batch():
+            batches = parser.aparse_blocks(log, prefetch=2, stats=stats)
+            batch = await batches.__anext__()
+            await asyncio.sleep(0.05)
+            await batches.aclose()
+            return batch
+
+        batch = asyncio.run(first_batch())
+
+        assert len(batch) == 10
+        assert stats.lines_read == 10
+
+    def test_analyzer_feed(self):
+        """Test 36: LogAnalyzer.feed consume un iterable asíncrono."""
+        parser = DummyParser()
+        analyzer = LogAnalyzer([])
+
+        async def run():
+            return await analyzer.feed(
+                parser.aparse_file(Path("fixtures/test_base_simple.log"))
+            )
+
+        assert asyncio.run(run()) == 3
+        assert analyzer.total_requests() == 3
+
+
 # ============================================================================
 # FIXTURES PARA CREAR ARCHIVOS DE TEST
 # ============================================================================
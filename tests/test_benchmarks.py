@@ -0,0 +1,126 @@
+import pytest
+import json
+import multiprocessing
+import os
+import time
+from click.testing import CliRunner
+from benchmarks.log_generator import generate_lines, generate_nginx_log
+from benchmarks.run import _wait_result, build_cases, compare_results, main
+from src.parsers.nginx_parser import NginxParser
+
+# ============================================================================
+# FASE 1: Tests del Generador de Logs Sintéticos
+# ============================================================================
+
+
+class TestLogGenerator:
+    """Tests del generador determinista de logs nginx."""
+
+    def test_generator_is_deterministic(self):
+        """Test 1: La misma semilla genera exactamente el mismo log."""
+        assert list(generate_lines(200, seed=7)) == list(generate_lines(200, seed=7))
+
+    def test_different_seeds_differ(self):
+        """Test 2: Semillas distintas generan logs distintos."""
+        assert list(generate_lines(50, seed=1)) != list(generate_lines(50, seed=2))
+
+    def test_generated_lines_are_parseable(self, tmp_path):
+        """Test 3: Todas las líneas generadas son nginx válidas."""
+        log = generate_nginx_log(tmp_path / "bench.log", 500)
+
+        assert len(list(NginxParser().parse_file(log))) == 500
+
+    def test_cardinality_is_respected(self, tmp_path):
+        """Test 4: El número de IPs y rutas distintas no supera lo pedido."""
+        log = generate_nginx_log(
+            tmp_path / "bench.log", 2000, ip_cardinality=10, path_cardinality=5
+        )
+        entries = list(NginxParser().parse_file(log))
+
+        assert len({e.ip for e in entries}) <= 10
+        assert len({e.path for e in entries}) <= 5
+
+    def test_error_ratio(self, tmp_path):
+        """Test 5: La proporción de errores se aproxima a error_ratio."""
+        log = generate_nginx_log(tmp_path / "bench.log", 5000, error_ratio=0.3)
+        entries = list(NginxParser().parse_file(log))
+
+        ratio = sum(1 for e in entries if e.status_code >= 400) / len(entries)
+        assert ratio == pytest.approx(0.3, abs=0.03)
+
+
+# ============================================================================
+# FASE 2: Tests del Runner y la Comparación
+# ============================================================================
+
+
+class TestBenchmarkRunner:
+    """Tests del runner de benchmarks y la detección de regresiones."""
+
+    def test_cases_cover_parse_analyze_and_format(self):
+        """Test 6: Hay casos de parseo, análisis y formateo."""
+        names = build_cases()
+
+        assert "parse.nginx" in names
+        assert "analyze.top_ips" in names
+        assert "format.json.format_top_ips" in names
+
+    def test_run_writes_json(self, tmp_path):
+        """Test 7: run guarda los resultados en JSON."""
+        output = tmp_path / "results.json"
+
+        result = CliRunner().invoke(
+            main,
+            [
+                "run",
+                "--lines",
+                "200",
+                "--repeat",
+                "1",
+                "--filter",
+                "parse.",
+                "--output",
+                str(output),
+            ],
+        )
+
+        assert result.exit_code == 0
+        report = json.loads(output.read_text())
+        assert report["meta"]["params"]["lines"] == 200
+        assert report["results"][0]["name"] == "parse.nginx"
+        assert report["results"][0]["items_per_sec"] > 0
+        assert report["results"][0]["peak_rss_kb"] > 0
+
+    def test_compare_detects_regression(self):
+        """Test 8: compare_results detecta casos más lentos que el umbral."""
+        base = {
+            "results": [
+                {"name": "a", "items_per_sec": 100.0},
+                {"name": "b", "items_per_sec": 100.0},
+            ]
+        }
+        new = {
+            "results": [
+                {"name": "a", "items_per_sec": 80.0},
+                {"name": "b", "items_per_sec": 95.0},
+            ]
+        }
+
+        assert compare_results(base, new, threshold=0.1) == [("a", 0.8)]
+
+    @pytest.mark.parametrize(
+        "target, args, timeout, error",
+        [(os._exit, (3,), 30.0, "código 3"), (time.sleep, (30,), 0.5, "sin resultado")],
+    )
+    def test_dead_or_hung_case(self, target, args, timeout, error):
+        """Test 9: Un caso que muere o se cuelga da un error en vez de bloquear."""
+        ctx = multiprocessing.get_context("spawn")
+        queue = ctx.Queue()
+        process = ctx.Process(target=target, args=args)
+        process.start()
+
+        result = _wait_result("caso", process, queue, timeout)
+        process.join()
+
+        assert result["name"] == "caso"
+        assert error in result["error"]
@@ -0,0 +1,885 @@
+import pytest
+import importlib
+import json
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from click.testing import CliRunner
+from src.cli.commands import cli
+from src.cli.metrics_server import MetricsServer
+from src.parsers.nginx_parser import NginxParser
+
+
+@pytest.fixture
+def runner():
+    """Fixture que retorna un CliRunner de click."""
+    return CliRunner()
+
+
+# ============================================================================
+# FASE 1: Tests del Comando stats
+# ============================================================================
+
+
+class TestStatsCommand:
+    """Tests para `logparse stats`."""
+
+    def test_stats_shows_counts(self, runner):
+        """Test 1: stats muestra líneas leídas y parseadas."""
+        result = runner.invoke(cli, ["stats", "fixtures/nginx_sample.log"])
+
+        assert result.exit_code == 0
+        assert "Líneas leídas" in result.output
+        assert "Líneas parseadas" in result.output
+
+    def test_stats_shows_rejected_sample(self, runner, tmp_path):
+        """Test 2: stats muestra una muestra de líneas rechazadas."""
+        log = tmp_path / "access.log"
+        lines = open("fixtures/nginx_sample.log").read().splitlines()
+        log.write_text("\n".join(lines + ["linea rota"]))
+
+        result = runner.invoke(cli, ["stats", str(log), "--sample", "3"])
+
+        assert result.exit_code == 0
+        assert "[no_match] linea rota" in result.output
+
+    def test_stats_unknown_format(self, runner):
+        """Test 3: stats avisa de archivos con formato no reconocido."""
+        result = runner.invoke(cli, ["stats", "fixtures/test_base_only_invalid.log"])
+
+        assert result.exit_code == 0
+        assert "Formato no reconocido" in result.output
+
+    def test_stats_missing_file(self, runner):
+        """Test 4: stats falla con un archivo inexistente."""
+        result = runner.invoke(cli, ["stats", "fixtures/no_existe.log"])
+
+        assert result.exit_code != 0
+
+
+# ============================================================================
+# FASE 2: Tests de --profile
+# ============================================================================
+
+
+class TestProfileOption:
+    """Tests para las opciones de perfilado del CLI."""
+
+    def test_profile_prints_stages(self, runner):
+        """Test 5: --profile muestra el tiempo por etapa."""
+        result = runner.invoke(cli, ["--profile", "stats", "fixtures/nginx_sample.log"])
+
+        assert result.exit_code == 0
+        assert "parse.regex" in result.output
+
+    def test_profile_collapsed_file(self, runner, tmp_path):
+        """Test 6: --profile-collapsed guarda las etapas en un archivo."""
+        folded = tmp_path / "stages.folded"
+
+        result = runner.invoke(
+            cli,
+            ["--profile-collapsed", str(folded), "stats", "fixtures/nginx_sample.log"],
+        )
+
+        assert result.exit_code == 0
+        assert "parse;validation" in folded.read_text()
+
+
+# ============================================================================
+# FASE 3: Tests del Servidor de Métricas (serve)
+# ============================================================================
+
+
+class TestMetricsServer:
+    """Tests del servidor /metrics usado por `logparse serve`."""
+
+    def test_metrics_endpoint(self, tmp_path):
+        """Test 7: /metrics expone las métricas de los logs seguidos."""
+        log = tmp_path / "access.log"
+        log.write_text(open("fixtures/nginx_sample.log").read())
+        server = MetricsServer(
+            [str(log)], [NginxParser()], port=0, poll_interval=0.01, from_start=True
+        )
+        server.start()
+        try:
+            host, port = server.address[:2]
+            threading.Thread(target=server.httpd.serve_forever, daemon=True).start()
+            deadline = time.time() + 5
+            body = ""
+            while "logparse_lines_read_total 90" not in body and time.time() < deadline:
+                body = (
+                    urllib.request.urlopen(f"http://{host}:{port}/metrics")
+                    .read()
+                    .decode()
+                )
+                time.sleep(0.02)
+        finally:
+            server.shutdown()
+
+        assert "logparse_lines_read_total 90" in body
+        assert 'logparse_requests_total{status="200"}' in body
+
+    def test_unknown_path_returns_404(self):
+        """Test 8: Rutas distintas de /metrics responden 404."""
+        server = MetricsServer([], [], port=0)
+        threading.Thread(target=server.httpd.serve_forever, daemon=True).start()
+        host, port = server.address[:2]
+        try:
+            with pytest.raises(urllib.error.HTTPError) as exc:
+                urllib.request.urlopen(f"http://{host}:{port}/otra")
+        finally:
+            server.shutdown()
+
+        assert exc.value.code == 404
+
+
+# ============================================================================
+# FASE 4: Tests del Comando export
+# ============================================================================
+
+
+class TestExportCommand:
+    """Tests para `logparse export`."""
+
+    def test_export_jsonl_filtered(self, runner):
+        """Test 9: export --status filtra las entradas exportadas."""
+        result = runner.invoke(
+            cli, ["export", "fixtures/nginx_sample.log", "--status", "4xx"]
+        )
+
+        assert result.exit_code == 0
+        rows = [json.loads(line) for line in result.stdout.splitlines()]
+        assert rows
+        assert all(400 <= row["status_code"] < 500 for row in rows)
+
+    def test_export_csv_file(self, runner, tmp_path):
+        """Test 10: export --format csv --output-file escribe el CSV en disco."""
+        out = tmp_path / "errors.csv"
+
+        result = runner.invoke(
+            cli,
+            [
+                "export",
+                "fixtures/nginx_sample.log",
+                "--status",
+                "404",
+                "--format",
+                "csv",
+                "--output-file",
+                str(out),
+            ],
+        )
+
+        assert result.exit_code == 0
+        lines = out.read_text().splitlines()
+        assert lines[0].startswith("ip,timestamp,method")
+        assert all(",404," in line for line in lines[1:])
+
+    def test_export_invalid_status(self, runner):
+        """Test 11: Un --status inválido termina con error."""
+        result = runner.invoke(
+            cli, ["export", "fixtures/nginx_sample.log", "--status", "9xx"]
+        )
+
+        assert result.exit_code != 0
+        assert "Status inválido" in result.output
+
+    def test_export_parquet_needs_output_file(self, runner):
+        """Test 12: --format parquet sin --output-file termina con error."""
+        result = runner.invoke(
+            cli, ["export", "fixtures/nginx_sample.log", "--format", "parquet"]
+        )
+
+        assert result.exit_code != 0
+        assert "--output-file" in result.output
+
+
+# ============================================================================
+# FASE 5: Tests del Comando analyze
+# ============================================================================
+
+
+class TestAnalyzeCommand:
+    """Tests para `logparse analyze`."""
+
+    def test_analyze_table(self, runner):
+        """Test 13: analyze muestra el informe en tablas por defecto."""
+        result = runner.invoke(cli, ["analyze", "fixtures/nginx_sample.log"])
+
+        assert result.exit_code == 0
+        assert "Top IPs" in result.stdout
+        assert "192.168.1.100" in result.stdout
+        assert "89 requests analizadas" in result.stderr
+
+    def test_analyze_json_top_ips(self, runner):
+        """Test 14: --output json y --top-ips controlan el informe."""
+        result = runner.invoke(
+            cli,
+            [
+                "analyze",
+                "fixtures/nginx_sample.log",
+                "--output",
+                "json",
+                "--top-ips",
+                "2",
+            ],
+        )
+
+        assert result.exit_code == 0
+        report = json.loads(result.stdout)
+        assert report["summary"]["total_requests"] == 89
+        assert report["top_ips"][0] == {"ip": "192.168.1.100", "count": 8}
+        assert len(report["top_ips"]) == 2
+
+    def test_analyze_filters(self, runner):
+        """Test 15: --errors-only, --start y --end filtran antes de agregar."""
+        result = runner.invoke(
+            cli,
+            [
+                "analyze",
+                "fixtures/nginx_sample.log",
+                "--output",
+                "json",
+                "--errors-only",
+                "--start",
+                "2024-11-26T09:00:00",
+                "--end",
+                "2024-11-26",
+            ],
+        )
+
+        assert result.exit_code == 0
+        summary = json.loads(result.stdout)["summary"]
+        assert 0 < summary["total_requests"] == summary["total_errors"]
+
+    def test_analyze_output_file(self, runner, tmp_path):
+        """Test 16: --output-file escribe el informe en disco."""
+        out = tmp_path / "report.md"
+
+        result = runner.invoke(
+            cli,
+            [
+                "analyze",
+                "fixtures/nginx_sample.log",
+                "--output",
+                "markdown",
+                "--output-file",
+                str(out),
+                "--workers",
+                "2",
+            ],
+        )
+
+        assert result.exit_code == 0
+        assert out.read_text().startswith("# Informe de logs")
+
+
+# ============================================================================
+# FASE 6: Tests de Tiempo de Arranque (imports perezosos)
+# ============================================================================
+
+# Presupuesto de módulos importados por `analyze small.log --output json`.
+# Se cuentan módulos y no milisegundos: el número no depende de la carga de
+# la máquina. Medido: ~150 módulos (27 del proyecto) con imports perezosos,
+# ~250 importando todo al arrancar.
+IMPORT_BUDGET_MODULES = 190
+IMPORT_BUDGET_PROJECT_MODULES = 35
+
+# Lo mismo que ejecuta el script `logparse` que instala [project.scripts]
+ENTRY_POINT = "import sys; from src.cli.commands import cli; sys.exit(cli())"
+
+HEAVY_MODULES = (
+    "rich",
+    "asyncio",
+    "aiohttp",
+    "concurrent.futures",
+    "cProfile",
+    "pyarrow",
+    "numpy",
+    "src.formatters.table_formatter",
+    "src.formatters.markdown_formatter",
+    "src.formatters.csv_formatter",
+    "src.formatters.parquet_formatter",
+    "src.analyzers.geoip",
+    "src.analyzers.group_by",
+    "src.analyzers.sessionizer",
+    "src.analyzers.spike_detector",
+    "src.analyzers.timeseries",
+    "src.analyzers.user_agents",
+)
+
+
+def import_times(*args, code=ENTRY_POINT):
+    """
+    Ejecuta `logparse *args` (o code) con `python -X importtime` y retorna
+    los módulos importados con su tiempo acumulado en microsegundos.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code, *args],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+
+class TestStartupTime:
+    """Tests de regresión del tiempo de importación de la CLI."""
+
+    def test_help_imports_no_parsers(self):
+        """Test 17: `--help` no importa parsers ni formatters."""
+        modules = import_times("--help")
+
+        assert not [
+            m for m in modules if m.startswith(("src.parsers", "src.formatters"))
+        ]
+        assert not [m for m in modules if m.split(".")[0] in ("rich", "asyncio")]
+
+    def test_analyze_json_skips_heavy_modules(self):
+        """Test 18: `analyze --output json` no importa rich, pyarrow ni otros formatters."""
+        modules = import_times(
+            "analyze", "fixtures/nginx_sample.log", "--output", "json"
+        )
+
+        loaded = [m for m in modules if m.startswith(HEAVY_MODULES)]
+        assert loaded == []
+        assert "src.formatters.json_formatter" in modules
+
+    def test_analyze_json_import_budget(self):
+        """Test 19: `analyze --output json` importa menos módulos que el presupuesto."""
+        modules = import_times(
+            "analyze", "fixtures/nginx_sample.log", "--output", "json"
+        )
+
+        project = [m for m in modules if m.split(".")[0] == "src"]
+        assert len(modules) < IMPORT_BUDGET_MODULES
+        assert len(project) < IMPORT_BUDGET_PROJECT_MODULES
+
+
+# ============================================================================
+# FASE 7: Tests del Comando detect
+# ============================================================================
+
+
+class TestDetectCommand:
+    """Tests para `logparse detect`."""
+
+    def test_detect_text_report(self, runner):
+        """Test 20: detect resume los hallazgos por categoría e IP."""
+        result = runner.invoke(cli, ["detect", "fixtures/nginx_sample.log"])
+
+        assert result.exit_code == 0
+        assert "path_traversal: 1" in result.output
+        assert "192.168.1.117" in result.output
+        assert "[sensitive_env]" in result.output
+
+    def test_detect_json_with_rate_spikes(self, runner):
+        """Test 21: --output json incluye los picos con un umbral bajo."""
+        result = runner.invoke(
+            cli,
+            [
+                "detect",
+                "fixtures/nginx_sample.log",
+                "--output",
+                "json",
+                "--rate-window",
+                "3600",
+                "--rate-threshold",
+                "5",
+            ],
+        )
+
+        assert result.exit_code == 0
+        report = json.loads(result.stdout)
+        assert report["by_category"]["rate"] >= 1
+        assert any(f["kind"] == "rate" for f in report["findings"])
+
+    def test_detect_skips_heavy_modules(self):
+        """Test 22: detect no importa rich ni formatters."""
+        modules = import_times("detect", "fixtures/nginx_sample.log")
+
+        assert [m for m in modules if m.startswith(HEAVY_MODULES)] == []
+
+
+# ============================================================================
+# FASE 8: Tests del Comando watch
+# ============================================================================
+
+
+def brute_force_log(path):
+    """Escribe un log con 15 logins fallidos de una IP y 5 de otra."""
+    lines = [
+        f'203.0.113.7 - - [26/Nov/2024:10:00:{i:02d} +0000] "POST /api/login HTTP/1.1" 401 20 "-" "curl/8.0"'
+        for i in range(15)
+    ] + [
+        f'198.51.100.2 - - [26/Nov/2024:10:00:{i:02d} +0000] "POST /api/login HTTP/1.1" 401 20 "-" "curl/8.0"'
+        for i in range(5)
+    ]
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+class TestWatchCommand:
+    """Tests para `logparse watch` en modo lotes."""
+
+    def test_watch_alerts_brute_force(self, runner, tmp_path):
+        """Test 23: watch alerta de la IP que supera el umbral en /api/login."""
+        log = brute_force_log(tmp_path / "access.log")
+        result = runner.invoke(cli, ["watch", log, "--no-follow", "--threshold", "10"])
+
+        assert result.exit_code == 0
+        assert "ALERTA 203.0.113.7: 10 requests en 60s" in result.output
+        assert "198.51.100.2" not in result.output
+        assert "  203.0.113.7: 15" in result.output
+
+    def test_watch_status_filter(self, runner, tmp_path):
+        """Test 24: Solo cuentan los códigos de --status."""
+        log = brute_force_log(tmp_path / "access.log")
+        result = runner.invoke(cli, ["watch", log, "--no-follow", "--status", "5xx"])
+
+        assert result.exit_code == 0
+        assert "ALERTA" not in result.output
+        assert "al final: 0" in result.output
+
+    def test_watch_invalid_status(self, runner, tmp_path):
+        """Test 25: Un --status inválido es un error de uso."""
+        log = brute_force_log(tmp_path / "access.log")
+        result = runner.invoke(cli, ["watch", log, "--no-follow", "--status", "abc"])
+
+        assert result.exit_code == 2
+
+
+# ============================================================================
+# FASE 9: Tests del Comando sessions
+# ============================================================================
+
+
+class TestSessionsCommand:
+    """Tests para `logparse sessions`."""
+
+    def test_sessions_text(self, runner):
+        """Test 26: sessions muestra sesiones, duración y rebote."""
+        result = runner.invoke(cli, ["sessions", "fixtures/nginx_sample.log"])
+
+        assert result.exit_code == 0
+        assert "Sesiones:" in result.output
+        assert "Tasa de rebote:" in result.output
+
+    def test_sessions_json_gap(self, runner):
+        """Test 27: Con un gap mayor hay menos sesiones o las mismas."""
+        counts = []
+        for gap in ("1", "120"):
+            result = runner.invoke(
+                cli,
+                [
+                    "sessions",
+                    "fixtures/nginx_sample.log",
+                    "--gap",
+                    gap,
+                    "--output",
+                    "json",
+                ],
+            )
+            assert result.exit_code == 0
+            counts.append(json.loads(result.output)["sessions"])
+
+        assert counts[1] <= counts[0]
+
+
+# ============================================================================
+# FASE 10: Tests del Comando timeline
+# ============================================================================
+
+
+class TestTimelineCommand:
+    """Tests para `logparse timeline`."""
+
+    def test_timeline_json(self, runner):
+        """Test 28: timeline --output json suma todas las requests del log."""
+        result = runner.invoke(
+            cli,
+            [
+                "timeline",
+                "fixtures/nginx_sample.log",
+                "--resolution",
+                "1h",
+                "--output",
+                "json",
+            ],
+        )
+
+        assert result.exit_code == 0
+        buckets = json.loads(result.output)
+        assert [b["requests"] for b in buckets] == [20, 19, 15, 14, 21]
+        assert set(buckets[0]) == {
+            "start",
+            "requests",
+            "errors",
+            "bytes",
+            "p50",
+            "p95",
+            "p99",
+        }
+
+    def test_timeline_csv_skip_empty(self, runner):
+        """Test 29: --skip-empty omite los intervalos sin tráfico."""
+        args = [
+            "timeline",
+            "fixtures/nginx_sample.log",
+            "--resolution",
+            "1m",
+            "--output",
+            "csv",
+        ]
+        full = runner.invoke(cli, args).output.splitlines()
+        sparse = runner.invoke(cli, args + ["--skip-empty"]).output.splitlines()
+
+        assert sparse[0] == "start,requests,errors,bytes,p50,p95,p99"
+        assert len(sparse) < len(full)
+
+    def test_timeline_invalid_resolution(self, runner):
+        """Test 30: Una resolución inválida es un error de uso."""
+        result = runner.invoke(
+            cli, ["timeline", "fixtures/nginx_sample.log", "--resolution", "1x"]
+        )
+
+        assert result.exit_code == 2
+
+
+# ============================================================================
+# FASE 11: Tests del Comando spikes
+# ============================================================================
+
+
+def spiky_log(path):
+    """Escribe 30 minutos de 40 requests y un minuto con 200."""
+    lines = []
+    for minute in range(31):
+        n = 200 if minute == 30 else 40
+        for i in range(n):
+            second = i * 59 // n
+            lines.append(
+                f"10.0.0.{i % 50} - - [26/Nov/2024:10:{minute:02d}:{second:02d} +0000]"
+                f' "GET / HTTP/1.1" 200 100 "-" "curl/8.0"'
+            )
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+class TestSpikesCommand:
+    """Tests para `logparse spikes` en modo lotes."""
+
+    def test_spikes_reports_traffic_spike(self, runner, tmp_path):
+        """Test 31: spikes avisa del minuto con 5x tráfico."""
+        result = runner.invoke(cli, ["spikes", spiky_log(tmp_path / "access.log")])
+
+        assert result.exit_code == 0
+        assert result.output.startswith("PICO requests 2024-11-26 10:30:00+00:00: 200")
+        assert len(result.output.splitlines()) == 1
+
+    def test_spikes_threshold(self, runner, tmp_path):
+        """Test 32: Con un umbral muy alto no hay picos."""
+        log = spiky_log(tmp_path / "access.log")
+        result = runner.invoke(cli, ["spikes", log, "--threshold", "1000"])
+
+        assert result.exit_code == 0
+        assert result.output == ""
+
+
+# ============================================================================
+# FASE 12: Tests de Agrupación de Paths en analyze
+# ============================================================================
+
+
+class TestAnalyzePathTemplates:
+    """Tests de --group-paths, --path-rule y --path en `logparse analyze`."""
+
+    def test_group_paths(self, runner):
+        """Test 33: --group-paths cuenta /api/users/{id} como un solo path."""
+        result = runner.invoke(
+            cli,
+            [
+                "analyze",
+                "fixtures/nginx_sample.log",
+                "--group-paths",
+                "--output",
+                "json",
+            ],
+        )
+
+        assert result.exit_code == 0
+        top_paths = dict(
+            (p["path"], p["count"]) for p in json.loads(result.stdout)["top_paths"]
+        )
+        assert top_paths["/api/users/{id}"] == 2
+
+    def test_path_template_filter(self, runner):
+        """Test 34: --path analiza solo las requests de esa plantilla."""
+        result = runner.invoke(
+            cli,
+            [
+                "analyze",
+                "fixtures/nginx_sample.log",
+                "--path",
+                "/api/users/{id}",
+                "--output",
+                "json",
+            ],
+        )
+
+        assert result.exit_code == 0
+        assert json.loads(result.stdout)["summary"]["total_requests"] == 2
+
+    def test_invalid_path_rule(self, runner):
+        """Test 35: Una --path-rule sin "=" es un error de uso."""
+        result = runner.invoke(
+            cli, ["analyze", "fixtures/nginx_sample.log", "--path-rule", "abc"]
+        )
+
+        assert result.exit_code == 2
+
+
+# ============================================================================
+# FASE 13: Tests de Filtros por Red en analyze
+# ============================================================================
+
+
+class TestAnalyzeNetworks:
+    """Tests de --ip e --ip-file en `logparse analyze`."""
+
+    def test_ip_prefix(self, runner):
+        """Test 36: --ip analiza solo las IPs de los prefijos dados."""
+        result = runner.invoke(
+            cli,
+            [
+                "analyze",
+                "fixtures/nginx_sample.log",
+                "--ip",
+                "192.168.1.96/28",
+                "--ip",
+                "192.168.1.117",
+                "--output",
+                "json",
+            ],
+        )
+
+        assert result.exit_code == 0
+        assert json.loads(result.stdout)["summary"]["total_requests"] == 24
+
+    def test_ip_file(self, runner, tmp_path):
+        """Test 37: --ip-file lee los prefijos de un archivo."""
+        path = tmp_path / "rangos.txt"
+        path.write_text("# admin\n192.168.1.100/32,admin\n")
+        result = runner.invoke(
+            cli,
+            [
+                "analyze",
+                "fixtures/nginx_sample.log",
+                "--ip-file",
+                str(path),
+                "--output",
+                "json",
+            ],
+        )
+
+        assert result.exit_code == 0
+        assert json.loads(result.stdout)["summary"]["total_requests"] == 8
+
+    def test_invalid_ip(self, runner):
+        """Test 38: Un prefijo inválido es un error de uso."""
+        result = runner.invoke(
+            cli, ["analyze", "fixtures/nginx_sample.log", "--ip", "10.0.0.0/99"]
+        )
+
+        assert result.exit_code == 2
+
+
+# ============================================================================
+# FASE 14: Tests del Comando geo
+# ============================================================================
+
+
+class TestGeoCommand:
+    """Tests para `logparse geo`."""
+
+    @pytest.fixture
+    def ranges_csv(self, tmp_path):
+        """Fixture con un CSV de rangos network,country,asn,org."""
+        path = tmp_path / "rangos.csv"
+        path.write_text(
+            "network,country,asn,org\n"
+            "192.168.1.0/24,ES,3352,Telefonica\n"
+            "192.168.1.100/32,US,13335,Cloudflare\n"
+        )
+        return str(path)
+
+    def test_geo_json(self, runner, ranges_csv):
+        """Test 39: geo agrupa las requests por país y ASN."""
+        result = runner.invoke(
+            cli,
+            [
+                "geo",
+                "fixtures/nginx_sample.log",
+                "--db",
+                ranges_csv,
+                "--output",
+                "json",
+            ],
+        )
+
+        assert result.exit_code == 0
+        report = json.loads(result.stdout)
+        assert report["top_countries"] == [
+            {"country": "ES", "count": 81},
+            {"country": "US", "count": 8},
+        ]
+        assert report["top_asns"][0] == {"asn": "AS3352 Telefonica", "count": 81}
+
+    def test_geo_text(self, runner, ranges_csv):
+        """Test 40: La salida de texto lista países y ASNs."""
+        result = runner.invoke(
+            cli, ["geo", "fixtures/nginx_sample.log", "--db", ranges_csv, "--top", "1"]
+        )
+
+        assert result.exit_code == 0
+        assert (
+            "Top países:\n  ES: 81\nTop ASNs:\n  AS3352 Telefonica: 81" in result.stdout
+        )
+
+    def test_geo_invalid_db(self, runner, tmp_path):
+        """Test 41: Una base sin columnas de rango es un error de uso."""
+        path = tmp_path / "mal.csv"
+        path.write_text("country\nES\n")
+        result = runner.invoke(
+            cli, ["geo", "fixtures/nginx_sample.log", "--db", str(path)]
+        )
+
+        assert result.exit_code == 2
+
+
+# ============================================================================
+# FASE 15: Tests del Comando agents
+# ============================================================================
+
+
+class TestAgentsCommand:
+    """Tests para `logparse agents`."""
+
+    def test_agents_json(self, runner):
+        """Test 42: agents desglosa las requests por dispositivo y bot."""
+        result = runner.invoke(
+            cli, ["agents", "fixtures/nginx_sample.log", "--output", "json"]
+        )
+
+        assert result.exit_code == 0
+        report = json.loads(result.stdout)
+        assert report["total_requests"] == 89
+        assert report["bot_requests"] == 26
+        assert report["devices"]["desktop"] == 46
+        assert report["bots"]["curl"] == 7
+
+    def test_agents_text(self, runner):
+        """Test 43: La salida de texto muestra la proporción de bots y el top."""
+        result = runner.invoke(cli, ["agents", "fixtures/nginx_sample.log"])
+
+        assert result.exit_code == 0
+        assert "Requests de bots: 26 (29.21%)" in result.stdout
+        assert "Top bots:\n" in result.stdout
+        assert "  curl: 7\n" in result.stdout
+
+
+# ============================================================================
+# FASE 16: Tests del Comando group
+# ============================================================================
+
+
+class TestGroupCommand:
+    """Tests para `logparse group`."""
+
+    def test_group_json(self, runner):
+        """Test 44: group agrega por varias dimensiones y ordena por métrica."""
+        result = runner.invoke(
+            cli,
+            [
+                "group",
+                "fixtures/nginx_sample.log",
+                "--by",
+                "status_class,method",
+                "--metrics",
+                "count,bytes_sum",
+                "--order-by",
+                "count",
+                "--top",
+                "1",
+                "--output",
+                "json",
+            ],
+        )
+
+        assert result.exit_code == 0
+        assert json.loads(result.stdout) == [
+            {"status_class": "2xx", "method": "GET", "count": 47, "bytes_sum": 1706947}
+        ]
+
+    def test_group_csv_with_spill(self, runner):
+        """Test 45: Con --max-groups bajo se vuelca a disco y el CSV no cambia."""
+        args = ["group", "fixtures/nginx_sample.log", "--by", "ip", "--output", "csv"]
+        in_memory = runner.invoke(cli, args)
+        spilled = runner.invoke(cli, args + ["--max-groups", "3"])
+
+        assert spilled.exit_code == 0
+        assert spilled.stdout == in_memory.stdout
+        assert spilled.stdout.startswith("ip,count\n")
+
+    def test_group_invalid(self, runner):
+        """Test 46: Una dimensión desconocida es un error de uso."""
+        result = runner.invoke(
+            cli, ["group", "fixtures/nginx_sample.log", "--by", "foo"]
+        )
+
+        assert result.exit_code == 2
+
+
+# ============================================================================
+# FASE 17: Tests de Imports Perezosos de los Analizadores
+# ============================================================================
+
+
+class TestAnalyzerImports:
+    """Tests de lo que carga importar los analizadores."""
+
+    def test_log_analyzer_skips_heavy_modules(self):
+        """Test 47: Importar LogAnalyzer no carga geo, group-by, series ni user agents."""
+        modules = import_times(
+            code="from src.analyzers.log_analyzer import LogAnalyzer"
+        )
+
+        assert "src.analyzers.log_analyzer" in modules
+        assert [m for m in modules if m.startswith(HEAVY_MODULES)] == []
+
+
+# ============================================================================
+# FASE 18: Tests de Instalación
+# ============================================================================
+
+
+class TestInstall:
+    """Tests del comando que instala pyproject.toml."""
+
+    def test_entry_point(self):
+        """Test 48: pyproject instala el comando logparse apuntando a la CLI."""
+        tomllib = pytest.importorskip("tomllib")
+        with open("pyproject.toml", "rb") as f:
+            scripts = tomllib.load(f)["project"]["scripts"]
+
+        module, _, attr = scripts["logparse"].partition(":")
+        assert getattr(importlib.import_module(module), attr) is cli
@@ -0,0 +1,114 @@
+import pytest
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+from src.models.log_entry import LogEntry
+from src.parsers.base_parser import BaseParser
+from src.parsers.nginx_parser import NginxParser
+from src.parsers.format_detector import (
+    REGISTERED_PARSERS,
+    detect_parser,
+    parse_files,
+    register_parser,
+)
+
+
+class PipeParser(BaseParser):
+    """Parser de prueba para el formato "IP|timestamp|method|path|status|size"."""
+
+    def parse_line(self, line: str) -> Optional[LogEntry]:
+        parts = line.split("|")
+        if len(parts) != 6:
+            return None
+        ip, timestamp, method, path, status, size = parts
+        return LogEntry(
+            ip=ip,
+            timestamp=datetime.fromisoformat(timestamp),
+            method=method,
+            path=path,
+            status_code=int(status),
+            response_size=int(size),
+        )
+
+
+@pytest.fixture
+def pipe_registered():
+    """Registra PipeParser durante el test."""
+    register_parser(PipeParser)
+    yield
+    REGISTERED_PARSERS.remove(PipeParser)
+
+
+# ============================================================================
+# FASE 1: Tests de Detección de Formato
+# ============================================================================
+
+
+class TestDetectParser:
+    """Tests para la detección de formato por muestra."""
+
+    def test_detects_nginx_format(self):
+        """Test 1: Detecta el formato nginx en el fixture de ejemplo."""
+        parser = detect_parser(Path("fixtures/nginx_sample.log"))
+
+        assert isinstance(parser, NginxParser)
+
+    def test_returns_none_for_unknown_format(self):
+        """Test 2: Retorna None si ningún parser reconoce la muestra."""
+        parser = detect_parser(Path("fixtures/test_base_only_invalid.log"))
+
+        assert parser is None
+
+    def test_returns_none_for_empty_file(self):
+        """Test 3: Retorna None para un archivo sin líneas útiles."""
+        parser = detect_parser(Path("fixtures/test_base_only_empty.log"))
+
+        assert parser is None
+
+    def test_detects_registered_parser(self, pipe_registered):
+        """Test 4: Un parser registrado participa en la detección."""
+        parser = detect_parser(Path("fixtures/test_base_mixed.log"))
+
+        assert isinstance(parser, PipeParser)
+
+    def test_explicit_candidates(self):
+        """Test 5: Se puede restringir la lista de candidatos."""
+        parser = detect_parser(
+            Path("fixtures/test_base_simple.log"), candidates=[NginxParser]
+        )
+
+        assert parser is None
+        assert detect_parser(Path("fixtures/nginx_sample.log"), candidates=[]) is None
+
+    def test_register_parser_is_idempotent(self, pipe_registered):
+        """Test 6: Registrar dos veces no duplica el parser."""
+        register_parser(PipeParser)
+
+        assert REGISTERED_PARSERS.count(PipeParser) == 1
+
+
+# ============================================================================
+# FASE 2: Tests de parse_files con Formatos Mixtos
+# ============================================================================
+
+
+class TestParseFiles:
+    """Tests para parsear varios archivos con formatos distintos."""
+
+    def test_parse_files_chooses_parser_per_file(self, pipe_registered):
+        """Test 7: Cada archivo se parsea con su propio parser."""
+        files = [
+            Path("fixtures/nginx_sample.log"),
+            Path("fixtures/test_base_simple.log"),
+        ]
+
+        entries = list(parse_files(files))
+        nginx_count = len(list(NginxParser().parse_file(files[0])))
+
+        assert len(entries) == nginx_count + 3
+
+    def test_parse_files_skips_unknown_files(self):
+        """Test 8: Los archivos sin formato reconocido se saltan."""
+        files = [Path("fixtures/test_base_only_invalid.log")]
+
+        assert list(parse_files(files)) == []
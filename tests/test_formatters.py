@@ -1,12 +1,18 @@
 import pytest
 import json
 import csv
+import gzip
 from io import StringIO
+from dataclasses import replace
 from datetime import datetime
-# from src.formatters.table_formatter import TableFormatter
+from rich.console import Console
 from src.formatters.json_formatter import JSONFormatter
 from src.formatters.csv_formatter import CSVFormatter
+from src.formatters.entry_exporter import EntryExporter, FIELDS
 from src.formatters.markdown_formatter import MarkdownFormatter
+from src.formatters.output import open_output
+from src.formatters.table_formatter import TableFormatter
+from src.formatters import parquet_formatter
 from src.models.log_entry import LogEntry
 from src.analyzers.log_analyzer import LogAnalyzer
 
@@ -281,4 +287,527 @@ class TestMarkdownFormatter:
         assert "Summary" in result or "Resumen" in result or "Total" in result
 
 
+# ============================================================================
+# FASE 4: Tests de Escritura en Streaming (write_*)
+# ============================================================================
+
+class TestStreamingFormatters:
+    """Tests para los métodos write_* que escriben en un archivo."""
+
+    def test_json_write_matches_format(self, sample_analyzer):
+        """Test 21: write_top_ips escribe lo mismo que format_top_ips."""
+        formatter = JSONFormatter()
+        top_ips = sample_analyzer.top_ips(n=5)
+        out = StringIO()
+
+        formatter.write_top_ips(top_ips, out)
+
+        assert out.getvalue() == formatter.format_top_ips(top_ips)
+
+    def test_json_write_accepts_generator(self):
+        """Test 22: write_top_paths acepta un generador de filas."""
+        formatter = JSONFormatter()
+        rows = ((f"/p/{i}", i) for i in range(5000))
+        out = StringIO()
+
+        formatter.write_top_paths(rows, out)
+
+        parsed = json.loads(out.getvalue())
+        assert len(parsed) == 5000
+        assert parsed[-1] == {"path": "/p/4999", "count": 4999}
+
+    def test_json_write_empty_list(self):
+        """Test 23: Una lista vacía se escribe como []."""
+        out = StringIO()
+
+        JSONFormatter().write_top_ips([], out)
+
+        assert out.getvalue() == "[]"
+
+    def test_csv_write_matches_format(self, sample_analyzer):
+        """Test 24: write_status_counts escribe lo mismo que format_status_counts."""
+        formatter = CSVFormatter()
+        status_counts = sample_analyzer.get_status_counts()
+        out = StringIO()
+
+        formatter.write_status_counts(status_counts, out)
+
+        assert out.getvalue() == formatter.format_status_counts(status_counts)
+
+    def test_write_to_compressed_file(self, tmp_path, sample_analyzer):
+        """Test 25: open_output comprime según la extensión del archivo."""
+        path = tmp_path / "top_ips.csv.gz"
+
+        with open_output(path) as fp:
+            CSVFormatter().write_top_ips(sample_analyzer.top_ips(), fp)
+
+        with gzip.open(path, "rt", newline="") as f:
+            rows = list(csv.reader(f))
+        assert rows[0] == ["IP", "Count"]
+        assert rows[1] == ["192.168.1.1", "2"]
+
+    def test_write_to_plain_file(self, tmp_path, sample_analyzer):
+        """Test 26: open_output sin extensión de compresión escribe texto plano."""
+        path = tmp_path / "summary.json"
+
+        with open_output(path) as fp:
+            JSONFormatter().write_summary(sample_analyzer.get_summary(), fp)
+
+        assert json.loads(path.read_text())["total_requests"] == 5
+
+
+# ============================================================================
+# FASE 5: Tests de Exportación de Entradas (EntryExporter)
+# ============================================================================
+
+class TestEntryExporter:
+    """Tests para la exportación fila a fila de LogEntry."""
+
+    def test_jsonl_one_object_per_line(self, sample_analyzer):
+        """Test 27: write_jsonl escribe un objeto JSON por entrada."""
+        out = StringIO()
+
+        rows = EntryExporter().write_jsonl(sample_analyzer.logs, out)
+
+        lines = out.getvalue().splitlines()
+        assert rows == len(lines) == 5
+        first = json.loads(lines[0])
+        assert list(first) == list(FIELDS)
+        assert first["timestamp"] == "2024-11-26T08:00:00"
+        assert first["status_code"] == 200
+        assert first["user_agent"] is None
+
+    def test_csv_matches_csv_module(self):
+        """Test 28: write_csv escribe lo mismo que csv.writer, con comillas donde hace falta."""
+        entries = [
+            LogEntry("10.0.0.1", datetime(2024, 11, 26, 8, 0, 0), "GET", "/a,b", 200, 10,
+                     'Mozilla "quoted"', None),
+            LogEntry("10.0.0.2", datetime(2024, 11, 26, 8, 0, 0), "GET", "/c", 404, 0,
+                     None, "http://example.com/"),
+        ]
+        expected = StringIO()
+        writer = csv.writer(expected)
+        writer.writerow(FIELDS)
+        for e in entries:
+            writer.writerow([e.ip, e.timestamp.isoformat(), e.method, e.path,
+                             e.status_code, e.response_size, e.user_agent, e.referrer])
+        out = StringIO()
+
+        rows = EntryExporter().write_csv(entries, out)
+
+        assert rows == 2
+        assert out.getvalue() == expected.getvalue()
+
+    def test_export_in_batches(self):
+        """Test 29: Las filas se escriben en lotes de batch_size."""
+        entries = [
+            LogEntry("10.0.0.1", datetime(2024, 11, 26, 8, 0, i % 60), "GET", "/", 200, i)
+            for i in range(25)
+        ]
+
+        class CountingWriter(StringIO):
+            writes = 0
+
+            def write(self, text):
+                self.writes += 1
+                return super().write(text)
+
+        out = CountingWriter()
+        EntryExporter(batch_size=10).write_jsonl(entries, out)
+
+        assert out.writes == 3
+        assert len(out.getvalue().splitlines()) == 25
+
+    def test_export_empty(self):
+        """Test 30: Sin entradas, CSV solo escribe la cabecera y JSONL nada."""
+        csv_out, jsonl_out = StringIO(), StringIO()
+
+        assert EntryExporter().write_csv([], csv_out) == 0
+        assert EntryExporter().write_jsonl([], jsonl_out) == 0
+        assert csv_out.getvalue() == ",".join(FIELDS) + "\r\n"
+        assert jsonl_out.getvalue() == ""
+
+
+# ============================================================================
+# FASE 6: Tests de Salida Columnar (ParquetFormatter)
+# ============================================================================
+
+class TestParquetFormatter:
+    """Tests para la escritura en Parquet / Arrow IPC (requiere pyarrow)."""
+
+    def test_parquet_roundtrip(self, tmp_path, sample_analyzer):
+        """Test 31: Las entradas escritas en Parquet se leen con sus tipos."""
+        pq = pytest.importorskip("pyarrow.parquet")
+        path = tmp_path / "logs.parquet"
+
+        rows = parquet_formatter.ParquetFormatter().write_parquet(sample_analyzer.logs, path)
+
+        table = pq.read_table(path)
+        assert rows == table.num_rows == 5
+        assert table.column_names == list(FIELDS)
+        assert table.column("status_code").to_pylist() == [200, 200, 200, 404, 500]
+        assert table.column("ip").to_pylist()[0] == "192.168.1.1"
+
+    def test_parquet_row_groups(self, tmp_path, sample_analyzer):
+        """Test 32: Cada bloque de row_group_size filas es un row group."""
+        pq = pytest.importorskip("pyarrow.parquet")
+        path = tmp_path / "logs.parquet"
+
+        parquet_formatter.ParquetFormatter(row_group_size=2).write_parquet(
+            sample_analyzer.logs, path
+        )
+
+        assert pq.ParquetFile(path).metadata.num_row_groups == 3
+
+    def test_dictionary_columns(self, sample_analyzer):
+        """Test 33: IP, path y user agent se codifican como diccionario."""
+        pa = pytest.importorskip("pyarrow")
+
+        batch = next(parquet_formatter.ParquetFormatter().record_batches(sample_analyzer.logs))
+
+        for name in ("ip", "path", "user_agent"):
+            assert pa.types.is_dictionary(batch.schema.field(name).type)
+
+    def test_arrow_ipc_roundtrip(self, tmp_path, sample_analyzer):
+        """Test 34: write_arrow escribe un Arrow IPC legible, también con varios batches."""
+        pa = pytest.importorskip("pyarrow")
+        path = tmp_path / "logs.arrow"
+
+        # 3 batches con valores nuevos en cada uno: el diccionario se comparte
+        parquet_formatter.ParquetFormatter(row_group_size=2).write_arrow(
+            sample_analyzer.logs, path
+        )
+
+        with pa.memory_map(str(path)) as source:
+            reader = pa.ipc.open_file(source)
+            assert reader.num_record_batches == 3
+            table = reader.read_all()
+        assert table.num_rows == 5
+        for name in ("ip", "path", "user_agent", "referrer"):
+            assert table.column(name).to_pylist() == [
+                getattr(e, name) for e in sample_analyzer.logs
+            ]
+
+    def test_missing_pyarrow(self, monkeypatch):
+        """Test 35: Sin pyarrow se lanza ImportError con un mensaje claro."""
+        monkeypatch.setattr(parquet_formatter, "pa", None)
+
+        with pytest.raises(ImportError, match="pyarrow"):
+            parquet_formatter.ParquetFormatter()
+
+
+# ============================================================================
+# FASE 7: Tests de TableFormatter (Rich)
+# ============================================================================
+
+def render(table) -> str:
+    """Dibuja una tabla Rich en texto plano."""
+    out = StringIO()
+    Console(file=out, width=100).print(table)
+    return out.getvalue()
+
+
+class TestTableFormatter:
+    """Tests para las tablas Rich paginadas."""
+
+    def test_top_ips_table(self, sample_analyzer):
+        """Test 36: format_top_ips dibuja una tabla con las IPs."""
+        result = render(TableFormatter().format_top_ips(sample_analyzer.top_ips()))
+
+        assert "Top IPs" in result
+        assert "192.168.1.1" in result
+        assert "Página 1 de 1" in result
+
+    def test_page_window(self):
+        """Test 37: Solo se dibuja la página pedida."""
+        rows = [(f"/p/{i}", 1000 - i) for i in range(1000)]
+
+        result = render(TableFormatter(page_size=10).format_top_paths(rows, page=3))
+
+        assert "/p/20 " in result and "/p/29 " in result
+        assert "/p/19 " not in result and "/p/30 " not in result
+        assert "Página 3 de 100" in result
+
+    def test_lazy_row_source(self):
+        """Test 38: Con un generador solo se consumen las filas hasta la página pedida."""
+        consumed = []
+
+        def rows():
+            for i in range(10_000):
+                consumed.append(i)
+                yield (f"/p/{i}", i)
+
+        TableFormatter(page_size=10).format_top_paths(rows(), page=2)
+
+        assert len(consumed) == 20
+
+    def test_markup_is_not_interpreted(self):
+        """Test 39: Los paths con corchetes se muestran tal cual."""
+        result = render(TableFormatter().format_top_paths([("/a/[b]x[/b]", 1)]))
+
+        assert "/a/[b]x[/b]" in result
+
+    def test_write_rows_streams_all(self):
+        """Test 40: write_top_paths escribe todas las filas, alineadas."""
+        rows = [(f"/p/{i}", 10_000 - i) for i in range(1000)]
+        out = StringIO()
+
+        written = TableFormatter(page_size=50, width=80).write_top_paths(rows, out)
+
+        lines = out.getvalue().splitlines()
+        assert written == 1000
+        assert "Top paths" in lines[0]
+        assert len(lines) == 1003  # título, cabecera, separador y filas
+        assert len({len(line) for line in lines[3:]}) == 1
+
+    def test_write_rows_matches_rich(self):
+        """Test 41: Las filas escritas en streaming coinciden con las de Rich."""
+        rows = [("/a", 10), ("/b/" + "x" * 200, 5)]
+        out = StringIO()
+
+        TableFormatter(width=60).write_top_paths(rows, out)
+
+        lines = out.getvalue().splitlines()
+        assert lines[3] == " /a" + " " * (len(lines[3]) - 6) + "10 "
+        assert lines[4].endswith("…          5 ")
+        assert {len(line) for line in lines} == {60}
+
+    def test_write_entries(self, sample_analyzer):
+        """Test 42: write_entries lista las requests una por línea."""
+        out = StringIO()
+
+        written = TableFormatter(width=120).write_entries(sample_analyzer.get_errors(), out)
+
+        assert written == 2
+        assert "/notfound" in out.getvalue()
+        assert "2024-11-26 09:00:00" in out.getvalue()
+
+
+# ============================================================================
+# FASE 8: Tests del Informe Markdown en una Pasada
+# ============================================================================
+
+class TestMarkdownReport:
+    """Tests para las tablas y el informe completo en Markdown."""
+
+    def test_table_columns_aligned(self, sample_analyzer):
+        """Test 43: Todas las filas de una tabla tienen el mismo ancho."""
+        result = MarkdownFormatter().format_top_paths(sample_analyzer.top_paths())
+
+        table = [line for line in result.splitlines() if line.startswith("|")]
+        assert len({len(line) for line in table}) == 1
+        assert table[1].endswith("-: |")  # Columna numérica alineada a la derecha
+
+    def test_pipes_are_escaped(self):
+        """Test 44: Un | dentro de una celda se escapa."""
+        result = MarkdownFormatter().format_top_paths([("/a|b", 1)])
+
+        assert "/a\\|b" in result
+
+    def test_full_report_sections(self, sample_analyzer):
+        """Test 45: El informe completo incluye todas las secciones."""
+        result = MarkdownFormatter().format_full_report(sample_analyzer)
+
+        for section in ("# Informe de logs", "## Resumen", "## Top IPs", "## Top paths",
+                        "## Códigos de estado", "## Requests por hora"):
+            assert section in result
+        assert "| 08:00 |" in result
+        assert "40.00%" in result
+
+    def test_full_report_aggregates_once(self, sample_analyzer, monkeypatch):
+        """Test 46: El informe agrega los logs una sola vez."""
+        calls = []
+        original = LogAnalyzer.aggregate
+
+        def counting(self):
+            calls.append(1)
+            return original(self)
+
+        monkeypatch.setattr(LogAnalyzer, "aggregate", counting)
+        monkeypatch.setattr(LogAnalyzer, "top_ips", lambda *a: pytest.fail("recalcula top_ips"))
+
+        MarkdownFormatter().format_full_report(sample_analyzer)
+
+        assert calls == [1]
+
+    def test_full_report_from_aggregate(self, sample_analyzer):
+        """Test 47: El informe se puede generar directamente desde un LogAggregate."""
+        formatter = MarkdownFormatter()
+
+        assert formatter.format_full_report(sample_analyzer.aggregate()) == \
+            formatter.format_full_report(sample_analyzer)
+
+    def test_full_report_empty(self, empty_analyzer):
+        """Test 48: Un analyzer vacío genera un informe con tablas vacías."""
+        result = MarkdownFormatter().format_full_report(empty_analyzer)
+
+        assert "## Resumen" in result
+        assert "Periodo" not in result
+
+
+# ============================================================================
+# FASE 9: Tests de write_report (informe desde un LogAggregate)
+# ============================================================================
+
+class TestWriteReport:
+    """Tests para write_report en todos los formatters."""
+
+    def test_json_report(self, sample_analyzer):
+        """Test 49: El informe JSON incluye resumen, tops, status y horas."""
+        out = StringIO()
+
+        JSONFormatter().write_report(sample_analyzer.aggregate(), out, top_ips=2)
+
+        report = json.loads(out.getvalue())
+        assert report["summary"] == sample_analyzer.get_summary()
+        assert report["top_ips"][0] == {"ip": "192.168.1.1", "count": 2}
+        assert len(report["top_ips"]) == 2
+        assert report["status_counts"] == {"200": 3, "404": 1, "500": 1}
+        assert report["requests_by_hour"] == {"8": 4, "9": 1}
+
+    def test_csv_report_sections(self, sample_analyzer):
+        """Test 50: El informe CSV separa las tablas con una línea vacía."""
+        out = StringIO()
+
+        CSVFormatter().write_report(sample_analyzer.aggregate(), out)
+
+        sections = out.getvalue().split("\r\n\r\n")
+        assert [section.split(",")[0] for section in sections] == ["Metric", "IP", "Paths", "Status"]
+
+    def test_table_report(self, sample_analyzer):
+        """Test 51: El informe en tabla incluye todas las secciones."""
+        out = StringIO()
+
+        TableFormatter(width=100).write_report(sample_analyzer.aggregate(), out)
+
+        result = out.getvalue()
+        for title in ("Resumen", "Top IPs", "Top paths", "Códigos de estado"):
+            assert title in result
+        assert "40.00%" in result
+
+
+# ============================================================================
+# FASE 10: Tests de Escritura Markdown Fila a Fila
+# ============================================================================
+
+class TestMarkdownStreaming:
+    """Tests para las tablas Markdown escritas sin materializar las filas."""
+
+    def test_iterator_rows_are_streamed(self):
+        """Test 52: Con un iterador cada fila se escribe antes de leer la siguiente."""
+        out = StringIO()
+
+        def rows():
+            for i in range(3):
+                yield (f"/p{i}", i)
+                # La fila recién generada ya está escrita
+                assert out.getvalue().splitlines()[-1].startswith(f"| /p{i} ")
+
+        MarkdownFormatter().write_table(["Path", "Requests"], rows(), out, ["left", "right"])
+
+        assert len(out.getvalue().splitlines()) == 5
+
+    def test_summary_accepts_indent(self, sample_analyzer):
+        """Test 53: format_summary acepta indent como JSONFormatter (y lo ignora)."""
+        formatter = MarkdownFormatter()
+        summary = sample_analyzer.get_summary()
+
+        assert formatter.format_summary(summary, indent=2) == formatter.format_summary(summary)
+
+    def test_hourly_zero_count_has_no_bar(self):
+        """Test 54: Una hora sin requests no dibuja barra."""
+        result = MarkdownFormatter().format_hourly({8: 0, 9: 100})
+
+        lines = result.splitlines()
+        assert "█" not in next(line for line in lines if "08:00" in line)
+        assert "█" * 40 in next(line for line in lines if "09:00" in line)
+
+
+# ============================================================================
+# FASE 11: Tests del Diccionario Compartido de Arrow IPC
+# ============================================================================
+
+class TestSharedDictionary:
+    """Tests para SharedDictionary con muchos batches y valores distintos."""
+
+    def test_only_new_values_are_added(self, monkeypatch):
+        """Test 55: Cada batch convierte solo sus valores; el diccionario no se reconstruye."""
+        pa = pytest.importorskip("pyarrow")
+        shared = parquet_formatter.SharedDictionary()
+        batches = [
+            [f"/p{i}" for i in range(start, start + 100)] + ["/"] * 10
+            for start in range(0, 5000, 100)
+        ]
+        converted = []
+        array = pa.array
+
+        def spy(values, *args, **kwargs):
+            if kwargs.get("type") == pa.string():
+                converted.append(len(values))
+            return array(values, *args, **kwargs)
+
+        monkeypatch.setattr(pa, "array", spy)
+        encoded = [shared.encode(batch) for batch in batches]
+        again = shared.encode(batches[0])
+
+        assert sum(converted) == sum(len(batch) for batch in batches) + len(batches[0])
+        assert len(shared.dictionary) == 5001
+        assert encoded[-1].to_pylist() == batches[-1]
+        assert again.to_pylist() == batches[0]
+        # Sin valores nuevos se reutiliza el mismo array
+        assert again.dictionary.buffers()[2].address == encoded[-1].dictionary.buffers()[2].address
+
+    def test_arrow_ipc_many_batches(self, tmp_path, sample_analyzer):
+        """Test 56: write_arrow con muchos batches y paths distintos se lee igual."""
+        pa = pytest.importorskip("pyarrow")
+        entries = [
+            replace(e, path=f"/p{i}")
+            for i, e in enumerate(sample_analyzer.logs * 60)
+        ]
+        path = tmp_path / "logs.arrow"
+
+        parquet_formatter.ParquetFormatter(row_group_size=7).write_arrow(entries, path)
+
+        with pa.memory_map(str(path)) as source:
+            reader = pa.ipc.open_file(source)
+            assert reader.num_record_batches == 43
+            table = reader.read_all()
+        for name in ("ip", "path", "user_agent", "referrer"):
+            assert table.column(name).to_pylist() == [getattr(e, name) for e in entries]
+
+
+# ============================================================================
+# FASE 12: Tests de Anchos y Etiquetas de TableFormatter
+# ============================================================================
+
+class TestTableWidths:
+    """Tests para las etiquetas del resumen y el ajuste de columnas."""
+
+    def test_summary_labels(self, sample_analyzer):
+        """Test 57: El resumen en tabla usa las mismas etiquetas que Markdown."""
+        result = render(TableFormatter().format_summary(sample_analyzer.get_summary()))
+
+        assert "Total requests" in result and "Tasa de error" in result
+        assert "total_requests" not in result and "error_rate" not in result
+
+    def test_widths_from_all_rows(self):
+        """Test 58: Con una lista los anchos salen de todas las filas, no del primer bloque."""
+        rows = [(f"/p/{i}", i) for i in range(60)] + [("/p/ancho", 10 ** 12)]
+        out = StringIO()
+
+        TableFormatter(page_size=10, width=80).write_top_paths(rows, out)
+
+        lines = out.getvalue().splitlines()
+        assert lines[-1].endswith(" 1000000000000 ")
+        assert len({len(line) for line in lines[3:]}) == 1
+
+    def test_right_aligned_overflow_is_cut(self):
+        """Test 59: Una celda a la derecha más ancha que su columna se recorta."""
+        rows = iter([("/a", 1), ("/b", 10 ** 12)])
+        out = StringIO()
+
+        TableFormatter(page_size=1, width=80).write_top_paths(rows, out)
 
+        lines = out.getvalue().splitlines()
+        assert lines[-1].endswith(" 1000000… ")
+        assert len({len(line) for line in lines[3:]}) == 1
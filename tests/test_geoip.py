@@ -0,0 +1,301 @@
+import pytest
+import os
+import pickle
+from src.analyzers import geoip
+from src.analyzers.geoip import (
+    GeoInfo,
+    GeoIpTable,
+    MmdbDatabase,
+    compile_ranges,
+    open_database,
+)
+from src.analyzers.log_analyzer import LogAnalyzer
+from src.parsers.nginx_parser import NginxParser
+
+RANGES_CSV = """network,country,asn,org
+192.168.1.0/24,ES,3352,Telefonica de Espana
+192.168.1.100/32,US,13335,Cloudflare
+192.168.1.117/32,US,AS15169,Google
+10.0.0.0/8,,64512,
+2001:db8::/32,DE,3320,Deutsche Telekom
+"""
+
+
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path, monkeypatch):
+    """Fixture que apunta XDG_CACHE_HOME a un directorio temporal."""
+    home = tmp_path / "cache"
+    monkeypatch.setenv("XDG_CACHE_HOME", str(home))
+    return home
+
+
+@pytest.fixture
+def ranges_csv(tmp_path):
+    """Fixture con un CSV de rangos network,country,asn,org."""
+    path = tmp_path / "rangos.csv"
+    path.write_text(RANGES_CSV)
+    return str(path)
+
+
+@pytest.fixture
+def table(ranges_csv, tmp_path):
+    """Fixture con la tabla compilada de ranges_csv."""
+    compiled = str(tmp_path / "rangos.lpgeo")
+    compile_ranges(ranges_csv, compiled)
+    with GeoIpTable(compiled) as table:
+        yield table
+
+
+# ============================================================================
+# FASE 1: Tests de la Tabla Compilada
+# ============================================================================
+
+
+class TestGeoIpTable:
+    """Tests de compile_ranges y GeoIpTable."""
+
+    @pytest.mark.parametrize(
+        "ip, info",
+        [
+            ("192.168.1.5", GeoInfo("ES", 3352, "Telefonica de Espana")),
+            ("192.168.1.100", GeoInfo("US", 13335, "Cloudflare")),
+            ("192.168.1.117", GeoInfo("US", 15169, "Google")),
+            ("192.168.1.255", GeoInfo("ES", 3352, "Telefonica de Espana")),
+            ("::ffff:192.168.1.100", GeoInfo("US", 13335, "Cloudflare")),
+            ("10.20.30.40", GeoInfo(None, 64512, None)),
+            ("2001:db8::1", GeoInfo("DE", 3320, "Deutsche Telekom")),
+            ("192.168.2.1", None),
+            ("2001:db9::1", None),
+            ("no-es-ip", None),
+        ],
+    )
+    def test_lookup(self, table, ip, info):
+        """Test 1: Gana el rango más específico; IPv4, IPv6 y sin datos."""
+        assert table.lookup(ip) == info
+
+    def test_start_end_columns(self, tmp_path):
+        """Test 2: Los rangos también pueden darse como start_ip/end_ip."""
+        csv_path = tmp_path / "asn.csv"
+        csv_path.write_text(
+            "start_ip,end_ip,as_number,as_name\n1.0.0.0,1.0.0.255,13335,Cloudflare\n"
+        )
+        compiled = str(tmp_path / "asn.lpgeo")
+
+        assert compile_ranges(str(csv_path), compiled) == 1
+        with GeoIpTable(compiled) as table:
+            assert table.lookup("1.0.0.7").asn_label == "AS13335 Cloudflare"
+            assert table.lookup("1.0.1.0") is None
+
+    def test_many_ranges(self, tmp_path):
+        """Test 3: Con miles de rangos cada IP encuentra el suyo."""
+        lines = ["network,asn"]
+        lines += [
+            f"{a}.{b}.0.0/16,{a * 256 + b}" for a in range(1, 41) for b in range(256)
+        ]
+        csv_path = tmp_path / "muchos.csv"
+        csv_path.write_text("\n".join(lines))
+        compiled = str(tmp_path / "muchos.lpgeo")
+
+        assert compile_ranges(str(csv_path), compiled) == 40 * 256
+        with GeoIpTable(compiled) as table:
+            for a, b in [(1, 0), (7, 77), (40, 255)]:
+                assert table.lookup(f"{a}.{b}.9.9").asn == a * 256 + b
+            assert table.lookup("41.0.0.1") is None
+
+    def test_invalid_csv(self, tmp_path):
+        """Test 4: Sin columnas de rango o con una fila inválida es un ValueError."""
+        no_range = tmp_path / "a.csv"
+        no_range.write_text("country,asn\nES,1\n")
+        bad_row = tmp_path / "b.csv"
+        bad_row.write_text("network,asn\n10.0.0.0/8,1\n10.0.0.0/99,2\n")
+
+        with pytest.raises(ValueError, match="network"):
+            compile_ranges(str(no_range), str(tmp_path / "a.lpgeo"))
+        with pytest.raises(ValueError, match="b.csv:3"):
+            compile_ranges(str(bad_row), str(tmp_path / "b.lpgeo"))
+
+    def test_not_compiled(self, ranges_csv):
+        """Test 5: Abrir un archivo que no es una tabla compilada es un ValueError."""
+        with pytest.raises(ValueError, match="compilada"):
+            GeoIpTable(ranges_csv)
+
+    def test_cache_hits(self, table):
+        """Test 6: Una IP repetida se resuelve desde la caché LRU."""
+        for _ in range(5):
+            table.lookup("192.168.1.5")
+
+        info = table.cache_info()
+        assert (info.hits, info.misses) == (4, 1)
+
+    def test_pickles_without_map(self, table):
+        """Test 7: Al serializar solo viaja la ruta; la copia reabre la tabla."""
+        table.lookup("192.168.1.5")
+        copy = pickle.loads(pickle.dumps(table))
+
+        assert copy.cache_info().currsize == 0
+        assert copy.lookup("192.168.1.100").country == "US"
+        copy.close()
+
+    def test_group(self, table):
+        """Test 8: by_country y by_asn suman cuentas por IP e ignoran las desconocidas."""
+        counts = [
+            ("192.168.1.5", 3),
+            ("192.168.1.100", 2),
+            ("10.0.0.1", 4),
+            ("8.8.8.8", 9),
+        ]
+
+        assert table.by_country(counts) == {"ES": 3, "US": 2}
+        assert table.by_asn(counts) == {
+            "AS3352 Telefonica de Espana": 3,
+            "AS13335 Cloudflare": 2,
+            "AS64512": 4,
+        }
+
+
+# ============================================================================
+# FASE 2: Tests de Apertura de Bases
+# ============================================================================
+
+
+class TestOpenDatabase:
+    """Tests de open_database y MmdbDatabase."""
+
+    def test_compiles_csv_once(self, ranges_csv):
+        """Test 9: Un CSV se compila en la caché la primera vez y luego se reutiliza."""
+        with open_database(ranges_csv) as first:
+            assert first.path == geoip.compiled_path(ranges_csv)
+        mtime = os.path.getmtime(first.path)
+
+        with open_database(ranges_csv) as second:
+            assert second.lookup("192.168.1.100").asn == 13335
+        assert os.path.getmtime(first.path) == mtime
+
+    def test_opens_compiled(self, table):
+        """Test 10: Una tabla ya compilada se abre directamente."""
+        with open_database(table.path) as database:
+            assert isinstance(database, GeoIpTable)
+            assert len(database) == len(table)
+
+    def test_mmdb_requires_maxminddb(self, tmp_path, monkeypatch):
+        """Test 11: Sin maxminddb, abrir un .mmdb explica qué instalar."""
+        monkeypatch.setattr(geoip, "maxminddb", None)
+        path = tmp_path / "GeoLite2-ASN.mmdb"
+        path.write_bytes(b"")
+
+        with pytest.raises(ImportError, match="maxminddb"):
+            open_database(str(path))
+        with pytest.raises(ImportError):
+            MmdbDatabase(str(path))
+
+
+# ============================================================================
+# FASE 3: Tests de Agrupación en LogAnalyzer
+# ============================================================================
+
+
+class TestAnalyzerGeo:
+    """Tests de top_countries y top_asns."""
+
+    @pytest.fixture
+    def analyzer(self):
+        """Fixture con un LogAnalyzer de nginx_sample.log."""
+        return LogAnalyzer(list(NginxParser().parse_file("fixtures/nginx_sample.log")))
+
+    def test_top_countries(self, analyzer, table):
+        """Test 12: top_countries cuenta requests por país."""
+        assert analyzer.top_countries(table) == [("ES", 76), ("US", 13)]
+
+    def test_top_asns(self, analyzer, table):
+        """Test 13: top_asns cuenta requests por sistema autónomo."""
+        assert analyzer.top_asns(table, 2) == [
+            ("AS3352 Telefonica de Espana", 76),
+            ("AS13335 Cloudflare", 8),
+        ]
+
+
+# ============================================================================
+# FASE 4: Tests de la Caché de Tablas Compiladas
+# ============================================================================
+
+
+class TestCompiledCache:
+    """Tests de dónde y cómo se guardan las tablas compiladas de un CSV."""
+
+    def test_compiles_into_private_cache(self, ranges_csv, cache_home):
+        """Test 14: La tabla se compila en un directorio 0700 del usuario, nunca junto al CSV."""
+        with open_database(ranges_csv) as database:
+            assert os.path.dirname(database.path) == geoip.cache_dir()
+            assert database.lookup("192.168.1.100").asn == 13335
+
+        assert geoip.cache_dir() == str(cache_home / "logparse")
+        assert os.stat(geoip.cache_dir()).st_mode & 0o777 == 0o700
+        assert os.stat(database.path).st_mode & 0o077 == 0
+        assert not [
+            name
+            for name in os.listdir(os.path.dirname(ranges_csv))
+            if name.endswith(".lpgeo")
+        ]
+
+    @pytest.mark.parametrize("plant", ["writable", "symlink"])
+    def test_ignores_untrusted_tables(self, ranges_csv, tmp_path, plant):
+        """Test 15: Una tabla escribible por otros o un enlace no se mapea: se recompila."""
+        forged = tmp_path / "forged.csv"
+        forged.write_text("network,country\n0.0.0.0/0,XX\n")
+        planted = geoip.compiled_path(ranges_csv)
+        os.makedirs(geoip.cache_dir(), mode=0o700)
+        if plant == "writable":
+            compile_ranges(str(forged), planted)
+            os.chmod(planted, 0o666)
+        else:
+            compile_ranges(str(forged), str(tmp_path / "forged.lpgeo"))
+            os.symlink(tmp_path / "forged.lpgeo", planted)
+
+        with open_database(ranges_csv) as database:
+            assert database.lookup("192.168.1.100").country == "US"
+            assert database.lookup("8.8.8.8") is None
+
+    def test_compile_uses_unpredictable_temp(self, ranges_csv, tmp_path):
+        """Test 16: compile_ranges no escribe en un "<salida>.tmp" preparado de antemano."""
+        victim = tmp_path / "victima.txt"
+        victim.write_text("intacto")
+        out = tmp_path / "rangos.lpgeo"
+        os.symlink(victim, str(out) + ".tmp")
+
+        compile_ranges(ranges_csv, str(out))
+
+        assert victim.read_text() == "intacto"
+        assert sorted(os.listdir(tmp_path)) == sorted(
+            ["rangos.csv", "rangos.lpgeo", "rangos.lpgeo.tmp", "victima.txt"]
+        )
+
+    @pytest.mark.parametrize("mtime", ["same", "older"])
+    def test_recompiles_changed_csv(self, ranges_csv, mtime):
+        """Test 17: Un CSV cambiado se recompila aunque conserve o retrase su mtime."""
+        with open_database(ranges_csv):
+            pass
+        st = os.stat(ranges_csv)
+
+        with open(ranges_csv, "a") as f:
+            f.write("8.8.8.0/24,US,15169,Google\n")
+        if mtime == "same":
+            os.utime(ranges_csv, ns=(st.st_atime_ns, st.st_mtime_ns))
+        else:
+            os.utime(ranges_csv, ns=(st.st_atime_ns, st.st_mtime_ns - 3600 * 10**9))
+
+        with open_database(ranges_csv) as database:
+            assert database.lookup("8.8.8.8").asn == 15169
+
+
+# ============================================================================
+# FASE 5: Tests de GeoDatabase
+# ============================================================================
+
+
+class TestGeoDatabase:
+    """Tests de la clase base de las fuentes geográficas."""
+
+    def test_geo_database_is_abstract(self):
+        """Test 18: GeoDatabase es abstracta: sin _lookup no se puede instanciar."""
+        with pytest.raises(TypeError):
+            geoip.GeoDatabase()
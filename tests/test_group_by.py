@@ -0,0 +1,234 @@
+import pytest
+import os
+from collections import Counter
+from dataclasses import replace
+from src.analyzers.group_by import GroupByAggregator, parse_metrics
+from src.analyzers.log_analyzer import LogAnalyzer
+from src.parsers.nginx_parser import NginxParser
+
+
+@pytest.fixture
+def nginx_entries():
+    """Fixture con las entradas de nginx_sample.log."""
+    return list(NginxParser().parse_file("fixtures/nginx_sample.log"))
+
+
+# ============================================================================
+# FASE 1: Tests de Agregación
+# ============================================================================
+
+
+class TestGroupBy:
+    """Tests de GroupByAggregator en memoria."""
+
+    def test_counts_match_counter(self, nginx_entries):
+        """Test 1: count por (status, method) coincide con un Counter."""
+        aggregator = GroupByAggregator(["status", "method"])
+        aggregator.consume(nginx_entries)
+
+        expected = Counter((e.status_code, e.method) for e in nginx_entries)
+        got = {(r["status"], r["method"]): r["count"] for r in aggregator.rows()}
+        assert got == expected
+
+    def test_metrics(self, nginx_entries):
+        """Test 2: Suma, media, mínimo, máximo y errores por grupo."""
+        aggregator = GroupByAggregator(
+            ["status_class"],
+            ["count", "bytes_sum", "bytes_avg", "bytes_min", "bytes_max", "errors"],
+        )
+        aggregator.consume(nginx_entries)
+        rows = {r["status_class"]: r for r in aggregator.rows()}
+
+        sizes = [e.response_size for e in nginx_entries if e.status_code // 100 == 2]
+        ok = rows["2xx"]
+        assert ok["count"] == len(sizes)
+        assert ok["bytes_sum"] == sum(sizes)
+        assert ok["bytes_avg"] == pytest.approx(sum(sizes) / len(sizes))
+        assert (ok["bytes_min"], ok["bytes_max"]) == (min(sizes), max(sizes))
+        assert ok["errors"] == 0
+        assert rows["4xx"]["errors"] == rows["4xx"]["count"]
+
+    def test_quantiles(self, nginx_entries):
+        """Test 3: pNN_size se aproxima con error relativo < 25 %."""
+        aggregator = GroupByAggregator(["method"], ["count", "p50_size", "p95_size"])
+        aggregator.consume(nginx_entries)
+        get = next(r for r in aggregator.rows() if r["method"] == "GET")
+
+        sizes = sorted(e.response_size for e in nginx_entries if e.method == "GET")
+        exact = sizes[int(0.95 * (len(sizes) - 1))]
+        assert abs(get["p95_size"] - exact) <= 0.25 * exact
+        assert get["p50_size"] <= get["p95_size"]
+
+    def test_derived_dimensions(self, nginx_entries):
+        """Test 4: hour y date salen del timestamp."""
+        aggregator = GroupByAggregator(["date", "hour"])
+        aggregator.consume(nginx_entries)
+
+        rows = aggregator.results()
+        assert rows[0]["date"] == "2024-11-26"
+        assert rows[0]["hour"] == min(e.timestamp.hour for e in nginx_entries)
+        assert sum(r["count"] for r in rows) == len(nginx_entries)
+
+    def test_results_order_and_top(self, nginx_entries):
+        """Test 5: results ordena por métrica de mayor a menor y corta en n."""
+        aggregator = GroupByAggregator(["ip"], ["count"])
+        aggregator.consume(nginx_entries)
+
+        assert aggregator.results(order_by="count", n=2) == [
+            {"ip": "192.168.1.100", "count": 8},
+            {"ip": "192.168.1.117", "count": 5},
+        ]
+
+    def test_none_keys_sort(self):
+        """Test 6: Las dimensiones sin valor (None) van al final al ordenar."""
+        parser = NginxParser()
+        line = (
+            '1.2.3.4 - - [26/Nov/2024:08:15:23 +0000] "GET / HTTP/1.1" 200 1 "-" "{}"'
+        )
+        entries = [parser.parse_line(line.format(ua)) for ua in ("b", "a")]
+        entries.append(replace(entries[0], user_agent=None))
+        aggregator = GroupByAggregator(["user_agent"])
+        aggregator.consume(entries)
+
+        assert [r["user_agent"] for r in aggregator.results()] == ["a", "b", None]
+
+    @pytest.mark.parametrize(
+        "keys, metrics",
+        [([], ["count"]), (["foo"], ["count"]), (["ip"], ["p95"]), (["ip"], ["x"])],
+    )
+    def test_invalid(self, keys, metrics):
+        """Test 7: Dimensiones o métricas desconocidas son un ValueError."""
+        with pytest.raises(ValueError):
+            GroupByAggregator(keys, metrics)
+
+    def test_parse_metrics(self):
+        """Test 8: parse_metrics acepta percentiles con decimales."""
+        assert parse_metrics(["count", "p99.9_size"]) == ["count", "p99.9_size"]
+
+
+# ============================================================================
+# FASE 2: Tests de Volcado a Disco
+# ============================================================================
+
+
+class TestSpill:
+    """Tests del límite de grupos en memoria."""
+
+    def test_spill_gives_same_results(self, nginx_entries, tmp_path):
+        """Test 9: Con volcados los resultados son los mismos que en memoria."""
+        metrics = ["count", "bytes_sum", "bytes_min", "bytes_max", "p95_size"]
+        in_memory = GroupByAggregator(["ip", "path"], metrics)
+        in_memory.consume(nginx_entries)
+
+        with GroupByAggregator(
+            ["ip", "path"], metrics, max_groups=5, spill_dir=str(tmp_path)
+        ) as spilled:
+            spilled.consume(nginx_entries[:40])
+            spilled.consume(nginx_entries[40:] + nginx_entries[:40])
+            assert spilled.spills > 1
+            assert len(spilled.groups) <= 5
+            rows = spilled.results()
+
+        in_memory.consume(nginx_entries[:40])
+        assert rows == in_memory.results()
+
+    def test_close_removes_spill_files(self, nginx_entries, tmp_path):
+        """Test 10: close() borra los archivos volcados."""
+        aggregator = GroupByAggregator(["ip"], max_groups=3, spill_dir=str(tmp_path))
+        aggregator.consume(nginx_entries)
+        assert os.listdir(tmp_path)
+
+        aggregator.results()
+        aggregator.close()
+        assert os.listdir(tmp_path) == []
+
+
+# ============================================================================
+# FASE 3: Tests de LogAnalyzer.group_by
+# ============================================================================
+
+
+class TestAnalyzerGroupBy:
+    """Tests de LogAnalyzer.group_by."""
+
+    def test_group_by(self, nginx_entries):
+        """Test 11: group_by con varias dimensiones y métricas en una pasada."""
+        rows = LogAnalyzer(nginx_entries).group_by(
+            ["status", "method", "hour"],
+            metrics=["count", "bytes_sum", "p95_size"],
+            order_by="count",
+            n=1,
+        )
+
+        assert rows == [
+            {
+                "status": 200,
+                "method": "GET",
+                "hour": 12,
+                "count": 12,
+                "bytes_sum": 154624,
+                "p95_size": 28671.5,
+            }
+        ]
+
+    def test_group_by_spill(self, nginx_entries):
+        """Test 12: Con max_groups bajo el resultado no cambia."""
+        analyzer = LogAnalyzer(nginx_entries)
+
+        assert analyzer.group_by(["path"], max_groups=2) == analyzer.group_by(["path"])
+
+
+# ============================================================================
+# FASE 4: Tests de Particiones Grandes y Top N
+# ============================================================================
+
+
+class TestLargeSpill:
+    """Tests del reparto recursivo de particiones y de results con n."""
+
+    @pytest.fixture
+    def many_paths(self, nginx_entries):
+        """Fixture con 2000 entradas, cada una con un path distinto."""
+        return [
+            replace(nginx_entries[i % len(nginx_entries)], path=f"/p{i}")
+            for i in range(2000)
+        ]
+
+    def test_partitions_stay_under_limit(self, many_paths, tmp_path, monkeypatch):
+        """Test 13: Una partición con más de max_groups grupos se reparte de nuevo."""
+        loaded = []
+        load = GroupByAggregator._load
+
+        def spy(self, path, limit):
+            merged = load(self, path, limit)
+            if merged is not None:
+                loaded.append(len(merged))
+            return merged
+
+        monkeypatch.setattr(GroupByAggregator, "_load", spy)
+        in_memory = GroupByAggregator(["path"], ["count", "bytes_sum"])
+        in_memory.consume(many_paths)
+
+        with GroupByAggregator(
+            ["path"], ["count", "bytes_sum"], max_groups=20, spill_dir=str(tmp_path)
+        ) as spilled:
+            spilled.consume(many_paths)
+            rows = spilled.results()
+            assert spilled.results() == rows
+
+        assert max(loaded) <= 20
+        assert rows == in_memory.results()
+        assert os.listdir(tmp_path) == []
+
+    def test_top_n(self, many_paths, tmp_path):
+        """Test 14: results con n da las mismas filas que ordenar todo y cortar."""
+        with GroupByAggregator(
+            ["ip"], ["count", "bytes_sum"], max_groups=3, spill_dir=str(tmp_path)
+        ) as aggregator:
+            aggregator.consume(many_paths)
+
+            assert aggregator.results("bytes_sum", n=3) == (
+                aggregator.results("bytes_sum")[:3]
+            )
+            assert aggregator.results(n=4) == aggregator.results()[:4]
+            assert aggregator.results("count", n=0) == []
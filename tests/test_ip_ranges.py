@@ -0,0 +1,186 @@
+import pytest
+import pickle
+import random
+from src.analyzers.filters import filter_networks
+from src.analyzers.ip_ranges import CidrTable, LOOKUP_CACHE_SIZE, ip_to_int
+from src.analyzers.log_analyzer import LogAnalyzer
+from src.analyzers.pipeline import EntryFilter, run_pipeline
+from src.parsers.nginx_parser import NginxParser
+
+
+@pytest.fixture
+def table():
+    """Fixture con prefijos anidados, disjuntos e IPv6."""
+    return CidrTable(
+        [
+            ("10.0.0.0/8", "privada"),
+            ("10.1.0.0/16", "oficina"),
+            ("10.1.2.0/24", "servidores"),
+            "192.168.1.96/28",
+            ("2001:db8::/32", "docs"),
+        ]
+    )
+
+
+@pytest.fixture
+def nginx_entries():
+    """Fixture con las entradas de nginx_sample.log."""
+    return list(NginxParser().parse_file("fixtures/nginx_sample.log"))
+
+
+# ============================================================================
+# FASE 1: Tests de la Tabla de Prefijos
+# ============================================================================
+
+
+class TestCidrTable:
+    """Tests de ip_to_int y CidrTable."""
+
+    @pytest.mark.parametrize(
+        "ip, expected",
+        [
+            ("0.0.0.1", (4, 1)),
+            ("10.0.0.1", (4, 0x0A000001)),
+            ("::1", (6, 1)),
+            ("::ffff:10.0.0.1", (4, 0x0A000001)),
+            ("2001:db8::1", (6, 0x20010DB8 << 96 | 1)),
+            ("10.0.0", None),
+            ("300.0.0.1", None),
+            ("no-es-ip", None),
+        ],
+    )
+    def test_ip_to_int(self, ip, expected):
+        """Test 1: ip_to_int convierte IPv4/IPv6 y rechaza las inválidas."""
+        assert ip_to_int(ip) == expected
+
+    @pytest.mark.parametrize(
+        "ip, label",
+        [
+            ("10.9.9.9", "privada"),
+            ("10.1.9.9", "oficina"),
+            ("10.1.2.3", "servidores"),
+            ("10.1.3.0", "oficina"),
+            ("10.2.0.0", "privada"),
+            ("192.168.1.100", "192.168.1.96/28"),
+            ("192.168.1.112", None),
+            ("11.0.0.0", None),
+            ("2001:db8:ffff::1", "docs"),
+            ("2001:db9::1", None),
+            ("::ffff:10.1.2.3", "servidores"),
+            ("basura", None),
+        ],
+    )
+    def test_most_specific(self, table, ip, label):
+        """Test 2: Gana el prefijo más específico; sin etiqueta se usa el CIDR."""
+        assert table.lookup(ip) == label
+
+    def test_contains_and_len(self, table):
+        """Test 3: `in` y len() funcionan sobre la tabla."""
+        assert "10.1.2.3" in table
+        assert "8.8.8.8" not in table
+        assert len(table) == 5
+
+    def test_many_prefixes(self):
+        """Test 4: Con miles de prefijos /24 la búsqueda coincide con ipaddress."""
+        rng = random.Random(7)
+        nets = {
+            f"{rng.randrange(1, 224)}.{rng.randrange(256)}.{rng.randrange(256)}.0/24"
+            for _ in range(10_000)
+        }
+        table = CidrTable(nets)
+
+        for net in list(nets)[:200]:
+            base = net.rsplit(".", 1)[0]
+            assert table.lookup(f"{base}.77") == net
+        assert table.lookup("224.0.0.1") is None
+
+    def test_cache_is_bounded(self, table, monkeypatch):
+        """Test 5: La caché de búsquedas se vacía al llegar al límite."""
+        monkeypatch.setattr("src.analyzers.ip_ranges.LOOKUP_CACHE_SIZE", 10)
+        for i in range(50):
+            table.lookup(f"10.0.0.{i}")
+
+        assert len(table._cache) <= 10 < LOOKUP_CACHE_SIZE
+
+    def test_pickles_without_cache(self, table):
+        """Test 6: Al serializar se descarta la caché y la tabla sigue igual."""
+        table.lookup("10.1.2.3")
+        copy = pickle.loads(pickle.dumps(table))
+
+        assert copy._cache == {}
+        assert copy.lookup("10.1.2.3") == "servidores"
+
+    def test_group(self, table):
+        """Test 7: group suma cuentas por etiqueta e ignora las IPs de fuera."""
+        counts = [("10.1.2.3", 2), ("10.1.2.4", 3), ("10.1.5.5", 1), ("8.8.8.8", 9)]
+
+        assert table.group(counts) == {"servidores": 5, "oficina": 1}
+
+    def test_from_file(self, tmp_path):
+        """Test 8: from_file lee prefijos con etiqueta e ignora comentarios."""
+        path = tmp_path / "rangos.txt"
+        path.write_text("# proveedor\n\n10.0.0.0/8,interna\n2001:db8::/32\n")
+        table = CidrTable.from_file(str(path))
+
+        assert table.lookup("10.2.3.4") == "interna"
+        assert table.lookup("2001:db8::5") == "2001:db8::/32"
+
+    def test_from_file_invalid(self, tmp_path):
+        """Test 9: Un prefijo inválido indica archivo y línea."""
+        path = tmp_path / "rangos.txt"
+        path.write_text("10.0.0.0/8\n10.0.0.0/99\n")
+
+        with pytest.raises(ValueError, match="rangos.txt:2"):
+            CidrTable.from_file(str(path))
+
+
+# ============================================================================
+# FASE 2: Tests de Filtrado y Agrupación por Red
+# ============================================================================
+
+
+class TestNetworkFilters:
+    """Tests de filtros y agregados por prefijo."""
+
+    def test_filter_networks(self, nginx_entries):
+        """Test 10: filter_networks deja solo las IPs del prefijo."""
+        matched = list(filter_networks(nginx_entries, CidrTable(["192.168.1.96/28"])))
+
+        assert len(matched) == 19
+
+    def test_analyzer_filter_by_cidr(self, nginx_entries):
+        """Test 11: filter_by_ip acepta una IP o un prefijo CIDR."""
+        analyzer = LogAnalyzer(nginx_entries)
+
+        assert len(analyzer.filter_by_ip("192.168.1.100")) == 8
+        assert len(analyzer.filter_by_ip("192.168.1.96/28")) == 19
+
+    def test_requests_by_network(self, nginx_entries):
+        """Test 12: requests_by_network cuenta por prefijo más específico."""
+        table = CidrTable([("192.168.1.0/24", "lan"), ("192.168.1.100/32", "admin")])
+
+        assert LogAnalyzer(nginx_entries).requests_by_network(table) == {
+            "lan": 81,
+            "admin": 8,
+        }
+
+    def test_pipeline_workers_networks(self):
+        """Test 13: El pipeline filtra por red igual en serie que con workers."""
+        jobs = [("fixtures/nginx_sample.log", NginxParser())]
+        entry_filter = EntryFilter(networks=CidrTable(["192.168.1.96/28"]))
+
+        serial = run_pipeline(jobs, entry_filter)
+        parallel = run_pipeline(jobs, entry_filter, workers=2)
+
+        assert serial.total_requests == parallel.total_requests == 19
+
+    def test_parse_ipv6_line(self):
+        """Test 14: El parser de nginx acepta IPs IPv6."""
+        line = (
+            '2001:db8::1 - - [26/Nov/2024:08:15:23 +0000] "GET / HTTP/1.1" '
+            '200 10 "-" "curl/8.0"'
+        )
+        entry = NginxParser().parse_line(line)
+
+        assert entry.ip == "2001:db8::1"
+        assert CidrTable(["2001:db8::/32"]).lookup(entry.ip) == "2001:db8::/32"
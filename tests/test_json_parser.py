@@ -0,0 +1,151 @@
+import pytest
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from src.models.log_entry import LogEntry
+from src.parsers.json_parser import JsonLinesParser
+from src.parsers.format_detector import detect_parser
+
+
+def make_line(**overrides) -> str:
+    """Genera una línea JSON estilo nginx escape=json."""
+    data = {
+        "remote_addr": "192.168.1.1",
+        "time_iso8601": "2024-11-26T12:00:00+00:00",
+        "request_method": "GET",
+        "request_uri": "/index.html",
+        "status": "200",
+        "body_bytes_sent": "1234",
+        "http_referer": "-",
+        "http_user_agent": "Mozilla/5.0",
+    }
+    data.update(overrides)
+    return json.dumps(data)
+
+
+@pytest.fixture
+def parser():
+    """Fixture que retorna una instancia del parser."""
+    return JsonLinesParser()
+
+
+# ============================================================================
+# FASE 1: Tests de Parsing de Línea
+# ============================================================================
+
+
+class TestJsonLinesParserLine:
+    """Tests de parsing de líneas individuales."""
+
+    def test_parse_valid_line(self, parser):
+        """Test 1: Una línea JSON válida retorna LogEntry."""
+        result = parser.parse_line(make_line())
+
+        assert isinstance(result, LogEntry)
+        assert result.ip == "192.168.1.1"
+        assert result.status_code == 200
+        assert result.response_size == 1234
+        assert result.timestamp == datetime(2024, 11, 26, 12, 0, 0, tzinfo=timezone.utc)
+
+    def test_dash_fields_are_none(self, parser):
+        """Test 2: Referrer "-" se convierte en None."""
+        result = parser.parse_line(make_line())
+
+        assert result.referrer is None
+        assert result.user_agent == "Mozilla/5.0"
+
+    def test_invalid_json_returns_none(self, parser):
+        """Test 3: Una línea que no es JSON retorna None."""
+        assert parser.parse_line("esto no es json") is None
+
+    def test_missing_field_returns_none(self, parser):
+        """Test 4: Un objeto sin campos requeridos retorna None."""
+        assert parser.parse_line('{"remote_addr": "1.2.3.4"}') is None
+
+    def test_non_object_returns_none(self, parser):
+        """Test 5: Un JSON que no es objeto retorna None."""
+        assert parser.parse_line("[1, 2, 3]") is None
+
+    def test_time_local_format(self, parser):
+        """Test 6: Acepta timestamps en formato $time_local."""
+        result = parser.parse_line(make_line(time_iso8601="26/Nov/2024:12:00:00 +0000"))
+
+        assert result.timestamp.hour == 12
+
+    def test_request_field_fallback(self, parser):
+        """Test 7: Usa la clave request si faltan método y ruta."""
+        line = make_line(request="POST /api/login HTTP/1.1")
+        data = json.loads(line)
+        del data["request_method"], data["request_uri"]
+
+        result = parser.parse_line(json.dumps(data))
+
+        assert result.method == "POST"
+        assert result.path == "/api/login"
+
+    def test_custom_field_mapping(self):
+        """Test 8: El mapeo de claves es configurable."""
+        parser = JsonLinesParser(fields={"ip": "client", "status_code": "code"})
+        data = json.loads(make_line())
+        data["client"] = data.pop("remote_addr")
+        data["code"] = 404
+        del data["status"]
+
+        result = parser.parse_line(json.dumps(data))
+
+        assert result.ip == "192.168.1.1"
+        assert result.status_code == 404
+
+
+# ============================================================================
+# FASE 2: Tests de Decodificación por Lotes
+# ============================================================================
+
+
+class TestBatchDecoding:
+    """Tests de decode_batch y parse_file."""
+
+    def test_decode_batch_valid_lines(self, parser):
+        """Test 9: Decodifica un lote completo."""
+        objs = parser.decode_batch([make_line(), make_line(status="404")])
+
+        assert [o["status"] for o in objs] == ["200", "404"]
+
+    def test_decode_batch_with_invalid_line(self, parser):
+        """Test 10: Una línea inválida no afecta al resto del lote."""
+        objs = parser.decode_batch([make_line(), "{roto}", make_line(status="500")])
+
+        assert objs[0]["status"] == "200"
+        assert objs[1] is None
+        assert objs[2]["status"] == "500"
+
+    def test_decode_batch_keeps_alignment(self, parser):
+        """Test 11: Una línea con dos objetos no desalinea el lote."""
+        objs = parser.decode_batch([make_line() + "," + make_line(), make_line()])
+
+        assert len(objs) == 2
+        assert objs[0] is None
+
+    def test_parse_file_fixture(self, parser):
+        """Test 12: Parsea el fixture JSON completo."""
+        entries = list(parser.parse_file(Path("fixtures/json_sample.log")))
+
+        assert len(entries) == 10
+        assert all(isinstance(e, LogEntry) for e in entries)
+
+    def test_parse_file_skips_invalid_lines(self, parser, tmp_path):
+        """Test 13: parse_file salta líneas vacías e inválidas."""
+        log = tmp_path / "mixed.log"
+        log.write_text(
+            "\n".join([make_line(), "", "basura", make_line(), "# comentario"])
+        )
+
+        entries = list(parser.parse_file(log))
+
+        assert len(entries) == 2
+
+    def test_detected_automatically(self):
+        """Test 14: El detector de formato reconoce JSON lines."""
+        assert isinstance(
+            detect_parser(Path("fixtures/json_sample.log")), JsonLinesParser
+        )
@@ -0,0 +1,123 @@
+import pytest
+from datetime import datetime
+from src.analyzers.live_metrics import BoundedLabelCounter, LiveMetrics, TopKCounter
+from src.formatters.prometheus_formatter import PrometheusFormatter
+from src.models.log_entry import LogEntry
+from src.parsers.parse_stats import ParseStats
+
+
+def make_entry(ip="192.168.1.1", method="GET", path="/", status=200, size=100):
+    return LogEntry(ip, datetime(2024, 11, 26, 12, 0, 0), method, path, status, size)
+
+
+# ============================================================================
+# FASE 1: Tests de Contadores Acotados
+# ============================================================================
+
+
+class TestBoundedCounters:
+    """Tests de TopKCounter y BoundedLabelCounter."""
+
+    def test_top_k_exact_when_small(self):
+        """Test 1: Con pocas claves las cuentas son exactas."""
+        top = TopKCounter(k=2)
+        for key in ["a", "b", "a", "c", "a", "b"]:
+            top.add(key)
+
+        assert top.most_common() == [("a", 3), ("b", 2)]
+
+    def test_top_k_memory_is_bounded(self):
+        """Test 2: TopKCounter nunca guarda más de capacity claves."""
+        top = TopKCounter(k=5, capacity=50)
+        for i in range(10_000):
+            top.add(f"/api/{i}")
+            top.add("/hot")
+
+        assert len(top.counts) <= 50
+        assert top.most_common(1) == [("/hot", 10_000)]
+
+    def test_bounded_labels_overflow_to_other(self):
+        """Test 3: Las etiquetas que no caben se acumulan en "other"."""
+        counter = BoundedLabelCounter(max_labels=2)
+        for label in ["GET", "POST", "PUT", "HACK", "GET"]:
+            counter.add(label)
+
+        assert dict(counter.items()) == {"GET": 2, "POST": 1, "other": 2}
+
+    def test_bounded_labels_are_sticky(self):
+        """Test 4: Una etiqueta admitida sigue teniendo serie propia."""
+        counter = BoundedLabelCounter(max_labels=1)
+        counter.add("GET")
+        counter.add("POST")
+        counter.add("GET")
+
+        assert dict(counter.items()) == {"GET": 2, "other": 1}
+
+
+# ============================================================================
+# FASE 2: Tests de LiveMetrics
+# ============================================================================
+
+
+class TestLiveMetrics:
+    """Tests de las métricas incrementales."""
+
+    def test_update_counts(self):
+        """Test 5: update acumula requests, errores y bytes."""
+        metrics = LiveMetrics()
+        metrics.update_many([make_entry(size=100), make_entry(status=500, size=50)])
+
+        assert metrics.requests_total == 2
+        assert metrics.errors_total == 1
+        assert metrics.bytes_total == 150
+        assert dict(metrics.by_status.items()) == {"200": 1, "500": 1}
+
+    def test_size_histogram_is_cumulative(self):
+        """Test 6: El histograma es acumulado y termina en +Inf."""
+        metrics = LiveMetrics(size_buckets=(100, 1000))
+        for size in (10, 100, 500, 5000):
+            metrics.update(make_entry(size=size))
+
+        assert metrics.size_histogram() == [("100", 2), ("1000", 3), ("+Inf", 4)]
+
+
+# ============================================================================
+# FASE 3: Tests de PrometheusFormatter
+# ============================================================================
+
+
+class TestPrometheusFormatter:
+    """Tests del formato de exposición de Prometheus."""
+
+    def test_format_contains_series(self):
+        """Test 7: El texto incluye counters, histograma y top-K."""
+        metrics = LiveMetrics()
+        metrics.update(make_entry(path="/index.html", size=10))
+
+        text = PrometheusFormatter().format_metrics(metrics)
+
+        assert "# TYPE logparse_requests_total counter" in text
+        assert 'logparse_requests_total{status="200"} 1' in text
+        assert 'logparse_response_size_bytes_bucket{le="+Inf"} 1' in text
+        assert 'logparse_top_path_requests{path="/index.html"} 1' in text
+        assert text.endswith("\n")
+
+    def test_label_values_are_escaped(self):
+        """Test 8: Las comillas y barras de las etiquetas se escapan."""
+        metrics = LiveMetrics()
+        metrics.update(make_entry(path='/a"b\\c'))
+
+        text = PrometheusFormatter().format_metrics(metrics)
+
+        assert 'path="/a\\"b\\\\c"' in text
+
+    def test_includes_parse_stats(self):
+        """Test 9: Con ParseStats se exponen líneas leídas y rechazadas."""
+        stats = ParseStats()
+        stats.lines_read = 10
+        stats.skip("no_match", "x")
+
+        text = PrometheusFormatter().format_metrics(LiveMetrics(), stats)
+
+        assert "logparse_lines_read_total 10" in text
+        assert "logparse_lines_rejected_total 1" in text
@@ -1,7 +1,10 @@
 import pytest
 from datetime import datetime
 from pathlib import Path
+from src.parsers.base_parser import BaseParser
 from src.parsers.nginx_parser import NginxParser
+from src.parsers.parse_stats import SKIP_INVALID, SKIP_NO_MATCH, ParseStats
+from src.profiling import Profiler
 from src.models.log_entry import LogEntry
 
 # ============================================================================
@@ -559,6 +562,58 @@ class TestPerformance:
         assert hasattr(parser, "NGINX_PATTERN") or hasattr(parser, "pattern")
 
 
+# ============================================================================
+# FASE 13: Tests de Parsing por Lotes
+# ============================================================================
+
+
+class TestBatchParsing:
+    """Tests para parse_lines del parser nginx."""
+
+    def test_parse_lines_matches_parse_line(self):
+        """Test 48: parse_lines da el mismo resultado que parse_line línea a línea."""
+        parser = NginxParser()
+        lines = Path("fixtures/nginx_sample.log").read_text().splitlines()
+
+        expected = [parser.parse_line(l.strip()) for l in lines]
+        expected = [e for e in expected if e is not None]
+
+        assert parser.parse_lines(lines) == expected
+
+    def test_parse_lines_skips_invalid_and_empty(self):
+        """Test 49: parse_lines salta líneas inválidas, vacías y con estado inválido."""
+        parser = NginxParser()
+        lines = [
+            "",
+            "basura",
+            '192.168.1.1 - - [26/Nov/2024:12:00:00 +0000] "GET / HTTP/1.1" 999 100 "-" "-"',
+            '  192.168.1.2 - - [26/Nov/2024:12:00:00 +0000] "GET / HTTP/1.1" 200 100 "-" "-"  ',
+        ]
+
+        entries = parser.parse_lines(lines)
+
+        assert [e.ip for e in entries] == ["192.168.1.2"]
+        assert entries[0].user_agent is None
+
+    def test_invalid_lines_same_reason_in_every_path(self):
+        """Test 50: Una línea con timestamp o estado inválido cuenta igual por cualquier camino."""
+        parser = NginxParser()
+        lines = [
+            "basura",
+            '192.168.1.1 - - [99/Nov/2024:12:00:00 +0000] "GET / HTTP/1.1" 200 100 "-" "-"',
+            '192.168.1.1 - - [26/Nov/2024:12:00:00 +0000] "GET / HTTP/1.1" 999 100 "-" "-"',
+        ]
+        expected = {SKIP_NO_MATCH: 1, SKIP_INVALID: 2}
+
+        batch, single, profiled = ParseStats(), ParseStats(), ParseStats()
+        parser.parse_lines(lines, batch)
+        BaseParser.parse_lines(parser, lines, single)
+        parser.parse_lines_profiled(lines, profiled, Profiler())
+
+        assert batch.skipped == single.skipped == profiled.skipped == expected
+        assert parser.parse_line(lines[1]) is None
+
+
 # ============================================================================
 # FIXTURES PARA TESTS
 # ============================================================================
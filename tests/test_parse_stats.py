@@ -0,0 +1,174 @@
+import pytest
+from pathlib import Path
+from src.parsers.nginx_parser import NginxParser
+from src.parsers.json_parser import JsonLinesParser
+from src.parsers.parse_stats import ParseStats
+from src.parsers.format_detector import parse_files
+from tests.test_base_parser import DummyParser
+
+# ============================================================================
+# FASE 1: Tests de ParseStats
+# ============================================================================
+
+
+class TestParseStats:
+    """Tests para la contabilidad de ParseStats."""
+
+    def test_empty_stats(self):
+        """Test 1: Unas estadísticas vacías no dividen por cero."""
+        stats = ParseStats()
+
+        assert stats.lines_skipped == 0
+        assert stats.rejection_rate == 0.0
+        assert stats.lines_per_second == 0.0
+
+    def test_skip_counts_by_reason(self):
+        """Test 2: skip cuenta las líneas por razón."""
+        stats = ParseStats()
+        stats.skip("no_match", "a")
+        stats.skip("no_match", "b")
+        stats.skip("empty", "")
+
+        assert stats.skipped == {"no_match": 2, "empty": 1}
+        assert stats.lines_rejected == 2
+
+    def test_no_sample_by_default(self):
+        """Test 3: Sin sample_size no se guardan líneas rechazadas."""
+        stats = ParseStats()
+        stats.skip("no_match", "basura")
+
+        assert stats.rejected_sample == []
+
+    def test_reservoir_is_bounded(self):
+        """Test 4: La muestra de rechazadas nunca supera sample_size."""
+        stats = ParseStats(sample_size=3)
+        for i in range(1000):
+            stats.skip("no_match", f"linea {i}")
+
+        assert len(stats.rejected_sample) == 3
+        assert stats.skipped["no_match"] == 1000
+
+    def test_empty_lines_are_not_sampled(self):
+        """Test 5: Líneas vacías y comentarios no entran en la muestra."""
+        stats = ParseStats(sample_size=3)
+        stats.skip("empty", "")
+        stats.skip("comment", "# x")
+
+        assert stats.rejected_sample == []
+
+
+# ============================================================================
+# FASE 2: Tests de Integración con los Parsers
+# ============================================================================
+
+
+class TestParserStats:
+    """Tests de las estadísticas recogidas por parse_file."""
+
+    def test_base_parser_stats(self):
+        """Test 6: BaseParser cuenta líneas leídas, parseadas y descartadas."""
+        stats = ParseStats(sample_size=10)
+
+        entries = list(
+            DummyParser().parse_file(Path("fixtures/test_base_mixed.log"), stats)
+        )
+
+        assert stats.lines_read == 6
+        assert stats.lines_parsed == len(entries) == 3
+        assert stats.skipped == {"no_match": 2, "comment": 1}
+        assert len(stats.rejected_sample) == 2
+        assert stats.bytes_read == Path("fixtures/test_base_mixed.log").stat().st_size
+
+    def test_nginx_parser_stats(self, tmp_path):
+        """Test 7: NginxParser distingue líneas sin match y con datos inválidos."""
+        log = tmp_path / "access.log"
+        log.write_text(
+            '192.168.1.1 - - [26/Nov/2024:12:00:00 +0000] "GET / HTTP/1.1" 200 1 "-" "-"\n'
+            '192.168.1.1 - - [26/Nov/2024:12:00:00 +0000] "GET / HTTP/1.1" 999 1 "-" "-"\n'
+            "basura\n"
+            "\n"
+        )
+        stats = ParseStats(sample_size=5)
+
+        entries = list(NginxParser().parse_file(log, stats))
+
+        assert len(entries) == 1
+        assert stats.lines_read == 4
+        assert stats.skipped == {"invalid": 1, "no_match": 1, "empty": 1}
+        assert stats.rejection_rate == pytest.approx(2 / 3)
+        assert stats.elapsed > 0
+
+    def test_json_parser_stats(self, tmp_path):
+        """Test 8: JsonLinesParser registra JSON inválido y objetos incompletos."""
+        log = tmp_path / "access.json"
+        log.write_text('{"remote_addr": "1.2.3.4"}\n{roto\n')
+        stats = ParseStats()
+
+        assert list(JsonLinesParser().parse_file(log, stats)) == []
+        assert stats.skipped == {"invalid": 1, "no_match": 1}
+
+    def test_parse_files_accumulates_stats(self):
+        """Test 9: parse_files acumula las estadísticas de todos los archivos."""
+        stats = ParseStats()
+        files = [Path("fixtures/nginx_sample.log"), Path("fixtures/json_sample.log")]
+
+        entries = list(parse_files(files, stats=stats))
+
+        assert stats.lines_parsed == len(entries)
+        assert "lines_per_second" in stats.to_dict()
+
+
+# ============================================================================
+# FASE 3: Tests de merge
+# ============================================================================
+
+
+class TestMerge:
+    """Tests para combinar estadísticas de varios workers."""
+
+    @staticmethod
+    def _stats(prefix, rejected, elapsed=0.0):
+        stats = ParseStats(sample_size=10, elapsed=elapsed)
+        for i in range(rejected):
+            stats.skip("no_match", f"{prefix} {i}")
+        return stats
+
+    def test_sample_weighted_by_rejected_lines(self):
+        """Test 10: La muestra combinada pesa cada lado por sus rechazadas."""
+        from_small = 0
+        for _ in range(200):
+            merged = self._stats("grande", 1000)
+            merged.merge(self._stats("pequeño", 10))
+            assert len(merged.rejected_sample) == 10
+            from_small += sum(
+                line.startswith("pequeño") for _, line in merged.rejected_sample
+            )
+
+        # Esperado: 200 * 10 * 10 / 1010 ≈ 20 (sin ponderar serían ~1000)
+        assert from_small < 100
+        assert merged._rejected_seen == 1010
+
+    def test_small_samples_are_kept_whole(self):
+        """Test 11: Si caben, se conservan todas las rechazadas de ambos lados."""
+        merged = self._stats("a", 3)
+        merged.merge(self._stats("b", 4))
+
+        assert sorted(line for _, line in merged.rejected_sample) == [
+            "a 0",
+            "a 1",
+            "a 2",
+            "b 0",
+            "b 1",
+            "b 2",
+            "b 3",
+        ]
+
+    def test_worker_time_is_not_wall_time(self):
+        """Test 12: El elapsed de las partes va a worker_time, no a elapsed."""
+        merged = ParseStats(lines_read=100, elapsed=1.0)
+        merged.merge(ParseStats(lines_read=100, elapsed=1.0))
+        merged.merge(ParseStats(lines_read=100, elapsed=1.0))
+
+        assert merged.elapsed == 1.0
+        assert merged.worker_time == 2.0
+        assert merged.lines_per_second == 300.0
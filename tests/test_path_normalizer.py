@@ -0,0 +1,144 @@
+import pytest
+import pickle
+from src.analyzers.aggregate import LogAggregate
+from src.analyzers.filters import filter_path_template
+from src.analyzers.log_analyzer import LogAnalyzer
+from src.analyzers.path_normalizer import PathNormalizer, parse_rule
+from src.analyzers.pipeline import EntryFilter, run_pipeline
+from src.parsers.nginx_parser import NginxParser
+
+
+@pytest.fixture
+def normalizer():
+    """Fixture con un PathNormalizer con las reglas por defecto."""
+    return PathNormalizer()
+
+
+@pytest.fixture
+def nginx_entries():
+    """Fixture con las entradas de nginx_sample.log."""
+    return list(NginxParser().parse_file("fixtures/nginx_sample.log"))
+
+
+# ============================================================================
+# FASE 1: Tests de Normalización
+# ============================================================================
+
+
+class TestNormalize:
+    """Tests de PathNormalizer.normalize."""
+
+    @pytest.mark.parametrize(
+        "path, template",
+        [
+            ("/api/users/123", "/api/users/{id}"),
+            ("/api/users/456?page=2", "/api/users/{id}"),
+            ("/api/users/123/orders/9#top", "/api/users/{id}/orders/{id}"),
+            ("/files/550e8400-e29b-41d4-a716-446655440000", "/files/{id}"),
+            ("/commits/9fceb02d0ae598e95dc970b74767f19372d61af8", "/commits/{id}"),
+            ("/", "/"),
+            ("/api/v2/users", "/api/v2/users"),
+            ("/blog/deadbeef", "/blog/deadbeef"),
+            ("/static/app.3f9a.js", "/static/app.3f9a.js"),
+        ],
+    )
+    def test_default_templates(self, normalizer, path, template):
+        """Test 1: Query string fuera y segmentos numéricos/UUID/hex a {id}."""
+        assert normalizer.normalize(path) == template
+
+    def test_keep_query(self):
+        """Test 2: strip_query=False conserva la query string."""
+        normalizer = PathNormalizer(strip_query=False, collapse_ids=False)
+
+        assert normalizer.normalize("/a/1?x=2") == "/a/1?x=2"
+
+    def test_user_rules(self):
+        """Test 3: Las reglas del usuario (plantillas literales) se aplican tras colapsar ids."""
+        normalizer = PathNormalizer([(r"^/u/[^/]+", "/u/{user}"), (r"^/u/", "/nunca")])
+
+        assert normalizer.normalize("/u/alice/posts/3") == "/u/{user}/posts/{id}"
+        # La plantilla es literal: las barras invertidas no son escapes
+        literal = PathNormalizer([(r"^/(\w+)/", r"/\1\d/")])
+        assert literal.normalize("/files/x") == r"/\1\d/x"
+
+    def test_cache_hits(self, normalizer):
+        """Test 4: Un path repetido se resuelve desde la caché."""
+        for _ in range(3):
+            normalizer.normalize("/api/users/1")
+
+        info = normalizer.cache_info()
+        assert (info.hits, info.misses) == (2, 1)
+
+    def test_cache_is_bounded(self):
+        """Test 5: La caché LRU no pasa de cache_size paths."""
+        normalizer = PathNormalizer(cache_size=100)
+        for i in range(1_000):
+            normalizer.normalize(f"/items/{i}")
+
+        assert normalizer.cache_info().currsize == 100
+
+    def test_pickles_without_cache(self, normalizer):
+        """Test 6: El normalizer viaja a los workers con una caché vacía."""
+        normalizer.normalize("/api/users/1")
+        copy = pickle.loads(pickle.dumps(normalizer))
+
+        assert copy.cache_info().currsize == 0
+        assert copy.normalize("/api/users/2") == "/api/users/{id}"
+
+    def test_group(self, normalizer):
+        """Test 7: group suma cuentas por plantilla."""
+        grouped = normalizer.group([("/a/1", 2), ("/a/2", 3), ("/b", 1)])
+
+        assert grouped == {"/a/{id}": 5, "/b": 1}
+
+    @pytest.mark.parametrize("spec", ["sin-igual", "=/x", "[=/x"])
+    def test_parse_rule_invalid(self, spec):
+        """Test 8: Las reglas mal formadas lanzan ValueError."""
+        with pytest.raises(ValueError):
+            parse_rule(spec)
+
+    def test_parse_rule(self):
+        """Test 9: parse_rule separa por el último "=": el patrón puede contenerlo."""
+        assert parse_rule("^/q\\?a=b=/q") == ("^/q\\?a=b", "/q")
+        assert parse_rule("^/api(?=/v2)=/api-v2") == ("^/api(?=/v2)", "/api-v2")
+
+
+# ============================================================================
+# FASE 2: Tests de Agrupación por Plantilla
+# ============================================================================
+
+
+class TestGroupByTemplate:
+    """Tests de top_paths y filtros por plantilla."""
+
+    def test_analyzer_top_paths(self, nginx_entries, normalizer):
+        """Test 10: top_paths con normalizer agrupa /api/users/1 y /api/users/2."""
+        top = dict(LogAnalyzer(nginx_entries).top_paths(None, normalizer))
+
+        assert top["/api/users/{id}"] == 2
+        assert "/api/users/123" not in top
+
+    def test_aggregate_counts_templates(self, nginx_entries, normalizer):
+        """Test 11: LogAggregate con normalizer cuenta plantillas."""
+        aggregate = LogAggregate(normalizer)
+        aggregate.consume(nginx_entries)
+
+        assert aggregate.path_counts["/api/users/{id}"] == 2
+        assert sum(aggregate.path_counts.values()) == len(nginx_entries)
+
+    def test_filter_path_template(self, nginx_entries):
+        """Test 12: filter_path_template deja solo las requests de la plantilla."""
+        matched = list(filter_path_template(nginx_entries, "/api/users/{id}"))
+
+        assert len(matched) == 2
+        assert all(e.path.startswith("/api/users/") for e in matched)
+
+    def test_pipeline_workers_group_paths(self, normalizer):
+        """Test 13: El pipeline agrupa igual en serie que con workers."""
+        jobs = [("fixtures/nginx_sample.log", NginxParser())]
+        entry_filter = EntryFilter(path_template="/api/users/{id}")
+
+        serial = run_pipeline(jobs, entry_filter, normalizer=normalizer)
+        parallel = run_pipeline(jobs, entry_filter, workers=2, normalizer=normalizer)
+
+        assert serial.path_counts == parallel.path_counts == {"/api/users/{id}": 2}
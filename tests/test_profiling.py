@@ -0,0 +1,179 @@
+import pytest
+import pstats
+import time
+from datetime import datetime
+from pathlib import Path
+from src import profiling
+from src.analyzers.aggregate import LogAggregate
+from src.analyzers.log_analyzer import LogAnalyzer
+from src.analyzers.rate_tracker import RateTracker
+from src.parsers.nginx_parser import NginxParser
+from src.parsers.parse_stats import ParseStats
+from tests.test_base_parser import DummyParser
+
+# ============================================================================
+# FASE 1: Tests del Profiler
+# ============================================================================
+
+
+class TestProfiler:
+    """Tests de la acumulación de tiempos por etapa."""
+
+    def test_stage_records_time_and_calls(self):
+        """Test 1: stage acumula segundos y llamadas."""
+        profiler = profiling.Profiler()
+        for _ in range(3):
+            with profiler.stage("format"):
+                pass
+
+        ((name, seconds, calls),) = profiler.report()
+        assert name == "format"
+        assert calls == 3
+        assert seconds >= 0
+
+    def test_nested_stages_self_time(self):
+        """Test 2: El tiempo propio de una etapa excluye el de sus hijas."""
+        profiler = profiling.Profiler()
+        with profiler.stage("outer"):
+            with profiler.stage("inner"):
+                time.sleep(0.01)
+
+        assert profiler.self_times[("outer", "inner")] >= 0.01
+        assert profiler.self_times[("outer",)] < 0.01
+
+    def test_add_discounts_from_open_stage(self):
+        """Test 3: Las etapas pre-medidas se descuentan de la etapa abierta."""
+        profiler = profiling.Profiler()
+        with profiler.stage("aggregate"):
+            profiler.add("parse.regex", 5.0, calls=100)
+
+        assert profiler.cumulative["parse.regex"] == [5.0, 100]
+        assert profiler.self_times[("aggregate",)] < 0
+
+    def test_collapsed_stacks_format(self):
+        """Test 4: collapsed_stacks genera "pila microsegundos" por línea."""
+        profiler = profiling.Profiler()
+        profiler.add("parse.regex", 0.5)
+
+        assert profiler.collapsed_stacks() == "parse;regex 500000\n"
+
+    def test_format_report_has_header(self):
+        """Test 5: format_report incluye cabecera y etapas."""
+        profiler = profiling.Profiler()
+        profiler.add("parse.io", 0.1)
+
+        report = profiler.format_report()
+
+        assert "Etapa" in report
+        assert "parse.io" in report
+
+
+# ============================================================================
+# FASE 2: Tests de Activación e Instrumentación
+# ============================================================================
+
+
+class TestProfileContext:
+    """Tests de profile(), stage() e instrument()."""
+
+    def test_inactive_by_default(self):
+        """Test 6: Sin profile() no hay Profiler activo."""
+        assert profiling.active() is None
+        with profiling.stage("nada"):
+            pass
+
+    def test_profile_activates_and_restores(self):
+        """Test 7: profile() activa un Profiler y lo desactiva al salir."""
+        with profiling.profile() as profiler:
+            assert profiling.active() is profiler
+        assert profiling.active() is None
+
+    def test_parse_stages_are_recorded(self):
+        """Test 8: NginxParser registra regex, timestamp y validación."""
+        with profiling.profile() as profiler:
+            entries = list(NginxParser().parse_file(Path("fixtures/nginx_sample.log")))
+
+        for name in (
+            "parse.io",
+            "parse.decode",
+            "parse.regex",
+            "parse.timestamp",
+            "parse.validation",
+        ):
+            assert name in profiler.cumulative
+        assert profiler.cumulative["parse.validation"][1] == len(entries)
+
+    def test_profiled_parse_gives_same_result(self):
+        """Test 9: Perfilar no cambia las entradas ni las estadísticas."""
+        log = Path("fixtures/nginx_sample.log")
+        plain_stats, profiled_stats = ParseStats(), ParseStats()
+        plain = list(NginxParser().parse_file(log, plain_stats))
+        with profiling.profile():
+            profiled = list(NginxParser().parse_file(log, profiled_stats))
+
+        assert profiled == plain
+        assert profiled_stats.skipped == plain_stats.skipped
+
+    def test_generic_parser_records_lines_stage(self):
+        """Test 10: Un parser sin etapas propias se mide como parse.lines."""
+        with profiling.profile() as profiler:
+            list(DummyParser().parse_file(Path("fixtures/test_base_simple.log")))
+
+        assert "parse.lines" in profiler.cumulative
+
+    def test_analyzer_methods_are_instrumented(self):
+        """Test 11: Los métodos de LogAnalyzer se miden como aggregate.*."""
+        analyzer = LogAnalyzer(
+            list(NginxParser().parse_file(Path("fixtures/nginx_sample.log")))
+        )
+        with profiling.profile() as profiler:
+            analyzer.get_summary()
+
+        assert profiler.cumulative["aggregate.get_summary"][1] == 1
+        assert (
+            "aggregate.get_summary",
+            "aggregate.total_errors",
+        ) in profiler.self_times
+
+    def test_cprofile_and_collapsed_output(self, tmp_path):
+        """Test 12: profile() puede guardar pstats y collapsed stacks."""
+        pstats_file = tmp_path / "out.pstats"
+        collapsed_file = tmp_path / "out.folded"
+        with profiling.profile(str(pstats_file), str(collapsed_file)):
+            list(NginxParser().parse_file(Path("fixtures/nginx_sample.log")))
+
+        assert pstats.Stats(str(pstats_file)).total_calls > 0
+        assert "parse;regex" in collapsed_file.read_text()
+
+    def test_generators_time_iteration(self):
+        """Test 13: En un generador se mide la iteración, no la creación."""
+
+        @profiling.instrument("demo")
+        class Slow:
+            def items(self):
+                for i in range(3):
+                    time.sleep(0.01)
+                    yield i
+
+        with profiling.profile() as profiler:
+            items = []
+            for item in Slow().items():
+                time.sleep(0.05)
+                items.append(item)
+
+        seconds, calls = profiler.cumulative["demo.items"]
+        assert items == [0, 1, 2]
+        assert calls == 1
+        assert 0.03 <= seconds < 0.1
+
+    def test_per_entry_methods_are_excluded(self):
+        """Test 14: Los métodos por entrada (exclude) no se instrumentan."""
+        tracker = RateTracker(window=60)
+        with profiling.profile() as profiler:
+            tracker.add("1.2.3.4", datetime(2024, 11, 26))
+            LogAggregate().update(
+                next(NginxParser().parse_file(Path("fixtures/nginx_sample.log")))
+            )
+
+        assert not any(name.startswith("rate.") for name in profiler.cumulative)
+        assert "aggregate.update" not in profiler.cumulative
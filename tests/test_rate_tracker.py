@@ -0,0 +1,159 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from src.analyzers.rate_tracker import RateAlert, RateRule, RateTracker
+from src.models.log_entry import LogEntry
+
+BASE = datetime(2024, 11, 26, 10, 0, 0, tzinfo=timezone.utc)
+
+
+def at(seconds):
+    return BASE + timedelta(seconds=seconds)
+
+
+def login(ip="203.0.113.7", seconds=0, status=401, path="/api/login"):
+    return LogEntry(ip, at(seconds), "POST", path, status, 20)
+
+
+# ============================================================================
+# FASE 1: Tests de la Ventana Deslizante
+# ============================================================================
+
+
+class TestSlidingWindow:
+    """Tests del conteo por clave de RateTracker."""
+
+    def test_counts_within_window(self):
+        """Test 1: Los eventos dentro de la ventana se suman."""
+        tracker = RateTracker(window=60, threshold=100)
+        for s in range(0, 50, 5):
+            tracker.add("a", at(s))
+
+        assert tracker.count("a") == 10
+        assert tracker.count("otra") == 0
+
+    def test_old_buckets_slide_out(self):
+        """Test 2: Los buckets que salen de la ventana dejan de contar."""
+        tracker = RateTracker(window=60, threshold=100, buckets=6)
+        tracker.add("a", at(0), 5)
+        tracker.add("a", at(30), 3)
+        tracker.add("b", at(65))
+
+        assert tracker.count("a") == 3
+        tracker.add("b", at(95))
+        assert tracker.count("a") == 0
+
+    def test_alert_once_while_above_threshold(self):
+        """Test 3: Se alerta al alcanzar el umbral, una vez mientras se siga por encima."""
+        tracker = RateTracker(window=60, threshold=3)
+        alerts = [tracker.add("a", at(s)) for s in range(6)]
+
+        assert alerts[:2] == [None, None]
+        assert alerts[2] == RateAlert("a", at(2), 3)
+        assert alerts[3:] == [None, None, None]
+
+    def test_alert_again_after_dropping(self):
+        """Test 4: Una clave que baja del umbral vuelve a alertar al alcanzarlo."""
+        tracker = RateTracker(window=60, threshold=3)
+        first = [tracker.add("a", at(s)) for s in (0, 1, 2)]
+        second = [tracker.add("a", at(s)) for s in (200, 201, 202)]
+
+        assert first[-1] is not None and second[-1] is not None
+
+    def test_late_entries_within_window_count(self):
+        """Test 5: Las entradas desordenadas cuentan si siguen en la ventana."""
+        tracker = RateTracker(window=60, threshold=100)
+        tracker.add("a", at(50))
+        tracker.add("a", at(20))
+        tracker.add("a", at(-30))
+
+        assert tracker.count("a") == 2
+
+    def test_invalid_window(self):
+        """Test 6: Una ventana no positiva es un error."""
+        with pytest.raises(ValueError):
+            RateTracker(window=0)
+
+
+# ============================================================================
+# FASE 2: Tests de Memoria Acotada
+# ============================================================================
+
+
+class TestBoundedMemory:
+    """Tests de expulsión de claves e informe de infractores."""
+
+    def test_idle_keys_are_evicted(self):
+        """Test 7: Las claves inactivas durante una ventana se descartan."""
+        tracker = RateTracker(window=60, threshold=100)
+        for i in range(1_000):
+            tracker.add(f"10.0.{i // 256}.{i % 256}", at(i))
+
+        assert len(tracker.keys) <= 61
+        assert tracker.evicted >= 939
+
+    def test_max_keys(self):
+        """Test 8: Nunca se siguen más de max_keys claves a la vez."""
+        tracker = RateTracker(window=60, threshold=50, max_keys=100)
+        for i in range(10_000):
+            tracker.add(f"ip{i}", at(1))
+            tracker.add("atacante", at(1))
+
+        assert len(tracker.keys) <= 100
+        assert tracker.offenders() == [("atacante", 10_000)]
+
+    def test_offenders_only_current_window(self):
+        """Test 9: offenders() solo incluye las claves por encima del umbral ahora."""
+        tracker = RateTracker(window=60, threshold=2)
+        for key in ("a", "a", "b", "b", "b", "c"):
+            tracker.add(key, at(0))
+
+        assert tracker.offenders() == [("b", 3), ("a", 2)]
+        tracker.add("c", at(120))
+        assert tracker.offenders() == []
+        assert tracker.offending == {}
+
+
+# ============================================================================
+# FASE 3: Tests de Reglas sobre LogEntry
+# ============================================================================
+
+
+class TestRateRule:
+    """Tests de RateRule y RateTracker.observe."""
+
+    def test_rule_matches_path_and_status(self):
+        """Test 10: La regla filtra por path (sin query string) y status."""
+        rule = RateRule("/api/login", frozenset({401, 403}))
+
+        assert rule.matches(login(path="/api/login?next=/"))
+        assert rule.matches(login(status=403))
+        assert not rule.matches(login(status=200))
+        assert not rule.matches(login(path="/api/login2"))
+
+    def test_rule_prefix(self):
+        """Test 11: Un path terminado en "/" se compara como prefijo."""
+        rule = RateRule("/api/")
+
+        assert rule.matches(login(path="/api/users"))
+        assert not rule.matches(login(path="/apix"))
+
+    def test_observe_brute_force(self):
+        """Test 12: observe alerta de la IP con muchos 401 en /api/login."""
+        tracker = RateTracker(window=60, threshold=10)
+        entries = [login(seconds=i) for i in range(15)]
+        entries += [login(ip="198.51.100.2", seconds=i) for i in range(5)]
+        entries += [login(ip="198.51.100.3", seconds=i, status=200) for i in range(20)]
+
+        alerts = tracker.observe(entries, RateRule("/api/login", frozenset({401})))
+
+        assert [(a.key, a.count) for a in alerts] == [("203.0.113.7", 10)]
+        assert tracker.offenders() == [("203.0.113.7", 15)]
+
+    def test_observe_custom_key(self):
+        """Test 13: Se puede agrupar por otra clave que la IP."""
+        tracker = RateTracker(window=60, threshold=3)
+        entries = [login(ip=f"10.0.0.{i}", seconds=i) for i in range(3)]
+
+        alerts = tracker.observe(entries, key=lambda e: e.path)
+
+        assert [a.key for a in alerts] == ["/api/login"]
@@ -0,0 +1,162 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from src.analyzers.sessionizer import Session, SessionSummary, Sessionizer, is_page
+from src.models.log_entry import LogEntry
+from src.parsers.nginx_parser import NginxParser
+
+BASE = datetime(2024, 11, 26, 10, 0, 0, tzinfo=timezone.utc)
+
+
+def visit(ip="10.0.0.1", minutes=0.0, path="/", user_agent="Mozilla/5.0"):
+    return LogEntry(
+        ip,
+        BASE + timedelta(minutes=minutes),
+        "GET",
+        path,
+        200,
+        100,
+        user_agent=user_agent,
+    )
+
+
+# ============================================================================
+# FASE 1: Tests de Sesionización
+# ============================================================================
+
+
+class TestSessionizer:
+    """Tests de Sessionizer."""
+
+    def test_requests_within_gap_share_session(self):
+        """Test 1: Requests con pausas menores que gap forman una sesión."""
+        sessions = list(Sessionizer().sessions(visit(minutes=m) for m in (0, 10, 25)))
+
+        assert len(sessions) == 1
+        assert sessions[0].requests == 3
+        assert sessions[0].duration == 25 * 60
+
+    def test_gap_splits_sessions(self):
+        """Test 2: Una pausa mayor que gap abre una sesión nueva."""
+        sessions = list(Sessionizer().sessions(visit(minutes=m) for m in (0, 5, 40)))
+
+        assert [s.requests for s in sessions] == [2, 1]
+
+    def test_ip_and_user_agent_are_the_key(self):
+        """Test 3: Misma IP con otro user agent es otro visitante."""
+        entries = [visit(), visit(user_agent="curl/8.0"), visit(ip="10.0.0.2")]
+
+        sessions = list(Sessionizer().sessions(entries))
+
+        assert len(sessions) == 3
+
+    def test_sessions_close_as_watermark_advances(self):
+        """Test 4: feed emite las sesiones inactivas sin esperar al final."""
+        sessionizer = Sessionizer(gap=30 * 60, lateness=0)
+        entries = [visit(ip="10.0.0.1", minutes=0), visit(ip="10.0.0.2", minutes=31)]
+
+        closed = list(sessionizer.feed(entries))
+
+        assert [s.ip for s in closed] == ["10.0.0.1"]
+        assert list(sessionizer.open) == [("10.0.0.2", "Mozilla/5.0")]
+
+    def test_only_open_sessions_in_memory(self):
+        """Test 5: Solo se guardan las sesiones abiertas."""
+        sessionizer = Sessionizer(gap=60, lateness=0)
+        entries = (
+            visit(ip=f"10.0.{i // 256}.{i % 256}", minutes=i) for i in range(5_000)
+        )
+
+        closed = sum(1 for _ in sessionizer.feed(entries))
+
+        assert closed >= 4_990
+        assert len(sessionizer.open) <= 2
+
+    def test_late_entries_join_open_session(self):
+        """Test 6: Una entrada algo desordenada se suma a su sesión abierta."""
+        entries = [
+            visit(minutes=10),
+            visit(ip="10.0.0.2", minutes=10.5),
+            visit(minutes=9),
+        ]
+
+        sessions = list(Sessionizer().sessions(entries))
+
+        first = [s for s in sessions if s.ip == "10.0.0.1"][0]
+        assert first.requests == 2
+        assert first.start == BASE + timedelta(minutes=9)
+        assert first.end == BASE + timedelta(minutes=10)
+
+    @pytest.mark.parametrize(
+        "path, expected",
+        [
+            ("/", True),
+            ("/products/42", True),
+            ("/index.html", True),
+            ("/static/app.js", False),
+            ("/img/logo.PNG?v=3", False),
+            ("/v1.2/users", True),
+        ],
+    )
+    def test_is_page(self, path, expected):
+        """Test 7: Los recursos estáticos no cuentan como página vista."""
+        assert is_page(path) is expected
+
+
+# ============================================================================
+# FASE 2: Tests de SessionSummary
+# ============================================================================
+
+
+class TestSessionSummary:
+    """Tests del resumen de sesiones."""
+
+    def test_summary_metrics(self):
+        """Test 8: Duración media, páginas por sesión y rebote."""
+        summary = SessionSummary()
+        summary.consume(
+            [
+                Session("a", None, BASE, BASE, requests=3, pages=1),
+                Session(
+                    "b", None, BASE, BASE + timedelta(minutes=10), requests=5, pages=4
+                ),
+            ]
+        )
+
+        assert summary.get_summary() == {
+            "sessions": 2,
+            "requests": 8,
+            "avg_duration": 300.0,
+            "max_duration": 600.0,
+            "avg_pages": 2.5,
+            "bounce_rate": 0.5,
+        }
+
+    def test_histograms(self):
+        """Test 9: Las sesiones se reparten por rangos de duración y páginas."""
+        summary = SessionSummary()
+        summary.consume(
+            [
+                Session("a", None, BASE, BASE, pages=1),
+                Session("b", None, BASE, BASE + timedelta(seconds=60), pages=3),
+                Session("c", None, BASE, BASE + timedelta(hours=2), pages=11),
+            ]
+        )
+
+        assert summary.duration_histogram()["0s"] == 1
+        assert summary.duration_histogram()["< 1m"] == 1
+        assert summary.duration_histogram()["> 1h"] == 1
+        assert summary.pages_histogram() == {"0-1": 1, "2-3": 1, "4-10": 0, "> 10": 1}
+
+    def test_empty_summary(self):
+        """Test 10: Sin sesiones las medias son 0."""
+        assert SessionSummary().get_summary()["avg_duration"] == 0.0
+
+    def test_fixture_sessions(self):
+        """Test 11: Cada request del fixture está en exactamente una sesión."""
+        entries = list(NginxParser().parse_file("fixtures/nginx_sample.log"))
+        summary = SessionSummary()
+
+        summary.consume(Sessionizer().sessions(entries))
+
+        assert summary.requests == len(entries)
+        assert 0 < summary.sessions <= len(entries)
@@ -0,0 +1,165 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from src.analyzers.log_analyzer import LogAnalyzer
+from src.analyzers.spike_detector import (
+    METRIC_ERROR_RATE,
+    METRIC_REQUESTS,
+    Ewma,
+    SpikeDetector,
+)
+from src.analyzers.timeseries import TimeBucket, TimeSeriesAggregator
+from src.models.log_entry import LogEntry
+
+BASE = datetime(2024, 11, 26, 10, 0, 0, tzinfo=timezone.utc)
+
+
+def bucket(minute, requests, errors=0):
+    return TimeBucket(BASE + timedelta(minutes=minute), requests, errors, 0, {})
+
+
+def steady(minutes=30, requests=40, errors=2):
+    """Serie con algo de ruido alrededor de requests y errors por minuto."""
+    return [
+        bucket(m, requests + (m % 5) - 2, errors + (m % 3) - 1) for m in range(minutes)
+    ]
+
+
+# ============================================================================
+# FASE 1: Tests de Ewma
+# ============================================================================
+
+
+class TestEwma:
+    """Tests de la media y varianza exponenciales."""
+
+    def test_constant_series(self):
+        """Test 1: Una serie constante tiene esa media y varianza 0."""
+        ewma = Ewma(0.2)
+        for _ in range(50):
+            ewma.update(10)
+
+        assert ewma.mean == 10
+        assert ewma.var == 0
+
+    def test_tracks_level_shift(self):
+        """Test 2: La media sigue un cambio de nivel."""
+        ewma = Ewma(0.3)
+        for value in [0] * 20 + [100] * 40:
+            ewma.update(value)
+
+        assert ewma.mean == pytest.approx(100, abs=0.1)
+
+    def test_variance_of_alternating_series(self):
+        """Test 3: La varianza refleja la dispersión de la serie."""
+        ewma = Ewma(0.05)
+        for i in range(2_000):
+            ewma.update(10 if i % 2 else -10)
+
+        assert ewma.var == pytest.approx(100, rel=0.1)
+
+
+# ============================================================================
+# FASE 2: Tests de SpikeDetector
+# ============================================================================
+
+
+class TestSpikeDetector:
+    """Tests de la detección de picos."""
+
+    def test_steady_series_has_no_spikes(self):
+        """Test 4: Una serie estable no genera picos."""
+        assert list(SpikeDetector().detect(steady())) == []
+
+    def test_traffic_spike(self):
+        """Test 5: Un minuto con 5x tráfico es un pico de requests."""
+        buckets = steady() + [bucket(30, 200, 5)]
+
+        spikes = list(SpikeDetector().detect(buckets))
+
+        assert [(s.metric, s.start) for s in spikes] == [
+            (METRIC_REQUESTS, BASE + timedelta(minutes=30))
+        ]
+        assert spikes[0].baseline == pytest.approx(40, abs=2)
+        assert spikes[0].zscore > 3
+
+    def test_error_rate_spike(self):
+        """Test 6: Un minuto con la mitad de errores es un pico de tasa de error."""
+        buckets = steady() + [bucket(30, 40, 20)]
+
+        spikes = list(SpikeDetector().detect(buckets))
+
+        assert [s.metric for s in spikes] == [METRIC_ERROR_RATE]
+        assert spikes[0].value == 0.5
+
+    def test_warmup(self):
+        """Test 7: Durante el warmup no se reportan picos."""
+        buckets = [bucket(0, 10), bucket(1, 10), bucket(2, 500)]
+
+        assert list(SpikeDetector(warmup=10).detect(buckets)) == []
+        assert len(list(SpikeDetector(warmup=2).detect(buckets))) == 1
+
+    def test_error_rate_needs_min_requests(self):
+        """Test 8: Con pocas requests no se evalúa la tasa de error."""
+        buckets = steady(requests=5, errors=0) + [bucket(30, 5, 5)]
+
+        spikes = list(SpikeDetector(min_requests=20).detect(buckets))
+
+        assert METRIC_ERROR_RATE not in [s.metric for s in spikes]
+
+    def test_incremental_matches_batch(self):
+        """Test 9: Observar bucket a bucket da lo mismo que detect sobre la serie."""
+        buckets = steady() + [bucket(30, 200)] + steady(10)
+        incremental = SpikeDetector()
+
+        streamed = [s for b in buckets for s in incremental.observe(b)]
+
+        assert streamed == list(SpikeDetector().detect(buckets))
+
+    def test_invalid_alpha(self):
+        """Test 10: alpha debe estar en (0, 1]."""
+        with pytest.raises(ValueError):
+            SpikeDetector(alpha=0)
+
+
+# ============================================================================
+# FASE 3: Tests de Integración
+# ============================================================================
+
+
+def entries_with_spike():
+    """40 requests por minuto durante 30 minutos y 200 en el minuto 30."""
+    entries = []
+    for minute in range(31):
+        n = 200 if minute == 30 else 40
+        for i in range(n):
+            ts = BASE + timedelta(minutes=minute, seconds=i * 59 // n)
+            entries.append(LogEntry("10.0.0.1", ts, "GET", "/", 200, 100))
+    return entries
+
+
+class TestSpikeIntegration:
+    """Tests de SpikeDetector con la serie temporal y LogAnalyzer."""
+
+    def test_analyzer_detect_spikes(self):
+        """Test 11: LogAnalyzer.detect_spikes encuentra el pico por minuto."""
+        spikes = LogAnalyzer(entries_with_spike()).detect_spikes(resolution=60)
+
+        assert [(s.metric, s.start) for s in spikes] == [
+            (METRIC_REQUESTS, BASE + timedelta(minutes=30))
+        ]
+
+    def test_streaming_with_drain(self):
+        """Test 12: En streaming los picos salen al cerrarse su bucket."""
+        series = TimeSeriesAggregator(60, lateness=0)
+        detector = SpikeDetector()
+        entries = entries_with_spike()
+        entries.append(
+            LogEntry("10.0.0.1", BASE + timedelta(minutes=31), "GET", "/", 200, 1)
+        )
+
+        spikes = []
+        for i in range(0, len(entries), 100):
+            series.consume(entries[i : i + 100])
+            spikes.extend(detector.detect(series.drain()))
+
+        assert [s.start for s in spikes] == [BASE + timedelta(minutes=30)]
@@ -0,0 +1,124 @@
+import pytest
+import os
+import threading
+from src.parsers.nginx_parser import NginxParser
+from src.parsers.tail import follow_blocks, follow_entries
+
+LINE = '192.168.1.1 - - [26/Nov/2024:12:00:00 +0000] "GET / HTTP/1.1" 200 100 "-" "-"\n'
+
+
+def collect(generator, stop, count):
+    """Consume `count` elementos del generador y detiene el seguimiento."""
+    items = []
+    for item in generator:
+        items.append(item)
+        if len(items) >= count:
+            stop.set()
+    return items
+
+
+# ============================================================================
+# FASE 1: Tests de follow_blocks
+# ============================================================================
+
+
+class TestFollowBlocks:
+    """Tests del seguimiento de archivos tipo tail -F."""
+
+    def test_from_start_reads_existing_content(self, tmp_path):
+        """Test 1: Con from_start lee el contenido existente."""
+        log = tmp_path / "access.log"
+        log.write_text("uno\ndos\n")
+        stop = threading.Event()
+
+        blocks = collect(follow_blocks(log, 0.01, from_start=True, stop=stop), stop, 1)
+
+        assert blocks == [b"uno\ndos\n"]
+
+    def test_follows_appended_lines(self, tmp_path):
+        """Test 2: Sin from_start solo genera las líneas añadidas después."""
+        log = tmp_path / "access.log"
+        log.write_text("antigua\n")
+        stop = threading.Event()
+        generator = follow_blocks(log, 0.01, stop=stop)
+        threading.Timer(0.05, lambda: log.open("a").write("nueva\n")).start()
+
+        assert collect(generator, stop, 1) == [b"nueva\n"]
+
+    def test_partial_line_waits_for_newline(self, tmp_path):
+        """Test 3: Una línea incompleta no se genera hasta tener salto de línea."""
+        log = tmp_path / "access.log"
+        log.write_text("incomp")
+        stop = threading.Event()
+        generator = follow_blocks(log, 0.01, from_start=True, stop=stop)
+        threading.Timer(0.05, lambda: log.open("a").write("leta\n")).start()
+
+        assert collect(generator, stop, 1) == [b"incompleta\n"]
+
+    def test_detects_rotation(self, tmp_path):
+        """Test 4: Tras una rotación sigue leyendo el archivo nuevo desde el principio."""
+        log = tmp_path / "access.log"
+        log.write_text("")
+        stop = threading.Event()
+        generator = follow_blocks(log, 0.01, stop=stop)
+
+        def rotate():
+            os.rename(log, tmp_path / "access.log.1")
+            log.write_text("rotado\n")
+
+        threading.Timer(0.05, rotate).start()
+
+        assert collect(generator, stop, 1) == [b"rotado\n"]
+
+    def test_stop_ends_generator(self, tmp_path):
+        """Test 5: Activar stop termina el seguimiento."""
+        stop = threading.Event()
+        stop.set()
+
+        assert list(follow_blocks(tmp_path / "no_existe.log", 0.01, stop=stop)) == []
+
+
+# ============================================================================
+# FASE 2: Tests de follow_entries
+# ============================================================================
+
+
+class TestFollowEntries:
+    """Tests del seguimiento con parseo."""
+
+    def test_follow_entries_parses_lines(self, tmp_path):
+        """Test 6: follow_entries genera LogEntry de las líneas nuevas."""
+        log = tmp_path / "access.log"
+        log.write_text(LINE * 3)
+        stop = threading.Event()
+
+        entries = collect(
+            follow_entries(NginxParser(), log, 0.01, from_start=True, stop=stop),
+            stop,
+            3,
+        )
+
+        assert [e.status_code for e in entries] == [200, 200, 200]
+
+
+# ============================================================================
+# FASE 3: Tests de Archivos que Aún no Existen
+# ============================================================================
+
+
+class TestFollowMissingFile:
+    """Tests de follow_blocks sobre un archivo que se crea después."""
+
+    def test_reads_file_created_later_from_start(self, tmp_path):
+        """Test 7: Sin from_start, un archivo creado después se lee desde el principio."""
+        log = tmp_path / "access.log"
+        stop = threading.Event()
+        generator = follow_blocks(log, 0.2, stop=stop)
+        threading.Timer(0.05, lambda: log.write_text("temprana\n")).start()
+        timeout = threading.Timer(5.0, stop.set)
+        timeout.start()
+
+        try:
+            assert collect(generator, stop, 1) == [b"temprana\n"]
+        finally:
+            timeout.cancel()
@@ -0,0 +1,223 @@
+import pytest
+import pickle
+from datetime import datetime, timedelta, timezone
+from src.analyzers.pipeline import EntryFilter, run_pipeline
+from src.analyzers.threat_detector import (
+    KIND_RATE,
+    KIND_SIGNATURE,
+    TARGET_PATH,
+    TARGET_USER_AGENT,
+    Signature,
+    SignatureMatcher,
+    ThreatDetector,
+    ThreatScanner,
+)
+from src.models.log_entry import LogEntry
+from src.parsers.nginx_parser import NginxParser
+
+BASE = datetime(2024, 11, 26, 12, 0, 0, tzinfo=timezone.utc)
+
+
+def make_entry(ip="10.0.0.1", path="/", user_agent="Mozilla/5.0", seconds=0):
+    return LogEntry(
+        ip,
+        BASE + timedelta(seconds=seconds),
+        "GET",
+        path,
+        200,
+        100,
+        user_agent=user_agent,
+    )
+
+
+@pytest.fixture
+def matcher():
+    """Fixture con un SignatureMatcher de las firmas por defecto."""
+    return SignatureMatcher()
+
+
+# ============================================================================
+# FASE 1: Tests de Firmas
+# ============================================================================
+
+
+class TestSignatureMatcher:
+    """Tests de la regex combinada de firmas."""
+
+    @pytest.mark.parametrize(
+        "path, name",
+        [
+            ("/products?id=1 UNION SELECT password FROM users", "sqli_union_select"),
+            ("/login?user=admin' or '1'='1", "sqli_tautology"),
+            ("/../../../etc/passwd", "traversal_dotdot"),
+            ("/download?file=%2e%2e%2f%2e%2e%2fetc%2fpasswd", "traversal_dotdot"),
+            ("/search?q=<script>alert(1)</script>", "xss_script"),
+            ("/ping?host=127.0.0.1;cat /etc/hosts", "cmd_chain"),
+            ("/.env", "sensitive_env"),
+            ("/.git/config", "sensitive_git"),
+        ],
+    )
+    def test_detects_attack_paths(self, matcher, path, name):
+        """Test 1: Los paths de ataque típicos coinciden con su firma."""
+        assert matcher.match(TARGET_PATH, path).name == name
+
+    @pytest.mark.parametrize(
+        "path",
+        [
+            "/",
+            "/index.html",
+            "/api/users?page=2",
+            "/blog/union-station",
+            "/environment",
+        ],
+    )
+    def test_benign_paths_do_not_match(self, matcher, path):
+        """Test 2: Los paths normales no generan hallazgos."""
+        assert matcher.match(TARGET_PATH, path) is None
+
+    def test_user_agent_signatures(self, matcher):
+        """Test 3: Las firmas de user agent solo se aplican al user agent."""
+        assert matcher.match(TARGET_USER_AGENT, "sqlmap/1.7").category == "scanner"
+        assert matcher.match(TARGET_PATH, "/sqlmap") is None
+        assert matcher.match(TARGET_USER_AGENT, None) is None
+
+    def test_first_signature_wins(self):
+        """Test 4: Gana la coincidencia más a la izquierda y, a igual posición, la primera firma."""
+        matcher = SignatureMatcher(
+            [Signature("first", "a", r"admin"), Signature("second", "b", r"/adm")]
+        )
+
+        assert matcher.match(TARGET_PATH, "/admin").name == "second"
+        assert matcher.match(TARGET_PATH, "admin").name == "first"
+
+    def test_results_are_cached(self, matcher):
+        """Test 5: Cada string se busca una sola vez."""
+        matcher.match(TARGET_PATH, "/.env")
+        matcher.regexes[TARGET_PATH] = None
+
+        assert matcher.match(TARGET_PATH, "/.env").name == "sensitive_env"
+
+    def test_matcher_pickles_without_cache(self, matcher):
+        """Test 6: El matcher viaja a los workers sin su caché."""
+        matcher.match(TARGET_PATH, "/.env")
+        copy = pickle.loads(pickle.dumps(matcher))
+
+        assert copy._cache == {}
+        assert copy.match(TARGET_PATH, "/.env").name == "sensitive_env"
+
+
+# ============================================================================
+# FASE 2: Tests de Picos por IP
+# ============================================================================
+
+
+class TestRateSpikes:
+    """Tests del conteo por ventana de ThreatDetector."""
+
+    def test_spike_reported_once_per_window(self):
+        """Test 7: Una IP que supera el umbral se reporta una vez por ventana."""
+        detector = ThreatDetector(rate_window=60, rate_threshold=5)
+        entries = [make_entry(seconds=i) for i in range(20)]
+
+        new = detector.observe(entries[:3]) + detector.observe(entries[3:])
+
+        spikes = [f for f in new if f.kind == KIND_RATE]
+        assert len(spikes) == 1
+        assert spikes[0].ip == "10.0.0.1"
+        assert spikes[0].timestamp == BASE
+
+    def test_spike_in_each_window(self):
+        """Test 8: El umbral se vuelve a evaluar en cada ventana."""
+        detector = ThreatDetector(rate_window=60, rate_threshold=3)
+        detector.observe(make_entry(seconds=s) for s in (0, 1, 2, 60, 61, 62))
+
+        assert detector.category_counts["rate"] == 2
+
+    def test_below_threshold_no_spike(self):
+        """Test 9: Las IPs por debajo del umbral no generan hallazgos."""
+        detector = ThreatDetector(rate_window=60, rate_threshold=5)
+        detector.observe(make_entry(ip=f"10.0.0.{i % 3}", seconds=i) for i in range(12))
+
+        assert detector.findings == []
+
+    def test_idle_ips_are_evicted(self):
+        """Test 10: Las IPs sin requests durante una ventana dejan de seguirse."""
+        detector = ThreatDetector(rate_window=60)
+        detector.observe(
+            make_entry(ip=f"10.0.0.{i}", seconds=60 * i) for i in range(10)
+        )
+
+        assert list(detector.rates.keys) == ["10.0.0.9"]
+
+    def test_tracked_ips_are_bounded(self):
+        """Test 11: Cada ventana guarda como máximo max_tracked_ips IPs."""
+        detector = ThreatDetector(
+            rate_window=60, rate_threshold=50, max_tracked_ips=100
+        )
+        entries = [make_entry(ip=f"10.1.{i // 256}.{i % 256}") for i in range(1_000)]
+        entries += [make_entry(ip="6.6.6.6", seconds=1)] * 60
+
+        detector.observe(entries)
+
+        assert len(detector.rates.keys) <= 100
+        assert [f.ip for f in detector.findings if f.kind == KIND_RATE] == ["6.6.6.6"]
+
+    def test_findings_are_bounded(self):
+        """Test 12: Se guardan max_findings hallazgos pero se cuentan todos."""
+        detector = ThreatDetector(max_findings=3)
+        detector.observe(make_entry(path="/.env", seconds=i) for i in range(10))
+
+        assert len(detector.findings) == 3
+        assert detector.summary()["total_findings"] == 10
+        assert detector.summary()["top_offenders"] == [("10.0.0.1", 10)]
+
+
+# ============================================================================
+# FASE 3: Tests de Integración con el Pipeline
+# ============================================================================
+
+
+class TestDetectorPipeline:
+    """Tests de ThreatDetector dentro de run_pipeline."""
+
+    def test_fixture_findings(self):
+        """Test 13: El detector encuentra los ataques de nginx_sample.log."""
+        detector = ThreatDetector()
+        aggregate = run_pipeline(
+            [("fixtures/nginx_sample.log", NginxParser())], detector=detector
+        )
+
+        names = {f.name for f in detector.findings}
+        assert {"sensitive_env", "traversal_dotdot", "scanner_ua"} <= names
+        assert all(f.kind == KIND_SIGNATURE for f in detector.findings)
+        assert aggregate.total_requests > 0
+
+    def test_workers_match_serial(self):
+        """Test 14: Con workers se obtienen los mismos hallazgos que en serie."""
+        jobs = [("fixtures/nginx_sample.log", NginxParser())]
+        serial, parallel = ThreatDetector(rate_window=3600, rate_threshold=5), None
+        run_pipeline(jobs, detector=serial)
+        parallel = ThreatDetector(rate_window=3600, rate_threshold=5)
+        run_pipeline(jobs, workers=2, detector=parallel)
+
+        assert parallel.findings == serial.findings
+        assert parallel.summary() == serial.summary()
+
+    def test_detector_sees_filtered_entries(self):
+        """Test 15: El detector solo ve las entradas que pasan los filtros."""
+        detector = ThreatDetector()
+        run_pipeline(
+            [("fixtures/nginx_sample.log", NginxParser())],
+            EntryFilter(statuses=frozenset({200})),
+            detector=detector,
+        )
+
+        assert "sensitive_env" not in {f.name for f in detector.findings}
+
+    def test_scanner_is_picklable(self):
+        """Test 16: ThreatScanner se puede enviar a un worker."""
+        scanner = pickle.loads(pickle.dumps(ThreatScanner(bucket_width=5)))
+        scan = scanner.scan([make_entry(path="/.env")])
+
+        assert [f.name for f in scan.findings] == ["sensitive_env"]
+        assert sum(c["10.0.0.1"] for c in scan.rate_counts.values()) == 1
@@ -0,0 +1,168 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from src.analyzers.log_analyzer import LogAnalyzer
+from src.analyzers.timeseries import (
+    TimeSeriesAggregator,
+    _bin_value,
+    _size_bin,
+    parse_resolution,
+)
+from src.models.log_entry import LogEntry
+from src.parsers.nginx_parser import NginxParser
+
+BASE = datetime(2024, 11, 26, 10, 0, 0, tzinfo=timezone.utc)
+
+
+def request(seconds=0, status=200, size=100):
+    return LogEntry(
+        "10.0.0.1", BASE + timedelta(seconds=seconds), "GET", "/", status, size
+    )
+
+
+# ============================================================================
+# FASE 1: Tests de Resolución e Histograma
+# ============================================================================
+
+
+class TestResolution:
+    """Tests de parse_resolution y del histograma logarítmico."""
+
+    @pytest.mark.parametrize(
+        "spec, seconds",
+        [("1s", 1), ("10s", 10), ("1m", 60), ("1h", 3600), ("15m", 900), ("30", 30)],
+    )
+    def test_parse_resolution(self, spec, seconds):
+        """Test 1: Las resoluciones con unidad se convierten a segundos."""
+        assert parse_resolution(spec) == seconds
+
+    @pytest.mark.parametrize("spec", ["", "0s", "abc", "1x", "-5m"])
+    def test_invalid_resolution(self, spec):
+        """Test 2: Las resoluciones inválidas lanzan ValueError."""
+        with pytest.raises(ValueError):
+            parse_resolution(spec)
+
+    @pytest.mark.parametrize("size", [1, 2, 3, 7, 100, 1_000, 65_536, 10**9])
+    def test_bin_value_is_close(self, size):
+        """Test 3: El valor de un bin está a menos del 25 % del tamaño real."""
+        assert abs(_bin_value(_size_bin(size)) - size) <= 0.25 * size
+
+    def test_bins_are_monotonic(self):
+        """Test 4: Tamaños mayores nunca caen en bins menores."""
+        bins = [_size_bin(size) for size in range(0, 5_000)]
+
+        assert bins == sorted(bins)
+
+
+# ============================================================================
+# FASE 2: Tests de TimeSeriesAggregator
+# ============================================================================
+
+
+class TestTimeSeries:
+    """Tests de la serie temporal."""
+
+    def test_buckets_and_metrics(self):
+        """Test 5: Requests, errores y bytes por bucket."""
+        series = TimeSeriesAggregator(resolution=10)
+        series.consume([request(0, size=10), request(5, 500, 20), request(12, 404, 30)])
+
+        buckets = list(series.buckets())
+        assert [b.start for b in buckets] == [BASE, BASE + timedelta(seconds=10)]
+        assert [(b.requests, b.errors, b.bytes) for b in buckets] == [
+            (2, 1, 30),
+            (1, 1, 30),
+        ]
+
+    def test_dense_gaps(self):
+        """Test 6: Los huecos sin tráfico aparecen como buckets vacíos."""
+        series = TimeSeriesAggregator(resolution=60)
+        series.consume([request(0), request(300)])
+
+        assert len(series.requests) == 6
+        assert [b.requests for b in series.buckets()] == [1, 0, 0, 0, 0, 1]
+        assert len(list(series.buckets(include_empty=False))) == 2
+
+    def test_out_of_order_extends_left(self):
+        """Test 7: Sin lateness, una entrada anterior al primer bucket se acepta."""
+        series = TimeSeriesAggregator(resolution=60)
+        series.consume([request(120), request(0)])
+
+        assert series.origin * 60 == BASE.timestamp()
+        assert [b.requests for b in series.buckets()] == [1, 0, 1]
+
+    def test_lateness_drops_old_entries(self):
+        """Test 8: Con lateness, lo demasiado antiguo se descarta y se cuenta."""
+        series = TimeSeriesAggregator(resolution=10, lateness=30)
+        added = series.consume([request(100), request(75), request(20)])
+
+        assert added == 2
+        assert series.late == 1
+
+    def test_quantiles(self):
+        """Test 9: Los cuantiles de tamaño salen del histograma logarítmico."""
+        series = TimeSeriesAggregator(resolution=60)
+        series.consume(request(i % 60, size=1_000) for i in range(99))
+        series.consume([request(0, size=1_000_000)])
+
+        quantiles = next(series.buckets()).size_quantiles
+        assert quantiles[0.5] == pytest.approx(1_000, rel=0.25)
+        assert quantiles[0.99] == pytest.approx(1_000, rel=0.25)
+
+    def test_merge_aligns_offsets(self):
+        """Test 10: merge suma series con distinto origen."""
+        a, b = TimeSeriesAggregator(60), TimeSeriesAggregator(60)
+        a.consume([request(60), request(120)])
+        b.consume([request(0), request(120, 500)])
+
+        a.merge(b)
+
+        assert [(x.requests, x.errors) for x in a.buckets()] == [(1, 0), (1, 0), (2, 1)]
+
+    def test_merge_requires_same_resolution(self):
+        """Test 11: No se pueden combinar series de distinta resolución."""
+        with pytest.raises(ValueError):
+            TimeSeriesAggregator(60).merge(TimeSeriesAggregator(10))
+
+    def test_drain_frees_closed_buckets(self):
+        """Test 12: drain emite los buckets cerrados y los libera."""
+        series = TimeSeriesAggregator(resolution=10, lateness=10)
+        series.consume(request(s) for s in range(0, 60, 5))
+
+        drained = series.drain()
+
+        assert [b.requests for b in drained] == [2, 2, 2, 2]
+        assert len(series.requests) == 2
+        assert series.drain() == []
+
+    def test_fixture_totals(self):
+        """Test 13: La suma de los buckets coincide con los totales del analyzer."""
+        entries = list(NginxParser().parse_file("fixtures/nginx_sample.log"))
+        analyzer = LogAnalyzer(entries)
+
+        series = analyzer.time_series(resolution=60)
+
+        assert sum(series.requests) == analyzer.total_requests()
+        assert sum(series.bytes) == analyzer.total_bytes_transferred()
+        assert sum(series.errors) == analyzer.aggregate().total_errors
+
+    def test_outlier_is_out_of_range(self):
+        """Test 14: Un timestamp que alargaría la serie más de max_buckets se descarta."""
+        series = TimeSeriesAggregator(resolution=1, max_buckets=3600)
+        added = series.consume(
+            [request(0), request(10 * 365 * 86400), request(-86400), request(3599)]
+        )
+
+        assert added == 2
+        assert series.out_of_range == 2
+        assert len(series.requests) == 3600
+
+    def test_merge_respects_max_buckets(self):
+        """Test 15: merge falla si las series juntas superan max_buckets."""
+        a = TimeSeriesAggregator(resolution=1, max_buckets=100)
+        b = TimeSeriesAggregator(resolution=1, max_buckets=100)
+        a.consume([request(0)])
+        b.consume([request(1000)])
+
+        with pytest.raises(ValueError, match="100"):
+            a.merge(b)
+        assert len(a.requests) == 1
@@ -0,0 +1,191 @@
+import pytest
+import pickle
+from src.analyzers.aggregate import LogAggregate
+from src.analyzers.log_analyzer import LogAnalyzer
+from src.analyzers.pipeline import EntryFilter, run_pipeline
+from src.analyzers.user_agents import (
+    DEVICE_BOT,
+    DEVICE_DESKTOP,
+    DEVICE_MOBILE,
+    DEVICE_TABLET,
+    UNKNOWN_AGENT,
+    UserAgentClassifier,
+)
+from src.parsers.nginx_parser import NginxParser
+
+CHROME = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+    " (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+EDGE = CHROME + " Edg/120.0.0.0"
+SAFARI_IPAD = (
+    "Mozilla/5.0 (iPad; CPU OS 17_0 like Mac OS X) AppleWebKit/605.1.15"
+    " (KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1"
+)
+SAMSUNG = (
+    "Mozilla/5.0 (Linux; Android 13; SM-S901B) AppleWebKit/537.36 (KHTML, like"
+    " Gecko) SamsungBrowser/23.0 Chrome/115.0.0.0 Mobile Safari/537.36"
+)
+FIREFOX_MAC = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 14.0; rv:121.0) Gecko/20100101"
+    " Firefox/121.0"
+)
+GOOGLEBOT_MOBILE = (
+    "Mozilla/5.0 (Linux; Android 6.0.1; Nexus 5X Build/MMB29P) AppleWebKit/537.36"
+    " (KHTML, like Gecko) Chrome/120.0 Mobile Safari/537.36"
+    " (compatible; Googlebot/2.1; +http://www.google.com/bot.html)"
+)
+
+
+@pytest.fixture
+def classifier():
+    """Fixture con un UserAgentClassifier con los bots por defecto."""
+    return UserAgentClassifier()
+
+
+@pytest.fixture
+def nginx_entries():
+    """Fixture con las entradas de nginx_sample.log."""
+    return list(NginxParser().parse_file("fixtures/nginx_sample.log"))
+
+
+# ============================================================================
+# FASE 1: Tests de Clasificación
+# ============================================================================
+
+
+class TestClassify:
+    """Tests de UserAgentClassifier.classify."""
+
+    @pytest.mark.parametrize(
+        "ua, browser, os, device",
+        [
+            (CHROME, "Chrome", "Windows", DEVICE_DESKTOP),
+            (EDGE, "Edge", "Windows", DEVICE_DESKTOP),
+            (SAFARI_IPAD, "Safari", "iOS", DEVICE_TABLET),
+            (SAMSUNG, "Samsung Internet", "Android", DEVICE_MOBILE),
+            (FIREFOX_MAC, "Firefox", "macOS", DEVICE_DESKTOP),
+        ],
+    )
+    def test_browsers(self, classifier, ua, browser, os, device):
+        """Test 1: Navegador, sistema y dispositivo, aunque el UA imite a otros."""
+        agent = classifier.classify(ua)
+
+        assert (agent.browser, agent.os, agent.device) == (browser, os, device)
+        assert not agent.is_bot
+
+    @pytest.mark.parametrize(
+        "ua, bot",
+        [
+            (GOOGLEBOT_MOBILE, "Googlebot"),
+            ("Mozilla/5.0 (compatible; bingbot/2.0)", "Bingbot"),
+            ("curl/7.68.0", "curl"),
+            ("python-requests/2.25.1", "Python"),
+            ("Mozilla/5.0 (compatible; scanner/1.0)", "Scanner"),
+            ("kube-probe/1.20", "Monitor"),
+            ("SomeCrawler/3.0 (+https://example.com)", "Otro"),
+        ],
+    )
+    def test_bots(self, classifier, ua, bot):
+        """Test 2: La regex combinada reconoce bots conocidos y genéricos."""
+        agent = classifier.classify(ua)
+
+        assert agent.bot == bot
+        assert agent.device == DEVICE_BOT
+        assert classifier.is_bot(ua)
+
+    @pytest.mark.parametrize("ua", [None, "", "-"])
+    def test_missing(self, classifier, ua):
+        """Test 3: Sin user agent la clasificación es UNKNOWN_AGENT."""
+        assert classifier.classify(ua) == UNKNOWN_AGENT
+
+    def test_custom_bots(self):
+        """Test 4: Se puede pasar una lista propia de bots."""
+        classifier = UserAgentClassifier([("Interno", r"acme-agent")])
+
+        assert classifier.classify("ACME-Agent/1.0").bot == "Interno"
+        assert classifier.classify("curl/8.0").bot is None
+
+    def test_cache_hits(self, classifier):
+        """Test 5: Un UA repetido se resuelve desde la caché LRU."""
+        for _ in range(5):
+            classifier.classify(CHROME)
+
+        info = classifier.cache_info()
+        assert (info.hits, info.misses) == (4, 1)
+
+    def test_cache_is_bounded(self):
+        """Test 6: La caché no pasa de cache_size entradas."""
+        classifier = UserAgentClassifier(cache_size=10)
+        for i in range(50):
+            classifier.classify(f"agent/{i}")
+
+        assert classifier.cache_info().currsize == 10
+
+    def test_pickles_without_cache(self, classifier):
+        """Test 7: Al serializar se descarta la caché y la regex sigue igual."""
+        classifier.classify(CHROME)
+        copy = pickle.loads(pickle.dumps(classifier))
+
+        assert copy.cache_info().currsize == 0
+        assert copy.classify("curl/7.68.0").bot == "curl"
+
+
+# ============================================================================
+# FASE 2: Tests de Agregación
+# ============================================================================
+
+
+class TestBreakdown:
+    """Tests de UserAgentBreakdown, LogAggregate y LogAnalyzer."""
+
+    def test_breakdown(self, classifier):
+        """Test 8: breakdown suma cuentas (ua, n) por navegador, dispositivo y bot."""
+        breakdown = classifier.breakdown(
+            [(CHROME, 5), (EDGE, 2), (SAMSUNG, 3), ("curl/7.68.0", 10), (None, 1)]
+        )
+
+        assert breakdown.total == 21
+        assert breakdown.top_browsers() == [
+            ("Chrome", 5),
+            ("Samsung Internet", 3),
+            ("Edge", 2),
+            ("Desconocido", 1),
+        ]
+        assert breakdown.devices == {"bot": 10, "desktop": 7, "mobile": 3, "other": 1}
+        assert breakdown.bot_share == pytest.approx(10 / 21)
+
+    def test_empty_breakdown(self, classifier):
+        """Test 9: Sin requests la proporción de bots es 0."""
+        assert classifier.breakdown([]).bot_share == 0.0
+
+    def test_aggregate_counts_user_agents(self, nginx_entries):
+        """Test 10: LogAggregate cuenta los UAs en la misma pasada."""
+        aggregate = LogAggregate()
+        aggregate.consume(nginx_entries)
+        breakdown = aggregate.user_agents()
+
+        assert sum(aggregate.user_agent_counts.values()) == len(nginx_entries)
+        assert breakdown.total == len(nginx_entries)
+        assert breakdown.bots["curl"] == 7
+
+    def test_analyzer(self, nginx_entries):
+        """Test 11: LogAnalyzer expone el desglose, top_browsers y bot_share."""
+        analyzer = LogAnalyzer(nginx_entries)
+        breakdown = analyzer.user_agents()
+
+        assert analyzer.bot_share() == breakdown.bot_share
+        assert breakdown.bot_requests == 26
+        assert analyzer.top_browsers(1) == breakdown.top_browsers(1)
+
+    def test_pipeline_workers(self):
+        """Test 12: El pipeline cuenta igual los UAs en serie que con workers."""
+        jobs = [("fixtures/nginx_sample.log", NginxParser())]
+
+        serial = run_pipeline(jobs, EntryFilter())
+        parallel = run_pipeline(jobs, EntryFilter(), workers=2)
+
+        assert serial.user_agent_counts == parallel.user_agent_counts
+        assert (
+            serial.user_agents().get_summary() == parallel.user_agents().get_summary()
+        )